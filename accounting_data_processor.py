@@ -6,13 +6,84 @@
 # - Nuevo manejo de indicadores debit_credit_indicator
 
 import pandas as pd
+import numpy as np
 import re
+import time
 from typing import Dict, List, Tuple, Any, Optional
 import logging
 from collections import Counter
 
+from date_inference import DateFormat, date_format_inferencer, strftime_unique
+from unique_transform import apply_unique
+
 logger = logging.getLogger(__name__)
 
+# Patrones del motor vectorizado de limpieza numérica (mismos que la versión por valor)
+_PARENTHESES_NEGATIVE_PATTERN = r'\([^)]*\d+[^)]*\)'
+_NON_NUMERIC_CHARS_PATTERN = r'[^\d.,\-]'
+_LAST_SEPARATOR_PATTERN = r'^(.*)([.,])([^.,]*)$'
+_FIRST_NUMBER_PATTERN = r'(-?\d+\.?\d*)'
+_BLANK_LINE_PATTERN = re.compile(r'(?m)^[ \t]*$')
+
+_CONVENTION_SAMPLE_SIZE = 2000
+
+# Campos fecha/hora que separate_datetime_fields procesa (en este orden) y valores no nulos
+# de la columna con los que se detecta su formato
+DATETIME_FIELDS = ('entry_date', 'entry_time', 'posting_date')
+DATETIME_PLAN_SAMPLE_SIZE = 10
+
+# Patrones de detección de campos fecha/hora
+_PURE_DATE_PATTERNS = [
+    r'^\d{1,2}\.\d{1,2}\.\d{4}$',      # DD.MM.YYYY
+    r'^\d{1,2}/\d{1,2}/\d{4}$',       # DD/MM/YYYY
+    r'^\d{1,2}-\d{1,2}-\d{4}$',       # DD-MM-YYYY
+    r'^\d{4}-\d{2}-\d{2}$',           # YYYY-MM-DD
+    r'^\d{4}/\d{2}/\d{2}$',           # YYYY/MM/DD
+    r'^\d{4}\.\d{2}\.\d{2}$',         # YYYY.MM.DD
+    r'^\d{8}$',                       # YYYYMMDD
+]
+
+_PURE_TIME_PATTERNS = [
+    r'^\d{1,2}:\d{2}:\d{2}$',         # HH:MM:SS
+    r'^\d{1,2}:\d{2}$',               # HH:MM
+    r'^\d{1,2}:\d{2}:\d{2}\.\d+$',    # HH:MM:SS.microseconds
+]
+
+_PURE_DATE_REGEX = re.compile('|'.join(f'(?:{pattern})' for pattern in _PURE_DATE_PATTERNS))
+_PURE_TIME_REGEX = re.compile('|'.join(f'(?:{pattern})' for pattern in _PURE_TIME_PATTERNS))
+
+_COMBINED_DATETIME_PATTERNS = [
+    r'\d{4}-\d{2}-\d{2}\s+\d{1,2}:\d{2}',        # YYYY-MM-DD HH:MM
+    r'\d{1,2}/\d{1,2}/\d{4}\s+\d{1,2}:\d{2}',    # DD/MM/YYYY HH:MM
+    r'\d{1,2}-\d{1,2}-\d{4}\s+\d{1,2}:\d{2}',    # DD-MM-YYYY HH:MM
+    r'\d{1,2}\.\d{1,2}\.\d{4}\s+\d{1,2}:\d{2}',  # DD.MM.YYYY HH:MM
+    r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}',      # ISO format
+]
+
+def _canonical_format(number_pattern: str, converter):
+    """
+    Patrón de fila, patrón multilínea de filas válidas, patrón de primera fila inválida
+    y conversor para una convención canónica
+    """
+    row = rf'[ \t]*(?:-?(?:{number_pattern})|\((?:{number_pattern})\))?[ \t]*'
+    return row, re.compile(rf'(?m)^{row}$'), re.compile(rf'(?m)^(?!{row}$)'), converter
+
+# Formatos canónicos por convención decimal: filas que los cumplen dan el mismo resultado
+# con un simple replace + float() que con la limpieza completa por valor
+_CANONICAL_NUMERIC_FORMATS = {
+    # 1234 / -1234.5 / 1234.56
+    'plain': _canonical_format(r'[0-9]+(?:\.[0-9]{0,2})?', lambda text: text),
+    # 1,234 / 1,234,567.89
+    'anglo': _canonical_format(r'[0-9]{1,3}(?:,[0-9]{3})+(?:\.[0-9]*)?|[0-9]+(?:\.[0-9]{0,2})?',
+                               lambda text: text.replace(',', '')),
+    # 1.234,56 / 1234,5 / 1.234
+    'european': _canonical_format(r'[0-9]{1,3}(?:\.[0-9]{3})+,[0-9]{1,2}|[0-9]+,[0-9]{1,2}|[0-9]{1,3}\.[0-9]{3}|[0-9]+',
+                                  lambda text: text.replace('.', '').replace(',', '.')),
+    # 25.000.00 / 1.234.567.89
+    'european_dotted': _canonical_format(r'[0-9]{1,3}(?:\.[0-9]{3})+\.[0-9]{1,2}|[0-9]+(?:\.[0-9]{1,2})?',
+                                         lambda text: re.sub(r'\.(?=[0-9]{3}\.)', '', text)),
+}
+
 class AccountingDataProcessor:
     """
     Procesador reutilizable para datos contables con limpieza numérica y cálculos
@@ -29,16 +100,30 @@ class AccountingDataProcessor:
             'fields_cleaned': 0,
             'parentheses_negatives_processed': 0,
             'amount_calculated': 0,
-            'indicators_created': 0
+            'indicators_created': 0,
+            'numeric_rows_cleaned': 0,
+            'numeric_unique_values': 0,
+            'numeric_cleaning_seconds': 0
         }
+        self.last_decimal_convention = None
+        self.last_unique_count = 0
 
-    def separate_datetime_fields(self, df: pd.DataFrame) -> pd.DataFrame:
+    def separate_datetime_fields(self, df: pd.DataFrame,
+                                 datetime_plans: Optional[Dict[str, Dict]] = None) -> pd.DataFrame:
         """
         Separa campos que contienen fecha y hora combinados en campos separados
         VERSIÓN CORREGIDA - Mantiene toda la funcionalidad original pero sin bucles infinitos
         ASEGURA que todas las fechas se conviertan a formato YYYY-MM-DD
-        """
         
+        El formato (strptime explícito + dayfirst) se infiere una vez con DateFormatInferencer
+        sobre la muestra y la columna completa se parsea de forma vectorizada; solo los valores
+        distintos que no encajan pasan por pd.to_datetime genérico
+        
+        Args:
+            datetime_plans: Dict opcional campo → formato detectado. Si se reutiliza el mismo dict
+                entre llamadas (p.ej. procesamiento por chunks), la detección se hace una sola vez
+                con la primera muestra y el resto de llamadas aplican el mismo formato
+        """
         def _separate_single_datetime_field(df, field_name):
             """
             Función auxiliar para separar un campo datetime individual
@@ -47,121 +132,34 @@ class AccountingDataProcessor:
             if field_name not in df.columns:
                 return False  # ✅ CORREGIDO: Return boolean consistente
             
-            sample_values = df[field_name].dropna().head(10)
-            if len(sample_values) == 0:
-                return False
-            
-            # Verificar si contiene tanto fecha como hora
-            datetime_detected = False
-            pure_date_count = 0
-            pure_time_count = 0
+            if datetime_plans is not None and field_name in datetime_plans:
+                plan = datetime_plans[field_name]
+            else:
+                sample_values = df[field_name].dropna().head(DATETIME_PLAN_SAMPLE_SIZE)
+                if len(sample_values) == 0:
+                    return False
+                plan = self._detect_datetime_plan(sample_values)
+                if datetime_plans is not None:
+                    datetime_plans[field_name] = plan
             
-            # Variables para capturar formato detectado
-            detected_format = None
-            detected_dayfirst = True  # Por defecto europeo
-            
-            # MANTENER TODA LA LÓGICA ORIGINAL DE DETECCIÓN
-            for value in sample_values:
-                str_value = str(value).strip()
-                
-                # PRIMERO: Verificar si es una fecha pura sin componente de tiempo
-                pure_date_patterns = [
-                    r'^\d{1,2}\.\d{1,2}\.\d{4}$',      # DD.MM.YYYY
-                    r'^\d{1,2}/\d{1,2}/\d{4}$',       # DD/MM/YYYY
-                    r'^\d{1,2}-\d{1,2}-\d{4}$',       # DD-MM-YYYY
-                    r'^\d{4}-\d{2}-\d{2}$',           # YYYY-MM-DD
-                    r'^\d{4}/\d{2}/\d{2}$',           # YYYY/MM/DD
-                    r'^\d{4}\.\d{2}\.\d{2}$',         # YYYY.MM.DD
-                    r'^\d{8}$',                       # YYYYMMDD
-                ]
-                
-                # SEGUNDO: Verificar si es tiempo puro
-                pure_time_patterns = [
-                    r'^\d{1,2}:\d{2}:\d{2}$',         # HH:MM:SS
-                    r'^\d{1,2}:\d{2}$',               # HH:MM
-                    r'^\d{1,2}:\d{2}:\d{2}\.\d+$',    # HH:MM:SS.microseconds
-                ]
-                
-                # Si coincide con patrón de fecha pura, incrementar contador
-                if any(re.match(pattern, str_value) for pattern in pure_date_patterns):
-                    pure_date_count += 1
-                    # Capturar formato de fecha pura
-                    if not detected_format:
-                        if re.match(r'^\d{1,2}\.\d{1,2}\.\d{4}$', str_value):
-                            detected_format = '%d.%m.%Y'
-                            detected_dayfirst = True
-                        elif re.match(r'^\d{4}-\d{2}-\d{2}$', str_value):
-                            detected_format = '%Y-%m-%d'
-                            detected_dayfirst = False
-                        elif re.match(r'^\d{1,2}/\d{1,2}/\d{4}$', str_value):
-                            detected_dayfirst = True  # Asumir europeo
-                        else:
-                            detected_dayfirst = '.' in str_value or not str_value.startswith(('20', '19'))
-                    continue
-                elif any(re.match(pattern, str_value) for pattern in pure_time_patterns):
-                    pure_time_count += 1
-                    continue
-                
-                # TERCERO: Solo si NO es fecha pura NI tiempo puro, verificar datetime combinado
-                combined_datetime_patterns = [
-                    r'\d{4}-\d{2}-\d{2}\s+\d{1,2}:\d{2}',        # YYYY-MM-DD HH:MM
-                    r'\d{1,2}/\d{1,2}/\d{4}\s+\d{1,2}:\d{2}',    # DD/MM/YYYY HH:MM
-                    r'\d{1,2}-\d{1,2}-\d{4}\s+\d{1,2}:\d{2}',    # DD-MM-YYYY HH:MM
-                    r'\d{1,2}\.\d{1,2}\.\d{4}\s+\d{1,2}:\d{2}',  # DD.MM.YYYY HH:MM
-                    r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}',      # ISO format
-                ]
-                
-                for pattern in combined_datetime_patterns:
-                    if re.search(pattern, str_value):
-                        datetime_detected = True
-                        # Capturar formato datetime combinado
-                        if not detected_format:
-                            if re.search(r'\d{1,2}\.\d{1,2}\.\d{4}\s+\d{1,2}:\d{2}', str_value):
-                                detected_format = '%d.%m.%Y %H:%M:%S'
-                                detected_dayfirst = True
-                            elif re.search(r'\d{4}-\d{2}-\d{2}\s+\d{1,2}:\d{2}', str_value):
-                                detected_format = '%Y-%m-%d %H:%M:%S'
-                                detected_dayfirst = False
-                            elif re.search(r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}', str_value):
-                                detected_format = '%Y-%m-%dT%H:%M:%S'
-                                detected_dayfirst = False
-                            else:
-                                # Para otros, detectar por contenido
-                                detected_dayfirst = '.' in str_value or ('/' in str_value and not str_value.startswith(('20', '19')))
-                        break
-                
-                if datetime_detected:
-                    break
+            datetime_detected = plan['datetime_detected']
+            pure_date_count = plan['pure_date_count']
+            pure_time_count = plan['pure_time_count']
+            date_format = plan['date_format']
+            total_samples = plan['total_samples']
             
             # Evaluar resultados - MANTENER TODA LA LÓGICA ORIGINAL
-            total_samples = len(sample_values)
             if total_samples == 0:
                 return False
                 
             pure_date_ratio = pure_date_count / total_samples
             pure_time_ratio = pure_time_count / total_samples
             
-            # NUEVA LÓGICA: Convertir fechas a YYYY-MM-DD incluso si no se separan
-            def convert_to_standard_date(value, dayfirst=detected_dayfirst):
-                """Convierte cualquier fecha a formato YYYY-MM-DD"""
-                if pd.isna(value) or value == '':
-                    return value
-                
-                str_value = str(value).strip()
-                try:
-                    parsed_dt = pd.to_datetime(str_value, dayfirst=dayfirst, errors='coerce')
-                    if not pd.isna(parsed_dt):
-                        return parsed_dt.strftime('%Y-%m-%d')
-                    else:
-                        return str_value
-                except:
-                    return str_value
-            
             # Si la mayoría son fechas puras, convertir a YYYY-MM-DD pero NO separar
             if pure_date_ratio >= 0.7:
                 print(f"   ℹ️ Field '{field_name}' contains pure dates, converting to YYYY-MM-DD format")
                 # Convertir todas las fechas al formato estándar
-                df[field_name] = df[field_name].apply(lambda x: convert_to_standard_date(x, detected_dayfirst))
+                df[field_name] = date_format_inferencer.to_iso(df[field_name], date_format)
                 return False  # No separamos, solo convertimos formato
             # Si la mayoría son tiempos puros, NO separar  
             elif pure_time_ratio >= 0.7:
@@ -171,85 +169,15 @@ class AccountingDataProcessor:
             elif not datetime_detected:
                 print(f"   ℹ️ Field '{field_name}' does not contain combined date+time")
                 # Aún así, intentar convertir fechas a formato estándar si las hay
-                df[field_name] = df[field_name].apply(lambda x: convert_to_standard_date(x, detected_dayfirst))
+                df[field_name] = date_format_inferencer.to_iso(df[field_name], date_format)
                 return False
             
             print(f"   📅 Detected combined DateTime in '{field_name}', separating...")
             
-            # MANTENER TODA LA LÓGICA ORIGINAL DE SEPARACIÓN
-            dates = []
-            times = []
-            
-            for value in df[field_name]:
-                if pd.isna(value) or value == '':
-                    dates.append('')
-                    times.append('')
-                    continue
-                
-                str_value = str(value).strip()
-                
-                # Verificar si este valor específico es fecha pura
-                if any(re.match(pattern, str_value) for pattern in pure_date_patterns):
-                    try:
-                        parsed_dt = pd.to_datetime(str_value, dayfirst=detected_dayfirst, errors='coerce')
-                        date_str = parsed_dt.strftime('%Y-%m-%d') if not pd.isna(parsed_dt) else str_value
-                    except:
-                        date_str = str_value
-
-                    dates.append(date_str)
-                    times.append('')
-                    continue
-                
-                # Verificar si este valor específico es tiempo puro
-                if any(re.match(pattern, str_value) for pattern in pure_time_patterns):
-                    dates.append('')  # No hay fecha
-                    times.append(str_value)  
-                    continue
-                
-                # Solo procesar como datetime combinado si realmente lo es
-                has_space_and_colon = ' ' in str_value and ':' in str_value
-                has_t_separator = 'T' in str_value and ':' in str_value
-                
-                if has_space_and_colon or has_t_separator:
-                    try:
-                        # Usar formato detectado en lugar de parsing genérico
-                        if detected_format:
-                            try:
-                                parsed_dt = pd.to_datetime(str_value, format=detected_format)
-                            except:
-                                # Si falla formato específico, usar dayfirst detectado como fallback
-                                parsed_dt = pd.to_datetime(str_value, dayfirst=detected_dayfirst, errors='raise')
-                        else:
-                            # Fallback si no se detectó formato específico
-                            parsed_dt = pd.to_datetime(str_value, dayfirst=detected_dayfirst, errors='raise')
-                        
-                        # SIEMPRE convertir fecha a YYYY-MM-DD
-                        date_str = parsed_dt.strftime('%Y-%m-%d')
-                        time_str = parsed_dt.strftime('%H:%M:%S')
-
-                        dates.append(date_str)
-                        times.append(time_str)
-                        
-                    except Exception as e:
-                        # Si falla el parseo, mantener original pero intentar convertir fecha
-                        try:
-                            parsed_dt = pd.to_datetime(str_value, dayfirst=detected_dayfirst, errors='coerce')
-                            date_str = parsed_dt.strftime('%Y-%m-%d') if not pd.isna(parsed_dt) else str_value
-                        except:
-                            date_str = str_value
-                        dates.append(date_str)
-                        times.append('')
-                else:
-                    try:
-                        parsed_dt = pd.to_datetime(str_value, dayfirst=detected_dayfirst, errors='coerce')
-                        date_str = parsed_dt.strftime('%Y-%m-%d') if not pd.isna(parsed_dt) else str_value
-                    except:
-                        date_str = str_value
-                    dates.append(date_str)
-                    times.append('')
+            dates, times = self._split_datetime_values(df[field_name], date_format)
             
             # Solo actualizar si realmente se procesó algo
-            if any(time for time in times if time):
+            if (times != '').any():
                 # Determinar nombres de campos de salida
                 if field_name == 'entry_date':
                     date_field = 'entry_date'
@@ -265,11 +193,11 @@ class AccountingDataProcessor:
                         time_field = f"{field_name}_time"
                 
                 # Actualizar el DataFrame con fechas separadas
-                df[date_field] = dates
+                df[date_field] = dates.tolist()
                 
                 # Para tiempo, verificar si ya existe el campo
                 if time_field not in df.columns or df[time_field].isna().all():
-                    df[time_field] = times
+                    df[time_field] = times.tolist()
                 else:
                     # Si ya existe time_field y tiene datos, crear uno nuevo
                     counter = 1
@@ -277,7 +205,7 @@ class AccountingDataProcessor:
                     while new_time_field in df.columns:
                         counter += 1
                         new_time_field = f"{time_field}_{counter}"
-                    df[new_time_field] = times
+                    df[new_time_field] = times.tolist()
                     time_field = new_time_field
                 
                 print(f"   ✓ Separated into '{date_field}' and '{time_field}'")
@@ -287,17 +215,13 @@ class AccountingDataProcessor:
                 return True  
             else:
                 # Si no había tiempos para separar, al menos actualizar las fechas convertidas
-                df[field_name] = dates
+                df[field_name] = dates.tolist()
                 return False
-            
-            return False  
         
         try:
             print("🔧 Checking for combined DateTime fields...")
             
-            fields_to_process = ['entry_date', 'entry_time', 'posting_date']
-            
-            for field_name in fields_to_process:
+            for field_name in DATETIME_FIELDS:
                 if field_name in df.columns:
                     success = _separate_single_datetime_field(df, field_name)
                     if success:
@@ -311,9 +235,90 @@ class AccountingDataProcessor:
         print("✓ DateTime field separation completed")
         return df
 
-    def process_numeric_fields_and_calculate_amounts(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict]:
+    def _split_datetime_values(self, series: pd.Series, date_format: DateFormat) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Fecha (YYYY-MM-DD) y hora (HH:MM:SS) por fila de una columna fecha+hora:
+        fechas puras → solo fecha, tiempos puros → solo hora, fecha+hora → ambas y el
+        resto → fecha convertida o el texto original
+        """
+        empty = (series.isna() | (series.astype(object) == '')).to_numpy(dtype=bool)
+        text = series.astype(str).str.strip().where(~empty, '')
+        
+        pure_date = text.str.match(_PURE_DATE_REGEX).to_numpy(dtype=bool) & ~empty
+        pure_time = text.str.match(_PURE_TIME_REGEX).to_numpy(dtype=bool) & ~empty & ~pure_date
+        has_colon = text.str.contains(':', regex=False).to_numpy(dtype=bool)
+        has_space_or_t = (text.str.contains(' ', regex=False) | text.str.contains('T', regex=False)).to_numpy(dtype=bool)
+        combined = has_colon & has_space_or_t & ~empty & ~pure_date & ~pure_time
+        date_only = ~empty & ~pure_time & ~combined
+        
+        dates = text.to_numpy(dtype=object, copy=True)
+        dates[pure_time] = ''
+        times = np.full(len(text), '', dtype=object)
+        times[pure_time] = text[pure_time].to_numpy(dtype=object)
+        
+        # Fecha+hora: formato de la muestra y, si no encaja, pd.to_datetime genérico con su dayfirst
+        if combined.any():
+            parsed = date_format_inferencer.parse(text[combined], date_format)
+            ok = parsed.notna().to_numpy(dtype=bool)
+            rows = np.flatnonzero(combined)[ok]
+            dates[rows] = strftime_unique(parsed[ok], '%Y-%m-%d')
+            times[rows] = strftime_unique(parsed[ok], '%H:%M:%S')
+        
+        # Fechas puras y resto: su propio formato (la muestra puede ser de fecha+hora)
+        if date_only.any():
+            values = text[date_only]
+            dates[date_only] = date_format_inferencer.to_iso(
+                values, date_format_inferencer.infer(values, dayfirst=date_format.dayfirst)).to_numpy(dtype=object)
+        
+        return dates, times
+
+    def _detect_datetime_plan(self, sample_values: pd.Series) -> Dict[str, Any]:
+        """
+        Detecta sobre una muestra si un campo contiene fechas puras, tiempos puros o fecha+hora,
+        junto con el formato y dayfirst a aplicar en toda la columna
+        """
+        datetime_detected = False
+        pure_date_count = 0
+        pure_time_count = 0
+        
+        # MANTENER TODA LA LÓGICA ORIGINAL DE DETECCIÓN
+        for value in sample_values:
+            str_value = str(value).strip()
+            
+            # PRIMERO: Verificar si es una fecha pura sin componente de tiempo
+            if _PURE_DATE_REGEX.match(str_value):
+                pure_date_count += 1
+                continue
+            # SEGUNDO: Verificar si es tiempo puro
+            elif _PURE_TIME_REGEX.match(str_value):
+                pure_time_count += 1
+                continue
+            
+            # TERCERO: Solo si NO es fecha pura NI tiempo puro, verificar datetime combinado
+            if any(re.search(pattern, str_value) for pattern in _COMBINED_DATETIME_PATTERNS):
+                datetime_detected = True
+                break
+        
+        # Formato strptime explícito y dayfirst inferidos una sola vez de la muestra
+        date_format = date_format_inferencer.infer(sample_values)
+        
+        return {
+            'datetime_detected': datetime_detected,
+            'pure_date_count': pure_date_count,
+            'pure_time_count': pure_time_count,
+            'date_format': date_format,
+            'detected_format': date_format.format,
+            'detected_dayfirst': date_format.dayfirst,
+            'total_samples': len(sample_values)
+        }
+
+    def process_numeric_fields_and_calculate_amounts(self, df: pd.DataFrame,
+                                                     has_indicator: Optional[bool] = None) -> Tuple[pd.DataFrame, Dict]:
         """
         Función principal que procesa campos numéricos y calcula amounts según disponibilidad
+        Args:
+            has_indicator: Fuerza la detección de debit_credit_indicator (p.ej. calculada sobre el
+                fichero completo al procesar por chunks). None = detectar sobre df
         Returns:
             Tuple[pd.DataFrame, Dict]: DataFrame procesado y estadísticas
         """
@@ -330,11 +335,8 @@ class AccountingDataProcessor:
             has_amount = 'amount' in df.columns
             has_debit = 'debit_amount' in df.columns
             has_credit = 'credit_amount' in df.columns
-            has_indicator = (
-            'debit_credit_indicator' in df.columns and 
-            not df['debit_credit_indicator'].isna().all() and
-            (df['debit_credit_indicator'] != '').any()
-        )
+            if has_indicator is None:
+                has_indicator = self.has_debit_credit_indicator(df)
             
             print(f"\n🔍 SCENARIO DETECTION:")
             print(f"   Has amount: {has_amount}")
@@ -375,6 +377,15 @@ class AccountingDataProcessor:
             print(f"Error processing numeric fields: {e}")
             return df, self.stats.copy()
 
+    @staticmethod
+    def has_debit_credit_indicator(df: pd.DataFrame) -> bool:
+        """Indica si df tiene una columna debit_credit_indicator con algún valor informado"""
+        return bool(
+            'debit_credit_indicator' in df.columns and 
+            not df['debit_credit_indicator'].isna().all() and
+            (df['debit_credit_indicator'] != '').any()
+        )
+
     def debit_credit_to_amount(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         ESCENARIO 1: Tiene debit_amount y credit_amount pero no amount
@@ -384,8 +395,8 @@ class AccountingDataProcessor:
         print(f"💡 SCENARIO 1: Calculating amount from debit/credit + creating indicator")
         
         # Limpiar campos debit y credit
-        df['debit_amount'] = df['debit_amount'].apply(self._clean_numeric_value_with_zero_fill)
-        df['credit_amount'] = df['credit_amount'].apply(self._clean_numeric_value_with_zero_fill)
+        df['debit_amount'] = self._clean_numeric_column_with_zero_fill(df['debit_amount'])
+        df['credit_amount'] = self._clean_numeric_column_with_zero_fill(df['credit_amount'])
         
         # Calcular amount SIN valores absolutos
         df['amount'] = df['debit_amount'] - df['credit_amount']
@@ -445,7 +456,7 @@ class AccountingDataProcessor:
         print(f"💡 SCENARIO 3: Creating debit_credit_indicator from amount only")
         
         # Limpiar campo amount
-        df['amount'] = df['amount'].apply(self._clean_numeric_value_with_zero_fill)
+        df['amount'] = self._clean_numeric_column_with_zero_fill(df['amount'])
         
         # Crear indicador basado en el signo del amount
         df['debit_credit_indicator'] = ''
@@ -486,14 +497,23 @@ class AccountingDataProcessor:
                 original_sample = df[field].dropna().head(3).tolist()
                 
                 # Contar valores con paréntesis ANTES del procesamiento
-                parentheses_count = df[field].astype(str).str.contains(r'\(', na=False).sum()
+                parentheses_count = df[field].astype(str).str.contains('(', regex=False, na=False).sum()
                 
-                # Aplicar limpieza numérica SIN valores absolutos
-                df[field] = df[field].apply(self._clean_numeric_value_with_zero_fill)
+                # Aplicar limpieza numérica SIN valores absolutos (motor vectorizado)
+                start_time = time.perf_counter()
+                df[field] = self._clean_numeric_column_with_zero_fill(df[field])
+                elapsed = time.perf_counter() - start_time
                 
                 cleaned_sample = df[field].head(3).tolist()
                 print(f"     Original: {original_sample}")
                 print(f"     Cleaned:  {cleaned_sample}")
+                rows_per_second = len(df) / elapsed if elapsed > 0 else float('inf')
+                print(f"     ⚡ {len(df):,} rows in {elapsed:.3f}s ({rows_per_second:,.0f} rows/s), "
+                      f"convention: {self.last_decimal_convention}, "
+                      f"{self.last_unique_count:,} uniques ({len(df) / max(self.last_unique_count, 1):.1f}x)")
+                self.stats['numeric_rows_cleaned'] += len(df)
+                self.stats['numeric_unique_values'] += self.last_unique_count
+                self.stats['numeric_cleaning_seconds'] += elapsed
                 
                 # Contar zero-fills
                 zero_count = (df[field] == 0.0).sum()
@@ -508,6 +528,26 @@ class AccountingDataProcessor:
         
         return df
 
+    def _clean_numeric_column_with_zero_fill(self, series: pd.Series) -> pd.Series:
+        """
+        Versión vectorizada de _clean_numeric_value_with_zero_fill para una columna completa
+        - Columnas ya numéricas: conversión directa a float con 0.0 en nulos
+        - Columnas de texto: factoriza la columna (apply_unique), detecta la convención decimal
+          una sola vez y convierte en bloque los valores distintos con operaciones .str / NumPy
+        - Resultado idéntico (bit a bit) a aplicar la versión por valor con .apply
+        """
+        if series.dtype.kind in 'biuf':
+            cleaned, self.last_decimal_convention = clean_numeric_series(series)
+            self.last_unique_count = len(series)
+            return cleaned
+        
+        def clean_uniques(uniques: pd.Series) -> pd.Series:
+            cleaned_uniques, self.last_decimal_convention = clean_numeric_series(uniques)
+            self.last_unique_count = len(uniques)
+            return cleaned_uniques
+        
+        return apply_unique(series, clean_uniques, label=f"numeric:{series.name}", vectorized=True)
+
     def _clean_numeric_value_with_zero_fill(self, value) -> float:
         """
         Limpia un valor numérico individual SIN aplicar valores absolutos
@@ -593,6 +633,13 @@ class AccountingDataProcessor:
         print(f"   Fields cleaned: {self.stats['fields_cleaned']}")
         print(f"   Amount calculations: {self.stats['amount_calculated']}")
         print(f"   Indicators created: {self.stats['indicators_created']}")
+        if self.stats['numeric_cleaning_seconds'] > 0:
+            rows_per_second = self.stats['numeric_rows_cleaned'] / self.stats['numeric_cleaning_seconds']
+            print(f"   Numeric cleaning throughput: {rows_per_second:,.0f} rows/s")
+        if self.stats['numeric_unique_values'] > 0:
+            reduction = self.stats['numeric_rows_cleaned'] / self.stats['numeric_unique_values']
+            print(f"   Numeric unique-value reduction: {reduction:.1f}x "
+                  f"({self.stats['numeric_unique_values']:,} uniques)")
         
         # Mostrar columnas finales
         numeric_cols = [col for col in df.columns if col in ['amount', 'debit_amount', 'credit_amount', 'debit_credit_indicator']]
@@ -622,9 +669,226 @@ class AccountingDataProcessor:
 # Funciones de utilidad para usar directamente
 def clean_numeric_field(series: pd.Series, field_name: str = "field") -> pd.Series:
     """Función utilitaria para limpiar una serie numérica"""
-    processor = AccountingDataProcessor()
     print(f"Cleaning numeric field: {field_name}")
-    return series.apply(processor._clean_numeric_value_with_zero_fill)
+    cleaned, _ = clean_numeric_series(series)
+    return cleaned
+
+def clean_numeric_series(series: pd.Series) -> Tuple[pd.Series, str]:
+    """
+    Motor vectorizado de limpieza numérica para una columna completa
+    Reproduce exactamente AccountingDataProcessor._clean_numeric_value_with_zero_fill:
+    - Nulos, vacíos y espacios → 0.0
+    - Valores ya numéricos → float sin cambios
+    - Texto: paréntesis como negativos, formato europeo (1.234,56 / 25.000.00)
+      y anglosajón (1,234.56)
+    - Texto sin dígitos ni separadores → NaN (None en la versión por valor)
+    Returns:
+        Tuple[pd.Series, str]: serie limpia y convención decimal detectada en la columna
+    """
+    # Columnas ya numéricas: conversión directa
+    if series.dtype.kind in 'biuf':
+        values = series.to_numpy(dtype='float64', na_value=np.nan)
+        values = np.where(np.isnan(values), 0.0, values)
+        return pd.Series(values, index=series.index, name=series.name), 'numeric'
+    
+    values = series.to_numpy(dtype=object)
+    n = len(values)
+    if n == 0:
+        return pd.Series(values, index=series.index, name=series.name, dtype=object), 'empty'
+    
+    result = np.full(n, np.nan)
+    is_null = np.asarray(pd.isna(values), dtype=bool)
+    all_strings = pd.api.types.infer_dtype(values, skipna=True) == 'string'
+    
+    # Valores numéricos nativos mezclados en columnas object
+    if all_strings:
+        is_number = np.zeros(n, dtype=bool)
+    else:
+        is_number = np.fromiter((isinstance(v, (int, float)) for v in values), dtype=bool, count=n) & ~is_null
+        if is_number.any():
+            result[is_number] = [_float_or_zero(v) for v in values[is_number]]
+    
+    result[is_null] = 0.0
+    is_text = ~(is_null | is_number)
+    if not is_text.any():
+        return pd.Series(result, index=series.index, name=series.name), 'numeric'
+    
+    raw_text = values[is_text]
+    if not all_strings:
+        raw_text = np.array([v if isinstance(v, str) else str(v) for v in raw_text], dtype=object)
+    text_result, no_chars, convention = _clean_text_values(raw_text)
+    result[is_text] = text_result
+    
+    # La versión por valor devuelve None para texto sin dígitos; si todos lo son, .apply da object
+    if no_chars.all() and not (is_null.any() or is_number.any()):
+        return pd.Series([None] * n, index=series.index, name=series.name, dtype=object), 'non_numeric'
+    
+    return pd.Series(result, index=series.index, name=series.name), convention
+
+def _clean_text_values(raw_text: np.ndarray) -> Tuple[np.ndarray, np.ndarray, str]:
+    """
+    Limpia valores de texto detectando la convención decimal de la columna una sola vez
+    - Ruta rápida: la convención se detecta sobre una muestra, la columna se une en un único string
+      y se valida con una sola búsqueda regex; las filas canónicas se convierten en bloque con
+      replace y un único cast a float64
+    - Ruta general (máscaras .str) solo para las filas que no encajan en la convención
+    Returns:
+        Tuple[np.ndarray, np.ndarray, str]: valores float, máscara de texto sin dígitos y convención
+    """
+    n = len(raw_text)
+    result = np.full(n, np.nan)
+    canonical = np.zeros(n, dtype=bool)
+    convention = None
+    
+    joined = '\n'.join(raw_text)
+    if joined.count('\n') == n - 1:
+        convention = _detect_decimal_convention(raw_text[:_CONVENTION_SAMPLE_SIZE])
+    
+    if convention:
+        row_pattern, _, invalid_row_pattern, _ = _CANONICAL_NUMERIC_FORMATS[convention]
+        if invalid_row_pattern.search(joined) is None:
+            canonical[:] = True
+            result[:] = _parse_canonical_text(joined, convention)
+        else:
+            canonical = pd.Series(raw_text, dtype=object).str.fullmatch(row_pattern).to_numpy(dtype=bool)
+            if canonical.any():
+                result[canonical] = _parse_canonical_text('\n'.join(raw_text[canonical]), convention)
+        if '(' in joined:
+            convention += '+parentheses'
+    
+    no_chars = np.zeros(n, dtype=bool)
+    rest = ~canonical
+    if rest.any():
+        rest_values, rest_no_chars, rest_convention = _clean_text_values_general(raw_text[rest])
+        result[rest] = rest_values
+        no_chars[rest] = rest_no_chars
+        convention = f"mixed({convention})" if convention else rest_convention
+    
+    return result, no_chars, convention
+
+def _detect_decimal_convention(sample: np.ndarray) -> Optional[str]:
+    """Detecta la convención decimal dominante de una muestra de la columna (None si ninguna encaja)"""
+    joined_sample = '\n'.join(sample)
+    best_convention, best_count = None, 0
+    for name, (_, valid_rows_pattern, _, _) in _CANONICAL_NUMERIC_FORMATS.items():
+        matches = len(valid_rows_pattern.findall(joined_sample))
+        if matches > best_count:
+            best_convention, best_count = name, matches
+        if matches == len(sample):
+            break
+    return best_convention
+
+def _parse_canonical_text(joined: str, convention: str) -> np.ndarray:
+    """Convierte en bloque un string de filas canónicas (separadas por saltos de línea) a float64"""
+    converted = joined
+    if '(' in converted:
+        converted = converted.replace('(', '-').replace(')', '')
+    converted = _CANONICAL_NUMERIC_FORMATS[convention][3](converted)
+    if _BLANK_LINE_PATTERN.search(converted):
+        converted = _BLANK_LINE_PATTERN.sub('0', converted)
+    return np.array(converted.split('\n'), dtype=object).astype(np.float64)
+
+def _clean_text_values_general(raw_text: np.ndarray) -> Tuple[np.ndarray, np.ndarray, str]:
+    """
+    Ruta general del motor vectorizado: replica rama a rama la lógica por valor
+    mediante máscaras y operaciones .str sobre toda la columna
+    """
+    text = pd.Series(raw_text, dtype=object).str.strip()
+    
+    blank = (text == '').to_numpy(dtype=bool)
+    cleaned = text.str.replace(_NON_NUMERIC_CHARS_PATTERN, '', regex=True)
+    no_chars = (cleaned == '').to_numpy(dtype=bool) & ~blank
+    active = ~(blank | no_chars)
+    
+    # Paréntesis como negativos: solo se evalúa el patrón en filas con '('
+    negative = np.zeros(len(text), dtype=bool)
+    has_paren = text.str.contains('(', regex=False).to_numpy(dtype=bool)
+    if has_paren.any():
+        negative[has_paren] = text[has_paren].str.contains(
+            _PARENTHESES_NEGATIVE_PATTERN, regex=True).to_numpy(dtype=bool)
+    
+    normalized, convention = _normalize_decimal_separators(cleaned[active])
+    if negative[active].any():
+        convention += '+parentheses'
+    
+    # Extraer el primer número de cada valor normalizado
+    numbers = pd.Series(normalized, dtype=object).str.extract(_FIRST_NUMBER_PATTERN, expand=False)
+    found = numbers.notna().to_numpy(dtype=bool)
+    parsed = np.zeros(len(numbers))
+    if found.any():
+        parsed[found] = numbers[found].to_numpy(dtype=object).astype(np.float64)
+    flip = negative[active] & found
+    parsed[flip] = np.negative(parsed[flip])
+    
+    result = np.full(len(text), np.nan)
+    result[blank] = 0.0
+    result[active] = parsed
+    return result, no_chars, convention
+
+def _normalize_decimal_separators(cleaned: pd.Series) -> Tuple[np.ndarray, str]:
+    """
+    Normaliza separadores decimales/miles en bloque sobre valores ya limpios (solo dígitos, '.', ',', '-')
+    Agrupa las filas por convención detectada y aplica una operación vectorizada por grupo
+    """
+    normalized = cleaned.to_numpy(dtype=object).copy()
+    if len(normalized) == 0:
+        return normalized, 'plain'
+    
+    has_comma = cleaned.str.contains(',', regex=False).to_numpy(dtype=bool)
+    has_dot = cleaned.str.contains('.', regex=False).to_numpy(dtype=bool)
+    with_separator = has_comma | has_dot
+    counts = {'plain': int((~with_separator).sum())}
+    if not with_separator.any():
+        return normalized, 'plain'
+    
+    # Separador final: prefijo (greedy) + separador + sufijo sin separadores
+    parts = cleaned[with_separator].str.extract(_LAST_SEPARATOR_PATTERN)
+    prefix, separator, suffix = parts[0], parts[1], parts[2]
+    comma_last = (separator == ',').to_numpy(dtype=bool)
+    comma_in = has_comma[with_separator]
+    dot_in = has_dot[with_separator]
+    suffix_len = suffix.str.len().to_numpy()
+    
+    # 1,234.56 → se eliminan las comas
+    anglo = ~comma_last & comma_in
+    # 1.234,56 o 1234,56 → coma decimal
+    decimal_comma = comma_last & (dot_in | (suffix_len <= 2))
+    # 1,234 → coma de miles
+    thousands_comma = comma_last & ~dot_in & (suffix_len > 2)
+    dot_only = ~comma_last & ~comma_in
+    multiple_dots = np.zeros(len(prefix), dtype=bool)
+    if dot_only.any():
+        multiple_dots[dot_only] = prefix[dot_only].str.contains('.', regex=False).to_numpy(dtype=bool)
+    # 25.000.00 → último grupo de 1-2 dígitos es decimal
+    dotted_thousands = dot_only & multiple_dots & suffix.str.fullmatch(r'\d{1,2}').fillna(False).to_numpy(dtype=bool)
+    # 1.234567 → punto de miles
+    thousands_dot = dot_only & ~multiple_dots & (suffix_len > 2)
+    
+    rewritten = normalized[with_separator]
+    prefix_digits = prefix.str.replace(r'[.,]', '', regex=True)
+    if anglo.any():
+        rewritten[anglo] = (prefix[anglo].str.replace(',', '', regex=False) + '.' + suffix[anglo]).to_numpy(dtype=object)
+    decimal_rewrite = decimal_comma | dotted_thousands
+    if decimal_rewrite.any():
+        rewritten[decimal_rewrite] = (prefix_digits[decimal_rewrite] + '.' + suffix[decimal_rewrite]).to_numpy(dtype=object)
+    thousands = thousands_comma | thousands_dot
+    if thousands.any():
+        rewritten[thousands] = (prefix_digits[thousands] + suffix[thousands]).to_numpy(dtype=object)
+    normalized[with_separator] = rewritten
+    
+    counts['anglo'] = int((anglo | thousands_comma).sum())
+    counts['european'] = int((decimal_comma | thousands_dot).sum())
+    counts['european_dotted'] = int(dotted_thousands.sum())
+    counts['plain'] += int((dot_only & ~(dotted_thousands | thousands_dot)).sum())
+    convention = max(counts, key=counts.get)
+    return normalized, convention
+
+def _float_or_zero(value) -> float:
+    """float() con el mismo fallback a 0.0 que la versión por valor"""
+    try:
+        return float(value)
+    except Exception:
+        return 0.0
 
 def calculate_amount_from_debit_credit(debit_series: pd.Series, credit_series: pd.Series) -> pd.Series:
     """Función utilitaria para calcular amount desde debit y credit SIN valores absolutos"""
@@ -30,21 +30,24 @@ def analyze_csv_mappings_corrected(file_path: str, erp_hint: str = None, show_st
         return None
     
     try:
-        # Cargar CSV
-        df = pd.read_csv(file_path)
-        print(f"📄 ANALYZING: {Path(file_path).name}")
-        print("=" * 60)
-        
         # Crear detector y mapper
         detector = FieldDetector()
         mapper = detector.field_mapper
         
+        # Cargar una muestra acotada del CSV (max_rows_for_analysis / max_columns_per_file)
+        from csv_sampling import read_csv_sample, sample_summary
+        limits = mapper.field_loader.get_analysis_limits()
+        df, sample_info = read_csv_sample(file_path, max_rows=limits['max_rows_for_analysis'],
+                                          max_columns=limits['max_columns_per_file'])
+        print(f"📄 ANALYZING: {Path(file_path).name}")
+        print("=" * 60)
+        
         # Auto-detectar ERP si no se especifica
         if not erp_hint:
             erp_hint = detector.auto_detect_erp(df)
         
         print(f"📊 File info:")
-        print(f"  • Rows: {len(df)}")
+        print(f"  • Rows: {sample_summary(sample_info)}")
         print(f"  • Columns: {len(df.columns)}")
         print(f"  • ERP detected: {erp_hint}")
         print()
@@ -130,7 +133,8 @@ def analyze_csv_mappings_corrected(file_path: str, erp_hint: str = None, show_st
             'mapping_rate': mapping_rate,
             'field_mappings': field_mappings,
             'unmapped_columns': unmapped_columns,
-            'average_confidence': avg_confidence
+            'average_confidence': avg_confidence,
+            'sample_info': sample_info
         }
         
     except Exception as e:
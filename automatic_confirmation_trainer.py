@@ -1,7 +1,8 @@
 # automatic_confirmation_trainer.py - VERSIÓN SIMPLE CON BALANCE VALIDATION
 # Reemplazar completamente tu archivo actual con esta versión
 
-import pandas as pd
+from __future__ import annotations
+
 import os
 import sys
 import re
@@ -10,7 +11,13 @@ import logging
 from datetime import datetime
 import json
 from pathlib import Path
-import yaml
+
+from startup_profiler import lazy_import, handle_profile_startup
+from stage_metrics import stage, timed, reset_stage_metrics, stage_metrics_report, write_stage_metrics
+
+# pandas y PyYAML se cargan al usarse: el texto de uso no los necesita
+pd = lazy_import('pandas')
+yaml = lazy_import('yaml')
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
@@ -19,12 +26,21 @@ logger = logging.getLogger(__name__)
 class AutomaticConfirmationTrainingSession:
     """Sesión de entrenamiento AUTOMÁTICO - sin confirmación manual"""
     
-    def __init__(self, csv_file: str, erp_hint: str = None):
+    def __init__(self, csv_file: str, erp_hint: str = None,
+                 field_mapper=None, field_detector=None, dataframe: pd.DataFrame = None,
+                 use_mapping_cache: bool = True):
         self.csv_file = csv_file
         self.erp_hint = erp_hint
         self.df = None
-        self.mapper = None
-        self.detector = None
+        # Muestra leída para la detección (csv_sampling.read_csv_sample); vacío con un DataFrame en memoria
+        self.sample_info = {}
+        # DataFrame ya cargado en memoria (modo in-process del orquestador); csv_file queda como etiqueta
+        self.input_df = dataframe
+        # Mapper/detector ya inicializados (p.ej. un worker del modo batch) para no recargar el YAML
+        self.mapper = field_mapper
+        self.detector = field_detector
+        # Reutilizar mapeos ya resueltos para el mismo conjunto de columnas (results/mapping_cache.sqlite)
+        self.use_mapping_cache = use_mapping_cache
         
         self.standard_fields = [
             'journal_entry_id', 'line_number', 'description', 'line_description',
@@ -103,38 +119,62 @@ class AutomaticConfirmationTrainingSession:
     def initialize(self) -> bool:
         """Inicializa la sesión de entrenamiento automático"""
         try:
+            # Métricas por etapa de esta sesión (JSON junto al reporte)
+            reset_stage_metrics()
             print(f"Initializing AUTOMATIC TRAINING Session...")
             print(f"File: {self.csv_file}")
             print(f"ERP Hint: {self.erp_hint or 'Auto-detect'}")
             print(f"Mode: AUTOMATIC (no manual confirmation)")
             print(f"Confidence threshold: Only mappings > {self.confidence_threshold} will be included")
             
-            # Verificar archivo
-            if not os.path.exists(self.csv_file):
+            if self.input_df is None and not os.path.exists(self.csv_file):
                 print(f"❌ File not found: {self.csv_file}")
                 return False
             
-            # Cargar CSV
-            self.df = pd.read_csv(self.csv_file)
-            print(f"✅ CSV loaded: {len(self.df)} rows, {len(self.df.columns)} columns")
-            
             # Importar módulos del sistema
             try:
                 from core.field_mapper import FieldMapper
                 from core.field_detector import FieldDetector
                 
-                self.mapper = FieldMapper()
-                self.mapper.set_sample_dataframe(self.df)
-                self.detector = FieldDetector()
+                if self.mapper is None:
+                    self.mapper = FieldMapper()
+                else:
+                    self.mapper.reset_mappings()
+                if self.detector is None:
+                    self.detector = FieldDetector()
                 print("✅ System modules imported successfully")
-                
-                # ✨ CONFIGURAR MAPPER PARA BALANCE VALIDATION
-                self.enhanced_mapper_initialization()
-                
             except ImportError as e:
                 print(f"❌ Failed to import system modules: {e}")
                 return False
             
+            if self.input_df is not None:
+                self.df = self.input_df
+                print(f"✅ CSV loaded: {len(self.df)} rows, {len(self.df.columns)} columns")
+            else:
+                # Detección sobre una muestra acotada (system_config.yaml); el fichero
+                # completo se recorre por chunks en la transformación
+                from csv_sampling import read_csv_sample, sample_summary
+                limits = self.mapper.field_loader.get_analysis_limits()
+                with stage('load') as load_stage:
+                    self.df, self.sample_info = read_csv_sample(
+                        self.csv_file, max_rows=limits['max_rows_for_analysis'],
+                        max_columns=limits['max_columns_per_file']
+                    )
+                    load_stage.rows = len(self.df)
+                self.training_stats['detection_sample_rows'] = len(self.df)
+                self.training_stats['detection_sampled'] = self.sample_info['sampled']
+                print(f"✅ CSV loaded for detection: {sample_summary(self.sample_info)}, {len(self.df.columns)} columns")
+                if self.sample_info['columns_read'] < self.sample_info['columns_total']:
+                    print(f"⚠️ Only the first {self.sample_info['columns_read']} of "
+                          f"{self.sample_info['columns_total']} columns analyzed (max_columns_per_file)")
+            
+            self.mapper.set_sample_dataframe(self.df)
+            if self.use_mapping_cache and self.mapper.mapping_result_cache is None:
+                self.mapper.enable_mapping_result_cache()
+            
+            # ✨ CONFIGURAR MAPPER PARA BALANCE VALIDATION
+            self.enhanced_mapper_initialization()
+            
             # Cargar patrones aprendidos
             self._load_learned_patterns()
             
@@ -165,7 +205,8 @@ class AutomaticConfirmationTrainingSession:
         try:
             if os.path.exists(self.yaml_config_file):
                 with open(self.yaml_config_file, 'r', encoding='utf-8') as f:
-                    config = yaml.safe_load(f)
+                    # Loader en C si está disponible (el YAML de patrones tiene ~1.600 líneas)
+                    config = yaml.load(f, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
                     self.learned_patterns = config.get('learned_patterns', {})
                     print(f"✅ Loaded {len(self.learned_patterns)} learned patterns")
             else:
@@ -285,18 +326,30 @@ class AutomaticConfirmationTrainingSession:
             traceback.print_exc()
             return {'success': False, 'error': str(e)}
         
+    @timed('field_detection')
     def _perform_automatic_field_detection(self) -> Dict:
         """Realiza detección automática usando mapper mejorado (SIN resolución redundante)"""
         try:
             print(f"🔍 AUTOMATIC FIELD DETECTION - USING ENHANCED MAPPER")
             print(f"-" * 50)
             
-            # ✅ USAR MAPPER MEJORADO que resuelve conflictos globalmente
-            final_mappings = self.mapper.map_all_columns_with_conflict_resolution(
-                df=self.df,
-                erp_hint=self.erp_hint,
-                balance_validator=self.balance_validator
-            )
+            # Mismas columnas, ERP y configuración que un fichero ya procesado: sin detección
+            final_mappings = None
+            if self.use_mapping_cache:
+                final_mappings = self.mapper.get_cached_column_mappings(self.df, self.erp_hint)
+                self.training_stats['mapping_cache_hit'] = final_mappings is not None
+            
+            if final_mappings is not None:
+                print(f"💾 MAPPING CACHE HIT: {len(final_mappings)} mappings reused - detection skipped")
+            else:
+                # ✅ USAR MAPPER MEJORADO que resuelve conflictos globalmente
+                final_mappings = self.mapper.map_all_columns_with_conflict_resolution(
+                    df=self.df,
+                    erp_hint=self.erp_hint,
+                    balance_validator=self.balance_validator
+                )
+                if self.use_mapping_cache:
+                    self.mapper.store_column_mappings(self.df, self.erp_hint, final_mappings)
             
             # Actualizar estadísticas básicas
             self.training_stats['columns_processed'] = len(self.df.columns)
@@ -382,17 +435,23 @@ class AutomaticConfirmationTrainingSession:
             print(f"=" * 40)
             
             # 1. Crear DataFrame transformado con mapeos
-            transformed_df = self.df.copy()
-            column_mapping = {col: decision['field_type'] for col, decision in self.user_decisions.items()}
-            transformed_df = transformed_df.rename(columns=column_mapping)
+            csv_result = None
+            if self.sample_info.get('sampled'):
+                # La detección usó una muestra: el fichero completo solo se recorre aquí, por chunks
+                csv_result, transformed_df = self._stream_full_file_transformation()
+            else:
+                transformed_df = self.df.copy()
+                column_mapping = {col: decision['field_type'] for col, decision in self.user_decisions.items()}
+                transformed_df = transformed_df.rename(columns=column_mapping)
             
             processing_stats = {}
-            if hasattr(self, 'data_processor') and self.data_processor:
+            if csv_result is None and hasattr(self, 'data_processor') and self.data_processor:
                 print("   📊 Processing numeric fields...")
                 try:
-                    transformed_df, processing_stats = self.data_processor.process_numeric_fields_and_calculate_amounts(
-                        transformed_df
-                    )
+                    with stage('numeric_processing', rows=len(transformed_df)):
+                        transformed_df, processing_stats = self.data_processor.process_numeric_fields_and_calculate_amounts(
+                            transformed_df
+                        )
                     self.training_stats.update(processing_stats)
                     
                     # CAPTURAR INFORMACIÓN NUMÉRICA PARA EL REPORTE
@@ -411,7 +470,8 @@ class AutomaticConfirmationTrainingSession:
             if self.balance_validator and 'journal_entry_id' in transformed_df.columns:
                 print("   ⚖️ Performing comprehensive balance validation...")
                 try:
-                    balance_report = self.balance_validator.perform_comprehensive_balance_validation(transformed_df)
+                    with stage('balance_validation', rows=len(transformed_df)):
+                        balance_report = self.balance_validator.perform_comprehensive_balance_validation(transformed_df)
                 except Exception as e:
                     print(f"   ⚠️ Balance validation failed: {e}")
                     balance_report = {
@@ -434,12 +494,15 @@ class AutomaticConfirmationTrainingSession:
                 }
             
             # 4. Crear CSV usando transformador (si está disponible)
-            if hasattr(self, 'csv_transformer') and self.csv_transformer:
+            if csv_result is not None:
+                print("   📄 CSV files already created by the streaming transformer")
+            elif hasattr(self, 'csv_transformer') and self.csv_transformer:
                 print("   📄 Creating CSV files with transformer...")
                 try:
-                    csv_result = self.csv_transformer.create_header_detail_csvs(
-                        self.df, self.user_decisions, self.standard_fields
-                    )
+                    with stage('csv_transformation', rows=len(self.df)):
+                        csv_result = self.csv_transformer.create_header_detail_csvs(
+                            self.df, self.user_decisions, self.standard_fields
+                        )
                 except Exception as e:
                     print(f"   ⚠️ CSV transformer failed: {e}")
                     csv_result = self._create_transformed_csv()
@@ -461,15 +524,19 @@ class AutomaticConfirmationTrainingSession:
                         'training_mode': 'automatic',
                         'standard_fields': self.standard_fields,
                         'confidence_threshold': self.confidence_threshold,
+                        'stage_metrics': stage_metrics_report(),
                         **csv_result
                     }
-                    report_file = self.reporter.generate_comprehensive_training_report(training_data)
+                    with stage('report'):
+                        report_file = self.reporter.generate_comprehensive_training_report(training_data)
                 except Exception as e:
                     print(f"   ⚠️ Reporter failed: {e}")
                     report_file = self._generate_training_report()
             else:
                 print("   📝 Generating basic report...")
-                report_file = self._generate_training_report()
+                with stage('report'):
+                    report_file = self._generate_training_report()
+            stage_metrics_file = self._write_stage_metrics_sidecar(report_file)
             
             # 6. Preparar resultado final
             result = {
@@ -479,6 +546,8 @@ class AutomaticConfirmationTrainingSession:
                 'conflict_resolutions': self.conflict_resolutions,
                 'balance_report': balance_report,
                 'report_file': report_file,
+                'stage_metrics': stage_metrics_report(),
+                'stage_metrics_file': stage_metrics_file,
                 **csv_result
             }
             
@@ -491,6 +560,54 @@ class AutomaticConfirmationTrainingSession:
             traceback.print_exc()
             return {'success': False, 'error': str(e)}
 
+    @timed('streaming_transformation')
+    def _stream_full_file_transformation(self) -> Tuple[Dict, pd.DataFrame]:
+        """
+        Transformación del fichero completo por chunks cuando la detección usó una muestra.
+        Devuelve el resultado del transformador y journal_entry_id/amount del detail
+        generado para la validación de balance. La salida coincide con la transformación en
+        memoria porque el transformador fija el tipo de cada columna con todo el fichero
+        """
+        print(f"   🌊 Detection used a {len(self.df):,}-row sample - streaming the full file...")
+        empty = pd.DataFrame()
+        if not (hasattr(self, 'csv_transformer') and self.csv_transformer):
+            print("   ⚠️ CSVTransformer not available - cannot transform the full file")
+            return {'success': False, 'error': 'CSVTransformer not available'}, empty
+        
+        csv_result = self.csv_transformer.create_header_detail_csvs_streaming(
+            self.csv_file, self.user_decisions, self.standard_fields
+        )
+        if not csv_result.get('success') or not csv_result.get('detail_file'):
+            print(f"   ⚠️ Streaming transformation failed: {csv_result.get('error')}")
+            return csv_result, empty
+        
+        self.training_stats.update(csv_result.get('numeric_processing_stats', {}))
+        # El detail trae todas las columnas estándar: solo las que existirían en memoria
+        mapped_fields = {decision['field_type'] for decision in self.user_decisions.values()}
+        has_amount = 'amount' in mapped_fields or {'debit_amount', 'credit_amount'} <= mapped_fields
+        balance_columns = [col for col, present in (('journal_entry_id', 'journal_entry_id' in mapped_fields),
+                                                    ('amount', has_amount))
+                           if present and col in csv_result.get('detail_columns', [])]
+        from staging_writer import read_staging_file
+        return csv_result, read_staging_file(csv_result['detail_file'], columns=balance_columns)
+
+    def _write_stage_metrics_sidecar(self, report_file: Optional[str]) -> Optional[str]:
+        """Métricas por etapa en <reporte>_stages.json (o results/ si no hay reporte)"""
+        try:
+            if report_file:
+                metrics_file = f"{os.path.splitext(report_file)[0]}_stages.json"
+            else:
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                metrics_file = os.path.join("results", f"automatic_training_stages_{timestamp}.json")
+            metrics_file = write_stage_metrics(metrics_file, {'csv_file': str(self.csv_file),
+                                                              'sample_info': self.sample_info})
+            if metrics_file:
+                print(f"   ⏱️ Stage metrics saved: {metrics_file}")
+            return metrics_file
+        except Exception as e:
+            print(f"   ⚠️ Could not write stage metrics: {e}")
+            return None
+
     def _generate_csv_files(self, transformed_df: pd.DataFrame) -> Dict:
         """Genera archivos CSV de salida"""
         try:
@@ -573,7 +690,7 @@ class AutomaticConfirmationTrainingSession:
             return None
 
 
-def run_automatic_training(csv_file: str, erp_hint: str = None) -> Dict:
+def run_automatic_training(csv_file: str, erp_hint: str = None, use_mapping_cache: bool = True) -> Dict:
     """Función principal para ejecutar entrenamiento automático"""
     try:
         print(f"🤖 AUTOMATIC CONFIRMATION TRAINER - MODULAR VERSION")
@@ -588,7 +705,7 @@ def run_automatic_training(csv_file: str, erp_hint: str = None) -> Dict:
         print()
         
         # Crear sesión de entrenamiento automático
-        session = AutomaticConfirmationTrainingSession(csv_file, erp_hint)
+        session = AutomaticConfirmationTrainingSession(csv_file, erp_hint, use_mapping_cache=use_mapping_cache)
         
         # Inicializar
         if not session.initialize():
@@ -638,7 +755,11 @@ def run_automatic_training(csv_file: str, erp_hint: str = None) -> Dict:
 
 def main():
     """Función principal"""
-    if len(sys.argv) < 2:
+    handle_profile_startup('automatic_confirmation_trainer')
+    args = [arg for arg in sys.argv[1:] if arg != '--no-mapping-cache']
+    use_mapping_cache = '--no-mapping-cache' not in sys.argv[1:]
+    
+    if len(args) < 1:
         print("AUTOMATIC CONFIRMATION TRAINER - SIMPLIFIED ARCHITECTURE")
         print("=" * 58)
         print("Training with AUTOMATIC DECISIONS - no manual confirmation required")
@@ -659,14 +780,18 @@ def main():
         print("  • Same balance validation")
         print("  • Same numeric processing")
         print("  • Compatible with main_global.py")
+        print()
+        print("OPTIONS:")
+        print("  • --no-mapping-cache: always run full detection (ignore results/mapping_cache.sqlite)")
+        print("  • --profile-startup: measure cold import time against the startup budget and exit")
         return
     
     # Extraer parámetros
-    csv_file = sys.argv[1]
-    erp_hint = sys.argv[2] if len(sys.argv) > 2 else None
+    csv_file = args[0]
+    erp_hint = args[1] if len(args) > 1 else None
     
     # Ejecutar entrenamiento automático
-    result = run_automatic_training(csv_file, erp_hint)
+    result = run_automatic_training(csv_file, erp_hint, use_mapping_cache=use_mapping_cache)
     
     if not result['success']:
         print(f"❌ Training failed: {result.get('error')}")
@@ -3,6 +3,9 @@ import re
 import argparse
 import unicodedata
 
+from unique_transform import apply_unique, print_unique_transform_report
+from staging_writer import OUTPUT_FORMATS, normalize_output_format, write_staging_file
+
 def clean_number(value):
     if pd.isna(value):
         return None
@@ -60,7 +63,7 @@ def detectar_fila_cabecera(input_file: str) -> int:
     first_sheet = next(iter(preview))
     df_preview = pd.read_excel(input_file, sheet_name=first_sheet, header=None)
     for i, row in df_preview.iterrows():
-        normalized = row.astype(str).apply(normalize_text).tolist()
+        normalized = apply_unique(row.astype(str), normalize_text, label="header_row").tolist()
         if any("CUENTA" in c for c in normalized) and any("SALDO" in c for c in normalized):
             return i
     raise ValueError("No se encontró la fila de cabecera con columnas tipo 'CUENTA' y 'SALDO'")
@@ -100,7 +103,12 @@ def _ensure_all_columns_trial_balance(df: pd.DataFrame, required_fields: list) -
             df[col] = ""
     return df[required_fields]
 
-def transformar_excel_a_csv(input_file: str, output_file: str):
+def transformar_excel_a_csv(input_file: str, output_file: str, output_format: str = "csv") -> str:
+    """
+    Transforma el Excel de sumas y saldos a staging.trial_balance.
+    output_format: csv (por defecto), parquet o feather; devuelve la ruta escrita
+    """
+    output_format = normalize_output_format(output_format)
     # Detectar fila de cabecera
     header_row = detectar_fila_cabecera(input_file)
 
@@ -143,24 +151,35 @@ def transformar_excel_a_csv(input_file: str, output_file: str):
 
     # Construir DataFrame resultado
     result = pd.DataFrame()
-    result["gl_account_number"] = df[gl_account_number_col].apply(clean_account_number)
+    # Las funciones de limpieza se aplican una vez por valor distinto
+    result["gl_account_number"] = apply_unique(df[gl_account_number_col], clean_account_number,
+                                               label="gl_account_number")
     if gl_local_account_number_col:
-        result["gl_local_account_number"] = df[gl_local_account_number_col].apply(clean_account_number)
-    result["period_ending_balance"] = df[col_ending_balance].apply(clean_number)
+        result["gl_local_account_number"] = apply_unique(df[gl_local_account_number_col], clean_account_number,
+                                                         label="gl_local_account_number")
+    result["period_ending_balance"] = apply_unique(df[col_ending_balance], clean_number,
+                                                   label="period_ending_balance")
     if beginning_col:
-        result["period_beginning_balance"] = df[beginning_col].apply(clean_number)
+        result["period_beginning_balance"] = apply_unique(df[beginning_col], clean_number,
+                                                          label="period_beginning_balance")
     else:
         result["period_beginning_balance"] = pd.Series([None] * len(result), index=result.index)
 
     # Garantizar todas las columnas de staging
     result = _ensure_all_columns_trial_balance(result, TRIAL_BALANCE_COLUMNS)
 
-    # Guardar en CSV
-    result.to_csv(output_file, index=False, sep=",", float_format="%.2f")
+    # Guardar en CSV, o en Parquet/Feather con tipos de staging (saldos float64)
+    if output_format == "csv":
+        result.to_csv(output_file, index=False, sep=",", float_format="%.2f")
+        return output_file
+    return write_staging_file(result, output_file, output_format)["path"]
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Transformar Excel de saldos a CSV limpio.")
     parser.add_argument("input_file", help="Ruta del archivo Excel de entrada.")
     parser.add_argument("output_file", help="Ruta del archivo CSV de salida.")
+    parser.add_argument("--format", dest="output_format", choices=list(OUTPUT_FORMATS), default="csv",
+                        help="Formato de salida (parquet/feather requieren pyarrow).")
     args = parser.parse_args()
-    transformar_excel_a_csv(args.input_file, args.output_file)
+    transformar_excel_a_csv(args.input_file, args.output_file, args.output_format)
+    print_unique_transform_report()
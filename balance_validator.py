@@ -1,12 +1,183 @@
 # balance_validator.py 
 
 
+import numpy as np
 import pandas as pd
+from collections.abc import Sequence
 from typing import Dict, List, Any
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Los importes se acumulan en céntimos enteros: sin deriva de redondeo en las sumas
+CENTS_PER_UNIT = 100
+# Límite de céntimos exactos en float64 (bincount acumula en float64)
+_MAX_EXACT_CENTS = 2 ** 53
+
+
+def amounts_to_cents(amounts) -> np.ndarray:
+    """Convierte importes a céntimos enteros (NaN cuenta como 0, como en groupby.sum)"""
+    values = np.asarray(amounts, dtype=np.float64) * CENTS_PER_UNIT
+    values = np.clip(np.nan_to_num(values, nan=0.0), -_MAX_EXACT_CENTS, _MAX_EXACT_CENTS)
+    return np.rint(values).astype(np.int64)
+
+
+class EntryBalanceRecords(Sequence):
+    """
+    Vista perezosa de los balances por asiento: se comporta como la lista de
+    registros {'journal_entry_id', 'amount', 'balance_difference', 'is_balanced'}
+    de grouped.to_dict('records') (mismo orden por journal_entry_id), pero solo
+    ordena al acceder por primera vez y construye el dict del elemento pedido
+    """
+
+    def __init__(self, balances: 'EntryBalances', positions: np.ndarray, is_sorted: bool = False):
+        self._balances = balances
+        self._positions = positions
+        self._is_sorted = is_sorted
+
+    @property
+    def positions(self) -> np.ndarray:
+        if not self._is_sorted:
+            self._positions = self._balances.sort_positions(self._positions)
+            self._is_sorted = True
+        return self._positions
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return EntryBalanceRecords(self._balances, self.positions[index], is_sorted=True)
+        return self._balances.record(int(self.positions[index]))
+
+    def __repr__(self) -> str:
+        return f"EntryBalanceRecords({len(self)} entries)"
+
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame equivalente al grouped de la implementación con groupby"""
+        return self._balances.to_frame(self.positions)
+
+
+class EntryBalances:
+    """
+    Kernel de balance por asiento: factoriza journal_entry_id una sola vez y suma
+    los céntimos con np.bincount. Guarda solo arrays compactos (ids únicos,
+    suma en céntimos y flag de balanceado por asiento); el orden por id solo se
+    calcula si se piden los registros
+    """
+
+    def __init__(self, journal_ids, amounts, tolerance: float = 0.01, cents: np.ndarray = None):
+        # Los ids nulos se descartan (código -1), como en groupby
+        codes, uniques = pd.factorize(pd.Series(journal_ids))
+        # cents permite reutilizar un vector de importes ya convertido entre candidatos
+        if cents is None:
+            cents = amounts_to_cents(amounts)
+        valid = codes >= 0
+
+        self.entry_ids = pd.Index(uniques)
+        self.amount_cents = np.rint(
+            np.bincount(codes[valid], weights=cents[valid], minlength=len(uniques))
+        ).astype(np.int64)
+        self.is_balanced = np.abs(self.amount_cents) < tolerance * CENTS_PER_UNIT
+        self.total_cents = int(cents.sum())
+
+    @property
+    def entries_count(self) -> int:
+        return len(self.amount_cents)
+
+    @property
+    def balanced_count(self) -> int:
+        return int(self.is_balanced.sum())
+
+    def sort_positions(self, positions: np.ndarray) -> np.ndarray:
+        """Ordena posiciones de asiento por journal_entry_id (orden de groupby)"""
+        entry_ids = self.entry_ids.take(positions)
+        if entry_ids.inferred_type == 'string':
+            # Array unicode de numpy: mismo orden por code points que str, sin comparar objetos Python
+            return positions[np.argsort(np.asarray(entry_ids, dtype=str), kind='stable')]
+        return positions[entry_ids.argsort()]
+
+    def record(self, position: int) -> Dict[str, Any]:
+        entry_id = self.entry_ids[position]
+        amount = float(self.amount_cents[position] / CENTS_PER_UNIT)
+        return {
+            'journal_entry_id': entry_id.item() if isinstance(entry_id, np.generic) else entry_id,
+            'amount': amount,
+            'balance_difference': amount,
+            'is_balanced': bool(self.is_balanced[position])
+        }
+
+    def records(self) -> EntryBalanceRecords:
+        return EntryBalanceRecords(self, np.arange(self.entries_count))
+
+    def unbalanced_records(self) -> EntryBalanceRecords:
+        return EntryBalanceRecords(self, np.flatnonzero(~self.is_balanced))
+
+    def to_frame(self, positions: np.ndarray = None) -> pd.DataFrame:
+        if positions is None:
+            positions = self.sort_positions(np.arange(self.entries_count))
+        amounts = self.amount_cents[positions] / CENTS_PER_UNIT
+        return pd.DataFrame({
+            'journal_entry_id': self.entry_ids.take(positions),
+            'amount': amounts,
+            'balance_difference': amounts,
+            'is_balanced': self.is_balanced[positions]
+        })
+
+
+class JournalEntryCandidateEvaluator:
+    """
+    Evaluador compartido de candidatos a journal_entry_id: convierte el vector de
+    importes a céntimos una sola vez y puntúa cada columna candidata con su propio
+    factorize + bincount sobre ese mismo array
+    """
+
+    def __init__(self, amounts, tolerance: float = 0.01):
+        self.tolerance = tolerance
+        self.cents = None
+        self.error = None
+        try:
+            self.cents = amounts_to_cents(amounts)
+        except Exception as e:
+            # Amount no numérico: todos los candidatos puntúan 0 (como la evaluación individual)
+            self.error = e
+
+    @property
+    def is_total_balanced(self) -> bool:
+        """La suma total de amount cuadra (no depende del candidato)"""
+        if self.cents is None:
+            return False
+        return bool(abs(int(self.cents.sum())) < self.tolerance * CENTS_PER_UNIT)
+
+    def evaluate(self, journal_ids) -> Dict[str, Any]:
+        """Mismo resultado que BalanceValidator._evaluate_journal_id_with_amount_only"""
+        if self.error is not None:
+            return {'quality_score': 0.0, 'error': f'Amount validation failed: {self.error}'}
+        try:
+            balances = EntryBalances(journal_ids, None, self.tolerance, cents=self.cents)
+
+            total_entries = balances.entries_count
+            if total_entries == 0:
+                return {'quality_score': 0.0, 'error': 'No entries found'}
+
+            # Score basado en proporción de asientos balanceados (suma ≈ 0)
+            balanced_entries = balances.balanced_count
+            return {
+                'quality_score': balanced_entries / total_entries,
+                'entries_count': total_entries,
+                'balanced_entries': int(balanced_entries),
+                'unbalanced_entries': int(total_entries - balanced_entries),
+                'validation_type': 'amount_only'
+            }
+
+        except Exception as e:
+            return {'quality_score': 0.0, 'error': f'Amount validation failed: {e}'}
+
+    def evaluate_all(self, candidates: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Evalúa todos los candidatos {nombre: ids} y devuelve sus resultados a la vez"""
+        return {name: self.evaluate(journal_ids) for name, journal_ids in candidates.items()}
+
+
 class BalanceValidator:
     """
     Validador reutilizable para balances contables basado solo en amount
@@ -113,32 +284,17 @@ class BalanceValidator:
         Evaluación basada en amount: valida que amount por asiento sume cero
         """
         try:
-            # Agrupar por journal_entry_id y sumar amount
-            grouped = df.groupby('journal_entry_id').agg({
-                'amount': 'sum'
-            }).reset_index()
-            
-            total_entries = len(grouped)
-            if total_entries == 0:
-                return {'quality_score': 0.0, 'error': 'No entries found'}
-
-            # Contar cuántos asientos cuadran (suma ≈ 0)
-            balanced_entries = (abs(grouped['amount']) < self.tolerance).sum()
-            
-            # Score basado en proporción de asientos balanceados
-            quality_score = balanced_entries / total_entries
-
-            return {
-                'quality_score': quality_score,
-                'entries_count': total_entries,
-                'balanced_entries': int(balanced_entries),
-                'unbalanced_entries': int(total_entries - balanced_entries),
-                'validation_type': 'amount_only'
-            }
+            # Sumar amount por journal_entry_id (kernel factorize + bincount)
+            evaluator = JournalEntryCandidateEvaluator(df['amount'], self.tolerance)
+            return evaluator.evaluate(df['journal_entry_id'])
             
         except Exception as e:
             return {'quality_score': 0.0, 'error': f'Amount validation failed: {e}'}
 
+    def create_candidate_evaluator(self, amounts) -> JournalEntryCandidateEvaluator:
+        """Evaluador reutilizable para puntuar varios candidatos con el mismo amount"""
+        return JournalEntryCandidateEvaluator(amounts, self.tolerance)
+
     def _check_required_fields(self, df: pd.DataFrame) -> Dict[str, Any]:
         """
         Verifica que exista el campo necesario para validación (solo amount)
@@ -169,8 +325,9 @@ class BalanceValidator:
         """
         Valida balance total del DataFrame (suma de amounts debe ser 0)
         """
-        total_amount = df['amount'].sum()
-        is_balanced = abs(total_amount) < self.tolerance
+        total_cents = int(amounts_to_cents(df['amount']).sum())
+        total_amount = total_cents / CENTS_PER_UNIT
+        is_balanced = abs(total_cents) < self.tolerance * CENTS_PER_UNIT
         
         print(f"📊 TOTAL BALANCE CHECK:")
         print(f"   Total Amount:  {total_amount:,.2f}")
@@ -192,18 +349,12 @@ class BalanceValidator:
         """
         print(f"\n📋 ENTRY-LEVEL BALANCE CHECK:")
         
-        # Agrupar por journal_entry_id
-        grouped = df.groupby('journal_entry_id').agg({
-            'amount': 'sum'
-        }).reset_index()
-        
-        # Calcular balance por asiento (debe ser ≈ 0)
-        grouped['balance_difference'] = grouped['amount']
-        grouped['is_balanced'] = abs(grouped['balance_difference']) < self.tolerance
+        # Suma por asiento en céntimos (debe ser ≈ 0), sin groupby ni frame intermedio
+        balances = EntryBalances(df['journal_entry_id'], df['amount'], self.tolerance)
         
-        entries_count = len(grouped)
-        balanced_count = grouped['is_balanced'].sum()
-        unbalanced_entries = grouped[~grouped['is_balanced']]
+        entries_count = balances.entries_count
+        balanced_count = balances.balanced_count
+        unbalanced_entries = balances.unbalanced_records()
         
         print(f"   Total Entries: {entries_count}")
         print(f"   Balanced:      {balanced_count}")
@@ -217,33 +368,34 @@ class BalanceValidator:
         self.validation_stats['balanced_entries'] = balanced_count
         self.validation_stats['unbalanced_entries'] = len(unbalanced_entries)
         
+        # Registros perezosos: mismas claves que to_dict('records') sin materializar un dict por asiento
         return {
             'entries_count': entries_count,
             'balanced_entries_count': balanced_count,
-            'unbalanced_entries': unbalanced_entries.to_dict('records'),
-            'entry_balance_check': grouped.to_dict('records')
+            'unbalanced_entries': unbalanced_entries,
+            'entry_balance_check': balances.records()
         }
 
-    def _report_unbalanced_entries(self, unbalanced_df: pd.DataFrame):
+    def _report_unbalanced_entries(self, unbalanced_entries: EntryBalanceRecords):
         """
         Reporta detalles de asientos desbalanceados
         MODIFICADO: Solo usa amount
         """
-        if len(unbalanced_df) == 0:
+        if len(unbalanced_entries) == 0:
             return
             
         print(f"\n❌ UNBALANCED ENTRIES DETAILS:")
-        max_display = min(10, len(unbalanced_df))
+        max_display = min(10, len(unbalanced_entries))
         
-        for idx, row in unbalanced_df.head(max_display).iterrows():
-            journal_id = row['journal_entry_id']
-            amount_sum = row['amount']
-            difference = row['balance_difference']
+        for entry in unbalanced_entries[:max_display]:
+            journal_id = entry['journal_entry_id']
+            amount_sum = entry['amount']
+            difference = entry['balance_difference']
             
             print(f"   Entry {journal_id}: Amount Sum = {amount_sum:,.2f} (diff: {difference:,.2f})")
         
-        if len(unbalanced_df) > max_display:
-            print(f"   ... and {len(unbalanced_df) - max_display} more unbalanced entries")
+        if len(unbalanced_entries) > max_display:
+            print(f"   ... and {len(unbalanced_entries) - max_display} more unbalanced entries")
 
     def generate_balance_summary_report(self, balance_report: Dict[str, Any]) -> str:
         """
@@ -327,14 +479,7 @@ def get_unbalanced_entries(df: pd.DataFrame, tolerance: float = 0.01) -> pd.Data
     if 'amount' not in df.columns:
         raise ValueError("DataFrame must have 'amount' column")
     
-    grouped = df.groupby('journal_entry_id').agg({
-        'amount': 'sum'
-    }).reset_index()
-    
-    grouped['balance_difference'] = grouped['amount']
-    grouped['is_balanced'] = abs(grouped['balance_difference']) < tolerance
-    
-    return grouped[~grouped['is_balanced']]
+    return EntryBalances(df['journal_entry_id'], df['amount'], tolerance).unbalanced_records().to_frame()
 
 def calculate_balance_quality_score(df: pd.DataFrame, tolerance: float = 0.01) -> float:
     """
@@ -0,0 +1,258 @@
+# batch_processor.py
+"""
+Procesamiento batch de libros diarios en paralelo
+Reparte los ficheros de un directorio entre un ProcessPoolExecutor. Cada worker carga
+una sola vez las definiciones de campos y los validadores (FieldMapper/FieldDetector)
+y ejecuta el entrenamiento automático por fichero, generando los mismos CSV de
+cabecera/detalle y reportes, más un resumen consolidado JSON/CSV del lote
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import contextlib
+import traceback
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+DEFAULT_PATTERN = "*.csv"
+DEFAULT_RESULTS_DIR = "results"
+
+SUMMARY_FIELDS = [
+    'file', 'success', 'wall_seconds', 'rows', 'columns', 'mapped_columns',
+    'is_balanced', 'header_file', 'detail_file', 'report_file', 'log_file',
+    'worker_pid', 'error'
+]
+
+# Estado del worker: se inicializa una única vez por proceso
+_worker_state = {}
+
+
+def _initialize_worker():
+    """Carga definiciones de campos y validadores una sola vez por proceso"""
+    from core.field_mapper import FieldMapper
+    from core.field_detector import FieldDetector
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        start_time = time.perf_counter()
+        _worker_state['field_mapper'] = FieldMapper()
+        _worker_state['field_detector'] = FieldDetector()
+        _worker_state['init_seconds'] = time.perf_counter() - start_time
+
+
+def process_ledger_file(csv_file: str, output_prefix: str, erp_hint: str = None,
+                        log_dir: str = None) -> Dict:
+    """
+    Entrena automáticamente un fichero reutilizando el mapper del worker.
+    Nunca lanza excepciones: los fallos se devuelven en el registro del fichero
+    """
+    if not _worker_state:
+        _initialize_worker()
+
+    record = {field: None for field in SUMMARY_FIELDS}
+    record.update({'file': csv_file, 'success': False, 'worker_pid': os.getpid()})
+    log_file = os.path.join(log_dir, f"{output_prefix}.log") if log_dir else os.devnull
+    record['log_file'] = log_file if log_dir else None
+
+    start_time = time.perf_counter()
+    try:
+        from automatic_confirmation_trainer import AutomaticConfirmationTrainingSession
+
+        with open(log_file, 'w', encoding='utf-8') as log, \
+                contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+            session = AutomaticConfirmationTrainingSession(
+                csv_file, erp_hint,
+                field_mapper=_worker_state['field_mapper'],
+                field_detector=_worker_state['field_detector']
+            )
+            # Prefijos por fichero: varios workers escriben en results/ en el mismo segundo
+            if session.csv_transformer:
+                session.csv_transformer.output_prefix = f"automatic_training_{output_prefix}"
+            if session.reporter:
+                session.reporter.report_prefix = f"automatic_training_report_{output_prefix}"
+
+            if not session.initialize():
+                raise RuntimeError("Initialization failed")
+
+            result = session.run_automatic_training()
+
+        record['rows'] = len(session.df)
+        record['columns'] = len(session.df.columns)
+        record['mapped_columns'] = len(session.user_decisions)
+        record['success'] = bool(result.get('success'))
+        record['error'] = result.get('error')
+        record['is_balanced'] = result.get('balance_report', {}).get('is_balanced')
+        for key in ['header_file', 'detail_file', 'report_file']:
+            record[key] = result.get(key)
+
+    except Exception as e:
+        record['error'] = f"{type(e).__name__}: {e}"
+        if log_dir:
+            with open(log_file, 'a', encoding='utf-8') as log:
+                log.write(traceback.format_exc())
+
+    record['wall_seconds'] = round(time.perf_counter() - start_time, 3)
+    return record
+
+
+def find_ledger_files(input_path: str, pattern: str = DEFAULT_PATTERN) -> List[str]:
+    """Lista los ficheros a procesar (un fichero o un directorio con patrón glob)"""
+    path = Path(input_path)
+    if path.is_file():
+        return [str(path)]
+    return sorted(str(file_path) for file_path in path.glob(pattern) if file_path.is_file())
+
+
+def _unique_prefixes(files: List[str]) -> List[str]:
+    """Prefijo de salida por fichero, desambiguando nombres repetidos"""
+    prefixes = []
+    seen = {}
+    for file_path in files:
+        stem = "".join(c if c.isalnum() or c in '-_' else '_' for c in Path(file_path).stem)
+        seen[stem] = seen.get(stem, 0) + 1
+        prefixes.append(stem if seen[stem] == 1 else f"{stem}_{seen[stem]}")
+    return prefixes
+
+
+def run_batch(input_path: str, workers: int = None, erp_hint: str = None,
+              pattern: str = DEFAULT_PATTERN, results_dir: str = DEFAULT_RESULTS_DIR) -> Dict:
+    """
+    Procesa todos los ficheros en paralelo y escribe el resumen consolidado.
+    workers <= 1 ejecuta en el propio proceso (útil en Spyder/Windows)
+    """
+    files = find_ledger_files(input_path, pattern)
+    workers = workers or os.cpu_count() or 1
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    batch_dir = os.path.join(results_dir, f"batch_{timestamp}")
+    log_dir = os.path.join(batch_dir, "logs")
+    os.makedirs(log_dir, exist_ok=True)
+
+    print(f"📦 BATCH PROCESSING: {len(files)} files, {workers} workers")
+    print(f"   • Input: {input_path} ({pattern})")
+    print(f"   • Output: {batch_dir}")
+
+    records = []
+    batch_start = time.perf_counter()
+    jobs = list(zip(files, _unique_prefixes(files)))
+
+    def report_progress(record: Dict):
+        records.append(record)
+        status = "✅" if record['success'] else "❌"
+        detail = f"{record['rows']} rows" if record['success'] else record['error']
+        print(f"   {status} [{len(records)}/{len(files)}] {Path(record['file']).name} "
+              f"({record['wall_seconds']:.2f}s) - {detail}")
+
+    if workers <= 1:
+        for csv_file, prefix in jobs:
+            report_progress(process_ledger_file(csv_file, prefix, erp_hint, log_dir))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_initialize_worker) as executor:
+            futures = {
+                executor.submit(process_ledger_file, csv_file, prefix, erp_hint, log_dir): csv_file
+                for csv_file, prefix in jobs
+            }
+            for future in as_completed(futures):
+                try:
+                    record = future.result()
+                except Exception as e:
+                    # Caída del worker (p.ej. memoria): se registra y el lote continúa
+                    record = {field: None for field in SUMMARY_FIELDS}
+                    record.update({'file': futures[future], 'success': False,
+                                   'wall_seconds': 0.0, 'error': f"{type(e).__name__}: {e}"})
+                report_progress(record)
+
+    total_seconds = time.perf_counter() - batch_start
+    records.sort(key=lambda record: record['file'])
+    summary = _build_summary(records, input_path, workers, total_seconds)
+    summary['summary_json'], summary['summary_csv'] = _write_summary(summary, batch_dir, timestamp)
+
+    _print_summary(summary)
+    return summary
+
+
+def _build_summary(records: List[Dict], input_path: str, workers: int, total_seconds: float) -> Dict:
+    processed = [record for record in records if record['success']]
+    cumulative_seconds = sum(record['wall_seconds'] or 0.0 for record in records)
+    return {
+        'input_path': str(input_path),
+        'timestamp': datetime.now().isoformat(),
+        'workers': workers,
+        'total_files': len(records),
+        'successful_files': len(processed),
+        'failed_files': len(records) - len(processed),
+        'total_rows': sum(record['rows'] or 0 for record in processed),
+        'wall_seconds': round(total_seconds, 3),
+        'cumulative_file_seconds': round(cumulative_seconds, 3),
+        'parallel_speedup': round(cumulative_seconds / total_seconds, 2) if total_seconds > 0 else 0.0,
+        'files': records
+    }
+
+
+def _write_summary(summary: Dict, batch_dir: str, timestamp: str):
+    json_file = os.path.join(batch_dir, f"batch_summary_{timestamp}.json")
+    csv_file = os.path.join(batch_dir, f"batch_summary_{timestamp}.csv")
+
+    with open(json_file, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False, default=str)
+
+    with open(csv_file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        writer.writerows(summary['files'])
+
+    return json_file, csv_file
+
+
+def _print_summary(summary: Dict):
+    print(f"\n📊 BATCH SUMMARY:")
+    print(f"   • Files: {summary['successful_files']}/{summary['total_files']} successful")
+    print(f"   • Rows processed: {summary['total_rows']:,}")
+    print(f"   • Wall time: {summary['wall_seconds']:.2f}s "
+          f"(per-file total {summary['cumulative_file_seconds']:.2f}s, x{summary['parallel_speedup']})")
+    for record in summary['files']:
+        if not record['success']:
+            print(f"   ❌ {record['file']}: {record['error']}")
+    print(f"   • Summary JSON: {summary['summary_json']}")
+    print(f"   • Summary CSV: {summary['summary_csv']}")
+
+
+def main(argv: Optional[List[str]] = None):
+    """Función principal"""
+    parser = argparse.ArgumentParser(
+        prog='batch',
+        description='Procesamiento batch de libros diarios en paralelo',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Ejemplos de uso:
+  python batch_processor.py data/
+  python batch_processor.py data/ --workers 8 --erp SAP
+  python main.py batch data/ --pattern "Libro_Diario_*.csv"
+        """
+    )
+    parser.add_argument('input_path', help='Directorio (o fichero) con los libros diarios')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Número de procesos (por defecto: número de CPUs)')
+    parser.add_argument('--erp', dest='erp_hint', default=None,
+                        help='Hint del sistema ERP para todos los ficheros')
+    parser.add_argument('--pattern', default=DEFAULT_PATTERN,
+                        help=f'Patrón glob de ficheros (por defecto: {DEFAULT_PATTERN})')
+
+    args = parser.parse_args(argv)
+
+    if not Path(args.input_path).exists():
+        print(f"❌ Input not found: {args.input_path}")
+        sys.exit(1)
+
+    summary = run_batch(args.input_path, workers=args.workers, erp_hint=args.erp_hint,
+                        pattern=args.pattern)
+
+    sys.exit(0 if summary['failed_files'] == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
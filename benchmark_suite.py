@@ -0,0 +1,429 @@
+# benchmark_suite.py
+"""
+Benchmarks de los motores principales sobre libros sintéticos
+Genera con synthetic_ledger un libro por ERP y mide FieldMapper (detección + conflictos),
+AccountingDataProcessor (limpieza numérica + separación de fechas), BalanceValidator,
+IntegratedCSVTransformer y DocumentFeatureExtractor. Cada medida guarda tiempo real y de
+CPU (mejor de `repeat`), filas/s, pico RSS, el desglose por etapa de stage_metrics y unas
+comprobaciones de resultado (precisión del mapeo, asientos descuadrados detectados).
+Los resultados se guardan en JSON y se comparan con una baseline guardada: una medida
+más lenta que la baseline por encima de la tolerancia se marca como regresión.
+
+Con 1M/10M filas el fichero se escribe por bloques; los motores en memoria usan las
+primeras max_memory_rows filas y el transformador recorre el fichero completo por chunks.
+
+Uso:
+    python benchmark_suite.py --size 10k --layouts sap,navision --repeat 3 --save-baseline
+    python benchmark_suite.py --size 10k --baseline results/benchmarks/baseline_10k.json
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import contextlib
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from synthetic_ledger import (ERP_LAYOUTS, DEFAULT_UNBALANCED_RATE, resolve_size, expected_mapping,
+                              write_synthetic_ledger, unbalanced_entry_count, ledger_text_lines)
+from stage_metrics import reset_stage_metrics, stage_metrics_report, _rss_peak_mb
+
+BENCHMARK_ENGINES = ('field_mapper', 'accounting_processor', 'balance_validator',
+                     'csv_transformer', 'feature_extractor')
+BENCHMARK_DIR = os.path.join('results', 'benchmarks')
+
+# Regresión: más de un 25 % más lento que la baseline y al menos 50 ms (ruido en medidas cortas)
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_MIN_DELTA_SECONDS = 0.05
+DEFAULT_MAX_MEMORY_ROWS = 1_000_000
+DEFAULT_DATETIME_MIX = 0.2
+
+
+def run_benchmarks(size='10k', layouts: Optional[List[str]] = None, engines: Optional[List[str]] = None,
+                   repeat: int = 1, seed: int = 0, unbalanced_rate: float = DEFAULT_UNBALANCED_RATE,
+                   datetime_mix: float = DEFAULT_DATETIME_MIX, number_format: Optional[str] = None,
+                   max_memory_rows: int = DEFAULT_MAX_MEMORY_ROWS, quiet: bool = True) -> Dict[str, Any]:
+    """
+    Ejecuta los benchmarks de `engines` sobre un libro sintético por layout
+
+    Returns:
+        {'environment', 'parameters', 'results': {'<layout>/<engine>': medida}}
+    """
+    rows = resolve_size(size)
+    layouts = list(layouts or ERP_LAYOUTS)
+    engines = list(engines or BENCHMARK_ENGINES)
+    unknown = set(engines) - set(BENCHMARK_ENGINES)
+    if unknown:
+        raise ValueError(f"Unknown benchmark engine(s): {', '.join(sorted(unknown))}")
+
+    results: Dict[str, Dict[str, Any]] = {}
+    work_dir = tempfile.mkdtemp(prefix='smau_benchmark_')
+    mapper = None
+    try:
+        for layout in layouts:
+            ledger_file = os.path.join(work_dir, f"ledger_{layout}.csv")
+            generated = write_synthetic_ledger(ledger_file, layout, rows, seed=seed, unbalanced_rate=unbalanced_rate,
+                                               number_format=number_format, datetime_mix=datetime_mix)
+            df = pd.read_csv(ledger_file, nrows=max_memory_rows)
+            text_df = pd.read_csv(ledger_file, nrows=max_memory_rows, dtype=str, keep_default_na=False)
+            context = {'layout': layout, 'df': df, 'text_df': text_df, 'ledger_file': ledger_file,
+                       'work_dir': work_dir, 'total_rows': generated['rows'], 'expected': expected_mapping(layout)}
+            print(f"📒 {layout}: {generated['rows']:,} rows, {generated['entries']:,} entries "
+                  f"({generated['bytes'] / 1024 / 1024:.1f} MB)")
+
+            if 'field_mapper' in engines:
+                if mapper is None:
+                    with _quiet(quiet):
+                        from core.field_mapper import FieldMapper
+                        mapper = FieldMapper()
+                context['mapper'] = mapper
+
+            for engine in engines:
+                measurement = _measure(BENCHMARKS[engine], context, repeat, quiet)
+                results[f"{layout}/{engine}"] = measurement
+                print(f"   ⏱️ {engine:<22} {measurement['seconds']:8.3f}s  "
+                      f"{_rate(measurement)}  {_checks_summary(measurement['checks'])}")
+    finally:
+        if mapper is not None and hasattr(mapper.field_loader, 'shutdown'):
+            mapper.field_loader.shutdown()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        'generated': datetime.now().isoformat(),
+        'environment': {
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'processor': platform.processor() or platform.machine(),
+            'cpu_count': os.cpu_count(),
+        },
+        'parameters': {
+            'size': str(size), 'rows': rows, 'layouts': layouts, 'engines': engines, 'repeat': repeat,
+            'seed': seed, 'unbalanced_rate': unbalanced_rate, 'datetime_mix': datetime_mix,
+            'number_format': number_format, 'max_memory_rows': max_memory_rows,
+        },
+        'results': results,
+    }
+
+
+def _measure(benchmark: Callable, context: Dict[str, Any], repeat: int, quiet: bool) -> Dict[str, Any]:
+    """Mejor de `repeat` ejecuciones: tiempo real, CPU, desglose de stage_metrics y comprobaciones"""
+    runs = []
+    best = None
+    for _ in range(max(int(repeat), 1)):
+        reset_stage_metrics()
+        with _quiet(quiet):
+            prepared = benchmark['prepare'](context) if 'prepare' in benchmark else None
+            cpu_start = time.process_time()
+            start = time.perf_counter()
+            output = benchmark['run'](context, prepared)
+            seconds = time.perf_counter() - start
+            cpu_seconds = time.process_time() - cpu_start
+        runs.append(seconds)
+        if best is None or seconds < best['seconds']:
+            best = {'seconds': seconds, 'cpu_seconds': cpu_seconds, 'output': output,
+                    'stages': {path: round(stats['wall_seconds'], 6)
+                               for path, stats in stage_metrics_report().items()}}
+
+    rows = benchmark['rows'](context)
+    return {
+        'seconds': best['seconds'],
+        'cpu_seconds': best['cpu_seconds'],
+        'runs': runs,
+        'rows': rows,
+        'rows_per_second': rows / best['seconds'] if best['seconds'] else None,
+        'rss_peak_mb': _rss_peak_mb(),
+        'stages': best['stages'],
+        'checks': benchmark['check'](context, best['output']),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Benchmarks: prepare (fuera del tiempo), run (medido), rows y check
+# ---------------------------------------------------------------------------
+
+def _mapper_prepare(context):
+    mapper = context['mapper']
+    sample = context['df'].head(mapper.field_loader.get_analysis_limits()['max_rows_for_analysis'])
+    mapper.reset_mappings()
+    mapper.set_sample_dataframe(sample)
+    mapper.set_dataframe_for_balance_validation(sample)
+    from balance_validator import BalanceValidator
+    return sample, BalanceValidator()
+
+
+def _mapper_run(context, prepared):
+    sample, validator = prepared
+    return context['mapper'].map_all_columns_with_conflict_resolution(df=sample, balance_validator=validator)
+
+
+def _mapper_check(context, mappings):
+    detected = {column: mapping['field_type'] for column, mapping in mappings.items()}
+    expected = context['expected']
+    correct = sum(detected.get(column) == field for column, field in expected.items())
+    return {
+        'mapping_accuracy': correct / len(expected),
+        'mismatches': {column: detected.get(column) for column, field in expected.items()
+                       if detected.get(column) != field},
+    }
+
+
+def _renamed(context):
+    return context['df'].rename(columns=context['expected'])
+
+
+def _processor_prepare(context):
+    from accounting_data_processor import AccountingDataProcessor
+    return AccountingDataProcessor(), _renamed(context)
+
+
+def _processor_run(context, prepared):
+    processor, df = prepared
+    df, _ = processor.process_numeric_fields_and_calculate_amounts(df)
+    return processor.separate_datetime_fields(df)
+
+
+def _processed_amounts(context):
+    """journal_entry_id + amount ya limpios (calculado una vez por layout)"""
+    if 'processed' not in context:
+        with _quiet(True):
+            context['processed'] = _processor_run(context, _processor_prepare(context))
+    return context['processed']
+
+
+def _processor_check(context, processed):
+    text_df = context['text_df']
+    expected_unbalanced = unbalanced_entry_count(text_df, context['layout'])
+    amounts = processed['amount']
+    return {
+        'amount_parsed': float(amounts.notna().mean()),
+        'time_separated': bool('entry_time' in processed.columns),
+        'expected_unbalanced_entries': expected_unbalanced,
+    }
+
+
+def _balance_prepare(context):
+    from balance_validator import BalanceValidator
+    return BalanceValidator(), _processed_amounts(context)[['journal_entry_id', 'amount']]
+
+
+def _balance_run(context, prepared):
+    validator, df = prepared
+    return validator.perform_comprehensive_balance_validation(df)
+
+
+def _balance_check(context, report):
+    detected = report.get('entries_count', 0) - report.get('balanced_entries_count', 0)
+    expected = unbalanced_entry_count(context['text_df'], context['layout'])
+    return {'unbalanced_entries': detected, 'unbalanced_entries_expected': expected,
+            'unbalanced_match': detected == expected}
+
+
+def _transformer_prepare(context):
+    from csv_transformer import IntegratedCSVTransformer
+    decisions = {column: {'field_type': field} for column, field in context['expected'].items()}
+    with _working_directory(context['work_dir']):
+        transformer = IntegratedCSVTransformer(output_prefix=f"benchmark_{context['layout']}")
+    return transformer, decisions
+
+
+def _transformer_run(context, prepared):
+    transformer, decisions = prepared
+    with _working_directory(context['work_dir']):
+        if context['total_rows'] > len(context['df']):
+            # El libro no cabe en max_memory_rows: fichero completo por chunks
+            return transformer.create_header_detail_csvs_streaming(context['ledger_file'], decisions, [])
+        return transformer.create_header_detail_csvs(context['df'], decisions, [])
+
+
+def _transformer_check(context, result):
+    return {'success': bool(result.get('success')),
+            'streaming': context['total_rows'] > len(context['df']),
+            'rows_processed': result.get('transformation_stats', {}).get('rows_processed')}
+
+
+def _features_prepare(context):
+    from features import DocumentFeatureExtractor
+    return DocumentFeatureExtractor(), pd.DataFrame({'text': ledger_text_lines(context['text_df'], context['layout'])})
+
+
+def _features_run(context, prepared):
+    extractor, text_df = prepared
+    return extractor.extract_all_features(text_df)
+
+
+BENCHMARKS: Dict[str, Dict[str, Callable]] = {
+    'field_mapper': {
+        'prepare': _mapper_prepare, 'run': _mapper_run, 'check': _mapper_check,
+        'rows': lambda context: min(len(context['df']), context['mapper'].field_loader.get_analysis_limits()[
+            'max_rows_for_analysis']),
+    },
+    'accounting_processor': {
+        'prepare': _processor_prepare, 'run': _processor_run, 'check': _processor_check,
+        'rows': lambda context: len(context['df']),
+    },
+    'balance_validator': {
+        'prepare': _balance_prepare, 'run': _balance_run, 'check': _balance_check,
+        'rows': lambda context: len(context['df']),
+    },
+    'csv_transformer': {
+        'prepare': _transformer_prepare, 'run': _transformer_run, 'check': _transformer_check,
+        'rows': lambda context: context['total_rows'],
+    },
+    'feature_extractor': {
+        'prepare': _features_prepare, 'run': _features_run,
+        'check': lambda context, features: {'feature_columns': features.shape[1]},
+        'rows': lambda context: len(context['df']),
+    },
+}
+
+
+# ---------------------------------------------------------------------------
+# JSON y comparación con la baseline
+# ---------------------------------------------------------------------------
+
+def write_benchmark_results(results: Dict[str, Any], path: Optional[str] = None) -> str:
+    """Guarda los resultados (por defecto results/benchmarks/benchmark_<size>_<timestamp>.json)"""
+    if path is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(BENCHMARK_DIR, f"benchmark_{results['parameters']['size']}_{timestamp}.json")
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False, default=str)
+    return path
+
+
+def load_benchmark_results(path: str) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def default_baseline_path(size) -> str:
+    return os.path.join(BENCHMARK_DIR, f"baseline_{size}.json")
+
+
+def compare_with_baseline(results: Dict[str, Any], baseline: Dict[str, Any],
+                          tolerance: float = DEFAULT_TOLERANCE,
+                          min_delta_seconds: float = DEFAULT_MIN_DELTA_SECONDS) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Compara cada medida con la de la baseline (mismo layout/motor y mismas filas).
+    Regresión: seconds > baseline × (1 + tolerance) y al menos min_delta_seconds más lento;
+    mejora: lo simétrico. Las medidas sin par en la baseline van a 'missing'
+    """
+    comparison = {'regressions': [], 'improvements': [], 'unchanged': [], 'missing': []}
+    baseline_results = baseline.get('results', {})
+    for name, measurement in results.get('results', {}).items():
+        reference = baseline_results.get(name)
+        if reference is None or reference.get('rows') != measurement.get('rows'):
+            comparison['missing'].append({'benchmark': name})
+            continue
+        base_seconds = reference['seconds']
+        seconds = measurement['seconds']
+        entry = {'benchmark': name, 'baseline_seconds': base_seconds, 'seconds': seconds,
+                 'ratio': seconds / base_seconds if base_seconds else None}
+        if seconds > base_seconds * (1 + tolerance) and seconds - base_seconds >= min_delta_seconds:
+            comparison['regressions'].append(entry)
+        elif seconds < base_seconds / (1 + tolerance) and base_seconds - seconds >= min_delta_seconds:
+            comparison['improvements'].append(entry)
+        else:
+            comparison['unchanged'].append(entry)
+    return comparison
+
+
+def print_comparison(comparison: Dict[str, List[Dict[str, Any]]]):
+    print(f"\n📈 BASELINE COMPARISON:")
+    for label, icon in (('regressions', '❌'), ('improvements', '✅')):
+        for entry in comparison[label]:
+            ratio = f" ({entry['ratio']:.2f}x)" if entry['ratio'] is not None else ''
+            print(f"   {icon} {entry['benchmark']}: {entry['baseline_seconds']:.3f}s → {entry['seconds']:.3f}s{ratio}")
+    print(f"   {len(comparison['regressions'])} regressions, {len(comparison['improvements'])} improvements, "
+          f"{len(comparison['unchanged'])} unchanged, {len(comparison['missing'])} without baseline")
+
+
+def _rate(measurement: Dict[str, Any]) -> str:
+    rate = measurement.get('rows_per_second')
+    return f"{rate:>12,.0f} rows/s" if rate else " " * 19
+
+
+def _checks_summary(checks: Dict[str, Any]) -> str:
+    shown = {key: value for key, value in checks.items() if not isinstance(value, dict)}
+    return ', '.join(f"{key}={value:.3f}" if isinstance(value, float) else f"{key}={value}"
+                     for key, value in shown.items())
+
+
+@contextlib.contextmanager
+def _quiet(enabled: bool):
+    """Silencia los print de los motores durante la medida"""
+    if not enabled:
+        yield
+        return
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+@contextlib.contextmanager
+def _working_directory(path: str):
+    original = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(original)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks de los motores sobre libros sintéticos.")
+    parser.add_argument("--size", default='10k', help="10k, 100k, 1m, 10m o un número de filas.")
+    parser.add_argument("--layouts", default=','.join(ERP_LAYOUTS), help="ERPs separados por comas.")
+    parser.add_argument("--engines", default=','.join(BENCHMARK_ENGINES), help="Motores separados por comas.")
+    parser.add_argument("--repeat", type=int, default=1, help="Ejecuciones por medida (se guarda la mejor).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--unbalanced-rate", type=float, default=DEFAULT_UNBALANCED_RATE)
+    parser.add_argument("--datetime-mix", type=float, default=DEFAULT_DATETIME_MIX)
+    parser.add_argument("--number-format", choices=['european', 'plain'], default=None)
+    parser.add_argument("--max-memory-rows", type=int, default=DEFAULT_MAX_MEMORY_ROWS)
+    parser.add_argument("--output", default=None, help="JSON de resultados.")
+    parser.add_argument("--baseline", default=None, help="JSON de baseline (por defecto results/benchmarks/baseline_<size>.json).")
+    parser.add_argument("--save-baseline", action='store_true', help="Guarda estos resultados como baseline.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--min-delta", type=float, default=DEFAULT_MIN_DELTA_SECONDS,
+                        help="Diferencia mínima en segundos para marcar una regresión.")
+    parser.add_argument("--verbose", action='store_true', help="No silenciar la salida de los motores.")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(
+        args.size, layouts=[name.strip() for name in args.layouts.split(',') if name.strip()],
+        engines=[name.strip() for name in args.engines.split(',') if name.strip()], repeat=args.repeat,
+        seed=args.seed, unbalanced_rate=args.unbalanced_rate, datetime_mix=args.datetime_mix,
+        number_format=args.number_format, max_memory_rows=args.max_memory_rows, quiet=not args.verbose)
+    output_file = write_benchmark_results(results, args.output)
+    print(f"\n💾 Results saved: {output_file}")
+
+    baseline_file = args.baseline or default_baseline_path(args.size)
+    exit_code = 0
+    if os.path.exists(baseline_file) and not (args.save_baseline and args.baseline is None):
+        comparison = compare_with_baseline(results, load_benchmark_results(baseline_file),
+                                           args.tolerance, args.min_delta)
+        print_comparison(comparison)
+        exit_code = 1 if comparison['regressions'] else 0
+    elif args.baseline:
+        print(f"⚠️ Baseline not found: {baseline_file}")
+
+    if args.save_baseline:
+        write_benchmark_results(results, baseline_file)
+        print(f"📌 Baseline saved: {baseline_file}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -3,21 +3,155 @@
 import pandas as pd
 import re
 import numpy as np
-from typing import Union, List, Dict, Any
+from functools import lru_cache
+from typing import Union, List, Dict, Any, Sequence, Tuple
 from datetime import datetime
 import logging
 import json
 import os
 
+try:
+    from dateutil import parser as date_parser
+except ImportError:
+    date_parser = None
+
+from date_inference import date_format_inferencer
+
 logger = logging.getLogger(__name__)
 
+# ===== PATRONES BASE (se compilan una vez por campo junto con los aprendidos) =====
+
+JOURNAL_ENTRY_ID_PATTERNS = (
+    r'^\d{6,15}$',                    # Números largos: 123456789012
+    r'^JE\d{6,12}$',                  # JE123456789
+    r'^AST\d{4,10}$',                 # AST20240001
+    r'^[A-Z]{2,4}\d{6,12}$',         # JOUR123456789
+    r'^\d{4}[A-Z]{2,4}\d{4,8}$',     # 2024JE00001234
+    r'^[A-Z0-9]{8,20}$'              # General alfanumérico
+)
+
+# Patrones base de fechas - INCLUYE DD.MM.YYYY
+DATE_FIELD_PATTERNS = (
+    r'^\d{1,2}[/\-\.]\d{1,2}[/\-\.]\d{2,4}$',  # dd/mm/yyyy (incluye puntos)
+    r'^\d{4}[/\-\.]\d{1,2}[/\-\.]\d{1,2}$',    # yyyy/mm/dd (incluye puntos)
+    r'^\d{1,2}-[A-Za-z]{3}-\d{2,4}$',          # dd-MMM-yyyy
+    r'^\d{4}-\d{2}-\d{2}$',                     # yyyy-mm-dd
+    r'^\d{2}/\d{2}/\d{4}$',                     # mm/dd/yyyy
+    r'^\d{2}\.\d{2}\.\d{4}$',                   # DD.MM.YYYY ← ESPECÍFICO
+    r'^\d{1,2}\.\d{1,2}\.\d{4}$',               # D.M.YYYY ← ESPECÍFICO
+    r'^\d{4}\.\d{2}\.\d{2}$',                   # YYYY.MM.DD ← ESPECÍFICO
+    r'^\d{8}$'                                   # yyyymmdd
+)
+
+AMOUNT_PATTERNS = (
+    r'^-?\d{1,3}(\.\d{3})*,\d{2}$',      # 1.234.567,89
+    r'^-?\d{1,3}(,\d{3})*\.\d{2}$',      # 1,234,567.89
+    r'^-?\d+[,\.]\d{1,4}$',              # 1234,56 o 1234.56
+    r'^-?\d+$',                          # 1234
+    r'^-?\d+\.\d+$',                     # 1234.56
+    r'^-?\d+,\d+$',                      # 1234,56
+    r'^-?\d{1,3}( \d{3})*[,\.]\d{2}$'    # 1 234 567,89
+)
+
+GL_ACCOUNT_PATTERNS = (
+    r'^\d{3,10}$',           # Solo números, 3-10 dígitos
+    r'^\d{3,6}\.\d{2,4}$',   # Con punto: 1234.56
+    r'^\d{3,6}-\d{2,4}$',    # Con guión: 1234-56
+    r'^[A-Z]\d{3,9}$',       # Letra + números: A1234
+    r'^\d{1,2}\.\d{2,3}\.\d{2,3}$'  # Formato jerárquico: 1.23.45
+)
+
+DATE_LIKE_PATTERNS = (
+    r'^\d{1,2}[/\-\.]\d{1,2}[/\-\.]\d{2,4}$',
+    r'^\d{4}[/\-\.]\d{1,2}[/\-\.]\d{1,2}$',
+    r'^\d{1,2}-[a-zA-Z]{3}-\d{2,4}$',
+    r'^\d{2,4}[/\-\.]\d{1,2}[/\-\.]\d{1,2}$',
+    r'^\d{8}$'  # YYYYMMDD
+)
+
+ALPHANUMERIC_REGEX = re.compile(r'^[A-Z0-9]+$')
+ACCOUNT_CHARS_REGEX = re.compile(r'^[A-Z0-9\.\-]+$')
+FISCAL_YEAR_FY_REGEX = re.compile(r'^FY\d{2,4}$')
+FISCAL_YEAR_RANGE_REGEX = re.compile(r'^\d{4}-\d{4}$')
+QUARTER_REGEX = re.compile(r'^Q[1-4]$')
+TRIMESTER_REGEX = re.compile(r'^T[1-4]$')
+YEAR_MONTH_REGEX = re.compile(r'^\d{4}-\d{2}$')
+
+DEBIT_CREDIT_INDICATORS = frozenset({
+    'D', 'C', 'H', 'DEBE', 'HABER', 'DEBIT', 'CREDIT', 'DR', 'CR', 
+    '1', '0', '-1', 'S', 'N', 'DB', 'CD', 'DEB', 'CRE'
+})
+
+# Referencias a grupos (\1, (?P=name)) cambian de numeración al combinar: se evalúan aparte
+_GROUP_REFERENCE_REGEX = re.compile(r'\\\d|\(\?P=')
+
+
+class CompiledPatternMatcher:
+    """
+    Lista de regex compilada en un único matcher: equivale a probar re.match con
+    cada patrón en orden (los inválidos se ignoran, como hacía el bucle original)
+    """
+
+    def __init__(self, patterns: Sequence[str]):
+        valid_patterns = []
+        for pattern in patterns:
+            try:
+                re.compile(pattern)
+                valid_patterns.append(pattern)
+            except re.error:
+                continue
+        self.patterns = tuple(valid_patterns)
+
+        combinable = [pattern for pattern in valid_patterns if not _GROUP_REFERENCE_REGEX.search(pattern)]
+        try:
+            self._combined = re.compile('|'.join(f'(?:{pattern})' for pattern in combinable)) if combinable else None
+        except re.error:
+            # Flags inline o grupos con el mismo nombre: sin alternancia combinada
+            self._combined, combinable = None, []
+        self._separate = [re.compile(pattern) for pattern in valid_patterns if pattern not in combinable]
+
+    def match(self, value: str) -> bool:
+        if self._combined is not None and self._combined.match(value):
+            return True
+        return any(regex.match(value) for regex in self._separate)
+
+    def match_all(self, values: List[str]) -> np.ndarray:
+        """Array booleano con el resultado de match para cada valor"""
+        if self._combined is not None and not self._separate:
+            match = self._combined.match
+            return np.fromiter((match(value) is not None for value in values), dtype=bool, count=len(values))
+        return np.fromiter((self.match(value) for value in values), dtype=bool, count=len(values))
+
+
+def _learned_regexes(learned_patterns: Dict, field_type: str) -> Tuple[str, ...]:
+    """Regex aprendidas para el campo, en el orden en que se añadieron"""
+    if learned_patterns and field_type in learned_patterns:
+        return tuple(pattern_info['regex'] for pattern_info in learned_patterns[field_type].get('patterns', [])
+                     if 'regex' in pattern_info)
+    return ()
+
+
 class PatternValidatorRegistry:
     """Registro de validadores con aprendizaje de patrones"""
     
     def __init__(self):
         self.validators = {}
         self.learned_patterns_file = "config/validator_patterns.json"
-        self.learned_patterns = self._load_learned_patterns()
+        # validator_patterns.json se lee en la primera validación, no al importar el módulo
+        self._learned_patterns = None
+        # Matchers compilados por campo: {field_type: (patrones, CompiledPatternMatcher)}
+        self._compiled_matchers = {}
+        self.matcher_compilations = 0
+    
+    @property
+    def learned_patterns(self) -> Dict:
+        if self._learned_patterns is None:
+            self._learned_patterns = self._load_learned_patterns()
+        return self._learned_patterns
+    
+    @learned_patterns.setter
+    def learned_patterns(self, patterns: Dict):
+        self._learned_patterns = patterns
     
     def _load_learned_patterns(self) -> Dict:
         """Carga patrones aprendidos"""
@@ -39,6 +173,17 @@ class PatternValidatorRegistry:
         except Exception as e:
             logger.error(f"Error saving validator patterns: {e}")
     
+    def get_matcher(self, field_type: str, base_patterns: Sequence[str],
+                    learned_patterns: Dict = None) -> CompiledPatternMatcher:
+        """Matcher combinado (base + aprendidos) del campo; solo se recompila si cambia el conjunto"""
+        patterns = tuple(base_patterns) + _learned_regexes(learned_patterns, field_type)
+        cached = self._compiled_matchers.get(field_type)
+        if cached is None or cached[0] != patterns:
+            cached = (patterns, CompiledPatternMatcher(patterns))
+            self._compiled_matchers[field_type] = cached
+            self.matcher_compilations += 1
+        return cached[1]
+
     def register_validator(self, field_type: str, validator_func):
         """Registra un validador para un tipo de campo"""
         self.validators[field_type] = validator_func
@@ -59,9 +204,10 @@ class PatternValidatorRegistry:
                 "confidence": 0.5
             }
         
-        # Añadir nuevo patrón
+        # Añadir nuevo patrón (el matcher del campo se recompila en la siguiente validación)
         if pattern_info not in self.learned_patterns[field_type]["patterns"]:
             self.learned_patterns[field_type]["patterns"].append(pattern_info)
+            self._compiled_matchers.pop(field_type, None)
         
         # Actualizar ejemplos
         examples = data.dropna().astype(str).head(5).tolist()
@@ -83,6 +229,27 @@ class PatternValidatorRegistry:
 # Instancia global del registro
 validator_registry = PatternValidatorRegistry()
 
+# ===== KERNEL DE PUNTUACIÓN =====
+
+def _stripped_values(series: pd.Series) -> List[str]:
+    """Valores no nulos como texto sin espacios extremos (misma conversión que el bucle original)"""
+    return [value.strip() for value in series.dropna().astype(str).tolist()]
+
+def _value_flags(values: List[str], predicate) -> np.ndarray:
+    """Array booleano con predicate(valor) para cada valor"""
+    return np.fromiter((bool(predicate(value)) for value in values), dtype=bool, count=len(values))
+
+def _value_lengths(values: List[str]) -> np.ndarray:
+    return np.fromiter(map(len, values), dtype=np.int64, count=len(values))
+
+def _accumulate_scores(*steps: np.ndarray) -> float:
+    """
+    Suma los incrementos de cada paso valor a valor y en el mismo orden que el bucle
+    original (valid_count += ...), así el redondeo en coma flotante es idéntico
+    """
+    increments = np.column_stack(steps).ravel()
+    return float(np.cumsum(increments)[-1]) if increments.size else 0.0
+
 def validate_journal_entry_id(series: pd.Series, learned_patterns: Dict = None) -> float:
     """
     Valida identificadores de asientos contables con patrones aprendidos
@@ -91,59 +258,31 @@ def validate_journal_entry_id(series: pd.Series, learned_patterns: Dict = None)
         return 0.0
     
     try:
-        clean_series = series.dropna().astype(str)
-        if len(clean_series) == 0:
+        values = _stripped_values(series)
+        if len(values) == 0:
             return 0.0
         
-        valid_count = 0
-        total_count = len(clean_series)
-        
-        # Patrones base
-        base_patterns = [
-            r'^\d{6,15}$',                    # Números largos: 123456789012
-            r'^JE\d{6,12}$',                  # JE123456789
-            r'^AST\d{4,10}$',                 # AST20240001
-            r'^[A-Z]{2,4}\d{6,12}$',         # JOUR123456789
-            r'^\d{4}[A-Z]{2,4}\d{4,8}$',     # 2024JE00001234
-            r'^[A-Z0-9]{8,20}$'              # General alfanumérico
-        ]
-        
-        # Añadir patrones aprendidos si existen
-        if learned_patterns and 'journal_entry_id' in learned_patterns:
-            learned_journal_patterns = learned_patterns['journal_entry_id'].get('patterns', [])
-            for pattern_info in learned_journal_patterns:
-                if 'regex' in pattern_info:
-                    base_patterns.append(pattern_info['regex'])
-        
-        for value in clean_series:
-            value = str(value).strip()
-            
-            # Verificar patrones
-            matched = False
-            for pattern in base_patterns:
-                try:
-                    if re.match(pattern, value.upper()):
-                        valid_count += 1
-                        matched = True
-                        break
-                except re.error:
-                    continue
-            
-            if not matched:
-                # Validaciones adicionales
-                if len(value) >= 6 and value.isdigit():
-                    valid_count += 0.8  # Números largos probablemente válidos
-                elif len(value) >= 4 and re.match(r'^[A-Z0-9]+$', value.upper()):
-                    valid_count += 0.6  # Alfanumérico general
-                
-                # PENALIZAR si parece fecha
-                if _is_date_like(value):
-                    valid_count -= 0.5
-                
-                # PENALIZAR si es muy corto
-                if len(value) < 3:
-                    valid_count -= 0.3
-        
+        total_count = len(values)
+        upper_values = [value.upper() for value in values]
+        
+        # Patrones base + aprendidos en un único matcher compilado
+        matcher = validator_registry.get_matcher('journal_entry_id', JOURNAL_ENTRY_ID_PATTERNS, learned_patterns)
+        matched = matcher.match_all(upper_values)
+        unmatched = ~matched
+        lengths = _value_lengths(values)
+        
+        # Validaciones adicionales: números largos (0.8) o alfanumérico general (0.6)
+        is_digit = _value_flags(values, str.isdigit)
+        is_alphanumeric = _value_flags(upper_values, ALPHANUMERIC_REGEX.match)
+        first_step = np.select(
+            [matched, unmatched & (lengths >= 6) & is_digit, unmatched & (lengths >= 4) & is_alphanumeric],
+            [1.0, 0.8, 0.6], default=0.0
+        )
+        # PENALIZAR si parece fecha o si es muy corto
+        date_penalty = np.where(unmatched & _value_flags(values, _is_date_like), -0.5, 0.0)
+        short_penalty = np.where(unmatched & (lengths < 3), -0.3, 0.0)
+        
+        valid_count = _accumulate_scores(first_step, date_penalty, short_penalty)
         return max(0.0, min(valid_count / total_count, 1.0))
         
     except Exception as e:
@@ -186,7 +325,7 @@ def validate_line_number(series: pd.Series, learned_patterns: Dict = None) -> fl
                     valid_count -= 0.5
                 
                 # Verificar si es alfanumérico corto (posible ID de línea)
-                if len(value_str) <= 5 and re.match(r'^[A-Z0-9]+$', value_str.upper()):
+                if len(value_str) <= 5 and ALPHANUMERIC_REGEX.match(value_str.upper()):
                     valid_count += 0.4
         
         return max(0.0, min(valid_count / total_count, 1.0))
@@ -215,55 +354,29 @@ def _validate_date_field(series: pd.Series, field_type: str, learned_patterns: D
         return 0.0
     
     try:
-        clean_series = series.dropna().astype(str)
-        if len(clean_series) == 0:
+        values = _stripped_values(series)
+        if len(values) == 0:
             return 0.0
         
-        valid_count = 0
-        total_count = len(clean_series)
+        total_count = len(values)
         
-        # Patrones base de fechas - INCLUYE DD.MM.YYYY
-        base_date_patterns = [
-            r'^\d{1,2}[/\-\.]\d{1,2}[/\-\.]\d{2,4}$',  # dd/mm/yyyy (incluye puntos)
-            r'^\d{4}[/\-\.]\d{1,2}[/\-\.]\d{1,2}$',    # yyyy/mm/dd (incluye puntos)
-            r'^\d{1,2}-[A-Za-z]{3}-\d{2,4}$',          # dd-MMM-yyyy
-            r'^\d{4}-\d{2}-\d{2}$',                     # yyyy-mm-dd
-            r'^\d{2}/\d{2}/\d{4}$',                     # mm/dd/yyyy
-            r'^\d{2}\.\d{2}\.\d{4}$',                   # DD.MM.YYYY ← ESPECÍFICO
-            r'^\d{1,2}\.\d{1,2}\.\d{4}$',               # D.M.YYYY ← ESPECÍFICO
-            r'^\d{4}\.\d{2}\.\d{2}$',                   # YYYY.MM.DD ← ESPECÍFICO
-            r'^\d{8}$'                                   # yyyymmdd
-        ]
-        
-        # Añadir patrones aprendidos
-        if learned_patterns and field_type in learned_patterns:
-            learned_date_patterns = learned_patterns[field_type].get('patterns', [])
-            for pattern_info in learned_date_patterns:
-                if 'regex' in pattern_info:
-                    base_date_patterns.append(pattern_info['regex'])
+        # Patrones base + aprendidos en un único matcher compilado
+        matcher = validator_registry.get_matcher(field_type, DATE_FIELD_PATTERNS, learned_patterns)
+        matched = matcher.match_all(values)
         
-        for value in clean_series:
-            value_str = str(value).strip()
-            
-            # Verificar patrones de fecha
-            date_matched = False
-            for pattern in base_date_patterns:
-                try:
-                    if re.match(pattern, value_str):
-                        valid_count += 1
-                        date_matched = True
-                        break
-                except re.error:
-                    continue
-            
-            if not date_matched:
-                # Verificar si es parseable como fecha
-                if _try_parse_date(value_str):
-                    valid_count += 0.8
-                # PENALIZAR si parece ID numérico largo
-                elif len(value_str) > 8 and value_str.isdigit():
-                    valid_count -= 0.3
+        # Solo los valores sin patrón pasan por el parser de fechas: formato inferido
+        # vectorizado y dateutil para los que no encajan
+        parsed = np.zeros(total_count, dtype=bool)
+        unmatched = np.flatnonzero(~matched)
+        if len(unmatched):
+            parsed[unmatched] = date_format_inferencer.parses([values[position] for position in unmatched],
+                                                              fallback=_try_parse_date)
+        
+        # PENALIZAR si parece ID numérico largo
+        long_number = (_value_lengths(values) > 8) & _value_flags(values, str.isdigit)
+        first_step = np.select([matched, parsed, long_number], [1.0, 0.8, -0.3], default=0.0)
         
+        valid_count = _accumulate_scores(first_step)
         return valid_count / total_count
         
     except Exception as e:
@@ -296,60 +409,23 @@ def _validate_amount_field(series: pd.Series, field_type: str, learned_patterns:
         return 0.0
     
     try:
-        clean_series = series.dropna().astype(str)
-        if len(clean_series) == 0:
+        values = _stripped_values(series)
+        if len(values) == 0:
             return 0.0
         
-        valid_count = 0
-        total_count = len(clean_series)
+        total_count = len(values)
         
-        # Patrones base de importes
-        base_amount_patterns = [
-            r'^-?\d{1,3}(\.\d{3})*,\d{2}$',      # 1.234.567,89
-            r'^-?\d{1,3}(,\d{3})*\.\d{2}$',      # 1,234,567.89
-            r'^-?\d+[,\.]\d{1,4}$',              # 1234,56 o 1234.56
-            r'^-?\d+$',                          # 1234
-            r'^-?\d+\.\d+$',                     # 1234.56
-            r'^-?\d+,\d+$',                      # 1234,56
-            r'^-?\d{1,3}( \d{3})*[,\.]\d{2}$'    # 1 234 567,89
-        ]
-        
-        # Añadir patrones aprendidos
-        if learned_patterns and field_type in learned_patterns:
-            learned_amount_patterns = learned_patterns[field_type].get('patterns', [])
-            for pattern_info in learned_amount_patterns:
-                if 'regex' in pattern_info:
-                    base_amount_patterns.append(pattern_info['regex'])
+        # Patrones base + aprendidos en un único matcher compilado
+        matcher = validator_registry.get_matcher(field_type, AMOUNT_PATTERNS, learned_patterns)
+        matched = matcher.match_all(values)
+        unmatched = ~matched
         
-        for value in clean_series:
-            value_str = str(value).strip()
-            
-            # Verificar patrones de importe
-            amount_matched = False
-            for pattern in base_amount_patterns:
-                try:
-                    if re.match(pattern, value_str):
-                        valid_count += 1
-                        amount_matched = True
-                        break
-                except re.error:
-                    continue
-            
-            if not amount_matched:
-                # Verificar si es numérico convertible
-                if _is_numeric(value_str):
-                    valid_count += 0.7
-                
-                # PENALIZAR si contiene muchas letras (descripción)
-                if len(value_str) > 2:
-                    letter_count = sum(1 for c in value_str if c.isalpha())
-                    if letter_count > len(value_str) * 0.5:
-                        valid_count -= 0.5
-                
-                # PENALIZAR si parece fecha
-                if _is_date_like(value_str):
-                    valid_count -= 0.4
+        # Numérico convertible (0.7); PENALIZAR muchas letras (descripción) o fechas
+        first_step = np.where(matched, 1.0, np.where(unmatched & _value_flags(values, _is_numeric), 0.7, 0.0))
+        letters_penalty = np.where(unmatched & _value_flags(values, _is_mostly_letters), -0.5, 0.0)
+        date_penalty = np.where(unmatched & _value_flags(values, _is_date_like), -0.4, 0.0)
         
+        valid_count = _accumulate_scores(first_step, letters_penalty, date_penalty)
         return max(0.0, min(valid_count / total_count, 1.0))
         
     except Exception as e:
@@ -358,6 +434,7 @@ def _validate_amount_field(series: pd.Series, field_type: str, learned_patterns:
 
 
 
+
 def validate_debit_credit_indicator(series: pd.Series, learned_patterns: Dict = None) -> float:
     """
     Valida indicadores debe/haber con patrones aprendidos
@@ -366,51 +443,31 @@ def validate_debit_credit_indicator(series: pd.Series, learned_patterns: Dict =
         return 0.0
     
     try:
-        clean_series = series.dropna().astype(str)
-        if len(clean_series) == 0:
+        values = [value.upper() for value in _stripped_values(series)]
+        if len(values) == 0:
             return 0.0
         
-        valid_count = 0
-        total_count = len(clean_series)
+        total_count = len(values)
         
-        # Indicadores válidos base
-        valid_indicators = {
-            'D', 'C', 'H', 'DEBE', 'HABER', 'DEBIT', 'CREDIT', 'DR', 'CR', 
-            '1', '0', '-1', 'S', 'N', 'DB', 'CD', 'DEB', 'CRE'
-        }
-        
-        # Añadir indicadores aprendidos
+        # Indicadores válidos base + aprendidos
+        valid_indicators = DEBIT_CREDIT_INDICATORS
         if learned_patterns and 'debit_credit_indicator' in learned_patterns:
             examples = learned_patterns['debit_credit_indicator'].get('examples', [])
-            for example in examples:
-                valid_indicators.add(example.upper().strip())
+            valid_indicators = valid_indicators | {example.upper().strip() for example in examples}
         
-        for value in clean_series:
-            value_str = str(value).strip().upper()
-            
-            # Verificar indicadores conocidos
-            if value_str in valid_indicators:
-                valid_count += 1
-            elif len(value_str) == 1 and value_str in 'DCHXSNYN+-':
-                valid_count += 0.8
-            elif value_str in ['YES', 'NO', 'SI', 'TRUE', 'FALSE']:
-                valid_count += 0.6
-            
-            # PENALIZAR fuertemente si parece importe numérico grande
-            if _is_numeric(value_str):
-                try:
-                    num_val = abs(float(value_str.replace(',', '.')))
-                    if num_val > 10:
-                        valid_count -= 0.8
-                    elif num_val <= 1:
-                        valid_count += 0.3  # Valores 0/1 son válidos como indicadores
-                except:
-                    pass
-            
-            # PENALIZAR si es muy largo
-            if len(value_str) > 10:
-                valid_count -= 0.5
+        lengths = _value_lengths(values)
+        known = _value_flags(values, valid_indicators.__contains__)
+        single_char = (lengths == 1) & _value_flags(values, lambda value: value in 'DCHXSNYN+-')
+        boolean_word = _value_flags(values, lambda value: value in ['YES', 'NO', 'SI', 'TRUE', 'FALSE'])
+        first_step = np.select([known, single_char, boolean_word], [1.0, 0.8, 0.6], default=0.0)
         
+        # PENALIZAR fuertemente importes numéricos grandes; 0/1 son válidos como indicadores
+        numeric_step = np.fromiter((_indicator_number_adjustment(value) for value in values),
+                                   dtype=np.float64, count=total_count)
+        # PENALIZAR si es muy largo
+        long_penalty = np.where(lengths > 10, -0.5, 0.0)
+        
+        valid_count = _accumulate_scores(first_step, numeric_step, long_penalty)
         return max(0.0, min(valid_count / total_count, 1.0))
         
     except Exception as e:
@@ -425,62 +482,30 @@ def validate_gl_account_number(series: pd.Series, learned_patterns: Dict = None)
         return 0.0
     
     try:
-        clean_series = series.dropna().astype(str)
-        if len(clean_series) == 0:
+        values = _stripped_values(series)
+        if len(values) == 0:
             return 0.0
         
-        valid_count = 0
-        total_count = len(clean_series)
-        
-        # Patrones base de cuentas contables
-        account_patterns = [
-            r'^\d{3,10}$',           # Solo números, 3-10 dígitos
-            r'^\d{3,6}\.\d{2,4}$',   # Con punto: 1234.56
-            r'^\d{3,6}-\d{2,4}$',    # Con guión: 1234-56
-            r'^[A-Z]\d{3,9}$',       # Letra + números: A1234
-            r'^\d{1,2}\.\d{2,3}\.\d{2,3}$'  # Formato jerárquico: 1.23.45
-        ]
-        
-        # Añadir patrones aprendidos
-        if learned_patterns and 'gl_account_number' in learned_patterns:
-            learned_patterns_list = learned_patterns['gl_account_number'].get('patterns', [])
-            for pattern_info in learned_patterns_list:
-                if 'regex' in pattern_info:
-                    account_patterns.append(pattern_info['regex'])
-        
-        for value in clean_series:
-            value_str = str(value).strip()
-            
-            # Verificar patrones de cuenta
-            account_matched = False
-            for pattern in account_patterns:
-                try:
-                    if re.match(pattern, value_str):
-                        valid_count += 1
-                        account_matched = True
-                        break
-                except re.error:
-                    continue
-            
-            if not account_matched:
-                # Verificaciones adicionales
-                if len(value_str) >= 3 and value_str.replace('.', '').replace('-', '').isdigit():
-                    valid_count += 0.8
-                elif len(value_str) >= 3 and re.match(r'^[A-Z0-9\.\-]+$', value_str.upper()):
-                    valid_count += 0.6
-                
-                # PENALIZAR si parece período (números muy pequeños)
-                try:
-                    num_val = int(value_str.replace('.', '').replace('-', ''))
-                    if 1 <= num_val <= 12:
-                        valid_count -= 0.4
-                except:
-                    pass
-                
-                # PENALIZAR si es muy corto para ser cuenta
-                if len(value_str) < 3:
-                    valid_count -= 0.3
-        
+        total_count = len(values)
+        
+        # Patrones base + aprendidos en un único matcher compilado
+        matcher = validator_registry.get_matcher('gl_account_number', GL_ACCOUNT_PATTERNS, learned_patterns)
+        matched = matcher.match_all(values)
+        unmatched = ~matched
+        lengths = _value_lengths(values)
+        
+        # Verificaciones adicionales: dígitos con separadores (0.8) o caracteres de cuenta (0.6)
+        digits_only = _value_flags(values, lambda value: value.replace('.', '').replace('-', '').isdigit())
+        account_chars = _value_flags(values, lambda value: ACCOUNT_CHARS_REGEX.match(value.upper()))
+        first_step = np.select(
+            [matched, unmatched & (lengths >= 3) & digits_only, unmatched & (lengths >= 3) & account_chars],
+            [1.0, 0.8, 0.6], default=0.0
+        )
+        # PENALIZAR si parece período (números muy pequeños) o si es muy corto para ser cuenta
+        period_penalty = np.where(unmatched & _value_flags(values, _is_period_like_number), -0.4, 0.0)
+        short_penalty = np.where(unmatched & (lengths < 3), -0.3, 0.0)
+        
+        valid_count = _accumulate_scores(first_step, period_penalty, short_penalty)
         return max(0.0, min(valid_count / total_count, 1.0))
         
     except Exception as e:
@@ -519,9 +544,9 @@ def validate_fiscal_year(series: pd.Series, learned_patterns: Dict = None) -> fl
                 value_str = str(value).strip()
                 
                 # Verificar formatos de año fiscal
-                if re.match(r'^FY\d{2,4}$', value_str.upper()):
+                if FISCAL_YEAR_FY_REGEX.match(value_str.upper()):
                     valid_count += 0.9
-                elif re.match(r'^\d{4}-\d{4}$', value_str):  # 2023-2024
+                elif FISCAL_YEAR_RANGE_REGEX.match(value_str):  # 2023-2024
                     valid_count += 0.9
         
         return valid_count / total_count
@@ -573,11 +598,11 @@ def validate_period_number(series: pd.Series, learned_patterns: Dict = None) ->
                 # Verificar nombres de meses
                 if any(month in value_str for month in month_names):
                     valid_count += 0.9
-                elif re.match(r'^Q[1-4]$', value_str):  # Q1, Q2, etc.
+                elif QUARTER_REGEX.match(value_str):  # Q1, Q2, etc.
                     valid_count += 0.9
-                elif re.match(r'^T[1-4]$', value_str):  # T1, T2, etc.
+                elif TRIMESTER_REGEX.match(value_str):  # T1, T2, etc.
                     valid_count += 0.9
-                elif re.match(r'^\d{4}-\d{2}$', value_str):  # 2024-01
+                elif YEAR_MONTH_REGEX.match(value_str):  # 2024-01
                     valid_count += 0.8
         
         return valid_count / total_count
@@ -606,44 +631,33 @@ def _validate_description_field(series: pd.Series, field_type: str, learned_patt
         return 0.0
     
     try:
-        clean_series = series.dropna().astype(str)
-        if len(clean_series) == 0:
+        values = _stripped_values(series)
+        if len(values) == 0:
             return 0.0
         
-        valid_count = 0
-        total_count = len(clean_series)
-        
-        for value in clean_series:
-            value_str = str(value).strip()
-            
-            # Validaciones básicas para descripción
-            if len(value_str) >= 3:
-                has_letters = any(c.isalpha() for c in value_str)
-                has_spaces_or_long = ' ' in value_str or len(value_str) > 10
-                
-                if has_letters and has_spaces_or_long:
-                    valid_count += 1
-                elif has_letters:
-                    valid_count += 0.7
-                elif len(value_str) > 5:
-                    valid_count += 0.4  # Podría ser descripción sin letras
-            
-            # PENALIZAR fuertemente si es completamente numérico
-            if value_str.replace('.', '').replace(',', '').replace('-', '').replace(' ', '').isdigit():
-                # Excepción: si es muy largo podría ser un ID descriptivo
-                if len(value_str) < 8:
-                    valid_count -= 0.6
-                else:
-                    valid_count -= 0.2
-            
-            # PENALIZAR si parece fecha
-            if _is_date_like(value_str):
-                valid_count -= 0.4
-            
-            # PENALIZAR si es muy corto para ser descripción
-            if len(value_str) < 2:
-                valid_count -= 0.5
-        
+        total_count = len(values)
+        lengths = _value_lengths(values)
+        
+        # Validaciones básicas para descripción
+        has_letters = _value_flags(values, lambda value: any(c.isalpha() for c in value))
+        has_spaces_or_long = _value_flags(values, lambda value: ' ' in value) | (lengths > 10)
+        long_enough = lengths >= 3
+        first_step = np.select(
+            [long_enough & has_letters & has_spaces_or_long, long_enough & has_letters, long_enough & (lengths > 5)],
+            [1.0, 0.7, 0.4], default=0.0  # 0.4: podría ser descripción sin letras
+        )
+        
+        # PENALIZAR fuertemente si es completamente numérico (menos si es muy largo: ID descriptivo)
+        all_numeric = _value_flags(
+            values, lambda value: value.replace('.', '').replace(',', '').replace('-', '').replace(' ', '').isdigit()
+        )
+        numeric_penalty = np.where(all_numeric, np.where(lengths < 8, -0.6, -0.2), 0.0)
+        
+        # PENALIZAR si parece fecha o si es muy corto para ser descripción
+        date_penalty = np.where(_value_flags(values, _is_date_like), -0.4, 0.0)
+        short_penalty = np.where(lengths < 2, -0.5, 0.0)
+        
+        valid_count = _accumulate_scores(first_step, numeric_penalty, date_penalty, short_penalty)
         return max(0.0, min(valid_count / total_count, 1.0))
         
     except Exception as e:
@@ -652,19 +666,11 @@ def _validate_description_field(series: pd.Series, field_type: str, learned_patt
 
 # ===== FUNCIONES DE UTILIDAD =====
 
+DATE_LIKE_MATCHER = CompiledPatternMatcher(DATE_LIKE_PATTERNS)
+
 def _is_date_like(value: str) -> bool:
     """Verifica si un valor parece una fecha"""
-    value_str = str(value).strip()
-    
-    date_patterns = [
-        r'^\d{1,2}[/\-\.]\d{1,2}[/\-\.]\d{2,4}$',
-        r'^\d{4}[/\-\.]\d{1,2}[/\-\.]\d{1,2}$',
-        r'^\d{1,2}-[a-zA-Z]{3}-\d{2,4}$',
-        r'^\d{2,4}[/\-\.]\d{1,2}[/\-\.]\d{1,2}$',
-        r'^\d{8}$'  # YYYYMMDD
-    ]
-    
-    return any(re.match(pattern, value_str) for pattern in date_patterns)
+    return DATE_LIKE_MATCHER.match(str(value).strip())
 
 def _is_numeric(value: str) -> bool:
     """Verifica si un valor es numérico"""
@@ -680,11 +686,50 @@ def _is_numeric(value: str) -> bool:
     except:
         return False
 
+def _is_mostly_letters(value: str) -> bool:
+    """Más de la mitad de los caracteres son letras (valores de más de 2 caracteres)"""
+    if len(value) <= 2:
+        return False
+    letter_count = sum(1 for c in value if c.isalpha())
+    return letter_count > len(value) * 0.5
+
+def _is_period_like_number(value: str) -> bool:
+    """El valor sin puntos ni guiones es un entero entre 1 y 12 (parece un período)"""
+    try:
+        return 1 <= int(value.replace('.', '').replace('-', '')) <= 12
+    except:
+        return False
+
+def _indicator_number_adjustment(value: str) -> float:
+    """Ajuste de un indicador debe/haber numérico: importe grande penaliza, 0/1 suma"""
+    if not _is_numeric(value):
+        return 0.0
+    try:
+        num_val = abs(float(value.replace(',', '.')))
+        if num_val > 10:
+            return -0.8
+        elif num_val <= 1:
+            return 0.3
+    except:
+        pass
+    return 0.0
+
+def _dateutil_parse(value: str):
+    """dateutil para un valor suelto (sin zona horaria); None si no es una fecha"""
+    if date_parser is None:
+        return None
+    try:
+        return date_parser.parse(value).replace(tzinfo=None)
+    except:
+        return None
+
+@lru_cache(maxsize=4096)
 def _try_parse_date(value: str) -> bool:
     """Intenta parsear una fecha con varios formatos"""
+    if date_parser is None:
+        return False
     try:
-        from dateutil import parser
-        parser.parse(value)
+        date_parser.parse(value)
         return True
     except:
         return False
@@ -788,18 +833,11 @@ def check_single_date_same_year_pattern(user_decisions: Dict, df: pd.DataFrame)
             if len(date_series) == 0:
                 return user_decisions
             
-            # Parsear fechas y extraer años
-            years = set()
-            parsed_dates = 0
-            
-            for date_value in date_series:
-                try:
-                    from dateutil import parser
-                    parsed_date = parser.parse(str(date_value))
-                    years.add(parsed_date.year)
-                    parsed_dates += 1
-                except:
-                    continue
+            # Parsear fechas y extraer años: una llamada vectorizada con el formato inferido
+            # y dateutil solo para los valores distintos que no encajan
+            parsed = date_format_inferencer.parse(date_series, fallback=_dateutil_parse)
+            years = set(parsed.dropna().dt.year.tolist())
+            parsed_dates = int(parsed.notna().sum())
             
             # Verificar si todas las fechas son del mismo año
             if len(years) == 1 and parsed_dates > 0:
@@ -10,10 +10,12 @@ __author__ = "Sistema Dinámico de Campos"
 # Importaciones principales para facilitar uso en Spyder
 try:
     from .dynamic_field_definition import DynamicFieldDefinition, SynonymData, ValidationRules, create_field_definition
-    from .dynamic_field_loader import DynamicFieldLoader, LoaderStatus, create_field_loader
+    from .dynamic_field_loader import DynamicFieldLoader, LoaderStatus, ConfigChangeEvent, create_field_loader
     from .field_mapper import FieldMapper, create_field_mapper
     from .field_detector import FieldDetector, create_detector
     from .csv_utils import analyze_csv_file
+    from .column_profiler import ColumnProfile, profile_column
+    from .mapping_cache import MappingResultCache
 
     # Exportar clases principales
     __all__ = [
@@ -22,13 +24,17 @@ try:
         'ValidationRules',
         'DynamicFieldLoader',
         'LoaderStatus',
+        'ConfigChangeEvent',
         'FieldMapper',
         'FieldDetector',
         'create_detector',
         'create_field_loader',
         'create_field_mapper',
         'create_field_definition',
-        'analyze_csv_file'
+        'analyze_csv_file',
+        'ColumnProfile',
+        'profile_column',
+        'MappingResultCache'
     ]
     
     print(f"✓ Core modules loaded successfully (v{__version__})")
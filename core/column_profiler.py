@@ -0,0 +1,336 @@
+# core/column_profiler.py
+"""
+Perfilador de columnas en una sola pasada
+Recorre la muestra de una columna una única vez y construye un vector compacto de
+características (ratio numérico, signos, ceros, unicidad, longitudes, histograma de
+clases de caracteres y aciertos de formato de fecha) del que puntúan todos los
+analizadores de contenido de FieldMapper
+"""
+
+import re
+from collections import Counter
+from functools import lru_cache
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from date_inference import date_format_inferencer
+
+# Patrones de fecha reconocidos por el análisis de contenido (antes en FieldMapper)
+DATE_PATTERNS = [
+    # ========== FORMATOS BÁSICOS CON 4 DÍGITOS DE AÑO ==========
+    r'^\d{4}-\d{2}-\d{2}$',          # YYYY-MM-DD
+    r'^\d{4}-\d{1,2}-\d{1,2}$',      # YYYY-M-D
+    r'^\d{2}/\d{2}/\d{4}$',          # DD/MM/YYYY
+    r'^\d{1,2}/\d{1,2}/\d{4}$',      # D/M/YYYY
+    r'^\d{4}/\d{2}/\d{2}$',          # YYYY/MM/DD
+    r'^\d{4}/\d{1,2}/\d{1,2}$',      # YYYY/M/D
+    r'^\d{2}-\d{2}-\d{4}$',          # DD-MM-YYYY
+    r'^\d{1,2}-\d{1,2}-\d{4}$',      # D-M-YYYY
+    r'^\d{2}\.\d{2}\.\d{4}$',        # DD.MM.YYYY
+    r'^\d{1,2}\.\d{1,2}\.\d{4}$',    # D.M.YYYY
+    r'^\d{4}\.\d{2}\.\d{2}$',        # YYYY.MM.DD
+    r'^\d{4}\.\d{1,2}\.\d{1,2}$',    # YYYY.M.D
+    r'^\d{8}$',                      # YYYYMMDD
+
+    # ========== FORMATOS CON 2 DÍGITOS DE AÑO ==========
+    r'^\d{2}/\d{2}/\d{2}$',          # DD/MM/YY
+    r'^\d{1,2}/\d{1,2}/\d{2}$',      # D/M/YY
+    r'^\d{2}-\d{2}-\d{2}$',          # DD-MM-YY
+    r'^\d{1,2}-\d{1,2}-\d{2}$',      # D-M-YY
+    r'^\d{2}\.\d{2}\.\d{2}$',        # DD.MM.YY
+    r'^\d{1,2}\.\d{1,2}\.\d{2}$',    # D.M.YY
+    r'^\d{6}$',                      # DDMMYY o YYMMDD
+
+    # ========== FORMATOS AMERICANOS ==========
+    r'^\d{1,2}/\d{1,2}/\d{4}$',      # M/D/YYYY (duplicado pero importante)
+    r'^\d{2}/\d{2}/\d{4}$',          # MM/DD/YYYY
+    r'^\d{1,2}-\d{1,2}-\d{4}$',      # M-D-YYYY
+    r'^\d{2}-\d{2}-\d{4}$',          # MM-DD-YYYY
+
+    # ========== FORMATOS CON NOMBRES DE MES (ABREVIADOS) ==========
+    r'^\d{1,2}[-\s]?(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[-\s]?\d{2,4}$',  # D-Jan-YYYY
+    r'^\d{1,2}[-\s]?(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[-\s]?\d{2,4}$',  # D-jan-yyyy
+    r'^\d{1,2}[-\s]?(JAN|FEB|MAR|APR|MAY|JUN|JUL|AUG|SEP|OCT|NOV|DEC)[-\s]?\d{2,4}$',  # D-JAN-YYYY
+    r'^(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[-\s]?\d{1,2}[-\s]?\d{2,4}$',  # Jan-D-YYYY
+    r'^(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[-\s]?\d{1,2}[-\s]?\d{2,4}$',  # jan-d-yyyy
+    r'^(JAN|FEB|MAR|APR|MAY|JUN|JUL|AUG|SEP|OCT|NOV|DEC)[-\s]?\d{1,2}[-\s]?\d{2,4}$',  # JAN-D-YYYY
+    r'^\d{2,4}[-\s]?(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[-\s]?\d{1,2}$',  # YYYY-Jan-D
+
+    # ========== FORMATOS CON NOMBRES DE MES (COMPLETOS) ==========
+    r'^\d{1,2}[-\s]?(January|February|March|April|May|June|July|August|September|October|November|December)[-\s]?\d{2,4}$',
+    r'^\d{1,2}[-\s]?(january|february|march|april|may|june|july|august|september|october|november|december)[-\s]?\d{2,4}$',
+    r'^(January|February|March|April|May|June|July|August|September|October|November|December)[-\s]?\d{1,2}[-\s]?\d{2,4}$',
+    r'^(january|february|march|april|may|june|july|august|september|october|november|december)[-\s]?\d{1,2}[-\s]?\d{2,4}$',
+
+    # ========== FORMATOS EN ESPAÑOL ==========
+    r'^\d{1,2}[-\s]?(Ene|Feb|Mar|Abr|May|Jun|Jul|Ago|Sep|Oct|Nov|Dic)[-\s]?\d{2,4}$',  # D-Ene-YYYY
+    r'^\d{1,2}[-\s]?(ene|feb|mar|abr|may|jun|jul|ago|sep|oct|nov|dic)[-\s]?\d{2,4}$',  # D-ene-yyyy
+    r'^\d{1,2}[-\s]?(Enero|Febrero|Marzo|Abril|Mayo|Junio|Julio|Agosto|Septiembre|Octubre|Noviembre|Diciembre)[-\s]?\d{2,4}$',
+    r'^\d{1,2}[-\s]?(enero|febrero|marzo|abril|mayo|junio|julio|agosto|septiembre|octubre|noviembre|diciembre)[-\s]?\d{2,4}$',
+
+    # ========== FORMATOS CON TIEMPO INCLUIDO ==========
+    r'^\d{4}-\d{2}-\d{2}\s\d{1,2}:\d{2}$',                    # YYYY-MM-DD HH:MM
+    r'^\d{4}-\d{2}-\d{2}\s\d{1,2}:\d{2}:\d{2}$',              # YYYY-MM-DD HH:MM:SS
+    r'^\d{2}/\d{2}/\d{4}\s\d{1,2}:\d{2}$',                    # DD/MM/YYYY HH:MM
+    r'^\d{2}/\d{2}/\d{4}\s\d{1,2}:\d{2}:\d{2}$',              # DD/MM/YYYY HH:MM:SS
+    r'^\d{1,2}/\d{1,2}/\d{4}\s\d{1,2}:\d{2}(:\d{2})?$',       # D/M/YYYY HH:MM(:SS)?
+    r'^\d{2}\.\d{2}\.\d{4}\s\d{1,2}:\d{2}(:\d{2})?$',         # DD.MM.YYYY HH:MM(:SS)?
+    r'^\d{4}/\d{2}/\d{2}\s\d{1,2}:\d{2}(:\d{2})?$',           # YYYY/MM/DD HH:MM(:SS)?
+
+    # ========== FORMATOS ISO Y TÉCNICOS ==========
+    r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}$',                 # ISO 8601: YYYY-MM-DDTHH:MM:SS
+    r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}Z$',                # ISO 8601 with Z
+    r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{3}Z?$',        # ISO 8601 con milisegundos
+    r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}[+-]\d{2}:\d{2}$',  # ISO 8601 con timezone
+
+    # ========== FORMATOS CON SEPARADORES ALTERNATIVOS ==========
+    r'^\d{1,2}\s\d{1,2}\s\d{2,4}$',           # D M YYYY (espacios)
+    r'^\d{2,4}\s\d{1,2}\s\d{1,2}$',           # YYYY M D (espacios)
+    r'^\d{1,2}_\d{1,2}_\d{2,4}$',             # D_M_YYYY (guiones bajos)
+    r'^\d{2,4}_\d{1,2}_\d{1,2}$',             # YYYY_M_D (guiones bajos)
+    r'^\d{1,2}\|\d{1,2}\|\d{2,4}$',           # D|M|YYYY (pipes)
+    r'^\d{2,4}\|\d{1,2}\|\d{1,2}$',           # YYYY|M|D (pipes)
+
+    # ========== FORMATOS ESPECÍFICOS DE ERP ==========
+    r'^\d{4}\d{2}\d{2}$',                     # YYYYMMDD (SAP típico)
+    r'^\d{2}\d{2}\d{4}$',                     # DDMMYYYY
+    r'^\d{2}\d{2}\d{2}$',                     # DDMMYY
+    r'^\d{6}$',                               # YYMMDD o DDMMYY
+    r'^\d{4}-\d{3}$',                         # YYYY-DDD (día juliano)
+    r'^\d{2}/\d{4}$',                         # MM/YYYY (solo mes y año)
+    r'^\d{1,2}/\d{4}$',                       # M/YYYY
+    r'^\d{4}/\d{2}$',                         # YYYY/MM
+    r'^\d{4}/\d{1,2}$',                       # YYYY/M
+    r'^\d{4}-\d{2}$',                         # YYYY-MM
+    r'^\d{4}-\d{1,2}$',                       # YYYY-M
+
+    # ========== FORMATOS DE TIMESTAMPS ==========
+    r'^\d{10}$',                              # Unix timestamp (10 dígitos)
+    r'^\d{13}$',                              # Unix timestamp milisegundos (13 dígitos)
+    r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d+$',  # YYYY-MM-DD HH:MM:SS.microseconds
+
+    # ========== FORMATOS REGIONALES ESPECÍFICOS ==========
+    # Alemán
+    r'^\d{1,2}\.\d{1,2}\.\d{4}$',             # D.M.YYYY (alemán)
+    r'^\d{2}\.\d{2}\.\d{2}$',                 # DD.MM.YY (alemán)
+
+    # Francés
+    r'^\d{1,2}/\d{1,2}/\d{4}$',               # D/M/YYYY (francés)
+    r'^\d{1,2}-\d{1,2}-\d{4}$',               # D-M-YYYY (francés)
+
+    # Reino Unido
+    r'^\d{1,2}/\d{1,2}/\d{4}$',               # DD/MM/YYYY (UK)
+    r'^\d{1,2}-\d{1,2}-\d{4}$',               # DD-MM-YYYY (UK)
+
+    # ========== FORMATOS POCO COMUNES PERO POSIBLES ==========
+    r'^\d{1,2}st|nd|rd|th\s\w+\s\d{4}$',      # 1st January 2024
+    r'^\w+\s\d{1,2}st|nd|rd|th,?\s\d{4}$',    # January 1st, 2024
+    r'^\w{3}\s\d{1,2},?\s\d{4}$',             # Jan 1, 2024
+    r'^\d{1,2}\s\w{3}\s\d{4}$',               # 1 Jan 2024
+    r'^\d{4}年\d{1,2}月\d{1,2}日$',             # Formato japonés: 2024年1月1日
+    r'^\d{4}.\d{1,2}.\d{1,2}$',               # YYYY.M.D (punto como separador genérico)
+
+]
+
+# Una única alternancia compilada: re.match prueba todas las alternativas desde el
+# inicio del valor, igual que el any(re.match(p, v) for p in DATE_PATTERNS) original
+DATE_FORMAT_REGEX = re.compile('|'.join(f'(?:{pattern})' for pattern in DATE_PATTERNS))
+
+# Tamaños de muestra de los analizadores originales
+NUMERIC_LIKE_SAMPLE_SIZE = 10
+DATE_SAMPLE_SIZE = 20
+DATE_YEAR_RANGE = (1900, 2100)
+LINE_SEQUENCE_SAMPLE_SIZE = 20
+
+CHAR_CLASSES = ('digit', 'alpha', 'space', 'separator', 'other')
+_SEPARATOR_CHARS = frozenset('.,-/:;_|+()')
+
+FEATURE_NAMES = (
+    'total_count', 'numeric_ratio', 'zero_ratio', 'positive_count', 'negative_count',
+    'numeric_unique_ratio', 'min_value', 'max_value', 'mean_value', 'std_value',
+    'unique_ratio', 'avg_length', 'min_length', 'max_length',
+    'numeric_like_ratio', 'date_ratio', 'date_regex_ratio',
+) + tuple(f'char_{char_class}_ratio' for char_class in CHAR_CLASSES)
+
+
+@dataclass
+class ColumnProfile:
+    """Características de la muestra de una columna calculadas en una sola pasada"""
+    total_count: int
+    numeric_values: np.ndarray
+    str_unique_count: int = 0
+    avg_length: float = 0.0
+    min_length: int = 0
+    max_length: int = 0
+    char_class_counts: Dict[str, int] = field(default_factory=dict)
+    numeric_like_count: int = 0
+    numeric_like_checked: int = 0
+    date_like_count: int = 0
+    date_regex_count: int = 0
+    date_checked: int = 0
+    numeric_unique_count: int = 0
+    zero_count: int = 0
+    positive_count: int = 0
+    negative_count: int = 0
+    min_value: float = np.nan
+    max_value: float = np.nan
+    mean_value: float = np.nan
+    std_value: float = np.nan
+    all_year_range: bool = False
+    consecutive_count: int = 0
+
+    @property
+    def numeric_count(self) -> int:
+        return len(self.numeric_values)
+
+    @property
+    def numeric_ratio(self) -> float:
+        return self.numeric_count / self.total_count if self.total_count else 0.0
+
+    @property
+    def unique_ratio(self) -> float:
+        return self.str_unique_count / self.total_count if self.total_count else 0.0
+
+    @property
+    def date_ratio(self) -> float:
+        return self.date_like_count / self.date_checked if self.date_checked else 0.0
+
+    def feature_vector(self) -> np.ndarray:
+        """Vector float64 en el orden de FEATURE_NAMES"""
+        numeric_count = self.numeric_count
+        total_chars = sum(self.char_class_counts.values())
+        values = [
+            self.total_count,
+            self.numeric_ratio,
+            self.zero_count / numeric_count if numeric_count else 0.0,
+            self.positive_count,
+            self.negative_count,
+            self.numeric_unique_count / numeric_count if numeric_count else 0.0,
+            self.min_value, self.max_value, self.mean_value, self.std_value,
+            self.unique_ratio, self.avg_length, self.min_length, self.max_length,
+            self.numeric_like_count / self.numeric_like_checked if self.numeric_like_checked else 0.0,
+            self.date_ratio,
+            self.date_regex_count / self.date_checked if self.date_checked else 0.0,
+        ]
+        values.extend(self.char_class_counts.get(char_class, 0) / total_chars if total_chars else 0.0
+                      for char_class in CHAR_CLASSES)
+        return np.array(values, dtype=np.float64)
+
+    def as_dict(self) -> Dict[str, float]:
+        return dict(zip(FEATURE_NAMES, self.feature_vector().tolist()))
+
+
+def profile_column(data: pd.Series) -> ColumnProfile:
+    """
+    Construye el perfil de la muestra tal y como llega (sin eliminar nulos):
+    una conversión numérica y una conversión a texto para toda la columna
+    """
+    str_values = data.astype(str).tolist()
+    profile = ColumnProfile(total_count=len(str_values), numeric_values=_to_numeric(data))
+
+    if str_values:
+        lengths = [len(value) for value in str_values]
+        profile.str_unique_count = len(set(str_values))
+        profile.avg_length = sum(lengths) / len(lengths)
+        profile.min_length = min(lengths)
+        profile.max_length = max(lengths)
+        profile.char_class_counts = _char_class_histogram(str_values)
+
+    head = str_values[:NUMERIC_LIKE_SAMPLE_SIZE]
+    profile.numeric_like_checked = len(head)
+    profile.numeric_like_count = sum(1 for value in head if _is_float(value))
+
+    date_values = [value.strip() for value in str_values[:DATE_SAMPLE_SIZE]]
+    profile.date_checked = len(date_values)
+    unmatched = []
+    for value in date_values:
+        if DATE_FORMAT_REGEX.match(value):
+            profile.date_regex_count += 1
+            profile.date_like_count += 1
+        elif not _is_short_number(value):
+            unmatched.append(value)
+    if unmatched:
+        # Formato inferido vectorizado y el parser genérico para los valores que no encajan
+        profile.date_like_count += int(date_format_inferencer.parses(
+            unmatched, fallback=_parses_as_date, year_range=DATE_YEAR_RANGE).sum())
+
+    _profile_numeric(profile)
+    return profile
+
+
+def _to_numeric(data: pd.Series) -> np.ndarray:
+    """Valores numéricos no nulos de la muestra como un único array float64"""
+    try:
+        values = pd.to_numeric(data, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    except Exception:
+        return np.empty(0, dtype=np.float64)
+    return values[~np.isnan(values)]
+
+
+def _profile_numeric(profile: ColumnProfile):
+    """Signos, rango, media/desviación (ddof=1, como pandas) y secuencias sobre el array numérico"""
+    values = profile.numeric_values
+    count = len(values)
+    if count == 0:
+        return
+
+    profile.zero_count = int(np.count_nonzero(values == 0))
+    profile.positive_count = int(np.count_nonzero(values > 0))
+    profile.negative_count = int(np.count_nonzero(values < 0))
+    sorted_values = np.sort(values)
+    profile.numeric_unique_count = int(np.count_nonzero(sorted_values[1:] != sorted_values[:-1])) + 1
+    profile.min_value = sorted_values[0]
+    profile.max_value = sorted_values[-1]
+    profile.mean_value = values.sum() / count
+    if count > 1:
+        deviations = profile.mean_value - values
+        profile.std_value = float(np.sqrt((deviations ** 2).sum() / (count - 1)))
+    profile.all_year_range = bool(sorted_values[0] >= 1900 and sorted_values[-1] <= 2100)
+
+    head = sorted_values[:LINE_SEQUENCE_SAMPLE_SIZE]
+    profile.consecutive_count = int(np.count_nonzero(head[1:] == head[:-1] + 1))
+
+
+def _char_class_histogram(str_values: List[str]) -> Dict[str, int]:
+    """Histograma de clases de caracteres: Counter cuenta en C y se clasifican solo los distintos"""
+    histogram = dict.fromkeys(CHAR_CLASSES, 0)
+    for char, count in Counter(''.join(str_values)).items():
+        if char.isdigit():
+            histogram['digit'] += count
+        elif char.isalpha():
+            histogram['alpha'] += count
+        elif char.isspace():
+            histogram['space'] += count
+        elif char in _SEPARATOR_CHARS:
+            histogram['separator'] += count
+        else:
+            histogram['other'] += count
+    return histogram
+
+
+def _is_float(value: str) -> bool:
+    try:
+        float(value)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+def _is_short_number(value: str) -> bool:
+    """Los números de hasta 6 caracteres nunca cuentan como fecha: no hace falta parsearlos"""
+    return value.replace('.', '').replace('/', '').replace('-', '').isdigit() and len(value) <= 6
+
+
+@lru_cache(maxsize=8192)
+def _parses_as_date(value: str) -> bool:
+    """Fallback permisivo de pandas, descartando números cortos que no son fechas"""
+    if _is_short_number(value):
+        return False
+    try:
+        parsed_date = pd.to_datetime(value, errors='coerce')
+        return bool(pd.notna(parsed_date) and DATE_YEAR_RANGE[0] <= parsed_date.year <= DATE_YEAR_RANGE[1])
+    except Exception:
+        return False
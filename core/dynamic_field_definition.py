@@ -73,6 +73,9 @@ class DynamicFieldDefinition:
     Optimizada para uso en Spyder con validación robusta
     """
     
+    # Modificaciones de cualquier definición (el loader lo usa para saber si su índice está al día)
+    modification_count = 0
+    
     def __init__(self, code: str, name: str, data_type: str, 
                  description: str = "", validation: ValidationRules = None, 
                  active: bool = True, priority: int = 0, default_value: Any = None,
@@ -393,6 +396,7 @@ class DynamicFieldDefinition:
         """Actualiza metadatos de control"""
         self.updated_at = datetime.now()
         self.version += 1
+        DynamicFieldDefinition.modification_count += 1
     
     def _clear_cache(self):
         """Limpia el cache interno"""
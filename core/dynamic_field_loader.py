@@ -5,14 +5,17 @@ Optimizado para Spyder con manejo robusto de errores
 
 """
 
+import os
+import re
 import json
+import pickle
 import hashlib
 import threading
 import time
 import sys
 import traceback
 from pathlib import Path
-from typing import Dict, List, Optional, Union, Any
+from typing import Callable, Dict, List, Optional, Tuple, Union, Any, NamedTuple
 from enum import Enum
 from datetime import datetime
 import logging
@@ -21,8 +24,11 @@ import logging
 try:
     import yaml
     HAS_YAML = True
+    # Loader en C (libyaml) si PyYAML se compiló con él: ~10x más rápido que el puro Python
+    YAML_SAFE_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
 except ImportError:
     HAS_YAML = False
+    YAML_SAFE_LOADER = None
     print("⚠️ PyYAML not available. Install with: pip install pyyaml")
 
 try:
@@ -44,6 +50,13 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Snapshot binario del YAML parseado junto al archivo; subir la versión invalida los existentes
+CONFIG_SNAPSHOT_VERSION = 1
+CONFIG_SNAPSHOT_SUFFIX = '.snapshot.pickle'
+
+# Límites del análisis de columnas (system_configuration en config/system_config.yaml)
+DEFAULT_ANALYSIS_LIMITS = {'max_rows_for_analysis': 10000, 'max_columns_per_file': 500}
+
 class LoaderStatus(Enum):
     """Estados del cargador"""
     UNINITIALIZED = "uninitialized"
@@ -56,6 +69,37 @@ class ConfigurationError(Exception):
     """Error específico de configuración"""
     pass
 
+class SynonymIndexEntry(NamedTuple):
+    """Entrada del índice de sinónimos; erp_system None indica coincidencia con el código del campo"""
+    field_type: str
+    erp_system: Optional[str]
+    synonym_name: str
+    confidence_boost: float
+
+class ConfigChangeEvent(NamedTuple):
+    """Resultado de una recarga: códigos de campo añadidos, modificados y eliminados"""
+    added: Tuple[str, ...]
+    modified: Tuple[str, ...]
+    removed: Tuple[str, ...]
+    validators_changed: bool
+    config_hash: str
+    
+    @property
+    def changed_fields(self) -> Tuple[str, ...]:
+        return self.added + self.modified + self.removed
+    
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.changed_fields) or self.validators_changed
+
+_NON_ALPHANUMERIC_PATTERN = re.compile(r'[^a-zA-Z0-9]')
+
+def normalize_synonym_name(name: str) -> str:
+    """Normalización usada para comparar nombres de columna con sinónimos (minúsculas, solo [a-z0-9])"""
+    if not name:
+        return ""
+    return _NON_ALPHANUMERIC_PATTERN.sub('', name.lower())
+
 class DynamicFieldLoader:
     """
     Cargador dinámico de configuración optimizado para Spyder
@@ -63,12 +107,14 @@ class DynamicFieldLoader:
     """
     
     def __init__(self, config_source: Union[str, Path] = None, 
-                 auto_reload: bool = True, reload_interval: int = 30):
+                 auto_reload: bool = True, reload_interval: int = 30,
+                 use_snapshot: bool = True):
         
         # Configuración básica
         self.config_source = Path(config_source or "config/dynamic_fields_config.yaml")
         self.auto_reload_enabled = auto_reload
         self.reload_interval_seconds = reload_interval
+        self.use_snapshot = use_snapshot
         
         # Estado del cargador
         self.status = LoaderStatus.UNINITIALIZED
@@ -81,8 +127,25 @@ class DynamicFieldLoader:
         self._backup_definitions = {}
         self._last_config_hash = None
         self._custom_validators_cache = {}
+        # Detección de cambios por stat (mtime/size/inode); el contenido solo se hashea si difiere
+        self._config_stat_signature = None
+        self._config_content_hash = None
+        self._loaded_stat_signature = None
+        self._validators_stat_signature = None
+        # Firma del subárbol YAML de cada definición: {(origen, código): (firma, definición, versión)}
+        self._field_signatures = {}
+        self._change_listeners = []
+        self.last_change_event = None
         self._config_history = []
         
+        # Índice de sinónimos normalizados: {nombre_normalizado: [SynonymIndexEntry]}
+        self._synonym_index = {}
+        self._indexed_fields = {}      # {field_code: (definición, versión, firma, claves)}
+        self._field_positions = {}     # Orden de las definiciones activas
+        # El índice solo se sincroniza si cambian las definiciones del loader o alguna definición
+        self._definitions_version = 0
+        self._synonym_index_stamp = None
+        
         # Threading para auto-reload (compatible con Spyder)
         self._reload_thread = None
         self._stop_reload = threading.Event()
@@ -92,13 +155,24 @@ class DynamicFieldLoader:
         self.custom_validators_module = None
         self.validators_path = Path("config/custom_field_validators.py")
         
+        # config/system_config.yaml junto al YAML de campos; se lee al pedir un ajuste
+        self.system_config_path = self.config_source.parent / "system_config.yaml"
+        self._system_settings = None
+        self._system_settings_signature = None
+        
         # Estadísticas
         self.stats = {
             'total_reloads': 0,
             'successful_reloads': 0,
             'failed_reloads': 0,
             'last_reload_duration': 0,
-            'config_changes_detected': 0
+            'config_changes_detected': 0,
+            'synonym_index_fields_reindexed': 0,
+            'config_content_hashes': 0,
+            'fields_rebuilt': 0,
+            'fields_reused': 0,
+            'snapshot_hits': 0,
+            'snapshot_misses': 0
         }
         
         # Configuración por defecto para campos core
@@ -190,14 +264,48 @@ class DynamicFieldLoader:
             return False
         
         try:
-            current_hash = self._get_config_hash()
-            return current_hash != self._last_config_hash
+            # Sin cambios de mtime/size/inode respecto a la carga no se lee ningún archivo
+            signature = self._config_files_signature()
+            if signature == self._loaded_stat_signature:
+                return False
+            if self._get_config_hash() == self._last_config_hash:
+                # Solo cambió el stat (touch, guardado sin cambios): no volver a hashear
+                self._loaded_stat_signature = self._config_stat_signature
+                return False
+            return True
         except Exception as e:
             logger.warning(f"Error checking if reload needed: {e}")
             return False
     
+    def _config_files(self) -> List[Path]:
+        """Archivos que forman la configuración: YAML principal, validadores y demás *.yaml de config/"""
+        files = [self.config_source, self.validators_path]
+        config_dir = self.config_source.parent
+        if config_dir.exists():
+            files.extend(file_path for file_path in config_dir.glob("*.yaml") if file_path != self.config_source)
+        return files
+    
+    @staticmethod
+    def _stat_signature(file_path: Path) -> Optional[tuple]:
+        try:
+            stat = file_path.stat()
+        except OSError:
+            return None
+        return (str(file_path), stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    
+    def _config_files_signature(self) -> tuple:
+        """Firma barata (solo stat) del conjunto de archivos de configuración"""
+        return tuple(self._stat_signature(file_path) for file_path in self._config_files())
+    
     def _get_config_hash(self) -> str:
-        """Calcula hash de todos los archivos relevantes"""
+        """
+        Calcula hash de todos los archivos relevantes. El stat se toma antes de leer: si
+        los archivos no han cambiado desde el último hash se devuelve sin leerlos
+        """
+        signature = self._config_files_signature()
+        if signature == self._config_stat_signature and self._config_content_hash is not None:
+            return self._config_content_hash
+        
         hash_content = ""
         
         # Hash del archivo principal de configuración
@@ -218,20 +326,26 @@ class DynamicFieldLoader:
                     except Exception:
                         pass  # Ignorar archivos que no se pueden leer
         
-        return hashlib.md5(hash_content.encode()).hexdigest()
+        self._config_stat_signature = signature
+        self._config_content_hash = hashlib.md5(hash_content.encode()).hexdigest()
+        self.stats['config_content_hashes'] += 1
+        return self._config_content_hash
     
     def _load_configuration(self) -> bool:
         """Carga la configuración con manejo robusto de errores"""
         start_time = time.time()
+        previous_signatures = self._field_signatures
         
         try:
             with self._reload_lock:
                 # Backup de la configuración actual
+                previous_definitions = self._field_definitions_cache.copy()
                 if self._field_definitions_cache:
-                    self._backup_definitions = self._field_definitions_cache.copy()
+                    self._backup_definitions = previous_definitions
                 
-                # Limpiar cache
+                # Limpiar cache (las definiciones sin cambios se reutilizan al procesar)
                 self._field_definitions_cache.clear()
+                self._field_signatures = {}
                 
                 # Cargar archivo principal o crear por defecto
                 if not self.config_source.exists():
@@ -240,13 +354,24 @@ class DynamicFieldLoader:
                 config_data = self._load_config_file(self.config_source)
                 
                 # Procesar definiciones de campos
-                self._process_field_definitions(config_data)
+                self._process_field_definitions(config_data, previous_signatures)
+                self._definitions_version += 1
                 
-                # Cargar validadores personalizados
-                self._load_custom_validators()
+                # Reindexar solo los campos cuyos sinónimos han cambiado
+                self._sync_synonym_index()
+                
+                # Cargar validadores personalizados (solo si el archivo ha cambiado)
+                validators_signature = self._stat_signature(self.validators_path)
+                validators_changed = validators_signature != self._validators_stat_signature
+                if validators_changed:
+                    self._load_custom_validators()
+                    self._validators_stat_signature = validators_signature
                 
                 # Actualizar estado
                 self._last_config_hash = self._get_config_hash()
+                self._loaded_stat_signature = self._config_stat_signature
+                change_event = self._build_change_event(previous_definitions, validators_changed)
+                self.last_change_event = change_event
                 self.last_reload_time = datetime.now()
                 self.reload_count += 1
                 
@@ -269,16 +394,24 @@ class DynamicFieldLoader:
                     self._config_history = self._config_history[-10:]
                 
                 logger.info(f"Configuration loaded successfully. {len(self._field_definitions_cache)} field definitions loaded in {duration:.3f}s")
-                return True
+            
+            # Fuera del lock: los listeners pueden consultar el loader
+            if previous_definitions and change_event.has_changes:
+                self.stats['config_changes_detected'] += 1
+                self._notify_change_listeners(change_event)
+            return True
                 
         except Exception as e:
             self.stats['failed_reloads'] += 1
             self.last_error = str(e)
+            self._field_signatures = previous_signatures
             
             # Intentar restaurar desde backup
             if self._backup_definitions:
                 logger.warning(f"Configuration loading failed, restoring from backup: {e}")
                 self._field_definitions_cache = self._backup_definitions.copy()
+                self._definitions_version += 1
+                self._sync_synonym_index()
                 return True
             else:
                 logger.error(f"Configuration loading failed and no backup available: {e}")
@@ -339,7 +472,7 @@ class DynamicFieldLoader:
             if file_path.suffix.lower() in ['.yml', '.yaml']:
                 if not HAS_YAML:
                     raise ConfigurationError("PyYAML required for YAML files")
-                data = yaml.safe_load(content)
+                data = self._load_yaml_with_snapshot(file_path, content)
             elif file_path.suffix.lower() == '.json':
                 data = json.loads(content)
             else:
@@ -357,19 +490,73 @@ class DynamicFieldLoader:
         except Exception as e:
             raise ConfigurationError(f"Error loading {file_path}: {e}")
     
-    def _process_field_definitions(self, config_data: Dict):
-        """Procesa las definiciones de campos desde la configuración - VERSIÓN CORREGIDA"""
+    @staticmethod
+    def _snapshot_path(file_path: Path) -> Path:
+        return file_path.with_name(file_path.stem + CONFIG_SNAPSHOT_SUFFIX)
+    
+    def _load_yaml_with_snapshot(self, file_path: Path, content: str) -> Any:
+        """
+        YAML parseado desde el snapshot si corresponde al mismo contenido; si falta o está
+        obsoleto se parsea (loader en C si existe) y se reescribe el snapshot
+        """
+        if not self.use_snapshot:
+            return yaml.load(content, Loader=YAML_SAFE_LOADER)
+        
+        content_hash = hashlib.md5(content.encode('utf-8')).hexdigest()
+        snapshot_path = self._snapshot_path(file_path)
+        
+        try:
+            # Mismo nivel de confianza que config/custom_field_validators.py, que también se ejecuta
+            with open(snapshot_path, 'rb') as f:
+                snapshot = pickle.load(f)
+            if (isinstance(snapshot, dict) and snapshot.get('version') == CONFIG_SNAPSHOT_VERSION
+                    and snapshot.get('content_hash') == content_hash):
+                self.stats['snapshot_hits'] += 1
+                return snapshot['data']
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.debug(f"Ignoring unreadable configuration snapshot {snapshot_path}: {e}")
+        
+        self.stats['snapshot_misses'] += 1
+        data = yaml.load(content, Loader=YAML_SAFE_LOADER)
+        
+        try:
+            # Escritura atómica: otro proceso nunca ve un snapshot a medias
+            temp_path = snapshot_path.with_name(f"{snapshot_path.name}.{os.getpid()}.tmp")
+            with open(temp_path, 'wb') as f:
+                pickle.dump({'version': CONFIG_SNAPSHOT_VERSION, 'content_hash': content_hash, 'data': data},
+                            f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, snapshot_path)
+        except Exception as e:
+            logger.debug(f"Could not write configuration snapshot {snapshot_path}: {e}")
+            try:
+                temp_path.unlink()
+            except OSError:
+                pass
+        
+        return data
+    
+    def _process_field_definitions(self, config_data: Dict, previous_signatures: Dict = None):
+        """
+        Procesa las definiciones de campos desde la configuración - VERSIÓN CORREGIDA
+        Las definiciones cuyo subárbol YAML no ha cambiado se reutilizan sin reconstruir
+        """
+        previous_signatures = previous_signatures or {}
         
         # Añadir campos core primero (sin sinónimos por defecto)
         for code, name in self.core_fields.items():
             try:
-                field_def = DynamicFieldDefinition(
-                    code=code,
-                    name=name,
-                    description=f"Core field: {name}",
-                    data_type="text",
-                    active=True,
-                    priority=100
+                field_def = self._reuse_or_build(
+                    ('core', code), ('core', name), previous_signatures,
+                    lambda: DynamicFieldDefinition(
+                        code=code,
+                        name=name,
+                        description=f"Core field: {name}",
+                        data_type="text",
+                        active=True,
+                        priority=100
+                    )
                 )
                 self._field_definitions_cache[code] = field_def
             except Exception as e:
@@ -388,7 +575,14 @@ class DynamicFieldLoader:
 
         for field_code, field_config in dynamic_fields.items():
             try:
-                
+                signature = self._field_config_signature(field_config)
+                reused = self._reusable_definition(('dynamic', field_code), signature, previous_signatures)
+                if reused is not None:
+                    self._field_signatures[('dynamic', field_code)] = previous_signatures[('dynamic', field_code)]
+                    self._field_definitions_cache[field_code] = reused
+                    self.stats['fields_reused'] += 1
+                    processed_count += 1
+                    continue
                 
                 # Crear copia de la configuración para modificar
                 processed_config = field_config.copy()
@@ -433,6 +627,8 @@ class DynamicFieldLoader:
 
                 if field_def.is_valid():
                     self._field_definitions_cache[field_code] = field_def
+                    self._field_signatures[('dynamic', field_code)] = (signature, field_def, field_def.version)
+                    self.stats['fields_rebuilt'] += 1
                     processed_count += 1
                     
                     
@@ -454,6 +650,58 @@ class DynamicFieldLoader:
         print(f"📊 Processing complete: {processed_count} successful, {error_count} errors")
         logger.info(f"Processed {processed_count} field definitions ({error_count} errors)")
     
+    @staticmethod
+    def _field_config_signature(field_config: Any) -> str:
+        """Firma estable del subárbol YAML de una definición"""
+        return hashlib.md5(json.dumps(field_config, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+    
+    @staticmethod
+    def _reusable_definition(key: tuple, signature: Any, previous_signatures: Dict) -> Optional[DynamicFieldDefinition]:
+        """Definición anterior con la misma firma y sin modificar en memoria (versión intacta)"""
+        previous = previous_signatures.get(key)
+        if previous and previous[0] == signature and previous[1].version == previous[2]:
+            return previous[1]
+        return None
+    
+    def _reuse_or_build(self, key: tuple, signature: Any, previous_signatures: Dict,
+                        build: Callable[[], DynamicFieldDefinition]) -> DynamicFieldDefinition:
+        field_def = self._reusable_definition(key, signature, previous_signatures)
+        if field_def is None:
+            field_def = build()
+            self.stats['fields_rebuilt'] += 1
+        else:
+            self.stats['fields_reused'] += 1
+        self._field_signatures[key] = (signature, field_def, field_def.version)
+        return field_def
+    
+    def _build_change_event(self, previous_definitions: Dict, validators_changed: bool) -> ConfigChangeEvent:
+        """Compara las definiciones antes/después de la recarga (las reutilizadas son el mismo objeto)"""
+        current = self._field_definitions_cache
+        return ConfigChangeEvent(
+            added=tuple(code for code in current if code not in previous_definitions),
+            modified=tuple(code for code, field_def in current.items()
+                           if code in previous_definitions and previous_definitions[code] is not field_def),
+            removed=tuple(code for code in previous_definitions if code not in current),
+            validators_changed=validators_changed,
+            config_hash=self._last_config_hash
+        )
+    
+    def add_change_listener(self, listener: Callable[[ConfigChangeEvent], None]):
+        """Registra un callback que recibe un ConfigChangeEvent tras cada recarga con cambios"""
+        if listener not in self._change_listeners:
+            self._change_listeners.append(listener)
+    
+    def remove_change_listener(self, listener: Callable[[ConfigChangeEvent], None]):
+        if listener in self._change_listeners:
+            self._change_listeners.remove(listener)
+    
+    def _notify_change_listeners(self, event: ConfigChangeEvent):
+        for listener in list(self._change_listeners):
+            try:
+                listener(event)
+            except Exception as e:
+                logger.warning(f"Error in configuration change listener: {e}")
+    
     def _load_custom_validators(self):
         """Carga validadores personalizados"""
         if not self.validators_path.exists() or not HAS_IMPORTLIB:
@@ -497,6 +745,88 @@ class DynamicFieldLoader:
             logger.error(f"Reload failed: {e}")
             return False
     
+    def lookup_synonyms(self, normalized_name: str) -> List[SynonymIndexEntry]:
+        """
+        Búsqueda O(1) de sinónimos y códigos de campo por nombre normalizado.
+        Las entradas se devuelven en el orden de get_field_definitions(). El índice solo
+        se sincroniza si las definiciones han cambiado desde la última sincronización
+        """
+        with self._reload_lock:
+            if self._synonym_index_stamp != self._definitions_stamp():
+                self._sync_synonym_index()
+            entries = self._synonym_index.get(normalized_name)
+            if not entries:
+                return []
+            return sorted(entries, key=lambda entry: self._field_positions[entry.field_type])
+    
+    def reindex_field_synonyms(self, field_code: str):
+        """Actualiza en el índice solo las entradas de un campo (tras añadir o eliminar sinónimos)"""
+        with self._reload_lock:
+            self._unindex_field(field_code)
+            field_def = self._field_definitions_cache.get(field_code)
+            if field_def is not None and field_def.active:
+                self._index_field(field_code, field_def)
+    
+    def _sync_synonym_index(self):
+        """
+        Sincroniza el índice con las definiciones actuales. Coste O(campos) si nada ha
+        cambiado; las definiciones nuevas (recarga) solo se reindexan si su firma difiere
+        """
+        active_definitions = self.get_field_definitions()
+        
+        for field_code in list(self._indexed_fields):
+            if field_code not in active_definitions:
+                self._unindex_field(field_code)
+        
+        for field_code, field_def in active_definitions.items():
+            indexed = self._indexed_fields.get(field_code)
+            if indexed and indexed[0] is field_def and indexed[1] == field_def.version:
+                continue
+            if indexed and indexed[2] == self._synonym_signature(field_def):
+                self._indexed_fields[field_code] = (field_def, field_def.version) + indexed[2:]
+                continue
+            self.reindex_field_synonyms(field_code)
+        
+        self._field_positions = {code: position for position, code in enumerate(active_definitions)}
+        self._synonym_index_stamp = self._definitions_stamp()
+    
+    def _definitions_stamp(self) -> Tuple[int, int]:
+        """Versión de las definiciones del loader y contador global de modificaciones de definiciones"""
+        return self._definitions_version, DynamicFieldDefinition.modification_count
+    
+    def _index_field(self, field_code: str, field_def: DynamicFieldDefinition):
+        entries = [SynonymIndexEntry(field_code, None, field_def.code, 0.0)]
+        for erp_system, synonyms in field_def.synonyms_by_erp.items():
+            for synonym in synonyms:
+                entries.append(SynonymIndexEntry(field_code, erp_system, synonym.name, synonym.confidence_boost))
+        
+        keys = set()
+        for entry in entries:
+            key = normalize_synonym_name(entry.synonym_name)
+            self._synonym_index.setdefault(key, []).append(entry)
+            keys.add(key)
+        
+        self._indexed_fields[field_code] = (field_def, field_def.version, self._synonym_signature(field_def), keys)
+        self.stats['synonym_index_fields_reindexed'] += 1
+    
+    def _unindex_field(self, field_code: str):
+        indexed = self._indexed_fields.pop(field_code, None)
+        if not indexed:
+            return
+        for key in indexed[3]:
+            remaining = [entry for entry in self._synonym_index.get(key, []) if entry.field_type != field_code]
+            if remaining:
+                self._synonym_index[key] = remaining
+            else:
+                self._synonym_index.pop(key, None)
+    
+    @staticmethod
+    def _synonym_signature(field_def: DynamicFieldDefinition) -> tuple:
+        return (field_def.code, tuple(
+            (erp_system, tuple((synonym.name, synonym.confidence_boost) for synonym in synonyms))
+            for erp_system, synonyms in field_def.synonyms_by_erp.items() if synonyms
+        ))
+    
     def get_field_definitions(self) -> Dict[str, DynamicFieldDefinition]:
         """Retorna definiciones de campos activos"""
         return {k: v for k, v in self._field_definitions_cache.items() if v.active}
@@ -512,6 +842,7 @@ class DynamicFieldLoader:
             return False
         
         self._field_definitions_cache[definition.code] = definition
+        self._definitions_version += 1
         logger.info(f"Added field definition: {definition.code}")
         return True
     
@@ -519,6 +850,7 @@ class DynamicFieldLoader:
         """Elimina una definición de campo"""
         if field_code in self._field_definitions_cache:
             del self._field_definitions_cache[field_code]
+            self._definitions_version += 1
             logger.info(f"Removed field definition: {field_code}")
             return True
         return False
@@ -532,12 +864,42 @@ class DynamicFieldLoader:
         if definition.code in self._field_definitions_cache:
             definition.updated_at = datetime.now()
             self._field_definitions_cache[definition.code] = definition
+            self._definitions_version += 1
             logger.info(f"Updated field definition: {definition.code}")
             return True
         else:
             logger.warning(f"Field not found for update: {definition.code}")
             return False
     
+    def get_system_settings(self) -> Dict[str, Any]:
+        """Sección system_configuration de config/system_config.yaml (se relee si el archivo cambia)"""
+        signature = self._stat_signature(self.system_config_path)
+        if self._system_settings is None or signature != self._system_settings_signature:
+            settings = {}
+            if signature is not None:
+                try:
+                    settings = self._load_config_file(self.system_config_path).get('system_configuration') or {}
+                except ConfigurationError as e:
+                    logger.warning(f"Using default system settings: {e}")
+            self._system_settings = settings if isinstance(settings, dict) else {}
+            self._system_settings_signature = signature
+        return self._system_settings
+    
+    def get_system_setting(self, key: str, default: Any = None) -> Any:
+        """Un ajuste de system_configuration o el valor por defecto indicado"""
+        return self.get_system_settings().get(key, default)
+    
+    def get_analysis_limits(self) -> Dict[str, int]:
+        """max_rows_for_analysis y max_columns_per_file para la fase de detección"""
+        limits = {}
+        for key, default in DEFAULT_ANALYSIS_LIMITS.items():
+            try:
+                value = int(self.get_system_setting(key, default))
+            except (TypeError, ValueError):
+                value = default
+            limits[key] = value if value > 0 else default
+        return limits
+    
     def get_custom_validator(self, validator_name: str):
         """Obtiene validador personalizado"""
         if validator_name in self._custom_validators_cache:
@@ -617,6 +979,7 @@ class DynamicFieldLoader:
             "core_fields": len(self.core_fields),
             "dynamic_fields": len(definitions) - len(self.core_fields),
             "total_synonyms": total_synonyms,
+            "synonym_index_keys": len(self._synonym_index),
             "erp_systems": len(erp_counts),
             "synonyms_by_erp": erp_counts,
             "last_reload": self.last_reload_time.isoformat() if self.last_reload_time else None,
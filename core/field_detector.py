@@ -10,18 +10,21 @@ import re
 try:
     from .field_mapper import EnhancedFieldMapper
     from .dynamic_field_loader import DynamicFieldLoader
-    from ..config.custom_field_validators import validator_registry
 except ImportError:
     # Fallback para casos donde los imports relativos no funcionan
     try:
         from field_mapper import EnhancedFieldMapper
         from dynamic_field_loader import DynamicFieldLoader
-        from config.custom_field_validators import validator_registry
     except ImportError:
         print("⚠️ Warning: Could not import some modules. Some features may not work.")
         EnhancedFieldMapper = None
         DynamicFieldLoader = None
-        validator_registry = None
+
+# Los validadores no dependen del mapper: se importan por separado
+try:
+    from config.custom_field_validators import validator_registry
+except ImportError:
+    validator_registry = None
 
 logger = logging.getLogger(__name__)
 
@@ -68,6 +71,7 @@ class EnhancedFieldDetector:
         # Cache para optimización
         self._similarity_cache = {}
         self._erp_detection_cache = {}
+        # Matriz de scores de validadores de la detección actual: {huella de muestra: {field_type: score}}
         self._content_validation_cache = {}
         self._pattern_analysis_cache = {}
         
@@ -81,6 +85,8 @@ class EnhancedFieldDetector:
             'automatic_corrections': 0,
             'erp_auto_detections': 0,
             'confidence_improvements': 0,
+            'validator_score_hits': 0,
+            'validator_score_misses': 0,
         }
         
         # Registro de correcciones automáticas
@@ -116,6 +122,8 @@ class EnhancedFieldDetector:
         
         try:
             self.detection_stats['total_detections'] += 1
+            # Cada validador se evalúa como mucho una vez por muestra en esta detección
+            self._content_validation_cache.clear()
             
             # Usar configuración por defecto si no se especifica
             if content_analysis is None:
@@ -328,10 +336,12 @@ class EnhancedFieldDetector:
         if not validator_registry:
             return candidates
         
+        sample_key = self._sample_fingerprint(sample_data)
+        
         # Probar todos los validadores disponibles
         for field_type in validator_registry.validators.keys():
             try:
-                validation_score = validator_registry.validate_field(field_type, sample_data)
+                validation_score = self._get_validator_score(field_type, sample_data, sample_key)
                 
                 if validation_score > self.confidence_thresholds['content_validation']:
                     candidates.append({
@@ -352,6 +362,24 @@ class EnhancedFieldDetector:
         
         return candidates
     
+    def _sample_fingerprint(self, sample_data: pd.Series) -> tuple:
+        """Huella barata de la muestra (tipo + valores): la misma muestra da los mismos scores"""
+        return (str(sample_data.dtype), tuple(sample_data.tolist()))
+    
+    def _get_validator_score(self, field_type: str, sample_data: pd.Series, sample_key: tuple = None) -> float:
+        """Score del validador desde la matriz de la detección actual (se calcula una sola vez)"""
+        if sample_key is None:
+            sample_key = self._sample_fingerprint(sample_data)
+        
+        scores = self._content_validation_cache.setdefault(sample_key, {})
+        if field_type in scores:
+            self.detection_stats['validator_score_hits'] += 1
+            return scores[field_type]
+        
+        self.detection_stats['validator_score_misses'] += 1
+        scores[field_type] = validator_registry.validate_field(field_type, sample_data)
+        return scores[field_type]
+    
     def _analyze_with_learned_patterns(self, column_name: str, sample_data: pd.Series, 
                                      erp_hint: str = None) -> List[Dict]:
         """Análisis usando patrones aprendidos"""
@@ -396,10 +424,11 @@ class EnhancedFieldDetector:
         
         corrected_candidates = candidates.copy()
         best_candidate = corrected_candidates[0]
+        sample_key = self._sample_fingerprint(sample_data)
         
         # Validar el mejor candidato con validador especializado
-        validation_score = validator_registry.validate_field(
-            best_candidate['field_type'], sample_data
+        validation_score = self._get_validator_score(
+            best_candidate['field_type'], sample_data, sample_key
         )
         
         # Si la validación falla, buscar alternativa
@@ -412,7 +441,7 @@ class EnhancedFieldDetector:
             
             for field_type in validator_registry.validators.keys():
                 if field_type != best_candidate['field_type']:
-                    alt_score = validator_registry.validate_field(field_type, sample_data)
+                    alt_score = self._get_validator_score(field_type, sample_data, sample_key)
                     if alt_score > best_alt_score and alt_score > 0.5:
                         best_alt_score = alt_score
                         best_alternative = field_type
@@ -607,6 +636,9 @@ class EnhancedFieldDetector:
             stats['success_rate'] = 0.0
             stats['cache_hit_rate'] = 0.0
         
+        score_lookups = stats['validator_score_hits'] + stats['validator_score_misses']
+        stats['validator_score_hit_rate'] = (stats['validator_score_hits'] / score_lookups) * 100 if score_lookups else 0.0
+        
         return stats
     
     def get_detection_summary(self, df: pd.DataFrame = None) -> Dict:
@@ -12,11 +12,14 @@ from datetime import datetime
 import logging
 from collections import Counter
 
+from stage_metrics import stage
 
 # Import local con manejo de errores mejorado
 try:
-    from .dynamic_field_loader import DynamicFieldLoader
+    from .dynamic_field_loader import DynamicFieldLoader, ConfigChangeEvent, normalize_synonym_name
     from .dynamic_field_definition import DynamicFieldDefinition
+    from .column_profiler import ColumnProfile, profile_column
+    from .mapping_cache import MappingResultCache, mapping_fingerprint
 except ImportError:
     # Fallback para desarrollo en Spyder
     import sys
@@ -24,8 +27,10 @@ except ImportError:
     sys.path.insert(0, str(current_dir))
     
     try:
-        from dynamic_field_loader import DynamicFieldLoader
+        from dynamic_field_loader import DynamicFieldLoader, ConfigChangeEvent, normalize_synonym_name
         from dynamic_field_definition import DynamicFieldDefinition
+        from column_profiler import ColumnProfile, profile_column
+        from mapping_cache import MappingResultCache, mapping_fingerprint
     except ImportError as e:
         print(f"⚠️ Warning: Could not import required modules: {e}")
         print("Creating minimal fallback classes...")
@@ -60,16 +65,24 @@ class FieldMapper:
     def __init__(self, config_source: Union[str, Path] = None):
         self.config_source = config_source
         self.field_loader = DynamicFieldLoader(config_source)
+        # Las recargas del YAML invalidan solo las entradas de los campos afectados
+        self.field_loader.add_change_listener(self._on_config_change)
         
         # Cache para optimización
         self._normalization_cache = {}
         self._mapping_cache = {}
         self._erp_synonyms_cache = {}
         self._content_analysis_cache = {}
+        # Cache persistente de mapeos finales (desactivada hasta enable_mapping_result_cache)
+        self.mapping_result_cache = None
 
         self._dataframe_for_balance = None
         self._balance_validator = None
         self._numeric_fields_prepared = False
+        # Importes limpios compartidos entre candidatos de journal_entry_id
+        self._clean_amount_cache = {}         # {column_name: serie limpia}
+        self._balance_evaluator_cache = {}    # {(columna, coerce, tolerance): evaluator}
+        self._balance_evaluator_frame = None  # DataFrame al que pertenecen los evaluators
 
         try:
             from balance_validator import BalanceValidator
@@ -134,7 +147,7 @@ class FieldMapper:
     def reload_and_update(self, force: bool = False) -> bool:
         """Recarga configuración y actualiza mapeos"""
         if self.field_loader.reload_configuration(force):
-            self._clear_caches()
+            # Los caches ya se han actualizado con el evento de cambio del loader
             print("✓ Field mappings updated")
             return True
         return False
@@ -147,11 +160,12 @@ class FieldMapper:
         self.mapping_stats['unique_mapping_conflicts'] = 0
         self.mapping_stats['header_forced_mappings'] = 0
         self.mapping_stats['smart_reassignments'] = 0
+        self._clear_balance_evaluators()
         print("✓ Unique mappings reset")
     
     def get_all_field_synonyms(self, field_type: str, erp_system: str = None) -> List[str]:
         """Obtiene sinónimos combinando todas las fuentes"""
-        cache_key = f"{field_type}_{erp_system or 'all'}"
+        cache_key = (field_type, erp_system or 'all')
         
         if cache_key in self._erp_synonyms_cache:
             self.mapping_stats['cache_hits'] += 1
@@ -173,6 +187,8 @@ class FieldMapper:
         """Configura el DataFrame completo para poder hacer balance validation en journal_entry_id conflicts"""
         self._dataframe_for_balance = df.copy()
         self._numeric_fields_prepared = False
+        self._clean_amount_cache.clear()
+        self._clear_balance_evaluators()
         
         print(f"🗃️ DataFrame set for balance validation: {df.shape[0]} rows, {df.shape[1]} columns")
 
@@ -255,19 +271,19 @@ class FieldMapper:
         if len(clean_data) == 0:
             return {}
         
-        # Convertir a string para análisis general
-        str_data = clean_data.astype(str)
+        # Perfil de la columna en una sola pasada: todos los analizadores puntúan sobre él
+        profile = profile_column(clean_data)
         
         # 1. ANÁLISIS NUMÉRICO MEJORADO
-        numeric_analysis = self._analyze_numeric_content(clean_data)
+        numeric_analysis = self._analyze_numeric_content(clean_data, profile)
         analysis.update(numeric_analysis)
         
         # 2. ANÁLISIS DE TEXTO MEJORADO
-        text_analysis = self._analyze_text_content(str_data, field_name)
+        text_analysis = self._analyze_text_content(None, field_name, profile)
         analysis.update(text_analysis)
         
         # 3. ANÁLISIS DE FECHAS MEJORADO
-        date_analysis = self._analyze_date_content_improved(str_data)
+        date_analysis = self._analyze_date_content_improved(None, profile)
         analysis.update(date_analysis)
         
         # 4. ANÁLISIS DE PATRONES ESPECÍFICOS
@@ -275,43 +291,41 @@ class FieldMapper:
         analysis.update(pattern_analysis)
         
         # 5. NUEVO: ANÁLISIS DE VENDOR_ID
-        vendor_analysis = self._analyze_vendor_id_content(field_name, str_data)
+        vendor_analysis = self._analyze_vendor_id_content(field_name, None, profile)
         analysis.update(vendor_analysis)
         
         # 6. NUEVO: ANÁLISIS DE GL_ACCOUNT_NAME
-        account_name_analysis = self._analyze_gl_account_name_content(field_name, str_data)
+        account_name_analysis = self._analyze_gl_account_name_content(field_name, None, profile)
         analysis.update(account_name_analysis)
         
         return analysis
     
-    def _analyze_numeric_content(self, data: pd.Series) -> Dict[str, float]:
+    def _analyze_numeric_content(self, data: pd.Series, profile: ColumnProfile = None) -> Dict[str, float]:
         """Análisis numérico mejorado con nombres actualizados"""
         analysis = {}
         
         try:
-            # Intentar conversión numérica
-            numeric_data = pd.to_numeric(data, errors='coerce')
-            non_null_numeric = numeric_data.dropna()
+            if profile is None:
+                profile = profile_column(data)
             
-            if len(non_null_numeric) == 0:
+            if profile.numeric_count == 0:
                 return analysis
             
-            numeric_ratio = len(non_null_numeric) / len(data)
-            
-            if numeric_ratio < 0.7:  # Si menos del 70% son numéricos, no es campo numérico
+            if profile.numeric_ratio < 0.7:  # Si menos del 70% son numéricos, no es campo numérico
                 return analysis
             
             # Estadísticas básicas
-            zero_count = (non_null_numeric == 0).sum()
-            positive_count = (non_null_numeric > 0).sum()
-            negative_count = (non_null_numeric < 0).sum()
-            total_count = len(non_null_numeric)
+            zero_count = profile.zero_count
+            positive_count = profile.positive_count
+            negative_count = profile.negative_count
+            total_count = profile.numeric_count
+            unique_count = profile.numeric_unique_count
             
             # Análisis de rangos
-            min_val = non_null_numeric.min()
-            max_val = non_null_numeric.max()
-            mean_val = non_null_numeric.mean()
-            std_val = non_null_numeric.std()
+            min_val = profile.min_value
+            max_val = profile.max_value
+            mean_val = profile.mean_value
+            std_val = profile.std_value
             
             # MEJORADO: Detección de amounts vs otros tipos numéricos
             if abs(mean_val) > 1 and std_val > 1:  # Valores monetarios típicos
@@ -327,37 +341,29 @@ class FieldMapper:
             
             # MEJORADO: Detección de números de documento (valores pequeños, poco variados)
             elif max_val <= 1000 and std_val < 10:  # Números pequeños con poca variación
-                unique_ratio = len(non_null_numeric.unique()) / len(non_null_numeric)
+                unique_ratio = unique_count / total_count
                 if unique_ratio < 0.2:  # Poca variabilidad → número de documento o similar
                     analysis['document_number'] = 0.7
                     # NO sugerir amount para este tipo de datos
             
             # MEJORADO: Detección de años fiscales
-            elif all(1900 <= val <= 2100 for val in non_null_numeric if pd.notna(val)):
-                unique_years = len(non_null_numeric.unique())
-                if unique_years <= 5:  # Pocos años únicos
+            elif profile.all_year_range:
+                if unique_count <= 5:  # Pocos años únicos
                     analysis['fiscal_year'] = 0.9
             
             # MEJORADO: Detección de line numbers (secuenciales)
             elif max_val <= 100 and min_val >= 1:
-                consecutive_count = 0
-                sorted_values = sorted(non_null_numeric)
-                for i in range(1, min(len(sorted_values), 20)):
-                    if sorted_values[i] == sorted_values[i-1] + 1:
-                        consecutive_count += 1
-                
-                if consecutive_count > len(sorted_values) * 0.3:
+                if profile.consecutive_count > total_count * 0.3:
                     analysis['line_number'] = 0.8
             
             # MEJORADO: Detección de journal entry IDs (valores repetidos)
-            elif len(non_null_numeric.unique()) < len(non_null_numeric) * 0.7:
-                value_counts = non_null_numeric.value_counts()
-                if (value_counts > 1).sum() > 0:  # Hay valores repetidos
-                    analysis['journal_entry_id'] = 0.7
+            elif unique_count < total_count * 0.7:
+                # Hay valores repetidos
+                analysis['journal_entry_id'] = 0.7
             
             # NUEVO: Detección de vendor_id (numérico)
             elif max_val <= 999999 and min_val >= 1:  # Rango típico de IDs
-                unique_ratio = len(non_null_numeric.unique()) / len(non_null_numeric)
+                unique_ratio = unique_count / total_count
                 if unique_ratio > 0.8:  # Alta variabilidad → IDs únicos
                     analysis['vendor_id'] = 0.6
             
@@ -366,26 +372,22 @@ class FieldMapper:
         
         return analysis
     
-    def _analyze_text_content(self, str_data: pd.Series, field_name: str) -> Dict[str, float]:
+    def _analyze_text_content(self, str_data: pd.Series, field_name: str,
+                              profile: ColumnProfile = None) -> Dict[str, float]:
         """Análisis de contenido de texto mejorado con nombres actualizados"""
         analysis = {}
         
         try:
-            # Verificar si realmente es texto (no números convertidos a string)
-            numeric_like = 0
-            for val in str_data.head(10):
-                try:
-                    float(val)
-                    numeric_like += 1
-                except:
-                    pass
+            if profile is None:
+                profile = profile_column(str_data)
             
-            if numeric_like > len(str_data.head(10)) * 0.8:
+            # Verificar si realmente es texto (no números convertidos a string)
+            if profile.numeric_like_count > profile.numeric_like_checked * 0.8:
                 # Es principalmente numérico convertido a string, no analizar como texto
                 return analysis
             
-            unique_ratio = len(str_data.unique()) / len(str_data)
-            avg_length = str_data.str.len().mean()
+            unique_ratio = profile.unique_ratio
+            avg_length = profile.avg_length
             
             # Análisis de descripción basado en nombre del campo
             field_lower = field_name.lower()
@@ -410,151 +412,21 @@ class FieldMapper:
         
         return analysis
     
-    def _analyze_date_content_improved(self, str_data: pd.Series) -> Dict[str, float]:
+    def _analyze_date_content_improved(self, str_data: pd.Series,
+                                       profile: ColumnProfile = None) -> Dict[str, float]:
         """Análisis de fechas MEJORADO con nombres actualizados"""
         analysis = {}
         
         try:
-            # Patrones de fecha más específicos - INCLUYE DD.MM.YYYY
-            date_patterns = [
-            # ========== FORMATOS BÁSICOS CON 4 DÍGITOS DE AÑO ==========
-            r'^\d{4}-\d{2}-\d{2}$',          # YYYY-MM-DD
-            r'^\d{4}-\d{1,2}-\d{1,2}$',      # YYYY-M-D
-            r'^\d{2}/\d{2}/\d{4}$',          # DD/MM/YYYY
-            r'^\d{1,2}/\d{1,2}/\d{4}$',      # D/M/YYYY
-            r'^\d{4}/\d{2}/\d{2}$',          # YYYY/MM/DD
-            r'^\d{4}/\d{1,2}/\d{1,2}$',      # YYYY/M/D
-            r'^\d{2}-\d{2}-\d{4}$',          # DD-MM-YYYY
-            r'^\d{1,2}-\d{1,2}-\d{4}$',      # D-M-YYYY
-            r'^\d{2}\.\d{2}\.\d{4}$',        # DD.MM.YYYY 
-            r'^\d{1,2}\.\d{1,2}\.\d{4}$',    # D.M.YYYY 
-            r'^\d{4}\.\d{2}\.\d{2}$',        # YYYY.MM.DD 
-            r'^\d{4}\.\d{1,2}\.\d{1,2}$',    # YYYY.M.D
-            r'^\d{8}$',                      # YYYYMMDD
-            
-            # ========== FORMATOS CON 2 DÍGITOS DE AÑO ==========
-            r'^\d{2}/\d{2}/\d{2}$',          # DD/MM/YY
-            r'^\d{1,2}/\d{1,2}/\d{2}$',      # D/M/YY
-            r'^\d{2}-\d{2}-\d{2}$',          # DD-MM-YY
-            r'^\d{1,2}-\d{1,2}-\d{2}$',      # D-M-YY
-            r'^\d{2}\.\d{2}\.\d{2}$',        # DD.MM.YY
-            r'^\d{1,2}\.\d{1,2}\.\d{2}$',    # D.M.YY
-            r'^\d{6}$',                      # DDMMYY o YYMMDD
-            
-            # ========== FORMATOS AMERICANOS ==========
-            r'^\d{1,2}/\d{1,2}/\d{4}$',      # M/D/YYYY (duplicado pero importante)
-            r'^\d{2}/\d{2}/\d{4}$',          # MM/DD/YYYY 
-            r'^\d{1,2}-\d{1,2}-\d{4}$',      # M-D-YYYY
-            r'^\d{2}-\d{2}-\d{4}$',          # MM-DD-YYYY
-            
-            # ========== FORMATOS CON NOMBRES DE MES (ABREVIADOS) ==========
-            r'^\d{1,2}[-\s]?(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[-\s]?\d{2,4}$',  # D-Jan-YYYY
-            r'^\d{1,2}[-\s]?(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[-\s]?\d{2,4}$',  # D-jan-yyyy
-            r'^\d{1,2}[-\s]?(JAN|FEB|MAR|APR|MAY|JUN|JUL|AUG|SEP|OCT|NOV|DEC)[-\s]?\d{2,4}$',  # D-JAN-YYYY
-            r'^(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[-\s]?\d{1,2}[-\s]?\d{2,4}$',  # Jan-D-YYYY
-            r'^(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[-\s]?\d{1,2}[-\s]?\d{2,4}$',  # jan-d-yyyy
-            r'^(JAN|FEB|MAR|APR|MAY|JUN|JUL|AUG|SEP|OCT|NOV|DEC)[-\s]?\d{1,2}[-\s]?\d{2,4}$',  # JAN-D-YYYY
-            r'^\d{2,4}[-\s]?(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[-\s]?\d{1,2}$',  # YYYY-Jan-D
-            
-            # ========== FORMATOS CON NOMBRES DE MES (COMPLETOS) ==========
-            r'^\d{1,2}[-\s]?(January|February|March|April|May|June|July|August|September|October|November|December)[-\s]?\d{2,4}$',
-            r'^\d{1,2}[-\s]?(january|february|march|april|may|june|july|august|september|october|november|december)[-\s]?\d{2,4}$',
-            r'^(January|February|March|April|May|June|July|August|September|October|November|December)[-\s]?\d{1,2}[-\s]?\d{2,4}$',
-            r'^(january|february|march|april|may|june|july|august|september|october|november|december)[-\s]?\d{1,2}[-\s]?\d{2,4}$',
-            
-            # ========== FORMATOS EN ESPAÑOL ==========
-            r'^\d{1,2}[-\s]?(Ene|Feb|Mar|Abr|May|Jun|Jul|Ago|Sep|Oct|Nov|Dic)[-\s]?\d{2,4}$',  # D-Ene-YYYY
-            r'^\d{1,2}[-\s]?(ene|feb|mar|abr|may|jun|jul|ago|sep|oct|nov|dic)[-\s]?\d{2,4}$',  # D-ene-yyyy
-            r'^\d{1,2}[-\s]?(Enero|Febrero|Marzo|Abril|Mayo|Junio|Julio|Agosto|Septiembre|Octubre|Noviembre|Diciembre)[-\s]?\d{2,4}$',
-            r'^\d{1,2}[-\s]?(enero|febrero|marzo|abril|mayo|junio|julio|agosto|septiembre|octubre|noviembre|diciembre)[-\s]?\d{2,4}$',
-            
-            # ========== FORMATOS CON TIEMPO INCLUIDO ==========
-            r'^\d{4}-\d{2}-\d{2}\s\d{1,2}:\d{2}$',                    # YYYY-MM-DD HH:MM
-            r'^\d{4}-\d{2}-\d{2}\s\d{1,2}:\d{2}:\d{2}$',              # YYYY-MM-DD HH:MM:SS
-            r'^\d{2}/\d{2}/\d{4}\s\d{1,2}:\d{2}$',                    # DD/MM/YYYY HH:MM
-            r'^\d{2}/\d{2}/\d{4}\s\d{1,2}:\d{2}:\d{2}$',              # DD/MM/YYYY HH:MM:SS
-            r'^\d{1,2}/\d{1,2}/\d{4}\s\d{1,2}:\d{2}(:\d{2})?$',       # D/M/YYYY HH:MM(:SS)?
-            r'^\d{2}\.\d{2}\.\d{4}\s\d{1,2}:\d{2}(:\d{2})?$',         # DD.MM.YYYY HH:MM(:SS)?
-            r'^\d{4}/\d{2}/\d{2}\s\d{1,2}:\d{2}(:\d{2})?$',           # YYYY/MM/DD HH:MM(:SS)?
-            
-            # ========== FORMATOS ISO Y TÉCNICOS ==========
-            r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}$',                 # ISO 8601: YYYY-MM-DDTHH:MM:SS
-            r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}Z$',                # ISO 8601 with Z
-            r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{3}Z?$',        # ISO 8601 con milisegundos
-            r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}[+-]\d{2}:\d{2}$',  # ISO 8601 con timezone
-            
-            # ========== FORMATOS CON SEPARADORES ALTERNATIVOS ==========
-            r'^\d{1,2}\s\d{1,2}\s\d{2,4}$',           # D M YYYY (espacios)
-            r'^\d{2,4}\s\d{1,2}\s\d{1,2}$',           # YYYY M D (espacios)
-            r'^\d{1,2}_\d{1,2}_\d{2,4}$',             # D_M_YYYY (guiones bajos)
-            r'^\d{2,4}_\d{1,2}_\d{1,2}$',             # YYYY_M_D (guiones bajos)
-            r'^\d{1,2}\|\d{1,2}\|\d{2,4}$',           # D|M|YYYY (pipes)
-            r'^\d{2,4}\|\d{1,2}\|\d{1,2}$',           # YYYY|M|D (pipes)
-            
-            # ========== FORMATOS ESPECÍFICOS DE ERP ==========
-            r'^\d{4}\d{2}\d{2}$',                     # YYYYMMDD (SAP típico)
-            r'^\d{2}\d{2}\d{4}$',                     # DDMMYYYY
-            r'^\d{2}\d{2}\d{2}$',                     # DDMMYY
-            r'^\d{6}$',                               # YYMMDD o DDMMYY
-            r'^\d{4}-\d{3}$',                         # YYYY-DDD (día juliano)
-            r'^\d{2}/\d{4}$',                         # MM/YYYY (solo mes y año)
-            r'^\d{1,2}/\d{4}$',                       # M/YYYY
-            r'^\d{4}/\d{2}$',                         # YYYY/MM
-            r'^\d{4}/\d{1,2}$',                       # YYYY/M
-            r'^\d{4}-\d{2}$',                         # YYYY-MM
-            r'^\d{4}-\d{1,2}$',                       # YYYY-M
-            
-            # ========== FORMATOS DE TIMESTAMPS ==========
-            r'^\d{10}$',                              # Unix timestamp (10 dígitos)
-            r'^\d{13}$',                              # Unix timestamp milisegundos (13 dígitos)
-            r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d+$',  # YYYY-MM-DD HH:MM:SS.microseconds
-            
-            # ========== FORMATOS REGIONALES ESPECÍFICOS ==========
-            # Alemán
-            r'^\d{1,2}\.\d{1,2}\.\d{4}$',             # D.M.YYYY (alemán)
-            r'^\d{2}\.\d{2}\.\d{2}$',                 # DD.MM.YY (alemán)
-            
-            # Francés  
-            r'^\d{1,2}/\d{1,2}/\d{4}$',               # D/M/YYYY (francés)
-            r'^\d{1,2}-\d{1,2}-\d{4}$',               # D-M-YYYY (francés)
-            
-            # Reino Unido
-            r'^\d{1,2}/\d{1,2}/\d{4}$',               # DD/MM/YYYY (UK)
-            r'^\d{1,2}-\d{1,2}-\d{4}$',               # DD-MM-YYYY (UK)
-            
-            # ========== FORMATOS POCO COMUNES PERO POSIBLES ==========
-            r'^\d{1,2}st|nd|rd|th\s\w+\s\d{4}$',      # 1st January 2024
-            r'^\w+\s\d{1,2}st|nd|rd|th,?\s\d{4}$',    # January 1st, 2024
-            r'^\w{3}\s\d{1,2},?\s\d{4}$',             # Jan 1, 2024
-            r'^\d{1,2}\s\w{3}\s\d{4}$',               # 1 Jan 2024
-            r'^\d{4}年\d{1,2}月\d{1,2}日$',             # Formato japonés: 2024年1月1日
-            r'^\d{4}.\d{1,2}.\d{1,2}$',               # YYYY.M.D (punto como separador genérico)
-            ]   
-
-            
-            date_like_count = 0
-            total_checked = min(len(str_data), 20)  # Limitar la verificación
+            # Los ~80 patrones de fecha se evalúan como una única alternancia compilada
+            # (DATE_FORMAT_REGEX) sobre los primeros valores, dentro del perfil
+            if profile is None:
+                profile = profile_column(str_data)
             
-            for val in str_data.head(total_checked):
-                val_str = str(val).strip()
-                
-                # Verificar patrones de fecha
-                if any(re.match(pattern, val_str) for pattern in date_patterns):
-                    date_like_count += 1
-                    continue
-                
-                # Verificar con pandas (más permisivo pero verificar resultado)
-                try:
-                    parsed_date = pd.to_datetime(val_str, errors='coerce')
-                    if pd.notna(parsed_date) and 1900 <= parsed_date.year <= 2100:
-                        # Verificar que no sea un número convertido incorrectamente
-                        if not val_str.replace('.', '').replace('/', '').replace('-', '').isdigit() or len(val_str) > 6:
-                            date_like_count += 1
-                except:
-                    pass
+            total_checked = profile.date_checked
             
             if total_checked > 0:
-                date_ratio = date_like_count / total_checked
+                date_ratio = profile.date_ratio
                 
                 if date_ratio >= 0.8:
                     analysis['posting_date'] = 0.9
@@ -573,7 +445,8 @@ class FieldMapper:
         
         return analysis
     
-    def _analyze_vendor_id_content(self, field_name: str, str_data: pd.Series) -> Dict[str, float]:
+    def _analyze_vendor_id_content(self, field_name: str, str_data: pd.Series,
+                                   profile: ColumnProfile = None) -> Dict[str, float]:
         """NUEVO: Análisis específico para vendor_id"""
         analysis = {}
         field_lower = field_name.lower()
@@ -589,15 +462,18 @@ class FieldMapper:
                 analysis['vendor_id'] = 0.9
             else:
                 # Podría ser vendor_id si es alfanumérico corto
-                avg_length = str_data.str.len().mean()
-                unique_ratio = len(str_data.unique()) / len(str_data)
+                if profile is None:
+                    profile = profile_column(str_data)
+                avg_length = profile.avg_length
+                unique_ratio = profile.unique_ratio
                 
                 if avg_length <= 15 and unique_ratio > 0.8:  # IDs cortos y únicos
                     analysis['vendor_id'] = 0.7
         
         return analysis
     
-    def _analyze_gl_account_name_content(self, field_name: str, str_data: pd.Series) -> Dict[str, float]:
+    def _analyze_gl_account_name_content(self, field_name: str, str_data: pd.Series,
+                                         profile: ColumnProfile = None) -> Dict[str, float]:
         """NUEVO: Análisis específico para gl_account_name"""
         analysis = {}
         field_lower = field_name.lower()
@@ -623,7 +499,9 @@ class FieldMapper:
             analysis['gl_account_name'] = 0.8
         elif has_account_pattern and not any(num_pattern in field_lower for num_pattern in ['num', 'number', 'codigo', 'code']):
             # Cuenta pero no número de cuenta
-            avg_length = str_data.str.len().mean()
+            if profile is None:
+                profile = profile_column(str_data)
+            avg_length = profile.avg_length
             if avg_length > 10:  # Nombres suelen ser más largos que códigos
                 analysis['gl_account_name'] = 0.7
         
@@ -845,30 +723,21 @@ class FieldMapper:
             
             # USAR TU BALANCE VALIDATOR EXISTENTE con evaluate_journal_entry_id_candidate
             try:
-                # Crear DataFrame temporal con la columna candidata
-                df_temp = df.copy()
-                
-                # Respaldar journal_entry_id si existe
-                backup_column = None
-                if 'journal_entry_id' in df_temp.columns:
-                    backup_column = df_temp['journal_entry_id'].copy()
-                    
-                # Asignar la columna candidata como journal_entry_id temporalmente
-                df_temp['journal_entry_id'] = df_temp[journal_column_name]
-                
-                # Usar el BalanceValidator con TU método evaluate_journal_entry_id_candidate
+                # Evaluator compartido: el amount de sample_df se convierte una sola vez
+                # y cada candidato es un factorize + bincount (sin copiar el DataFrame)
                 from balance_validator import BalanceValidator
                 validator = BalanceValidator(tolerance=0.01)
                 
-                # Llamar a TU método que ya está implementado
-                validation_result = validator.evaluate_journal_entry_id_candidate(df_temp)
+                # Misma normalización que evaluate_journal_entry_id_candidate (amount_numeric -> amount)
+                amount_column = 'amount' if has_amount else 'amount_numeric'
+                if amount_column in df.columns:
+                    evaluator = self._get_balance_candidate_evaluator(df, amount_column, False, validator)
+                    validation_result = evaluator.evaluate(df[journal_column_name])
+                else:
+                    validation_result = {'quality_score': 0.0, 'error': 'No amount field found'}
                 
                 # Extraer el score final del resultado
                 final_score = validation_result.get('quality_score', 0.0)
-                
-                # Restaurar backup si existía
-                if backup_column is not None:
-                    df_temp['journal_entry_id'] = backup_column
                     
                 print(f"{final_score:.3f}")
                 return final_score
@@ -893,6 +762,7 @@ class FieldMapper:
     def set_sample_dataframe(self, df: pd.DataFrame):
         """Establece DataFrame de muestra para balance validation de journal_entry_id"""
         self.sample_df = df
+        self._clear_balance_evaluators()
         print(f"📊 Sample DataFrame set for balance validation: {len(df)} rows, {len(df.columns)} columns")
 
     # 5. MÉTODO AUXILIAR: Preparar campos numéricos (reutiliza _analyze_numeric_content existente)  
@@ -914,7 +784,7 @@ class FieldMapper:
                 # Si el análisis sugiere que es un campo amount, prepararlo
                 if any(field_type in ['amount', 'debit_amount', 'credit_amount'] for field_type in numeric_analysis.keys()):
                     # Limpiar campo numérico usando lógica similar al automatic_confirmation_trainer
-                    cleaned_series = self._clean_numeric_column(self._dataframe_for_balance[column])
+                    cleaned_series = self._get_clean_amount_column(column)
                     self._dataframe_for_balance[f"{column}_numeric"] = cleaned_series
                     
             except Exception as e:
@@ -962,6 +832,15 @@ class FieldMapper:
         
         return series.apply(clean_numeric_value)
 
+    def _get_clean_amount_column(self, column_name: str) -> pd.Series:
+        """Columna amount limpia del DataFrame de balance, limpiada una sola vez"""
+        if f"{column_name}_numeric" in self._dataframe_for_balance.columns:
+            return self._dataframe_for_balance[f"{column_name}_numeric"]
+        if column_name not in self._clean_amount_cache:
+            self._clean_amount_cache[column_name] = self._clean_numeric_column(
+                self._dataframe_for_balance[column_name])
+        return self._clean_amount_cache[column_name]
+
     # 7. MÉTODO AUXILIAR: Identificar columnas de amount
     def _identify_amount_columns(self) -> Dict[str, str]:
         """CORREGIDO: Identifica qué columnas contienen amounts usando SOLO la confianza original"""
@@ -999,38 +878,41 @@ class FieldMapper:
     # 8. MÉTODO AUXILIAR: Probar un candidato de journal_entry_id
     def _test_journal_entry_candidate(self, journal_column: str, amount_columns: Dict[str, str]) -> float:
         """Prueba un candidato de journal_entry_id y retorna balance score"""
+        return self._test_journal_entry_candidates([journal_column], amount_columns)[journal_column]
+
+    def _test_journal_entry_candidates(self, journal_columns: List[str],
+                                       amount_columns: Dict[str, str]) -> Dict[str, float]:
+        """
+        Prueba todos los candidatos de journal_entry_id a la vez: el amount limpio se
+        convierte una sola vez y cada candidato es un factorize + bincount sobre él.
+        Mismo score que _calculate_balance_score sobre el reporte completo
+        """
+        scores = {column: 0.0 for column in journal_columns}
+        # La validación completa solo usa 'amount' (debit/credit no entran en el balance)
+        if 'amount' not in amount_columns:
+            return scores
+
         try:
-            # Crear DataFrame de prueba
-            test_df = pd.DataFrame()
-            test_df['journal_entry_id'] = self._dataframe_for_balance[journal_column]
-            
-            # Agregar campos amount limpios
-            for field_type, column_name in amount_columns.items():
-                if f"{column_name}_numeric" in self._dataframe_for_balance.columns:
-                    test_df[field_type] = self._dataframe_for_balance[f"{column_name}_numeric"]
-                else:
-                    test_df[field_type] = self._clean_numeric_column(self._dataframe_for_balance[column_name])
-            
-            # Asegurar que tenemos debit_amount y credit_amount
-            if 'debit_amount' not in test_df.columns:
-                test_df['debit_amount'] = 0.0
-            if 'credit_amount' not in test_df.columns:
-                test_df['credit_amount'] = 0.0
-                
-            # Si solo tenemos 'amount', distribuir en debit/credit
-            if 'amount' in test_df.columns and test_df['debit_amount'].sum() == 0 and test_df['credit_amount'].sum() == 0:
-                test_df['debit_amount'] = test_df['amount'].apply(lambda x: x if x > 0 else 0)
-                test_df['credit_amount'] = test_df['amount'].apply(lambda x: -x if x < 0 else 0)
-            
-            # Ejecutar balance validation usando el validator existente
-            balance_report = self._balance_validator.perform_comprehensive_balance_validation(test_df)
-            
-            # Calcular score (0-1) basado en el reporte
-            return self._calculate_balance_score(balance_report)
-            
+            evaluator = self._balance_validator.create_candidate_evaluator(
+                self._get_clean_amount_column(amount_columns['amount']))
         except Exception as e:
-            print(f"     Error testing candidate '{journal_column}': {e}")
-            return 0.0
+            print(f"     Error preparing amount for balance validation: {e}")
+            return scores
+
+        # Factor 1: balance total (40% del score), común a todos los candidatos
+        total_score = 0.4 if evaluator.is_total_balanced else 0.0
+
+        for column in journal_columns:
+            try:
+                result = evaluator.evaluate(self._dataframe_for_balance[column])
+                # Factor 2: tasa de asientos balanceados (60% del score)
+                if result.get('entries_count', 0) > 0:
+                    scores[column] = min(total_score + 0.6 * result['quality_score'], 1.0)
+                else:
+                    scores[column] = total_score
+            except Exception as e:
+                print(f"     Error testing candidate '{column}': {e}")
+        return scores
 
     # 9. MÉTODO AUXILIAR: Calcular score de balance 
     def _calculate_balance_score(self, balance_report: Dict[str, Any]) -> float:
@@ -1112,28 +994,24 @@ class FieldMapper:
         normalized_name = self._normalize_field_name(field_name)
         exact_matches = []
         
-        field_definitions = self.field_loader.get_field_definitions()
-        
-        for field_type, field_def in field_definitions.items():
+        # Índice hash del loader: solo se recorren los sinónimos con el mismo nombre normalizado
+        for entry in self.field_loader.lookup_synonyms(normalized_name):
+            # Prioridad 3: Coincidencia exacta con código de campo
+            if entry.erp_system is None:
+                exact_matches.append((entry.field_type, 0.90))
+                continue
+            
+            if self._is_problematic_partial_match(field_name, entry.synonym_name):
+                continue
+            
             # Prioridad 1: Coincidencia exacta en ERP específico
-            if erp_system and erp_system in field_def.synonyms_by_erp:
-                for synonym in field_def.synonyms_by_erp[erp_system]:
-                    if normalized_name == self._normalize_field_name(synonym.name):
-                        if not self._is_problematic_partial_match(field_name, synonym.name):
-                            confidence = min(0.95 + (synonym.confidence_boost * 0.05), 1.0)
-                            exact_matches.append((field_type, confidence))
+            if erp_system and entry.erp_system == erp_system:
+                confidence = min(0.95 + (entry.confidence_boost * 0.05), 1.0)
+                exact_matches.append((entry.field_type, confidence))
             
             # Prioridad 2: Coincidencia exacta en cualquier ERP
-            for erp_synonyms in field_def.synonyms_by_erp.values():
-                for synonym in erp_synonyms:
-                    if normalized_name == self._normalize_field_name(synonym.name):
-                        if not self._is_problematic_partial_match(field_name, synonym.name):
-                            confidence = min(0.85 + (synonym.confidence_boost * 0.1), 1.0)
-                            exact_matches.append((field_type, confidence))
-            
-            # Prioridad 3: Coincidencia exacta con código de campo
-            if normalized_name == self._normalize_field_name(field_def.code):
-                exact_matches.append((field_type, 0.90))
+            confidence = min(0.85 + (entry.confidence_boost * 0.1), 1.0)
+            exact_matches.append((entry.field_type, confidence))
         
         # Eliminar duplicados manteniendo el mejor score
         unique_matches = {}
@@ -1195,6 +1073,7 @@ class FieldMapper:
         if field_def:
             success = field_def.add_synonym(erp_system, synonym_name, confidence_boost)
             if success:
+                self.field_loader.reindex_field_synonyms(field_type)
                 self._clear_caches()
                 print(f"✓ Added synonym: {synonym_name} -> {field_type} ({erp_system})")
             return success
@@ -1209,6 +1088,7 @@ class FieldMapper:
         if field_def:
             success = field_def.remove_synonym(erp_system, synonym_name)
             if success:
+                self.field_loader.reindex_field_synonyms(field_type)
                 self._clear_caches()
                 print(f"✓ Removed synonym: {synonym_name} from {field_type} ({erp_system})")
             return success
@@ -1238,10 +1118,8 @@ class FieldMapper:
         if name in self._normalization_cache:
             return self._normalization_cache[name]
         
-        normalized = re.sub(r'[^a-zA-Z0-9]', '', name.lower())
-        
-        for accented, plain in self.accent_map.items():
-            normalized = normalized.replace(accented, plain)
+        # Misma normalización que usa el índice de sinónimos del loader
+        normalized = normalize_synonym_name(name)
         
         self._normalization_cache[name] = normalized
         
@@ -1253,8 +1131,19 @@ class FieldMapper:
         self._mapping_cache.clear()
         self._erp_synonyms_cache.clear()
         self._content_analysis_cache.clear()
+        self._clear_balance_evaluators()
         logger.debug("Enhanced field mapper caches cleared")
     
+    def _on_config_change(self, event: ConfigChangeEvent):
+        """Invalida solo los sinónimos de los campos cambiados; los mapeos por columna dependen de todos"""
+        changed_fields = set(event.changed_fields)
+        for cache_key in [key for key in self._erp_synonyms_cache if key[0] in changed_fields]:
+            del self._erp_synonyms_cache[cache_key]
+        if changed_fields:
+            self._mapping_cache.clear()
+            self._content_analysis_cache.clear()
+        logger.debug(f"Configuration change: {len(changed_fields)} fields invalidated")
+    
     def _normalize_confidence_score(self, raw_score: float) -> float:
         """Función auxiliar para normalizar cualquier score a rango 0-1"""
         if raw_score < 0:
@@ -1264,6 +1153,42 @@ class FieldMapper:
         else:
             return raw_score
     
+    def enable_mapping_result_cache(self, db_path: Union[str, Path] = None, max_entries: int = None):
+        """Activa la cache persistente de mapeos finales por huella de columnas"""
+        kwargs = {}
+        if db_path is not None:
+            kwargs['db_path'] = db_path
+        if max_entries is not None:
+            kwargs['max_entries'] = max_entries
+        self.mapping_result_cache = MappingResultCache(**kwargs)
+        return self.mapping_result_cache
+
+    def _mapping_fingerprint(self, df: pd.DataFrame, erp_hint: str = None) -> Tuple[str, str]:
+        """Huella del DataFrame y hash actual de configuración (YAML + validadores)"""
+        config_hash = self.field_loader._get_config_hash()
+        return mapping_fingerprint(df, erp_hint, config_hash, self._normalize_field_name), config_hash
+
+    def get_cached_column_mappings(self, df: pd.DataFrame, erp_hint: str = None) -> Optional[Dict[str, Dict]]:
+        """Mapeos finales guardados para este conjunto de columnas (None si no hay cache o no acierta)"""
+        if self.mapping_result_cache is None:
+            return None
+        try:
+            fingerprint, _ = self._mapping_fingerprint(df, erp_hint)
+            return self.mapping_result_cache.get(fingerprint, list(df.columns))
+        except Exception as e:
+            logger.warning(f"Mapping cache lookup skipped: {e}")
+            return None
+
+    def store_column_mappings(self, df: pd.DataFrame, erp_hint: str, final_mappings: Dict[str, Dict]):
+        """Guarda los mapeos finales de map_all_columns_with_conflict_resolution"""
+        if self.mapping_result_cache is None:
+            return
+        try:
+            fingerprint, config_hash = self._mapping_fingerprint(df, erp_hint)
+            self.mapping_result_cache.put(fingerprint, list(df.columns), final_mappings, config_hash, erp_hint)
+        except Exception as e:
+            logger.warning(f"Mapping cache store skipped: {e}")
+
     def get_mapping_statistics(self) -> Dict:
         """Obtiene estadísticas mejoradas de los mapeos incluyendo mapeo único"""
         field_definitions = self.field_loader.get_field_definitions()
@@ -1292,6 +1217,8 @@ class FieldMapper:
                 'content_analysis_cache': len(self._content_analysis_cache)
             },
             'usage_stats': self.mapping_stats.copy(),
+            'mapping_result_cache': (self.mapping_result_cache.get_statistics()
+                                     if self.mapping_result_cache is not None else None),
             'field_loader_stats': self.field_loader.get_statistics()
         }
     
@@ -1417,7 +1344,8 @@ class FieldMapper:
 
         for column_name in amount_priority:
             sample_data = df[column_name].dropna().head(100)
-            mapping_result = self.find_field_mapping(column_name, erp_hint, sample_data)
+            with stage('column_mapping', rows=len(sample_data), key=column_name):
+                mapping_result = self.find_field_mapping(column_name, erp_hint, sample_data)
             
             if mapping_result:
                 field_type, confidence = mapping_result
@@ -1434,7 +1362,8 @@ class FieldMapper:
 
             print(f"\nAnalyzing column: '{column_name}'")
             sample_data = df[column_name].dropna().head(100)
-            mapping_result = self.find_field_mapping(column_name, erp_hint, sample_data)
+            with stage('column_mapping', rows=len(sample_data), key=column_name):
+                mapping_result = self.find_field_mapping(column_name, erp_hint, sample_data)
             
             if mapping_result:
                 field_type, confidence = mapping_result
@@ -1447,7 +1376,8 @@ class FieldMapper:
                 print(f"   No matches found")
         
         # Resolver conflictos globales con amounts ya disponibles
-        final_mappings = self._resolve_global_field_conflicts(initial_mappings, df, balance_validator)
+        with stage('conflict_resolution', rows=len(df)):
+            final_mappings = self._resolve_global_field_conflicts(initial_mappings, df, balance_validator)
         
         return final_mappings
 
@@ -1494,6 +1424,8 @@ class FieldMapper:
                 self.mapping_stats['conflicts_resolved'] += 1
                 print(f"   🏆 CONFLICT - {field_type}: {winner_column} WINNER ({resolution_type})")
         
+        # Los evaluators referencian el df de esta pasada: no retenerlo tras resolver
+        self._clear_balance_evaluators()
         return final_mappings
 
     def _resolve_field_type_conflict(self, field_type: str, candidates: List[Tuple[str, float]], 
@@ -1550,13 +1482,13 @@ class FieldMapper:
             return (winner_column, winner_confidence, 'highest_confidence')
         
         # Calcular balance_score para cada candidato
-        balance_scores = {}
-        
         print(f"🧮 Testing balance validation with amount columns: {amount_fields_mapped}")
         
-        for column_name, confidence in candidates:
-            balance_score = self._calculate_balance_score_for_column(column_name, df, balance_validator)
-            balance_scores[column_name] = balance_score
+        # Todos los candidatos comparten el mismo vector de importes limpio
+        balance_scores = self._calculate_balance_scores_for_columns(
+            [column_name for column_name, _ in candidates], df, balance_validator
+        )
+        for column_name, balance_score in balance_scores.items():
             print(f"   📊 '{column_name}': balance_score = {balance_score:.3f}")
         
         # Mostrar balance scores después de cross-validation  
@@ -1586,24 +1518,72 @@ class FieldMapper:
 
     def _calculate_balance_score_for_column(self, column_name: str, df: pd.DataFrame, balance_validator) -> float:
         """Calcula balance_score para candidato de journal_entry_id (soporta SOLO amount)."""
-        try:
-            # Copia temporal y aplica mapeos conocidos
-            temp_df = df.copy()
-            column_mapping = {mapped_col: ftype for ftype, mapped_col in self._used_field_mappings.items()}
-            column_mapping[column_name] = 'journal_entry_id'
-            temp_df = temp_df.rename(columns=column_mapping)
+        return self._calculate_balance_scores_for_columns([column_name], df, balance_validator)[column_name]
 
-            # Asegurar que columnas contables sean numéricas (si existen)
-            for col in ('debit_amount', 'credit_amount', 'amount'):
-                if col in temp_df.columns:
-                    temp_df[col] = pd.to_numeric(temp_df[col], errors='coerce')
+    def _calculate_balance_scores_for_columns(self, column_names: List[str], df: pd.DataFrame,
+                                              balance_validator) -> Dict[str, float]:
+        """
+        Calcula balance_score para todos los candidatos de journal_entry_id a la vez.
+        Equivale a renombrar una copia del df por candidato (mapeos conocidos +
+        candidato -> journal_entry_id) y evaluarla, pero el amount se convierte una
+        sola vez por DataFrame y cada candidato es un factorize + bincount
+        """
+        scores = {}
+        for column_name in column_names:
+            try:
+                amount_source = self._balance_amount_source(column_name, df)
+                if amount_source is None:
+                    scores[column_name] = 0.0
+                    continue
+                evaluator = self._get_balance_candidate_evaluator(df, *amount_source, balance_validator)
+                result = evaluator.evaluate(df[column_name])
+                scores[column_name] = float(result.get('quality_score', 0.0))
+            except Exception as e:
+                print(f"      ❌ Error calculating balance_score: {e}")
+                scores[column_name] = 0.0
+        return scores
 
-            # Usar el validador que soporta: (debit+credit) o solo amount
-            result = balance_validator.evaluate_journal_entry_id_candidate(temp_df)
-            return float(result.get('quality_score', 0.0))
-        except Exception as e:
-            print(f"      ❌ Error calculating balance_score: {e}")
-            return 0.0
+    def _balance_amount_source(self, column_name: str, df: pd.DataFrame) -> Optional[Tuple[str, bool]]:
+        """
+        Columna original que actúa como 'amount' al evaluar el candidato y si se
+        convierte con pd.to_numeric. None si el candidato no es evaluable (sin amount
+        o columnas duplicadas tras renombrar, que la evaluación con copia puntuaba 0)
+        """
+        column_mapping = {mapped_col: ftype for ftype, mapped_col in self._used_field_mappings.items()}
+        column_mapping[column_name] = 'journal_entry_id'
+        renamed = [column_mapping.get(col, col) for col in df.columns]
+
+        if column_name not in df.columns or renamed.count('journal_entry_id') != 1:
+            return None
+        if any(renamed.count(col) > 1 for col in ('debit_amount', 'credit_amount', 'amount')):
+            return None
+
+        # Solo 'amount' se convierte con to_numeric; 'amount_numeric' se usa tal cual
+        if 'amount' in renamed:
+            return df.columns[renamed.index('amount')], True
+        if renamed.count('amount_numeric') == 1:
+            return df.columns[renamed.index('amount_numeric')], False
+        return None
+
+    def _get_balance_candidate_evaluator(self, df: pd.DataFrame, amount_column: str, coerce: bool,
+                                         balance_validator):
+        """Evaluator con el amount ya convertido, cacheado por DataFrame y columna"""
+        if self._balance_evaluator_frame is not df:
+            self._balance_evaluator_cache = {}
+            self._balance_evaluator_frame = df
+
+        cache_key = (amount_column, coerce, balance_validator.tolerance)
+        if cache_key not in self._balance_evaluator_cache:
+            amounts = df[amount_column]
+            if coerce:
+                amounts = pd.to_numeric(amounts, errors='coerce')
+            self._balance_evaluator_cache[cache_key] = balance_validator.create_candidate_evaluator(amounts)
+        return self._balance_evaluator_cache[cache_key]
+
+    def _clear_balance_evaluators(self):
+        """Suelta los evaluators cacheados y la referencia al DataFrame del que salieron"""
+        self._balance_evaluator_cache = {}
+        self._balance_evaluator_frame = None
 
 # Funciones de utilidad para Spyder (manteniendo compatibilidad)
 def create_field_mapper(config_file: str = None) -> FieldMapper:
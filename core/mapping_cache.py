@@ -0,0 +1,174 @@
+# core/mapping_cache.py
+"""
+Cache persistente (SQLite) de resultados de mapeo por libro contable
+Los mismos exports de ERP llegan cada mes con las mismas cabeceras: la huella del
+conjunto de columnas (nombres normalizados + firma de contenido), el ERP hint y el
+hash de configuración (YAML + validadores) identifica un mapeo ya resuelto, que se
+reutiliza sin repetir el análisis de contenido ni la resolución de conflictos
+"""
+
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+from pathlib import Path
+from contextlib import closing
+from typing import Callable, Dict, List, Optional, Union
+
+import pandas as pd
+
+try:
+    from .column_profiler import DATE_FORMAT_REGEX
+except ImportError:
+    from column_profiler import DATE_FORMAT_REGEX
+
+logger = logging.getLogger(__name__)
+
+# Subir la versión invalida todas las entradas (cambios en la lógica de mapeo)
+MAPPING_CACHE_VERSION = 1
+DEFAULT_CACHE_PATH = Path("results") / "mapping_cache.sqlite"
+DEFAULT_MAX_ENTRIES = 500
+# Filas de muestra por columna para la firma de contenido
+SIGNATURE_SAMPLE_SIZE = 100
+
+
+def column_content_signature(series: pd.Series) -> str:
+    """
+    Firma pequeña y estable del contenido de una columna: tipo, ratio numérico y de
+    fechas redondeados y presencia de negativos. Cambia si la columna pasa a tener
+    otro tipo de dato, pero no con los valores concretos de cada mes
+    """
+    # Muestra pequeña de las primeras filas: bucle Python sobre la lista, sin recorrer la columna entera
+    sample = series.head(SIGNATURE_SAMPLE_SIZE).dropna()
+    if sample.empty:
+        sample = series.dropna().head(SIGNATURE_SAMPLE_SIZE)
+    values = [str(value).strip() for value in sample.tolist()]
+    if not values:
+        return f"{series.dtype.kind}:empty"
+
+    numeric_count = date_count = 0
+    has_negative = False
+    for value in values:
+        try:
+            number = float(value)
+            numeric_count += 1
+            has_negative = has_negative or number < 0
+        except ValueError:
+            pass
+        if DATE_FORMAT_REGEX.match(value):
+            date_count += 1
+    return (f"{series.dtype.kind}:{numeric_count / len(values):.1f}:{date_count / len(values):.1f}:"
+            f"{int(has_negative)}")
+
+
+def mapping_fingerprint(df: pd.DataFrame, erp_hint: Optional[str], config_hash: str,
+                        normalize: Callable[[str], str]) -> str:
+    """Huella de (columnas normalizadas en orden, firmas de contenido, ERP hint, configuración)"""
+    payload = {
+        'version': MAPPING_CACHE_VERSION,
+        'erp_hint': (erp_hint or '').strip().lower(),
+        'config_hash': config_hash,
+        'columns': [[normalize(str(column)), column_content_signature(df.iloc[:, position])]
+                    for position, column in enumerate(df.columns)],
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class MappingResultCache:
+    """
+    Cache LRU en SQLite de mapeos finales {columna: field_type, confidence, resolution_type}.
+    Las columnas se guardan por posición para que el mapeo se aplique a los nombres
+    del fichero actual (misma huella normalizada, p.ej. distinta capitalización)
+    """
+
+    def __init__(self, db_path: Union[str, Path] = DEFAULT_CACHE_PATH, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.db_path = Path(db_path)
+        self.max_entries = max_entries
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0, 'invalidated': 0}
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS mapping_cache (
+                    fingerprint TEXT PRIMARY KEY,
+                    config_hash TEXT NOT NULL,
+                    erp_hint TEXT,
+                    columns TEXT NOT NULL,
+                    mappings TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL,
+                    hit_count INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_mapping_cache_last_used ON mapping_cache(last_used)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # Una conexión por operación: seguro entre workers del modo batch
+        return sqlite3.connect(str(self.db_path), timeout=30)
+
+    def get(self, fingerprint: str, columns: List[str]) -> Optional[Dict[str, Dict]]:
+        """Mapeos finales para la huella (None si no hay entrada) y marca la entrada como usada"""
+        try:
+            with closing(self._connect()) as conn, conn:
+                row = conn.execute("SELECT mappings FROM mapping_cache WHERE fingerprint = ?",
+                                   (fingerprint,)).fetchone()
+                if row is None:
+                    self.stats['misses'] += 1
+                    return None
+                conn.execute("UPDATE mapping_cache SET last_used = ?, hit_count = hit_count + 1 "
+                             "WHERE fingerprint = ?", (time.time(), fingerprint))
+        except sqlite3.Error as e:
+            logger.warning(f"Mapping cache lookup failed: {e}")
+            self.stats['misses'] += 1
+            return None
+
+        self.stats['hits'] += 1
+        return {columns[position]: mapping for position, mapping in json.loads(row[0])}
+
+    def put(self, fingerprint: str, columns: List[str], mappings: Dict[str, Dict],
+            config_hash: str, erp_hint: Optional[str] = None):
+        """Guarda los mapeos finales, descarta entradas de otra configuración y aplica el límite LRU"""
+        positions = {column: position for position, column in enumerate(columns)}
+        stored = [[positions[column], {
+            'field_type': mapping['field_type'],
+            'confidence': float(mapping['confidence']),
+            'resolution_type': mapping.get('resolution_type', 'no_conflict')
+        }] for column, mapping in mappings.items() if column in positions]
+
+        now = time.time()
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO mapping_cache "
+                    "(fingerprint, config_hash, erp_hint, columns, mappings, created_at, last_used, hit_count) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, 0)",
+                    (fingerprint, config_hash, erp_hint, json.dumps([str(c) for c in columns]),
+                     json.dumps(stored), now, now)
+                )
+                # Invalidación automática: YAML o validadores distintos ya no pueden acertar
+                invalidated = conn.execute("DELETE FROM mapping_cache WHERE config_hash != ?",
+                                           (config_hash,)).rowcount
+                evicted = conn.execute(
+                    "DELETE FROM mapping_cache WHERE fingerprint IN ("
+                    "SELECT fingerprint FROM mapping_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                ).rowcount
+        except sqlite3.Error as e:
+            logger.warning(f"Mapping cache store failed: {e}")
+            return
+
+        self.stats['stores'] += 1
+        self.stats['invalidated'] += invalidated
+        self.stats['evictions'] += evicted
+
+    def clear(self):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM mapping_cache")
+
+    def __len__(self) -> int:
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM mapping_cache").fetchone()[0]
+
+    def get_statistics(self) -> Dict:
+        return {'db_path': str(self.db_path), 'entries': len(self), 'max_entries': self.max_entries,
+                **self.stats}
@@ -0,0 +1,181 @@
+# csv_sampling.py
+"""
+Muestra acotada de un CSV para la fase de detección
+El mapeo de columnas solo necesita una muestra representativa: en lugar de cargar
+el fichero completo se leen la cabecera y unas pocas ventanas de filas repartidas
+uniformemente por el fichero (saltando por offset de bytes, sin recorrer lo que
+queda entre ventanas). El fichero completo solo se recorre después, en la fase de
+transformación. Los límites vienen de config/system_config.yaml
+(max_rows_for_analysis y max_columns_per_file) a través de DynamicFieldLoader
+"""
+
+import io
+import os
+import csv
+import codecs
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+# Valores de config/system_config.yaml si no se indican otros
+DEFAULT_MAX_ROWS = 10000
+DEFAULT_MAX_COLUMNS = 500
+# Ventanas repartidas por el fichero (la primera empieza tras la cabecera)
+DEFAULT_WINDOWS = 4
+
+# Argumentos de read_csv compatibles con la lectura por ventanas; con cualquier otro
+# (skiprows, header, nrows, compression...) se lee solo el principio del fichero
+_WINDOW_SAFE_KWARGS = {
+    'sep', 'delimiter', 'encoding', 'dtype', 'decimal', 'thousands', 'quotechar',
+    'na_values', 'keep_default_na', 'low_memory', 'engine', 'usecols', 'skipinitialspace'
+}
+_COMPRESSED_SUFFIXES = ('.gz', '.bz2', '.zip', '.xz', '.zst', '.tar')
+
+
+def read_csv_sample(file_path: str, max_rows: int = DEFAULT_MAX_ROWS,
+                    max_columns: Optional[int] = DEFAULT_MAX_COLUMNS, windows: int = DEFAULT_WINDOWS,
+                    **read_csv_kwargs) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Lee como mucho max_rows filas y max_columns columnas de un CSV.
+
+    Si el fichero cabe en la muestra el resultado es el mismo que pd.read_csv; si no,
+    las filas salen de `windows` ventanas contiguas repartidas por el fichero.
+
+    Returns:
+        (DataFrame de la muestra, info) con info['sampled'] = True si faltan filas
+        y una estimación del total de filas del fichero
+    """
+    start_time = time.perf_counter()
+    file_path = str(file_path)
+    max_rows = max(int(max_rows), 1)
+    windows = max(min(int(windows), max_rows), 1)
+
+    kwargs = dict(read_csv_kwargs)
+    columns_total = len(pd.read_csv(file_path, nrows=0, **kwargs).columns)
+    if max_columns and columns_total > max_columns and 'usecols' not in kwargs:
+        kwargs['usecols'] = list(range(max_columns))
+
+    if _supports_byte_windows(file_path, kwargs):
+        df, sampled, estimated_rows = _read_byte_windows(file_path, max_rows, windows, columns_total, kwargs)
+        method = 'windows'
+    else:
+        df = pd.read_csv(file_path, nrows=max_rows + 1, **kwargs)
+        sampled = len(df) > max_rows
+        df = df.iloc[:max_rows]
+        estimated_rows = None if sampled else len(df)
+        method = 'head'
+
+    info = {
+        'sampled': sampled,
+        'method': method,
+        'rows': len(df),
+        'estimated_total_rows': estimated_rows,
+        'windows': windows if method == 'windows' else 1,
+        'columns_total': columns_total,
+        'columns_read': len(df.columns),
+        'max_rows': max_rows,
+        'max_columns': max_columns,
+        'file_bytes': os.path.getsize(file_path),
+        'seconds': time.perf_counter() - start_time,
+    }
+    return df, info
+
+
+def _supports_byte_windows(file_path: str, kwargs: Dict[str, Any]) -> bool:
+    """Saltar por bytes exige texto sin comprimir con '\\n' de un byte (no UTF-16/32)"""
+    if file_path.lower().endswith(_COMPRESSED_SUFFIXES) or set(kwargs) - _WINDOW_SAFE_KWARGS:
+        return False
+    try:
+        encoding = codecs.lookup(kwargs.get('encoding') or 'utf-8').name
+    except LookupError:
+        return False
+    return not encoding.startswith(('utf-16', 'utf-32'))
+
+
+def _read_byte_windows(file_path: str, max_rows: int, windows: int, columns: int,
+                       kwargs: Dict[str, Any]) -> Tuple[pd.DataFrame, bool, Optional[int]]:
+    """
+    Cabecera + ventanas de como mucho max_rows // windows líneas. Cada ventana empieza
+    en la primera línea completa tras su offset y termina antes de la siguiente, así
+    que si ninguna se queda corta la muestra es el fichero completo byte a byte
+    """
+    rows_per_window = max(max_rows // windows, 1)
+    file_bytes = os.path.getsize(file_path)
+
+    with open(file_path, 'rb') as handle:
+        header = handle.readline()
+        data_start = handle.tell()
+        span = file_bytes - data_start
+        offsets = [data_start + span * window // windows for window in range(windows)] + [file_bytes]
+
+        blocks: List[bytes] = []
+        truncated = False
+        for begin, end in zip(offsets, offsets[1:]):
+            if begin > data_start:
+                # Descartar el resto de la línea en la que cae el offset
+                handle.seek(begin - 1)
+                handle.readline()
+            else:
+                handle.seek(begin)
+            lines = []
+            while handle.tell() < end:
+                line = handle.readline()
+                if not line:
+                    break
+                if len(lines) == rows_per_window:
+                    truncated = True
+                    break
+                lines.append(line if line.endswith(b'\n') else line + b'\n')
+            blocks.append(lines)
+
+    if truncated:
+        # Los cortes pueden caer dentro de un campo entre comillas con saltos de línea
+        blocks = [_complete_records(lines, columns, kwargs) for lines in blocks]
+    if not header.endswith(b'\n'):
+        header += b'\n'
+    data = header + b''.join(b''.join(lines) for lines in blocks)
+    read_kwargs = dict(kwargs)
+    if truncated:
+        read_kwargs.setdefault('on_bad_lines', 'skip')
+    df = pd.read_csv(io.BytesIO(data), **read_kwargs)
+
+    if not truncated:
+        return df, False, len(df)
+    # Registros leídos por byte de muestra (un registro puede ocupar varias líneas)
+    sampled_bytes = len(data) - len(header)
+    estimated_rows = int(round(span * len(df) / sampled_bytes)) if sampled_bytes else 0
+    return df, True, estimated_rows
+
+
+def _complete_records(lines: List[bytes], columns: int, kwargs: Dict[str, Any]) -> List[bytes]:
+    """
+    Líneas de los registros con tantos campos como la cabecera: descarta el final de un
+    registro cortado al inicio de la ventana y el registro a medias del final
+    """
+    delimiter = kwargs.get('sep', kwargs.get('delimiter', ','))
+    if not isinstance(delimiter, str) or len(delimiter) != 1:
+        return lines
+    encoding = kwargs.get('encoding') or 'utf-8'
+    reader = csv.reader((line.decode(encoding, errors='replace') for line in lines),
+                        delimiter=delimiter, quotechar=kwargs.get('quotechar', '"'))
+    kept: List[bytes] = []
+    consumed = 0
+    try:
+        for record in reader:
+            if len(record) == columns:
+                kept.extend(lines[consumed:reader.line_num])
+            consumed = reader.line_num
+    except csv.Error:
+        pass
+    return kept
+
+
+def sample_summary(info: Dict[str, Any]) -> str:
+    """Descripción de una línea de la muestra leída"""
+    if not info.get('sampled'):
+        return f"{info['rows']:,} rows (full file)"
+    estimated = info.get('estimated_total_rows')
+    total = f"~{estimated:,}" if estimated else "?"
+    return (f"{info['rows']:,} of {total} rows sampled in {info['windows']} window(s), "
+            f"{info['seconds']:.2f}s")
@@ -3,18 +3,51 @@
 # Y garantiza todas las columnas de header y detail
 
 import pandas as pd
+import numpy as np
 import os
-from typing import Dict, List, Tuple, Any, Optional
+import csv
+import heapq
+import shutil
+import tempfile
+from typing import Dict, List, Tuple, Any, Optional, Callable
 from datetime import datetime
 import logging
 
 # Importar el procesador de datos contables
-from accounting_data_processor import AccountingDataProcessor
+from accounting_data_processor import AccountingDataProcessor, DATETIME_FIELDS, DATETIME_PLAN_SAMPLE_SIZE
+from stage_metrics import stage
+from staging_writer import (
+    DEFAULT_ROW_GROUP_SIZE, normalize_output_format, write_staging_file, convert_csv_to_staging
+)
 
 logger = logging.getLogger(__name__)
 
+# Modo streaming: filas por chunk por defecto y máximo de runs abiertos a la vez en el merge externo
+DEFAULT_CHUNK_SIZE = 100_000
+MAX_OPEN_SORT_RUNS = 64
+
 class IntegratedCSVTransformer:
     """Transformador CSV con limpieza numérica automática integrada"""
+    
+    # Columnas header y detail según staging
+    HEADER_FIELD_DEFINITIONS = [
+        'journal_entry_id', 'journal_id', 'entry_date', 'entry_time',
+        'posting_date', 'reversal_date', 'effective_date', 'description',
+        'reference_number', 'source', 'entry_type', 'recurring_entry',
+        'manual_entry', 'adjustment_entry', 'prepared_by', 'approved_by',
+        'approval_date', 'entry_status', 'total_debit_amount', 'total_credit_amount',
+        'line_count', 'fiscal_year', 'period_number', 'user_defined_01', 
+        'user_defined_02', 'user_defined_03'
+    ]
+
+    DETAIL_FIELD_DEFINITIONS = [
+        'journal_entry_id', 'line_number', 'gl_account_number', 'amount',
+        'debit_credit_indicator', 'business_unit', 'cost_center', 'department',
+        'project_code', 'location', 'line_description', 'reference_number',
+        'customer_id', 'vendor_id', 'product_id', 'user_defined_01',
+        'user_defined_02', 'user_defined_03'
+    ]
+    
     def _ensure_results_directory(self):
         results_dir = "results"
         if not os.path.exists(results_dir):
@@ -22,10 +55,15 @@ class IntegratedCSVTransformer:
         return results_dir
     
     def __init__(self, output_prefix: str = "transformed", sort_by_journal_id: bool = True,
-                 apply_numeric_processing: bool = True):
+                 apply_numeric_processing: bool = True, chunk_size: Optional[int] = None,
+                 output_format: str = "csv", row_group_size: int = DEFAULT_ROW_GROUP_SIZE):
         self.output_prefix = output_prefix
         self.sort_by_journal_id = sort_by_journal_id
         self.apply_numeric_processing = apply_numeric_processing
+        self.chunk_size = chunk_size
+        # Formato de header/detail: csv (por defecto), parquet o feather (requieren pyarrow)
+        self.output_format = normalize_output_format(output_format)
+        self.row_group_size = row_group_size
         self.results_dir = self._ensure_results_directory()
         self.accounting_processor = AccountingDataProcessor()
         
@@ -37,7 +75,8 @@ class IntegratedCSVTransformer:
             'rows_processed': 0,
             'numeric_processing_applied': False,
             'numeric_fields_processed': 0,
-            'duplicates_removed': 0
+            'duplicates_removed': 0,
+            'output_format': self.output_format
         }
     
     def _ensure_all_columns(self, df: pd.DataFrame, required_fields: List[str]) -> pd.DataFrame:
@@ -66,46 +105,27 @@ class IntegratedCSVTransformer:
             self.transformation_stats['original_columns'] = len(df.columns)
             self.transformation_stats['rows_processed'] = len(df)
             
-            # Renombrar columnas según decisiones del usuario
-            transformed_df = df.copy()
+            # Renombrar columnas según decisiones del usuario (rename ya devuelve una copia)
             column_mapping = {col: decision['field_type'] for col, decision in user_decisions.items()}
-            transformed_df = transformed_df.rename(columns=column_mapping)
+            transformed_df = df.rename(columns=column_mapping)
             
             # Aplicar limpieza numérica si está habilitada
             if self.apply_numeric_processing:
                 transformed_df, numeric_stats = self._apply_numeric_processing(transformed_df)
                 self.transformation_stats['numeric_processing_applied'] = True
                 self.transformation_stats['numeric_fields_processed'] = numeric_stats.get('fields_cleaned', 0)
+                self.transformation_stats['numeric_unique_reduction'] = self._unique_reduction(numeric_stats)
             
             # Separar campos datetime
-            transformed_df = self.accounting_processor.separate_datetime_fields(transformed_df)
+            with stage('datetime_separation', rows=len(transformed_df)):
+                transformed_df = self.accounting_processor.separate_datetime_fields(transformed_df)
             
             # Ordenar si journal_entry_id está presente
             if self.sort_by_journal_id and 'journal_entry_id' in transformed_df.columns:
-                try:
-                    transformed_df = transformed_df.sort_values('journal_entry_id', ascending=True)
-                except TypeError:
-                    transformed_df['journal_entry_id'] = transformed_df['journal_entry_id'].astype(str)
-                    transformed_df = transformed_df.sort_values('journal_entry_id', ascending=True)
+                transformed_df = self._sort_by_journal_id(transformed_df)
             
-            # Definir columnas header y detail según staging
-            header_field_definitions = [
-                'journal_entry_id', 'journal_id', 'entry_date', 'entry_time',
-                'posting_date', 'reversal_date', 'effective_date', 'description',
-                'reference_number', 'source', 'entry_type', 'recurring_entry',
-                'manual_entry', 'adjustment_entry', 'prepared_by', 'approved_by',
-                'approval_date', 'entry_status', 'total_debit_amount', 'total_credit_amount',
-                'line_count', 'fiscal_year', 'period_number', 'user_defined_01', 
-                'user_defined_02', 'user_defined_03'
-            ]
-
-            detail_field_definitions = [
-                'journal_entry_id', 'line_number', 'gl_account_number', 'amount',
-                'debit_credit_indicator', 'business_unit', 'cost_center', 'department',
-                'project_code', 'location', 'line_description', 'reference_number',
-                'customer_id', 'vendor_id', 'product_id', 'user_defined_01',
-                'user_defined_02', 'user_defined_03'
-            ]
+            header_field_definitions = self.HEADER_FIELD_DEFINITIONS
+            detail_field_definitions = self.DETAIL_FIELD_DEFINITIONS
 
             # Crear DataFrames separados para header y detail, asegurando todas las columnas
             header_df = self._ensure_all_columns(transformed_df, header_field_definitions)
@@ -152,7 +172,8 @@ class IntegratedCSVTransformer:
             return {'success': False, 'error': str(e)}
 
     
-    def _apply_numeric_processing(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict]:
+    def _apply_numeric_processing(self, df: pd.DataFrame,
+                                  has_indicator: Optional[bool] = None) -> Tuple[pd.DataFrame, Dict]:
         potential_numeric_fields = [
             'amount', 'line_number', 'debit_amount', 'credit_amount',
             'fiscal_year', 'period_number', 'gl_account_number'
@@ -160,7 +181,9 @@ class IntegratedCSVTransformer:
         available_numeric_fields = [field for field in potential_numeric_fields if field in df.columns]
         if not available_numeric_fields:
             return df, {}
-        processed_df, processing_stats = self.accounting_processor.process_numeric_fields_and_calculate_amounts(df)
+        with stage('numeric_processing', rows=len(df)):
+            processed_df, processing_stats = self.accounting_processor.process_numeric_fields_and_calculate_amounts(
+                df, has_indicator=has_indicator)
         self._last_numeric_stats = processing_stats
         return processed_df, processing_stats
     
@@ -191,18 +214,13 @@ class IntegratedCSVTransformer:
             
             # Ordenar si está habilitado
             if self.sort_by_journal_id:
-                try:
-                    header_df = header_df.sort_values('journal_entry_id', ascending=True)
-                except TypeError:
-                    header_df['journal_entry_id'] = header_df['journal_entry_id'].astype(str)
-                    header_df = header_df.sort_values('journal_entry_id', ascending=True)
+                header_df = self._sort_by_journal_id(header_df)
         else:
             # Si no hay journal_entry_id, solo copiar los campos
             header_df = df[header_fields].copy()
         
-        # Crear archivo CSV
-        header_file = os.path.join(self.results_dir, f"{self.output_prefix}_header_{timestamp}.csv")
-        header_df.to_csv(header_file, index=False, encoding='utf-8')
+        # Crear archivo (CSV por defecto, o Parquet/Feather)
+        header_file = self._write_staging_file(header_df, 'header', timestamp)
         
         print(f"Archivo header creado: {header_file} ({len(header_df):,} registros)")
         return header_file
@@ -216,19 +234,340 @@ class IntegratedCSVTransformer:
         
         # Ordenar si está habilitado y journal_entry_id está presente
         if self.sort_by_journal_id and 'journal_entry_id' in detail_df.columns:
-            try:
-                detail_df = detail_df.sort_values('journal_entry_id', ascending=True)
-            except TypeError:
-                detail_df['journal_entry_id'] = detail_df['journal_entry_id'].astype(str)
-                detail_df = detail_df.sort_values('journal_entry_id', ascending=True)
+            detail_df = self._sort_by_journal_id(detail_df)
         
-        # Crear archivo CSV
-        detail_file = os.path.join(self.results_dir, f"{self.output_prefix}_detail_{timestamp}.csv")
-        detail_df.to_csv(detail_file, index=False, encoding='utf-8')
+        # Crear archivo (CSV por defecto, o Parquet/Feather)
+        detail_file = self._write_staging_file(detail_df, 'detail', timestamp)
         
         print(f"Archivo detail creado: {detail_file} ({len(detail_df):,} registros)")
         return detail_file
     
+    def _write_staging_file(self, df: pd.DataFrame, kind: str, timestamp: str) -> str:
+        """Escribe results/<prefijo>_<kind>_<timestamp> en el formato de salida configurado"""
+        base_path = os.path.join(self.results_dir, f"{self.output_prefix}_{kind}_{timestamp}")
+        with stage('csv_write', rows=len(df), key=kind):
+            written = write_staging_file(df, base_path, self.output_format, row_group_size=self.row_group_size)
+        self._record_output_file(kind, written)
+        return written['path']
+    
+    def _record_output_file(self, kind: str, written: Dict[str, Any]):
+        """Tamaño, tiempo de escritura y columnas con diccionario de cada fichero de salida"""
+        self.transformation_stats[f'{kind}_file_bytes'] = written['bytes']
+        self.transformation_stats[f'{kind}_write_seconds'] = written['seconds']
+        if written['dictionary_columns']:
+            self.transformation_stats[f'{kind}_dictionary_columns'] = written['dictionary_columns']
+    
+    def _sort_by_journal_id(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Ordena por journal_entry_id de forma estable (conserva el orden original de las líneas)"""
+        try:
+            return df.sort_values('journal_entry_id', ascending=True, kind='stable')
+        except TypeError:
+            df['journal_entry_id'] = df['journal_entry_id'].astype(str)
+            return df.sort_values('journal_entry_id', ascending=True, kind='stable')
+    
+    # ==============================
+    # MODO STREAMING (POR CHUNKS)
+    # ==============================
+    
+    def create_header_detail_csvs_streaming(self, csv_file: str, user_decisions: Dict,
+                                            standard_fields: List[str], chunk_size: Optional[int] = None,
+                                            **read_csv_kwargs) -> Dict[str, Any]:
+        """
+        Versión por chunks de create_header_detail_csvs: mismos ficheros de salida con memoria acotada
+        - Lee el CSV en bloques de chunk_size filas y aplica mapeo, limpieza numérica y fechas por bloque
+        - El detail se añade al fichero bloque a bloque; del header solo se guarda la primera fila
+          de cada journal_entry_id
+        - Con sort_by_journal_id, el detail se ordena con un merge sort externo en disco
+        - El escenario numérico y el formato de fechas se deciden una vez para todo el fichero
+        """
+        chunk_size = chunk_size or self.chunk_size or DEFAULT_CHUNK_SIZE
+        runs_dir = None
+        try:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            column_mapping = {col: decision['field_type'] for col, decision in user_decisions.items()}
+            header_fields = list(self.HEADER_FIELD_DEFINITIONS)
+            detail_fields = list(self.DETAIL_FIELD_DEFINITIONS)
+            has_journal_id = 'journal_entry_id' in column_mapping.values()
+            sort_detail = self.sort_by_journal_id and has_journal_id
+            
+            print(f"🌊 STREAMING TRANSFORMATION: {csv_file} (chunks of {chunk_size:,} rows)")
+            
+            # Pasada previa: indicador y dtypes de TODO el fichero, como los vería el modo en memoria
+            has_indicator, chunk_read_kwargs = self._scan_source_columns(csv_file, user_decisions, chunk_size,
+                                                                         read_csv_kwargs)
+            datetime_plans = self._seed_datetime_plans(csv_file, column_mapping, chunk_size, chunk_read_kwargs)
+            
+            detail_file = os.path.join(self.results_dir, f"{self.output_prefix}_detail_{timestamp}.csv")
+            if sort_detail:
+                runs_dir = tempfile.mkdtemp(prefix=f"{self.output_prefix}_runs_", dir=self.results_dir)
+            
+            seen_journal_ids = set()
+            header_parts: List[pd.DataFrame] = []
+            run_files: List[str] = []
+            numeric_sorted_runs: List[str] = []
+            numeric_journal_ids = True
+            numeric_stats: Dict[str, Any] = {}
+            rows_processed = 0
+            original_columns = 0
+            
+            for chunk_number, chunk in enumerate(pd.read_csv(csv_file, chunksize=chunk_size, **chunk_read_kwargs)):
+                original_columns = len(chunk.columns)
+                rows_processed += len(chunk)
+                
+                transformed_chunk = chunk.rename(columns=column_mapping)
+                del chunk
+                if self.apply_numeric_processing:
+                    transformed_chunk, chunk_stats = self._apply_numeric_processing(transformed_chunk, has_indicator)
+                    self._merge_numeric_stats(numeric_stats, chunk_stats)
+                with stage('datetime_separation', rows=len(transformed_chunk)):
+                    transformed_chunk = self.accounting_processor.separate_datetime_fields(transformed_chunk,
+                                                                                           datetime_plans)
+                
+                chunk_has_numeric_ids = has_journal_id and transformed_chunk['journal_entry_id'].dtype.kind in 'iuf'
+                numeric_journal_ids = numeric_journal_ids and chunk_has_numeric_ids
+                
+                # Header: solo la primera fila de cada journal_entry_id no visto antes
+                header_chunk = self._ensure_all_columns(transformed_chunk, header_fields)
+                if has_journal_id:
+                    header_chunk = header_chunk.drop_duplicates(subset=['journal_entry_id'], keep='first')
+                    keys = [self._journal_id_key(value) for value in header_chunk['journal_entry_id']]
+                    is_new = np.fromiter((key not in seen_journal_ids for key in keys), dtype=bool, count=len(keys))
+                    seen_journal_ids.update(keys)
+                    header_chunk = header_chunk[is_new]
+                header_parts.append(header_chunk)
+                
+                # Detail: append directo o run ordenado para el merge externo
+                detail_chunk = self._ensure_all_columns(transformed_chunk, detail_fields)
+                del transformed_chunk
+                if sort_detail:
+                    run_file = os.path.join(runs_dir, f"run_{chunk_number:06d}.csv")
+                    self._sort_by_journal_id(detail_chunk).to_csv(run_file, index=False, header=False, encoding='utf-8')
+                    run_files.append(run_file)
+                    if chunk_has_numeric_ids:
+                        numeric_sorted_runs.append(run_file)
+                else:
+                    detail_chunk.to_csv(detail_file, index=False, encoding='utf-8',
+                                        mode='w' if chunk_number == 0 else 'a', header=chunk_number == 0)
+                print(f"   ✓ Chunk {chunk_number + 1}: {rows_processed:,} rows processed")
+            
+            with stage('csv_write', rows=rows_processed, key='detail'):
+                if rows_processed == 0:
+                    pd.DataFrame(columns=detail_fields).to_csv(detail_file, index=False, encoding='utf-8')
+                elif sort_detail:
+                    if numeric_journal_ids:
+                        key_function = self._numeric_journal_key
+                    else:
+                        # Los runs de chunks numéricos se ordenaron como números: reordenar como texto
+                        key_function = self._text_journal_key
+                        for run_file in numeric_sorted_runs:
+                            self._resort_run(run_file, key_function)
+                    self._merge_sorted_runs(run_files, detail_file, detail_fields, key_function, runs_dir)
+                # Parquet/Feather: el CSV del detail se convierte por bloques (memoria acotada)
+                converted = convert_csv_to_staging(detail_file, self.output_format, chunk_size=chunk_size,
+                                                   row_group_size=self.row_group_size)
+            self._record_output_file('detail', converted)
+            detail_file = converted['path']
+            print(f"Archivo detail creado: {detail_file} ({rows_processed:,} registros)")
+            
+            header_df = pd.concat(header_parts, ignore_index=True) if header_parts else pd.DataFrame(columns=header_fields)
+            if self.sort_by_journal_id and has_journal_id:
+                header_df = self._sort_by_journal_id(header_df)
+            header_file = self._write_staging_file(header_df, 'header', timestamp)
+            duplicates_removed = rows_processed - len(header_df) if has_journal_id else 0
+            if duplicates_removed > 0:
+                print(f"DEDUPLICACIÓN: Removidos {duplicates_removed:,} registros duplicados de journal_entry_id")
+                print(f"Registros únicos de header: {len(header_df):,}")
+            print(f"Archivo header creado: {header_file} ({len(header_df):,} registros)")
+            
+            self.transformation_stats.update({
+                'original_columns': original_columns,
+                'rows_processed': rows_processed,
+                'transformed_columns': len(column_mapping),
+                'header_columns': len(header_fields),
+                'detail_columns': len(detail_fields),
+                'numeric_processing_applied': self.apply_numeric_processing,
+                'numeric_fields_processed': numeric_stats.get('fields_cleaned', 0),
+                'numeric_unique_reduction': self._unique_reduction(numeric_stats),
+                'duplicates_removed': duplicates_removed,
+                'chunk_size': chunk_size
+            })
+            self._last_numeric_stats = numeric_stats
+            
+            return {
+                'success': True,
+                'header_file': header_file,
+                'detail_file': detail_file,
+                'header_columns': header_fields,
+                'detail_columns': detail_fields,
+                'transformation_stats': self.transformation_stats,
+                'total_standard_fields_mapped': len(user_decisions),
+                'unmapped_standard_fields': [
+                    f for f in standard_fields 
+                    if f not in [d['field_type'] for d in user_decisions.values()]
+                ],
+                'numeric_processing_stats': numeric_stats
+            }
+            
+        except Exception as e:
+            logger.error(f"Error in streaming CSV transformation: {e}")
+            return {'success': False, 'error': str(e)}
+        finally:
+            if runs_dir and os.path.exists(runs_dir):
+                shutil.rmtree(runs_dir, ignore_errors=True)
+    
+    def _scan_source_columns(self, csv_file: str, user_decisions: Dict, chunk_size: int,
+                             read_csv_kwargs: Dict) -> Tuple[bool, Dict]:
+        """
+        Pasada previa sobre las columnas mapeadas del fichero completo. Devuelve:
+        - Si el indicador debe/haber tiene valores (AccountingDataProcessor.has_debit_credit_indicator
+          sobre todo el fichero: decide el escenario numérico de todos los chunks)
+        - read_csv kwargs con un dtype por columna para todos los chunks. pandas infiere el dtype
+          por chunk: un id int en un chunk y str en otro se deduplicaría dos veces en el header, y un
+          vacío tardío en una columna entera cambiaría "100" por "100.0" a mitad del detail. Los
+          dtypes de cada chunk se combinan como los combinaría pandas al leer el fichero entero
+          (int + float → float64, numérico + texto → str)
+        """
+        indicator_columns = [col for col, decision in user_decisions.items()
+                             if decision['field_type'] == 'debit_credit_indicator'][:1]
+        user_dtype = read_csv_kwargs.get('dtype')
+        fixed_dtypes = user_dtype is not None and not isinstance(user_dtype, dict)
+        if not user_decisions or (fixed_dtypes and not indicator_columns):
+            return False, read_csv_kwargs
+        
+        scan_kwargs = {**read_csv_kwargs, 'usecols': lambda column: column in user_decisions,
+                       'chunksize': chunk_size}
+        seen_value = False
+        seen_non_empty = False
+        column_dtypes: Dict[str, np.dtype] = {}
+        for chunk in pd.read_csv(csv_file, **scan_kwargs):
+            for column in indicator_columns:
+                indicator = chunk[column]
+                seen_value = seen_value or not indicator.isna().all()
+                seen_non_empty = seen_non_empty or bool((indicator != '').any())
+            for column, dtype in chunk.dtypes.items():
+                column_dtypes[column] = self._merge_chunk_dtype(column_dtypes.get(column), dtype)
+        has_indicator = seen_value and seen_non_empty
+        
+        if fixed_dtypes:
+            return has_indicator, read_csv_kwargs
+        dtypes = {column: str if dtype == object else dtype for column, dtype in column_dtypes.items()}
+        return has_indicator, {**read_csv_kwargs, 'dtype': {**dtypes, **(user_dtype or {})}}
+    
+    @staticmethod
+    def _merge_chunk_dtype(current: Optional[np.dtype], chunk_dtype: np.dtype) -> np.dtype:
+        """dtype de una columna en el fichero completo a partir del de cada chunk"""
+        if current is None or current == chunk_dtype:
+            return chunk_dtype
+        if current.kind in 'iuf' and chunk_dtype.kind in 'iuf':
+            return np.dtype('float64')
+        return np.dtype(object)
+    
+    def _seed_datetime_plans(self, csv_file: str, column_mapping: Dict[str, str], chunk_size: int,
+                             read_csv_kwargs: Dict) -> Dict[str, Dict]:
+        """
+        Formatos de fecha de todo el fichero: el modo en memoria los detecta con los primeros
+        valores no nulos de cada columna, que pueden no estar en el primer chunk. Se leen solo
+        las columnas de fecha (con los dtypes del fichero) hasta tener esa muestra y se pasan por
+        separate_datetime_fields para que el orden de detección (fecha+hora antes que hora) sea
+        el mismo
+        """
+        date_columns = [col for col, field_type in column_mapping.items() if field_type in DATETIME_FIELDS]
+        datetime_plans: Dict[str, Dict] = {}
+        if not date_columns:
+            return datetime_plans
+        
+        sample_kwargs = {**read_csv_kwargs, 'usecols': lambda column: column in date_columns,
+                         'chunksize': chunk_size}
+        head_parts = []
+        for chunk in pd.read_csv(csv_file, **sample_kwargs):
+            head_parts.append(chunk)
+            if all(sum(part[col].notna().sum() for part in head_parts) >= DATETIME_PLAN_SAMPLE_SIZE
+                   for col in chunk.columns):
+                break
+        if head_parts:
+            head = pd.concat(head_parts, ignore_index=True).rename(columns=column_mapping)
+            self.accounting_processor.separate_datetime_fields(head, datetime_plans)
+        return datetime_plans
+    
+    @staticmethod
+    def _merge_numeric_stats(total: Dict[str, Any], chunk_stats: Dict[str, Any]):
+        """Acumula estadísticas numéricas por chunk (fields_cleaned es por campo, no por fila)"""
+        for key, value in chunk_stats.items():
+            if key == 'fields_cleaned':
+                total[key] = max(total.get(key, 0), value)
+            else:
+                total[key] = total.get(key, 0) + value
+    
+    @staticmethod
+    def _unique_reduction(numeric_stats: Dict[str, Any]) -> float:
+        """Filas limpiadas / valores distintos limpiados (reducción de apply_unique en los importes)"""
+        unique_values = numeric_stats.get('numeric_unique_values', 0)
+        return numeric_stats.get('numeric_rows_cleaned', 0) / unique_values if unique_values else 1.0
+    
+    @staticmethod
+    def _journal_id_key(value):
+        """Clave hashable de journal_entry_id para la deduplicación del header (NaN → None)"""
+        return None if pd.isna(value) else value
+    
+    @staticmethod
+    def _numeric_journal_key(text: str):
+        """Clave de orden para journal_entry_id numéricos escritos en CSV (vacíos al final)"""
+        if text == '':
+            return (1, 0)
+        try:
+            return (0, int(text))
+        except ValueError:
+            return (0, float(text))
+    
+    @staticmethod
+    def _text_journal_key(text: str):
+        """Clave de orden para journal_entry_id de texto escritos en CSV (vacíos al final)"""
+        return (1, '') if text == '' else (0, text)
+    
+    def _merge_sorted_runs(self, run_files: List[str], output_file: str, fieldnames: List[str],
+                           key_function: Callable, runs_dir: str):
+        """
+        Merge sort externo de runs ordenados (journal_entry_id en la primera columna)
+        heapq.merge es estable: en empates mantiene el orden de los runs y, por tanto, el del fichero
+        """
+        # Merge por niveles para no superar MAX_OPEN_SORT_RUNS ficheros abiertos
+        level = 0
+        while len(run_files) > MAX_OPEN_SORT_RUNS:
+            merged_runs = []
+            for group_start in range(0, len(run_files), MAX_OPEN_SORT_RUNS):
+                group = run_files[group_start:group_start + MAX_OPEN_SORT_RUNS]
+                merged_file = os.path.join(runs_dir, f"merge_{level}_{group_start:06d}.csv")
+                with open(merged_file, 'w', encoding='utf-8', newline='') as out:
+                    self._merge_runs_into(group, out, key_function)
+                merged_runs.append(merged_file)
+            run_files = merged_runs
+            level += 1
+        
+        pd.DataFrame(columns=fieldnames).to_csv(output_file, index=False, encoding='utf-8')
+        with open(output_file, 'a', encoding='utf-8', newline='') as out:
+            self._merge_runs_into(run_files, out, key_function)
+    
+    @staticmethod
+    def _merge_runs_into(run_files: List[str], out, key_function: Callable):
+        """Escribe en out el merge de los runs con el mismo formato CSV que DataFrame.to_csv"""
+        handles = [open(run_file, 'r', encoding='utf-8', newline='') for run_file in run_files]
+        try:
+            readers = [csv.reader(handle) for handle in handles]
+            writer = csv.writer(out, lineterminator=os.linesep)
+            writer.writerows(heapq.merge(*readers, key=lambda record: key_function(record[0])))
+        finally:
+            for handle in handles:
+                handle.close()
+    
+    @staticmethod
+    def _resort_run(run_file: str, key_function: Callable):
+        """Reordena un run (tamaño de un chunk) con la clave indicada de forma estable"""
+        with open(run_file, 'r', encoding='utf-8', newline='') as handle:
+            records = list(csv.reader(handle))
+        records.sort(key=lambda record: key_function(record[0]))
+        with open(run_file, 'w', encoding='utf-8', newline='') as handle:
+            csv.writer(handle, lineterminator=os.linesep).writerows(records)
+    
     def create_single_transformed_csv(self, df: pd.DataFrame, user_decisions: Dict, 
                                     suffix: str = "transformed") -> Dict[str, Any]:
         try:
@@ -265,7 +604,8 @@ class IntegratedCSVTransformer:
 
 def transform_and_split_csv_with_numeric_cleaning(csv_file: str, column_mapping: Dict[str, str], 
                                                  output_prefix: str = "transformed",
-                                                 apply_numeric_processing: bool = True) -> Dict[str, Any]:
+                                                 apply_numeric_processing: bool = True,
+                                                 chunk_size: Optional[int] = None) -> Dict[str, Any]:
     user_decisions = {col: {'field_type': field, 'confidence': 1.0} for col, field in column_mapping.items()}
     standard_fields = [
         'journal_entry_id', 'line_number', 'description', 'line_description',
@@ -273,9 +613,12 @@ def transform_and_split_csv_with_numeric_cleaning(csv_file: str, column_mapping:
         'amount', 'debit_credit_indicator',
         'prepared_by', 'entry_date', 'entry_time', 'gl_account_name', 'vendor_id'
     ]
-    df = pd.read_csv(csv_file)
     transformer = IntegratedCSVTransformer(output_prefix=output_prefix,
-                                           apply_numeric_processing=apply_numeric_processing)
+                                           apply_numeric_processing=apply_numeric_processing,
+                                           chunk_size=chunk_size)
+    if chunk_size:
+        return transformer.create_header_detail_csvs_streaming(csv_file, user_decisions, standard_fields)
+    df = pd.read_csv(csv_file)
     return transformer.create_header_detail_csvs(df, user_decisions, standard_fields)
 
 def simple_csv_rename_with_numeric_cleaning(csv_file: str, column_mapping: Dict[str, str], 
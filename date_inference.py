@@ -0,0 +1,257 @@
+# date_inference.py
+"""
+Inferencia de formato de fecha compartida
+Infiere una sola vez, a partir de una muestra, un formato strptime explícito y el flag
+dayfirst de una columna, y parsea la columna completa con una única llamada vectorizada
+a pd.to_datetime(format=...). Solo los valores que no encajan en el formato (únicos)
+pasan por el parser genérico valor a valor. Lo usan el análisis de contenido del mapper,
+los validadores de fecha, la comprobación de año único del trainer y la separación
+fecha/hora del procesador
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+# Valores de la muestra usados para inferir el formato
+DEFAULT_SAMPLE_SIZE = 200
+# Proporción mínima de la muestra que debe encajar en el formato para usarlo
+MIN_FORMAT_RATIO = 0.5
+
+_TIME_PART = r'(?P<time>[ \t]+\d{1,2}:\d{2}(?::\d{2}(?:\.\d{1,6})?)?|T\d{2}:\d{2}(?::\d{2}(?:\.\d{1,6})?)?)?'
+_MONTH_ABBR = r'(?i:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)'
+
+# (regex de la parte de fecha, formato con día primero, formato con mes primero o None si no es ambiguo)
+_DATE_CANDIDATES = [
+    (r'\d{4}-\d{1,2}-\d{1,2}', '%Y-%m-%d', None),
+    (r'\d{4}/\d{1,2}/\d{1,2}', '%Y/%m/%d', None),
+    (r'\d{4}\.\d{1,2}\.\d{1,2}', '%Y.%m.%d', None),
+    (r'(?:19|20)\d{2}(?:0[1-9]|1[0-2])\d{2}', '%Y%m%d', None),
+    (r'(?P<a>\d{1,2})/(?P<b>\d{1,2})/\d{4}', '%d/%m/%Y', '%m/%d/%Y'),
+    (r'(?P<a>\d{1,2})-(?P<b>\d{1,2})-\d{4}', '%d-%m-%Y', '%m-%d-%Y'),
+    (r'(?P<a>\d{1,2})\.(?P<b>\d{1,2})\.\d{4}', '%d.%m.%Y', '%m.%d.%Y'),
+    (r'(?P<a>\d{1,2})/(?P<b>\d{1,2})/\d{2}', '%d/%m/%y', '%m/%d/%y'),
+    (r'(?P<a>\d{1,2})-(?P<b>\d{1,2})-\d{2}', '%d-%m-%y', '%m-%d-%y'),
+    (r'(?P<a>\d{1,2})\.(?P<b>\d{1,2})\.\d{2}', '%d.%m.%y', '%m.%d.%y'),
+    (rf'\d{{1,2}}-{_MONTH_ABBR}-\d{{4}}', '%d-%b-%Y', None),
+    (rf'\d{{1,2}}-{_MONTH_ABBR}-\d{{2}}', '%d-%b-%y', None),
+    (rf'\d{{1,2}} {_MONTH_ABBR} \d{{4}}', '%d %b %Y', None),
+]
+_COMPILED_CANDIDATES = [(re.compile(f'{date_regex}{_TIME_PART}'), dayfirst_format, monthfirst_format)
+                        for date_regex, dayfirst_format, monthfirst_format in _DATE_CANDIDATES]
+
+
+@dataclass(frozen=True)
+class DateFormat:
+    """Formato inferido para una columna (format=None si ningún formato cubre la muestra)"""
+    format: Optional[str]
+    dayfirst: bool = True
+    matched: int = 0
+    sampled: int = 0
+
+    @property
+    def ratio(self) -> float:
+        return self.matched / self.sampled if self.sampled else 0.0
+
+    @property
+    def has_time(self) -> bool:
+        return self.format is not None and '%H' in self.format
+
+
+def _time_format(time_text: str) -> str:
+    """Formato strptime de la parte de hora tal y como aparece en el valor"""
+    separator = 'T' if time_text.startswith('T') else ' '
+    colons = time_text.count(':')
+    time_format = '%H:%M:%S' if colons == 2 else '%H:%M'
+    if '.' in time_text:
+        time_format += '.%f'
+    return separator + time_format
+
+
+@lru_cache(maxsize=1024)
+def _infer_format(sample: Tuple[str, ...], dayfirst: Optional[bool], min_ratio: float) -> DateFormat:
+    default_dayfirst = True if dayfirst is None else dayfirst
+    if not sample:
+        return DateFormat(None, default_dayfirst)
+
+    best = None
+    for pattern, dayfirst_format, monthfirst_format in _COMPILED_CANDIDATES:
+        matches = [match for match in map(pattern.fullmatch, sample) if match]
+        if matches and (best is None or len(matches) > len(best[1])):
+            best = ((dayfirst_format, monthfirst_format), matches)
+    if best is None or len(best[1]) / len(sample) < min_ratio:
+        return DateFormat(None, default_dayfirst, 0, len(sample))
+
+    (dayfirst_format, monthfirst_format), matches = best
+    if monthfirst_format is None:
+        # Año primero (o mes con nombre): dayfirst solo afecta al fallback genérico
+        format_dayfirst = default_dayfirst if dayfirst_format.startswith('%d') else False
+        date_format = dayfirst_format
+    else:
+        # Un componente > 12 decide el orden; sin evidencia, el indicado o europeo
+        first_is_day = any(int(match.group('a')) > 12 for match in matches)
+        second_is_day = any(int(match.group('b')) > 12 for match in matches)
+        if first_is_day != second_is_day:
+            format_dayfirst = first_is_day
+        else:
+            format_dayfirst = default_dayfirst
+        date_format = dayfirst_format if format_dayfirst else monthfirst_format
+
+    # La hora más frecuente entre los valores que encajan (los demás irán al fallback)
+    time_formats = [_time_format(match.group('time')) if match.group('time') else '' for match in matches]
+    time_format = max(dict.fromkeys(time_formats), key=time_formats.count)
+    matched = time_formats.count(time_format)
+    return DateFormat(date_format + time_format, format_dayfirst, matched, len(sample))
+
+
+def _is_missing(value) -> bool:
+    try:
+        return bool(pd.isna(value))
+    except (TypeError, ValueError):
+        return False
+
+
+@lru_cache(maxsize=8192)
+def _generic_parse(value: str, dayfirst: bool):
+    """Parser genérico de pandas para un valor suelto (el comportamiento anterior por valor)"""
+    try:
+        parsed = pd.to_datetime(value, dayfirst=dayfirst, errors='coerce')
+    except Exception:
+        return None
+    if pd.isna(parsed):
+        return None
+    return parsed.tz_localize(None) if parsed.tzinfo is not None else parsed
+
+
+class DateFormatInferencer:
+    """
+    Inferencia de formato por muestra y parseo vectorizado de columnas de fecha.
+    Cada texto distinto se parsea una sola vez (los libros repiten pocas fechas en
+    muchas filas) y los que no encajan en el formato inferido se resuelven uno a uno
+    con el fallback de cada llamador
+    """
+
+    def __init__(self, sample_size: int = DEFAULT_SAMPLE_SIZE, min_ratio: float = MIN_FORMAT_RATIO):
+        self.sample_size = sample_size
+        self.min_ratio = min_ratio
+        # Valores distintos resueltos con el formato explícito / con el fallback por valor
+        self.stats = {'columns_parsed': 0, 'format_values': 0, 'fallback_values': 0}
+
+    @staticmethod
+    def _factorize(values) -> Tuple[pd.Series, np.ndarray, pd.Series]:
+        """(serie original, código por fila (-1 = nulo), texto sin espacios de cada valor distinto o NaN si vacío)"""
+        series = values if isinstance(values, pd.Series) else pd.Series(list(values), dtype=object)
+        codes, uniques = pd.factorize(series)
+        text = pd.Series(np.asarray(uniques, dtype=object)).astype(str).str.strip()
+        return series, codes, text.astype(object).where(text != '')
+
+    def infer(self, values, dayfirst: Optional[bool] = None) -> DateFormat:
+        """Formato strptime explícito y dayfirst a partir de los primeros valores distintos no vacíos"""
+        _, _, text = self._factorize(values)
+        sample = tuple(text.dropna().head(self.sample_size).tolist())
+        return _infer_format(sample, dayfirst, self.min_ratio)
+
+    def _format_parse(self, text: pd.Series, date_format: DateFormat) -> pd.Series:
+        """Una única llamada vectorizada con el formato explícito (NaT donde no encaja)"""
+        self.stats['columns_parsed'] += 1
+        if date_format.format is None or text.empty:
+            return pd.Series(pd.NaT, index=text.index, dtype='datetime64[ns]')
+        parsed = pd.to_datetime(text, format=date_format.format, errors='coerce').astype('datetime64[ns]')
+        self.stats['format_values'] += int(parsed.notna().sum())
+        return parsed
+
+    def _fallback(self, text: pd.Series, parsed: pd.Series, fallback: Callable) -> pd.Series:
+        """fallback(valor) para los textos que no encajaron en el formato (índice = posición del valor distinto)"""
+        leftovers = text[text.notna() & parsed.isna()]
+        self.stats['fallback_values'] += len(leftovers)
+        return leftovers.map(fallback)
+
+    def _parse_unique(self, text: pd.Series, date_format: Optional[DateFormat],
+                      fallback: Union[bool, Callable[[str], object]]) -> pd.Series:
+        if date_format is None:
+            date_format = _infer_format(tuple(text.dropna().head(self.sample_size).tolist()), None, self.min_ratio)
+        parsed = self._format_parse(text, date_format)
+        if fallback is False:
+            return parsed
+        if fallback is True:
+            dayfirst = date_format.dayfirst
+            fallback = lambda value: _generic_parse(value, dayfirst)
+        resolved = self._fallback(text, parsed, fallback).dropna()
+        if not resolved.empty:
+            # Asignación posicional (el índice de text es la posición del valor distinto)
+            parsed.iloc[resolved.index.to_numpy()] = pd.to_datetime(resolved.tolist(),
+                                                                    errors='coerce').astype('datetime64[ns]')
+        return parsed
+
+    def parse(self, values, date_format: Optional[DateFormat] = None,
+              fallback: Union[bool, Callable[[str], object]] = True) -> pd.Series:
+        """
+        Parsea la columna completa. fallback=True resuelve los valores que no encajan con
+        pd.to_datetime genérico (dayfirst del formato), un callable devuelve un datetime o
+        None por valor y False los deja como NaT
+        """
+        series, codes, text = self._factorize(values)
+        parsed = self._parse_unique(text, date_format, fallback).to_numpy()
+        result = np.full(len(codes), np.datetime64('NaT'), dtype='datetime64[ns]')
+        present = codes >= 0
+        result[present] = parsed[codes[present]]
+        return pd.Series(result, index=series.index, name=series.name)
+
+    def parses(self, values, fallback: Callable[[str], bool] = None, date_format: Optional[DateFormat] = None,
+               year_range: Tuple[int, int] = None) -> np.ndarray:
+        """Máscara de valores que son fecha: formato vectorizado y, para el resto, fallback(valor)"""
+        if date_format is None and not isinstance(values, pd.Series):
+            # Muestras sueltas (validadores): sin formato común se evita el coste fijo de pandas
+            texts = [None if _is_missing(value) else (str(value).strip() or None) for value in values]
+            distinct = [text for text in dict.fromkeys(texts) if text is not None]
+            date_format = _infer_format(tuple(distinct[:self.sample_size]), None, self.min_ratio)
+            if date_format.format is None:
+                self.stats['columns_parsed'] += 1
+                self.stats['fallback_values'] += len(distinct) if fallback is not None else 0
+                checked = {text: bool(fallback(text)) for text in distinct} if fallback is not None else {}
+                return np.array([checked.get(text, False) for text in texts], dtype=bool)
+        _, codes, text = self._factorize(values)
+        if date_format is None:
+            date_format = _infer_format(tuple(text.dropna().head(self.sample_size).tolist()), None, self.min_ratio)
+        parsed = self._format_parse(text, date_format)
+        is_date = parsed.notna()
+        if year_range is not None:
+            is_date &= parsed.dt.year.between(*year_range)
+        is_date = is_date.to_numpy(dtype=bool, copy=True)
+        if fallback is not None:
+            checked = self._fallback(text, parsed, fallback)
+            is_date[checked.index] = checked.to_numpy(dtype=bool)
+        return np.where(codes >= 0, is_date[codes], False) if len(codes) else np.zeros(0, dtype=bool)
+
+    def to_iso(self, values, date_format: Optional[DateFormat] = None,
+               fallback: Union[bool, Callable[[str], object]] = True) -> pd.Series:
+        """
+        Fechas como YYYY-MM-DD. Los valores no parseables quedan como texto sin espacios
+        laterales y los nulos/vacíos sin cambios (mismo contrato que la conversión por valor)
+        """
+        series, codes, text = self._factorize(values)
+        parsed = self._parse_unique(text, date_format, fallback)
+
+        # Por valor distinto: fecha ISO, texto sin espacios o '' si solo tenía espacios
+        converted = text.fillna('').to_numpy(dtype=object, copy=True)
+        ok = parsed.notna().to_numpy(dtype=bool)
+        converted[ok] = strftime_unique(parsed[ok], '%Y-%m-%d')
+
+        result = series.astype(object).to_numpy(copy=True)
+        present = codes >= 0
+        result[present] = converted[codes[present]]
+        return pd.Series(result, index=series.index, name=series.name, dtype=object)
+
+
+def strftime_unique(parsed: pd.Series, strftime_format: str) -> np.ndarray:
+    """strftime una vez por fecha distinta (los libros repiten pocas fechas en muchas filas)"""
+    codes, uniques = pd.factorize(parsed)
+    return np.asarray(uniques.strftime(strftime_format), dtype=object)[codes]
+
+
+# Instancia compartida por mapper, validadores, trainers y procesador
+date_format_inferencer = DateFormatInferencer()
@@ -3,16 +3,82 @@ import re
 import pickle
 import numpy as np
 import pandas as pd
-from sklearn.preprocessing import LabelEncoder
-from sklearn.model_selection import train_test_split
-
-
-MONTHS_ES = r"(ene|feb|mar|abr|may|jun|jul|ago|set|sep|oct|nov|dic)"
-MONTHS_EN = r"(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)"
+from typing import Optional
+
+
+MONTHS_ES = r"(?:ene|feb|mar|abr|may|jun|jul|ago|set|sep|oct|nov|dic)"
+MONTHS_EN = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)"
+
+# Patrones compartidos por la extracción por línea y la vectorizada
+# (grupos no capturantes: str.contains avisa si el patrón tiene grupos)
+SEPARATOR_LINE_PATTERN = r"^\s*[-=\.]{8,}\s*$"
+TABLE_SEPARATORS = ["|", "│", ";", ",", "\t"]
+NUMBER_PATTERN = r"\d+[.,]\d+|\d+"
+DATE_PATTERNS = [
+    r"\b\d{2}/\d{2}/\d{4}\b",
+    r"\b\d{2}\.\d{2}\.\d{4}\b",
+    r"\b\d{2}-\d{2}-\d{4}\b",
+    r"\b\d{8}\b",           # YYYYMMDD o DDMMYYYY
+    r"\b\d{6}\b",           # YYMMDD
+]
+CURRENCY_PATTERN = r"(?:\bEUR\b|\bUSD\b|€|\$)"
+AMOUNT_PATTERN = r"[-]?\d{1,3}(?:[.,]\d{3})*[.,]\d{2}"
+ALL_CAPS_WORD_PATTERN = r"\b[^\W\d_]{4,}\b"
+
+META_KEYWORDS = [
+    "hora", "fecha", "pág", "página", "cif", "ledger", "soc", "sociedad", "ejercicio","empresa",
+    "usuario", "user", "report", "rj", "rfbelj", "nacc", "fi97map"
+]
+
+HEADER_KEYWORDS = [
+    "nº", "n°", "no.", "numero", "nº doc", "nº docum", "fecont", "fedoc", "fecpu",
+    "texto cabecera", "denominación", "cuenta", "importe", "debe", "haber",
+    "libro may", "ba", "cc", "md", "mon.", "mon", "ms", "ap.", "i",
+    "bukrs", "gjahr", "belnr", "waers", "tcode", "blart", "bldat", "cpudt",
+    "usnam", "nktxt", "tcode", "stblg", "blart", "bldat", "updt", "lifnr", "número",
+    "date", "documentNo", "period"
+]
+
+TOTAL_KEYWORDS = ["total", "suma", "acumulado", "arrsaldos", "saldo", "total página", "carryfwd"]
+
+#PARENT_KEYWORDS = ["factura", "cobros", "contab", "provision", "int comp", "valuation"]
+
+META_STRONG_KEYWORDS = ["hora", "fecha", "pág", "pagina", "ledger", "usuario", "empresa", "cif", "libro diario"]
+
+
+class _LineCharCounter:
+    """
+    Conteos de caracteres por línea sobre los code points de todas las líneas
+    concatenadas (un único array numpy en lugar de una regex por clase y línea).
+    """
+
+    def __init__(self, texts: pd.Series, lengths: np.ndarray):
+        joined = "".join(texts).encode("utf-32-le", "surrogatepass")
+        self.codes = np.frombuffer(joined, dtype=np.uint32)
+        self.bounds = np.concatenate(([0], np.cumsum(lengths)))
+        present = np.zeros(int(self.codes.max()) + 1 if len(self.codes) else 1, dtype=bool)
+        present[self.codes] = True
+        self.table_size = len(present)
+        self.chars = [chr(code) for code in np.flatnonzero(present)]
+
+    def _per_line(self, mask: np.ndarray) -> np.ndarray:
+        cumulative = np.concatenate(([0], np.cumsum(mask, dtype=np.int64)))
+        return cumulative[self.bounds[1:]] - cumulative[self.bounds[:-1]]
+
+    def count_char(self, ch: str) -> np.ndarray:
+        return self._per_line(self.codes == ord(ch))
+
+    def count_where(self, predicate) -> np.ndarray:
+        """Caracteres por línea que cumplen el predicado de str (isalpha, isdigit...)"""
+        table = np.zeros(self.table_size, dtype=bool)
+        table[[ord(ch) for ch in self.chars if predicate(ch)]] = True
+        return self._per_line(table[self.codes])
 
 
 class DocumentFeatureExtractor:
     def __init__(self):
+        # sklearn (~1 s de import) solo al crear el extractor, no al importar el módulo
+        from sklearn.preprocessing import LabelEncoder
         self.label_encoder = LabelEncoder()
 
     # ---------------------------
@@ -28,16 +94,13 @@ class DocumentFeatureExtractor:
     @staticmethod
     def _is_separator(text: str) -> int:
         # Línea tipo "-----" o "=====" o "....."
-        return 1 if re.search(r"^\s*[-=\.]{8,}\s*$", text) else 0
+        return 1 if re.search(SEPARATOR_LINE_PATTERN, text) else 0
 
     # Detecta si una línea tiene formato tabular
     @staticmethod
     def _is_table_like(text: str) -> int:
-        # Lista de separadores a verificar
-        separators = ["|", "│", ";", ",", "\t"]
-        
         # Verificar separadores explícitos
-        for sep in separators:
+        for sep in TABLE_SEPARATORS:
             if text.count(sep) >= 3:
                 return 1
         
@@ -62,7 +125,7 @@ class DocumentFeatureExtractor:
     @staticmethod
     def _has_all_caps_word(text: str) -> int:
         # Palabra de ≥4 chars, sin dígitos, toda en mayúsculas
-        for w in re.findall(r"\b[^\W\d_]{4,}\b", text, flags=re.UNICODE):
+        for w in re.findall(ALL_CAPS_WORD_PATTERN, text, flags=re.UNICODE):
             if w.isupper():
                 return 1
         return 0
@@ -139,29 +202,21 @@ class DocumentFeatureExtractor:
         features = {}
 
         # Números
-        numbers = re.findall(r"\d+[.,]\d+|\d+", text)
+        numbers = re.findall(NUMBER_PATTERN, text)
         features["number_count"] = len(numbers)
         features["has_numbers"] = 1 if len(numbers) > 0 else 0
         features["number_density"] = len(numbers) / max(len(text), 1)
 
         # Fechas (varios formatos)
-        date_patterns = [
-            r"\b\d{2}/\d{2}/\d{4}\b",
-            r"\b\d{2}\.\d{2}\.\d{4}\b",
-            r"\b\d{2}-\d{2}-\d{4}\b",
-            r"\b\d{8}\b",           # YYYYMMDD o DDMMYYYY
-            r"\b\d{6}\b",           # YYMMDD
-        ]
-        
         features["has_date"] = 0
-        for pattern in date_patterns:
+        for pattern in DATE_PATTERNS:
             if re.search(pattern, text):
                 features["has_date"] = 1
                 break
 
         features["has_two_dates"] = 0
 
-        for pattern in date_patterns:
+        for pattern in DATE_PATTERNS:
             matches = re.findall(pattern, text)
             if len(matches) >= 2:   # encontró dos o más
                 features["has_two_dates"] = 1
@@ -173,8 +228,7 @@ class DocumentFeatureExtractor:
         features["has_month_name"] = 1 if re.search(MONTHS_ES, low) or re.search(MONTHS_EN, low) else 0
 
         # Monedas
-        currency_pattern = r"(\bEUR\b|\bUSD\b|€|\$)"
-        features["has_currency"] = 1 if re.search(currency_pattern, text, re.IGNORECASE) else 0
+        features["has_currency"] = 1 if re.search(CURRENCY_PATTERN, text, re.IGNORECASE) else 0
 
         # Tipo de documento
         features["has_doc_type"] = 1 if re.search(r"\b[A-Z][A-Z0-9]\b", text) else 0
@@ -184,9 +238,8 @@ class DocumentFeatureExtractor:
         features["has_account_number"] = 1 if re.search(account_pattern, text) else 0
 
         # Importes (números con decimales y signos)
-        amount_pattern = r"[-]?\d{1,3}([.,]\d{3})*[.,]\d{2}"
-        features["has_amounts"] = 1 if re.search(amount_pattern, text) else 0
-        features["amount_count"] = len(re.findall(amount_pattern, text))
+        features["has_amounts"] = 1 if re.search(AMOUNT_PATTERN, text) else 0
+        features["amount_count"] = len(re.findall(AMOUNT_PATTERN, text))
 
         return features
 
@@ -197,28 +250,10 @@ class DocumentFeatureExtractor:
         # Palabras clave (fortalecidas)
         text_lower = text.lower()
 
-        meta_keywords = [
-            "hora", "fecha", "pág", "página", "cif", "ledger", "soc", "sociedad", "ejercicio","empresa",
-            "usuario", "user", "report", "rj", "rfbelj", "nacc", "fi97map"
-        ]
-
-        header_keywords = [
-            "nº", "n°", "no.", "numero", "nº doc", "nº docum", "fecont", "fedoc", "fecpu",
-            "texto cabecera", "denominación", "cuenta", "importe", "debe", "haber",
-            "libro may", "ba", "cc", "md", "mon.", "mon", "ms", "ap.", "i",
-            "bukrs", "gjahr", "belnr", "waers", "tcode", "blart", "bldat", "cpudt",
-            "usnam", "nktxt", "tcode", "stblg", "blart", "bldat", "updt", "lifnr", "número",
-            "date", "documentNo", "period"
-        ]
-
-        total_keywords = ["total", "suma", "acumulado", "arrsaldos", "saldo", "total página", "carryfwd"]
-
-        #parent_keywords = ["factura", "cobros", "contab", "provision", "int comp", "valuation"]
-
-        features["meta_keywords"] = sum(1 for kw in meta_keywords if kw in text_lower)
-        features["header_keywords"] = sum(1 for kw in header_keywords if kw in text_lower)
-        features["total_keywords"] = sum(1 for kw in total_keywords if kw in text_lower)
-        #features["parent_keywords"] = sum(1 for kw in parent_keywords if kw in text_lower)
+        features["meta_keywords"] = sum(1 for kw in META_KEYWORDS if kw in text_lower)
+        features["header_keywords"] = sum(1 for kw in HEADER_KEYWORDS if kw in text_lower)
+        features["total_keywords"] = sum(1 for kw in TOTAL_KEYWORDS if kw in text_lower)
+        #features["parent_keywords"] = sum(1 for kw in PARENT_KEYWORDS if kw in text_lower)
 
         # Estadísticos de palabras
         stripped = text.strip()
@@ -258,83 +293,262 @@ class DocumentFeatureExtractor:
         features["has_dotted_fillers"] = 1 if re.search(r"\.{3,}", text) else 0
 
         # Meta fuerte: ≥2 palabras clave de metadatos
-        meta_strong_kw = ["hora", "fecha", "pág", "pagina", "ledger", "usuario", "empresa", "cif", "libro diario"]
-        features["meta_strong_keywords"] = sum(1 for kw in meta_strong_kw if kw in text_lower)
+        features["meta_strong_keywords"] = sum(1 for kw in META_STRONG_KEYWORDS if kw in text_lower)
         features["is_meta_strong"] = 1 if features["meta_strong_keywords"] >= 2 else 0
 
         return features
 
+    # ---------------------------
+    # Extracción vectorizada (columna completa)
+    # ---------------------------
+    # Los métodos por línea de arriba son la referencia; estos calculan las mismas
+    # features sobre toda la columna con Series.str (sin iterrows).
+
+    @staticmethod
+    def _count(texts: pd.Series, pattern: str, flags: int = 0) -> np.ndarray:
+        return texts.str.count(pattern, flags=flags).to_numpy(dtype=np.int64)
+
+    @staticmethod
+    def _has(texts: pd.Series, pattern: str, flags: int = 0, regex: bool = True) -> np.ndarray:
+        return texts.str.contains(pattern, flags=flags, regex=regex).to_numpy(dtype=bool)
+
+    @staticmethod
+    def _char_class(chars, predicate) -> str:
+        """Clase regex con los caracteres presentes que cumplen el predicado de str (isalpha, isdigit...)"""
+        selected = "".join(re.escape(ch) for ch in sorted(chars) if predicate(ch))
+        return f"[{selected}]" if selected else r"[^\s\S]"
+
+    def _is_separator_lines(self, texts: pd.Series) -> np.ndarray:
+        return self._has(texts, SEPARATOR_LINE_PATTERN)
+
+    def _is_table_like_lines(self, texts: pd.Series, char_counter: _LineCharCounter = None) -> np.ndarray:
+        if char_counter is None:
+            char_counter = _LineCharCounter(texts, texts.str.len().to_numpy(dtype=np.int64))
+        is_table = self._count(texts, r" {2,}") >= 3
+        for sep in TABLE_SEPARATORS:
+            is_table |= char_counter.count_char(sep) >= 3
+        return is_table
+
+    @staticmethod
+    def _keyword_count(texts_lower: list, keywords: list) -> np.ndarray:
+        # Búsqueda de subcadena directa sobre la lista: str.contains(regex=False) cuesta
+        # lo mismo por línea más el coste fijo de pandas por cada una de las ~75 palabras
+        total = np.zeros(len(texts_lower), dtype=np.int64)
+        for kw in keywords:
+            total += np.array([kw in text for text in texts_lower], dtype=bool)
+        return total
+
+    def extract_line_features(self, texts: pd.Series) -> pd.DataFrame:
+        """
+        Versión vectorizada de extract_structural_features + extract_content_features +
+        extract_text_features: mismas columnas, orden y tipos que aplicarlas línea a línea.
+        """
+        texts = texts.fillna("").astype(str).reset_index(drop=True)
+        length = texts.str.len().to_numpy(dtype=np.int64)
+        safe_length = np.maximum(length, 1)
+        char_counter = _LineCharCounter(texts, length)
+        chars = char_counter.chars
+        f = {}
+
+        # --- Estructurales ---
+        space_count = char_counter.count_char(" ")
+        tab_count = char_counter.count_char("\t")
+        f["line_length"] = length
+        f["line_length_no_ws"] = length - space_count - tab_count
+        f["starts_with_space_or_tab"] = texts.str.match(r"[ \t]").to_numpy(dtype=np.int64)
+        f["leading_spaces"] = length - texts.str.lstrip(" ").str.len().to_numpy(dtype=np.int64)
+        f["leading_tabs"] = length - texts.str.lstrip("\t").str.len().to_numpy(dtype=np.int64)
+        f["total_indentation"] = f["leading_spaces"] + f["leading_tabs"]
+
+        f["pipe_count"] = char_counter.count_char("|")
+        f["tab_count"] = tab_count
+        f["comma_count"] = char_counter.count_char(",")
+        f["semicolon_count"] = char_counter.count_char(";")
+        f["colon_count"] = char_counter.count_char(":")
+        f["dot_count"] = char_counter.count_char(".")
+        f["dash_count"] = char_counter.count_char("-")
+        f["total_delimiters"] = (
+            f["pipe_count"] + f["tab_count"] + f["comma_count"] + f["semicolon_count"] + f["colon_count"]
+        )
+
+        f["has_dashes"] = self._has(texts, r"-{8,}")
+        f["has_equals"] = self._has(texts, r"={8,}")
+        f["has_dots"] = self._has(texts, r"\.{8,}")
+        f["is_separator_line"] = self._is_separator_lines(texts)
+
+        # Ratios por clase de carácter (mismos predicados que los helpers por línea)
+        letters = char_counter.count_where(str.isalpha)
+        uppers = char_counter.count_where(lambda ch: ch.isalpha() and ch.isupper())
+        f["upper_ratio"] = uppers / np.maximum(letters, 1)
+        f["non_alnum_ratio"] = char_counter.count_where(
+            lambda ch: not ch.isalnum() and not ch.isspace()
+        ) / safe_length
+        f["digits_ratio"] = char_counter.count_where(str.isdigit) / safe_length
+        f["space_ratio"] = space_count / safe_length
+
+        # --- Contenido ---
+        number_count = self._count(texts, NUMBER_PATTERN)
+        f["number_count"] = number_count
+        f["has_numbers"] = number_count > 0
+        f["number_density"] = number_count / safe_length
+
+        has_date = np.zeros(len(texts), dtype=bool)
+        has_two_dates = np.zeros(len(texts), dtype=bool)
+        for pattern in DATE_PATTERNS:
+            date_count = self._count(texts, pattern)
+            has_date |= date_count > 0
+            has_two_dates |= date_count >= 2
+        f["has_date"] = has_date
+        f["has_two_dates"] = has_two_dates
+
+        texts_lower = texts.str.lower()
+        f["has_year"] = self._has(texts, r"\b20\d{2}\b")
+        f["has_month_name"] = self._has(texts_lower, f"{MONTHS_ES}|{MONTHS_EN}")
+        f["has_currency"] = self._has(texts, CURRENCY_PATTERN, flags=re.IGNORECASE)
+        f["has_doc_type"] = self._has(texts, r"\b[A-Z][A-Z0-9]\b")
+        f["has_account_number"] = self._has(texts, r"\b\d{6,12}\b")
+        amount_count = self._count(texts, AMOUNT_PATTERN)
+        f["has_amounts"] = amount_count > 0
+        f["amount_count"] = amount_count
+
+        # --- Texto ---
+        lower_list = texts_lower.tolist()
+        f["meta_keywords"] = self._keyword_count(lower_list, META_KEYWORDS)
+        f["header_keywords"] = self._keyword_count(lower_list, HEADER_KEYWORDS)
+        f["total_keywords"] = self._keyword_count(lower_list, TOTAL_KEYWORDS)
+
+        # str.split() y \S+ cortan por los mismos espacios (unicode, str.isspace)
+        words = texts.str.split()
+        num_words = words.str.len().to_numpy(dtype=np.int64)
+        word_chars = length - char_counter.count_where(str.isspace)
+        f["num_words"] = num_words
+        f["avg_word_length"] = np.divide(word_chars, num_words, out=np.zeros(len(texts)), where=num_words > 0)
+        f["max_word_length"] = words.map(lambda ws: max(map(len, ws), default=0)).to_numpy(dtype=np.int64)
+
+        stripped_length = texts.str.strip().str.len().to_numpy(dtype=np.int64)
+        f["starts_with_number"] = texts.str.match(r"\s*\d").to_numpy(dtype=bool)
+        f["starts_with_zeros"] = texts.str.match(r"\s*0").to_numpy(dtype=bool)
+        f["is_empty"] = stripped_length == 0
+        f["is_mostly_spaces"] = stripped_length < length * 0.1
+
+        # Palabra ≥4 letras con w.isupper(): sin minúsculas/titlecase y con al menos una mayúscula
+        word_letter = re.compile(r"[^\W\d_]")
+        caps_word_chars = self._char_class(
+            chars, lambda ch: bool(word_letter.match(ch)) and not ch.islower() and not (ch.istitle() and not ch.isupper())
+        )
+        upper_letters = self._char_class(chars, lambda ch: bool(word_letter.match(ch)) and ch.isupper())
+        f["has_all_caps_word"] = self._has(
+            texts, rf"\b(?={caps_word_chars}*{upper_letters}){caps_word_chars}{{4,}}\b"
+        )
+        is_table_like = self._is_table_like_lines(texts, char_counter)
+        f["is_table_like"] = is_table_like
+
+        # has_year/has_month_name todavía no están en el dict cuando se calcula por línea
+        f["is_meta_candidate"] = (f["meta_keywords"] > 0) | f["has_all_caps_word"]
+        f["is_header_candidate"] = is_table_like | (f["header_keywords"] > 0) | (f["pipe_count"] >= 3)
+
+        f["short_tokens_ratio"] = self._count(texts, r"\b\w{1,3}\b") / np.maximum(num_words, 1)
+        f["has_dotted_fillers"] = self._has(texts, r"\.{3,}")
+        f["meta_strong_keywords"] = self._keyword_count(lower_list, META_STRONG_KEYWORDS)
+        f["is_meta_strong"] = f["meta_strong_keywords"] >= 2
+
+        return pd.DataFrame({
+            name: values.astype(np.int64) if values.dtype == bool else values
+            for name, values in f.items()
+        })
+
     # ---------------------------
     # Features contextuales
     # ---------------------------
+    def _contextual_features(self, length: np.ndarray, is_separator: np.ndarray,
+                             is_table_like: np.ndarray, pipe_count: np.ndarray,
+                             first_position: int = 0, total_lines: Optional[int] = None) -> pd.DataFrame:
+        """
+        Features de líneas adyacentes a partir de los arrays por línea desplazados (vecino inexistente = "").
+        Para una ventana de un fichero mayor: first_position es la posición de su primera línea en el
+        fichero y total_lines el total de líneas del fichero (posición relativa, primeras/últimas líneas).
+        """
+        n = len(length) if total_lines is None else total_lines
+        position = first_position + np.arange(len(length))
+
+        def shift(values: np.ndarray, offset: int) -> np.ndarray:
+            shifted = np.zeros_like(values)
+            if offset > 0:
+                shifted[offset:] = values[:-offset]
+            else:
+                shifted[:offset] = values[-offset:]
+            return shifted
+
+        prev_is_separator = shift(is_separator, 1)
+        next_is_separator = shift(is_separator, -1)
+        prev_is_table_like = shift(is_table_like, 1)
+        prev_length = shift(length, 1)
+        next_length = shift(length, -1)
+
+        f = {}
+        # Posición relativa (0..1)
+        f["relative_position"] = position / (n - 1) if n > 1 else np.zeros(n)
+        f["is_first_lines"] = position < 10      # ↑ Aumentamos ventana: META suele vivir aquí
+        f["is_last_lines"] = position >= n - 8
+
+        # Línea anterior
+        f["prev_line_length"] = prev_length
+        f["prev_is_separator"] = prev_is_separator
+        f["prev_is_table_like"] = prev_is_table_like
+        f["length_diff_prev"] = length - prev_length
+
+        # Esta línea
+        f["surrounded_by_separators"] = prev_is_separator & next_is_separator
+
+        # Línea siguiente
+        f["next_line_length"] = next_length
+        f["next_is_separator"] = next_is_separator
+        f["next_is_table_like"] = shift(is_table_like, -1)
+        f["length_diff_next"] = next_length - length
+        f["next_pipe_count"] = shift(pipe_count, -1)
+
+        # Heurísticas contextuales útiles:
+        # - Un HEADER suele estar pegado a un separador antes/después.
+        f["header_context_hint"] = prev_is_separator | next_is_separator
+        # - META a menudo aparece antes de la primera línea “tabla-like”
+        f["meta_context_hint"] = (position < 10) & ~prev_is_table_like
+
+        return pd.DataFrame({
+            name: values.astype(np.int64) if values.dtype == bool else values
+            for name, values in f.items()
+        })
+
     def extract_contextual_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """Extrae features contextuales basadas en líneas adyacentes."""
-        df = df.copy()
-        df["text"] = df["text"].fillna("").astype(str)
-        texts = df["text"].tolist()
-        n = len(texts)
-
-        features_list = []
-        for i in range(n):
-            prev_text = texts[i - 1] if i > 0 else ""
-            this_text = texts[i]
-            next_text = texts[i + 1] if i < n - 1 else ""
-
-            f = {}
-            # Posición relativa (0..1)
-            f["relative_position"] = (i / (n - 1)) if n > 1 else 0.0
-            f["is_first_lines"] = 1 if i < 10 else 0      # ↑ Aumentamos ventana: META suele vivir aquí
-            f["is_last_lines"] = 1 if i >= n - 8 else 0
-
-            # Línea anterior
-            f["prev_line_length"] = len(prev_text)
-            f["prev_is_separator"] = self._is_separator(prev_text)
-            f["prev_is_table_like"] = self._is_table_like(prev_text)
-            f["length_diff_prev"] = len(this_text) - len(prev_text)
-
-            # Esta línea
-            f["surrounded_by_separators"] = 1 if (self._is_separator(prev_text) and self._is_separator(next_text)) else 0
-
-            # Línea siguiente
-            f["next_line_length"] = len(next_text)
-            f["next_is_separator"] = self._is_separator(next_text)
-            f["next_is_table_like"] = self._is_table_like(next_text)
-            f["length_diff_next"] = len(next_text) - len(this_text)
-            f["next_pipe_count"] = next_text.count("|")
-
-            # Heurísticas contextuales útiles:
-            # - Un HEADER suele estar pegado a un separador antes/después.
-            f["header_context_hint"] = 1 if (f["prev_is_separator"] or f["next_is_separator"]) else 0
-            # - META a menudo aparece antes de la primera línea “tabla-like”
-            f["meta_context_hint"] = 1 if (i < 10 and not f["prev_is_table_like"]) else 0
-
-            features_list.append(f)
-
-        return pd.DataFrame(features_list)
+        texts = df["text"].fillna("").astype(str).reset_index(drop=True)
+        length = texts.str.len().to_numpy(dtype=np.int64)
+        char_counter = _LineCharCounter(texts, length)
+        return self._contextual_features(
+            length,
+            self._is_separator_lines(texts),
+            self._is_table_like_lines(texts, char_counter),
+            char_counter.count_char("|"),
+        )
 
     # ---------------------------
     # Pipeline de extracción
     # ---------------------------
-    def extract_all_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Extrae todas las features y las combina."""
-        df = df.copy()
-        df["text"] = df["text"].fillna("").astype(str)
-
-        all_features = []
-        for _, row in df.iterrows():
-            text = row["text"]
-            f = {}
-            f.update(self.extract_structural_features(text))
-            content_f = self.extract_content_features(text)
-            f.update(content_f)
-            text_f = self.extract_text_features(text)
-            text_f["has_year"] = content_f.get("has_year", 0)
-            text_f["has_month_name"] = content_f.get("has_month_name", 0)
-            f.update(text_f)
-            all_features.append(f)
-
-        features_df = pd.DataFrame(all_features).reset_index(drop=True)
-        contextual_df = self.extract_contextual_features(df).reset_index(drop=True)
+    def extract_all_features(self, df: pd.DataFrame, first_position: int = 0,
+                             total_lines: Optional[int] = None) -> pd.DataFrame:
+        """
+        Extrae todas las features y las combina.
+        df puede ser una ventana de un fichero mayor (ver _contextual_features).
+        """
+        features_df = self.extract_line_features(df["text"])
+        # El contexto reutiliza los flags por línea ya calculados (sin recalcular vecinos)
+        contextual_df = self._contextual_features(
+            features_df["line_length"].to_numpy(),
+            features_df["is_separator_line"].to_numpy(dtype=bool),
+            features_df["is_table_like"].to_numpy(dtype=bool),
+            features_df["pipe_count"].to_numpy(),
+            first_position=first_position,
+            total_lines=total_lines,
+        )
         features_df = pd.concat([features_df, contextual_df], axis=1)
 
         return features_df
@@ -368,6 +582,7 @@ class DocumentFeatureExtractor:
         y = self.label_encoder.fit_transform(df["label"])
 
         print("Dividiendo datos en train/validation/test...")
+        from sklearn.model_selection import train_test_split
         X_temp, X_test, y_temp, y_test = train_test_split(
             features_df, y, test_size=0.2, random_state=42, stratify=y
         )
@@ -7,7 +7,6 @@ Optimizado para mostrar resultados claros y concisos
 import sys
 import os
 from pathlib import Path
-import pandas as pd
 from datetime import datetime
 
 # Configurar entorno
@@ -24,20 +23,32 @@ def setup_environment():
 # Configurar entorno
 setup_environment()
 
-# Importar módulos del sistema
-try:
-    from core.field_detector import FieldDetector
-    from core.field_mapper import FieldMapper
-    CORE_AVAILABLE = True
-except ImportError as e:
-    print(f"❌ Error importing core modules: {e}")
-    CORE_AVAILABLE = False
+from startup_profiler import lazy_import, handle_profile_startup
+
+# pandas y los módulos del sistema se cargan en el primer análisis, no al arrancar
+pd = lazy_import('pandas')
+FieldDetector = None
+FieldMapper = None
+CORE_AVAILABLE = None
+
+def core_available() -> bool:
+    """Importa los módulos core la primera vez que se necesitan"""
+    global FieldDetector, FieldMapper, CORE_AVAILABLE
+    if CORE_AVAILABLE is None:
+        try:
+            from core.field_detector import FieldDetector
+            from core.field_mapper import FieldMapper
+            CORE_AVAILABLE = True
+        except ImportError as e:
+            print(f"❌ Error importing core modules: {e}")
+            CORE_AVAILABLE = False
+    return CORE_AVAILABLE
 
 def analyze_csv_mappings(file_path: str, erp_hint: str = None, show_stats: bool = True):
     """
     Analiza un CSV y muestra los mapeos de campos de forma clara
     """
-    if not CORE_AVAILABLE:
+    if not core_available():
         print("❌ Core modules not available")
         return None
     
@@ -47,21 +58,24 @@ def analyze_csv_mappings(file_path: str, erp_hint: str = None, show_stats: bool
         return None
     
     try:
-        # Cargar CSV
-        df = pd.read_csv(file_path)
-        print(f"📄 ANALYZING: {Path(file_path).name}")
-        print("=" * 60)
-        
         # Crear detector y mapper
         detector = FieldDetector()
         mapper = detector.field_mapper
         
+        # Cargar una muestra acotada del CSV (max_rows_for_analysis / max_columns_per_file)
+        from csv_sampling import read_csv_sample, sample_summary
+        limits = mapper.field_loader.get_analysis_limits()
+        df, sample_info = read_csv_sample(file_path, max_rows=limits['max_rows_for_analysis'],
+                                          max_columns=limits['max_columns_per_file'])
+        print(f"📄 ANALYZING: {Path(file_path).name}")
+        print("=" * 60)
+        
         # Auto-detectar ERP si no se especifica
         if not erp_hint:
             erp_hint = detector.auto_detect_erp(df)
         
         print(f"📊 File info:")
-        print(f"  • Rows: {len(df)}")
+        print(f"  • Rows: {sample_summary(sample_info)}")
         print(f"  • Columns: {len(df.columns)}")
         print(f"  • ERP detected: {erp_hint}")
         print()
@@ -143,7 +157,8 @@ def analyze_csv_mappings(file_path: str, erp_hint: str = None, show_stats: bool
             'mapping_rate': mapping_rate,
             'field_mappings': field_mappings,
             'unmapped_columns': unmapped_columns,
-            'average_confidence': avg_confidence if field_mappings else 0.0
+            'average_confidence': avg_confidence if field_mappings else 0.0,
+            'sample_info': sample_info
         }
         
     except Exception as e:
@@ -262,12 +277,20 @@ def main():
     """
     Función principal simplificada
     """
+    handle_profile_startup('main')
+    
+    # Modo batch: python main.py batch <directorio> [--workers N] [--erp ERP]
+    if len(sys.argv) > 1 and sys.argv[1] == 'batch':
+        from batch_processor import main as batch_main
+        batch_main(sys.argv[2:])
+        return
+    
     print("🚀 SISTEMA DE MAPEO DE CAMPOS")
     print("=" * 40)
     print(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print()
     
-    if not CORE_AVAILABLE:
+    if not core_available():
         print("❌ Core modules not available. Please check your installation.")
         return
     
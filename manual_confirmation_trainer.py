@@ -3,6 +3,7 @@
 # MEJORADO: Añade sinónimos y patrones regex precisos automáticamente
 
 import pandas as pd
+import numpy as np
 import os
 import sys
 import re
@@ -13,6 +14,8 @@ import json
 from pathlib import Path
 import yaml
 
+from date_inference import date_format_inferencer, strftime_unique
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -105,7 +108,8 @@ class ManualConfirmationTrainingSession:
         try:
             if os.path.exists(self.yaml_config_file):
                 with open(self.yaml_config_file, 'r', encoding='utf-8') as f:
-                    config = yaml.safe_load(f)
+                    # Loader en C si está disponible (el YAML de patrones tiene ~1.600 líneas)
+                    config = yaml.load(f, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
                     self.learned_patterns = config.get('learned_patterns', {})
                     print(f"✓ Loaded {len(self.learned_patterns)} learned patterns")
             else:
@@ -1877,46 +1881,32 @@ class ManualConfirmationTrainingSession:
                     # IMPORTANTE: Solo procesar si realmente contiene datetime combinado
                     # NO usar pd.to_datetime(errors='coerce') que inventa fechas
                     
-                    dates = []
-                    times = []
+                    empty = (df[col].isna() | (df[col].astype(object) == '')).to_numpy(dtype=bool)
+                    text = df[col].astype(str).str.strip().where(~empty, '')
                     
-                    for value in df[col]:
-                        if pd.isna(value) or value == '':
-                            dates.append('')
-                            times.append('')
-                            continue
-                        
-                        str_value = str(value).strip()
-                        
-                        # Verificar si realmente contiene fecha y hora
-                        has_space_and_colon = ' ' in str_value and ':' in str_value
-                        
-                        if has_space_and_colon:
-                            try:
-                                # Solo ahora intentar parsear
-                                parsed_dt = pd.to_datetime(str_value, errors='raise')
-                                
-                                # Extraer fecha manteniendo formato original si es posible
-                                if '.' in str_value:
-                                    date_str = parsed_dt.strftime('%d.%m.%Y')
-                                elif '/' in str_value:
-                                    date_str = parsed_dt.strftime('%d/%m/%Y')
-                                else:
-                                    date_str = parsed_dt.strftime('%Y-%m-%d')
-                                
-                                time_str = parsed_dt.strftime('%H:%M:%S')
-                                
-                                dates.append(date_str)
-                                times.append(time_str)
-                                
-                            except:
-                                # Si falla el parseo, mantener original
-                                dates.append(str_value)
-                                times.append('')
-                        else:
-                            # No tiene formato de fecha+hora, mantener original
-                            dates.append(str_value)
-                            times.append('')
+                    # Verificar si realmente contiene fecha y hora
+                    has_space_and_colon = (text.str.contains(' ', regex=False) &
+                                           text.str.contains(':', regex=False)).to_numpy(dtype=bool)
+                    
+                    # Formato inferido una vez para la columna y parseo vectorizado; lo que no
+                    # se pueda parsear (ni con el parser genérico) mantiene el valor original
+                    dates = text.to_numpy(dtype=object, copy=True)
+                    times = np.full(len(text), '', dtype=object)
+                    parsed = date_format_inferencer.parse(text[has_space_and_colon])
+                    ok = parsed.notna().to_numpy(dtype=bool)
+                    rows = np.flatnonzero(has_space_and_colon)[ok]
+                    parsed = parsed[ok]
+                    
+                    # Extraer fecha manteniendo formato original si es posible
+                    source = text.iloc[rows]
+                    dotted = source.str.contains('.', regex=False).to_numpy(dtype=bool)
+                    slashed = source.str.contains('/', regex=False).to_numpy(dtype=bool) & ~dotted
+                    for style, date_style in ((dotted, '%d.%m.%Y'), (slashed, '%d/%m/%Y'),
+                                              (~dotted & ~slashed, '%Y-%m-%d')):
+                        if style.any():
+                            dates[rows[style]] = strftime_unique(parsed[style], date_style)
+                    times[rows] = strftime_unique(parsed, '%H:%M:%S')
+                    dates, times = dates.tolist(), times.tolist()
                     
                     # Solo actualizar si realmente se procesó algo
                     if any(time for time in times if time):
@@ -13,21 +13,40 @@ Flujo del Pipeline:
 3. Post-procesar las predicciones
 4. Aplicar automatic trainer para generar CSVs finales
 
+Modos de ejecución (execution_mode):
+- subprocess: cada paso es un script independiente y los datos pasan por CSV
+  intermedios en predicciones/ y temp/ (modo por defecto)
+- inprocess: los pasos se llaman directamente, los DataFrames pasan en memoria y
+  el modelo/mapper se cargan una sola vez por orquestador y se reutilizan entre ficheros
+
+Con prediction_server (--prediction-server) el paso 2 del modo subprocess se delega en
+un prediction_server.py ya arrancado (modelo residente) en lugar de lanzar test_model.py;
+si el servidor no responde se vuelve a lanzar test_model.py
+
 Autor: Sistema de Mapeo de Campos Contables
 Fecha: 2025
 """
 
+from __future__ import annotations
+
+import io
 import os
 import sys
+import time
 import argparse
 import logging
+import contextlib
 from datetime import datetime
 from pathlib import Path
 import subprocess
 import json
-import pandas as pd
 from typing import Dict, List, Optional, Tuple
 
+from startup_profiler import lazy_import, handle_profile_startup
+
+# pandas solo se carga al usarse (--help y errores de argumentos no lo necesitan)
+pd = lazy_import('pandas')
+
 # Configurar logging
 logging.basicConfig(
     level=logging.INFO,
@@ -39,6 +58,10 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Los scripts de cada paso se resuelven junto al orquestador (no respecto al cwd)
+SCRIPT_DIR = Path(__file__).resolve().parent
+EXECUTION_MODES = ('subprocess', 'inprocess')
+
 
 class PipelineOrchestrator:
     """
@@ -48,8 +71,9 @@ class PipelineOrchestrator:
     - Ejecuta el pipeline completo de procesamiento de datos
     - Normaliza automáticamente el separador CSV a coma (,)
     - Maneja diferentes formatos de entrada (CSV, TXT, XLSX)
-    - Genera reportes detallados de ejecución
+    - Genera reportes detallados de ejecución (con tiempos por paso)
     - Validación robusta en cada paso
+    - Modo in-process reutilizando modelo y mapper entre ficheros
     """
     
     def __init__(self, config_path: str = "config/pipeline_config.json"):
@@ -69,15 +93,31 @@ class PipelineOrchestrator:
         # Crear directorios necesarios
         self._create_directories()
         
+        # Componentes del modo in-process: se cargan una vez y se reutilizan entre ficheros
+        self._document_tester = None
+        self._field_mapper = None
+        self._field_detector = None
+        
         # Estado del pipeline
-        self.pipeline_status = {
+        self.pipeline_status = self._new_pipeline_status()
+    
+    @staticmethod
+    def _new_pipeline_status() -> Dict:
+        return {
             'start_time': None,
             'end_time': None,
             'steps_completed': [],
             'current_step': None,
-            'errors': []
+            'errors': [],
+            'step_timings': {},
+            'input_format': None,
+            'prediction_backend': None
         }
     
+    @property
+    def in_process(self) -> bool:
+        return self.config.get('execution_mode') == 'inprocess'
+    
     def _load_config(self) -> Dict:
         """Carga la configuración del pipeline"""
         default_config = {
@@ -85,7 +125,10 @@ class PipelineOrchestrator:
             'data_pre_dir': 'data_pre',
             'automatic_trainer_confidence': 0.75,
             'erp_detection': 'auto',
-            'cleanup_temp_files': True
+            'cleanup_temp_files': True,
+            'execution_mode': 'subprocess',
+            'prediction_server': None,
+            'prediction_window_lines': None
         }
         
         if os.path.exists(self.config_path):
@@ -96,6 +139,10 @@ class PipelineOrchestrator:
             except Exception as e:
                 logger.warning(f"Error loading config: {e}. Using defaults.")
         
+        if default_config['execution_mode'] not in EXECUTION_MODES:
+            logger.warning(f"Unknown execution_mode '{default_config['execution_mode']}'. Using subprocess.")
+            default_config['execution_mode'] = 'subprocess'
+        
         return default_config
     
     def _create_directories(self):
@@ -105,6 +152,15 @@ class PipelineOrchestrator:
             dir_path.mkdir(exist_ok=True)
             logger.debug(f"Directory ensured: {dir_path}")
     
+    @contextlib.contextmanager
+    def _timed_step(self, step_name: str):
+        """Registra el tiempo de reloj de un paso en pipeline_status['step_timings']"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.pipeline_status['step_timings'][step_name] = time.perf_counter() - start
+    
     def _execute_command(self, command: List[str], description: str) -> Tuple[bool, str]:
         """
         Ejecuta un comando del sistema y captura la salida
@@ -168,6 +224,18 @@ class PipelineOrchestrator:
         logger.info(f"   Extension: {file_ext}")
         logger.info(f"   Size: {file_size:.2f} MB")
         
+        # Codificación y separador sobre los primeros 64 KB; la predicción in-process los reutiliza
+        if file_ext == '.csv':
+            from test_model import sniff_csv_format
+            
+            input_format = sniff_csv_format(input_file)
+            self.pipeline_status['input_format'] = input_format
+            if input_format:
+                logger.info(f"   Format: encoding={input_format['encoding']}, sep={input_format['sep']!r}, "
+                            f"{input_format['columns']} columns")
+            else:
+                logger.info("   Format: not detected from sample (full read fallback)")
+        
         self.pipeline_status['steps_completed'].append('validate_input')
         return True
     
@@ -184,13 +252,25 @@ class PipelineOrchestrator:
         input_name = Path(input_file).stem
         output_file = self.predictions_dir / f"predictions_{input_name}_{self.timestamp}.csv"
         
+        if self.config.get('prediction_server'):
+            reached, predicted_file = self._predict_via_server(input_file, output_file)
+            if reached:
+                if predicted_file is None:
+                    logger.error("Model prediction failed")
+                    return None
+                self.pipeline_status['steps_completed'].append('model_prediction')
+                return predicted_file
+        
         command = [
             sys.executable,
-            "test_model.py",
+            str(SCRIPT_DIR / "test_model.py"),
             "--model-dir", self.config['model_dir'],
             "--file", input_file,
             "--out", str(output_file)
         ]
+        # Ficheros muy grandes: clasificación por ventanas con memoria constante
+        if self.config.get('prediction_window_lines'):
+            command += ["--window-lines", str(self.config['prediction_window_lines'])]
         
         success, output = self._execute_command(
             command,
@@ -205,6 +285,35 @@ class PipelineOrchestrator:
             logger.error("Model prediction failed")
             return None
     
+    def _predict_via_server(self, input_file: str, output_file: Path) -> Tuple[bool, Optional[str]]:
+        """
+        Predicción con el modelo residente de prediction_server (mismos CSV que test_model.py)
+        
+        Returns:
+            Tupla (servidor alcanzado, fichero de predicciones). Si el servidor no responde
+            se devuelve (False, None) y el paso lanza test_model.py
+        """
+        from prediction_server import PredictionClient, PredictionServerError
+        
+        address = self.config['prediction_server']
+        logger.info(f"Executing: Model prediction (prediction server {address})")
+        try:
+            summary = PredictionClient(address).predict_file(input_file, out=str(output_file))
+        except PredictionServerError as e:
+            error_msg = f"❌ Model prediction failed on prediction server: {e}"
+            logger.error(error_msg)
+            self.pipeline_status['errors'].append(error_msg)
+            return True, None
+        except OSError as e:
+            logger.warning(f"Prediction server {address} unavailable ({e}). Falling back to test_model.py")
+            return False, None
+        
+        self.pipeline_status['prediction_backend'] = address
+        logger.info(f"✅ Model prediction completed successfully ({summary['lines']} lines, "
+                    f"{summary['seconds']:.2f}s on server)")
+        logger.info(f"✅ Predictions saved to: {output_file}")
+        return True, str(output_file)
+    
     def step3_process_predictions(self, predictions_file: str) -> Optional[str]:
         """
         Paso 3: Procesar predicciones para estructurar datos
@@ -219,7 +328,7 @@ class PipelineOrchestrator:
         
         command = [
             sys.executable,
-            "procesador_predicciones.py",
+            str(SCRIPT_DIR / "procesador_predicciones.py"),
             predictions_file,
             "--salida", str(output_file)
         ]
@@ -251,7 +360,7 @@ class PipelineOrchestrator:
             erp_hint = self.config['erp_detection']
         
         # Construir comando
-        command = [sys.executable, "automatic_confirmation_trainer.py", processed_file]
+        command = [sys.executable, str(SCRIPT_DIR / "automatic_confirmation_trainer.py"), processed_file]
         if erp_hint:
             command.append(erp_hint)
             logger.info(f"Using ERP hint: {erp_hint}")
@@ -269,13 +378,13 @@ class PipelineOrchestrator:
         }
         
         if success:
-            # Buscar archivos generados
+            # Buscar archivos generados (resumen "📄 FILES CREATED" del trainer)
             for line in output.split('\n'):
-                if 'Header CSV saved:' in line:
+                if 'Header CSV saved:' in line or '• Header CSV:' in line:
                     result['header_file'] = line.split(':')[-1].strip()
-                elif 'Detail CSV saved:' in line:
+                elif 'Detail CSV saved:' in line or '• Detail CSV:' in line:
                     result['detail_file'] = line.split(':')[-1].strip()
-                elif 'Training report saved' in line:
+                elif 'Training report saved' in line or '• Training Report:' in line:
                     result['report_file'] = line.split(':')[-1].strip()
             
             logger.info(f"✅ Automatic trainer completed")
@@ -292,6 +401,167 @@ class PipelineOrchestrator:
         
         return result
     
+    # ---------------------------
+    # Modo in-process
+    # ---------------------------
+    def _execute_in_process(self, func, description: str, *args, **kwargs) -> Tuple[bool, object]:
+        """
+        Equivalente in-process de _execute_command: captura la salida por consola
+        del paso (se vuelca al log en DEBUG) y registra los errores en el estado
+        """
+        logger.info(f"Executing: {description} (in-process)")
+        captured = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(captured):
+                result = func(*args, **kwargs)
+            logger.info(f"✅ {description} completed successfully")
+            return True, result
+        except Exception as e:
+            error_msg = f"❌ {description} failed: {type(e).__name__}: {e}"
+            logger.error(error_msg)
+            self.pipeline_status['errors'].append(error_msg)
+            return False, None
+        finally:
+            if captured.getvalue():
+                logger.debug(captured.getvalue())
+    
+    def _get_document_tester(self):
+        """Carga el modelo una sola vez por orquestador"""
+        if self._document_tester is None:
+            from test_model import DocumentTester
+            
+            with self._timed_step('model_load'):
+                tester = DocumentTester(model_path=self.config['model_dir'])
+                success, _ = self._execute_in_process(tester.load_model, "Model loading")
+            if not success:
+                return None
+            self._document_tester = tester
+        return self._document_tester
+    
+    def _get_field_components(self):
+        """FieldMapper/FieldDetector compartidos entre ficheros (como los workers batch)"""
+        if self._field_mapper is None:
+            from core.field_mapper import FieldMapper
+            from core.field_detector import FieldDetector
+            
+            with self._timed_step('mapper_load'), contextlib.redirect_stdout(io.StringIO()):
+                self._field_mapper = FieldMapper()
+                self._field_detector = FieldDetector()
+        return self._field_mapper, self._field_detector
+    
+    def step2_predict_in_process(self, input_file: str) -> Optional[pd.DataFrame]:
+        """
+        Paso 2 (in-process): predicción con el DocumentTester ya cargado
+        """
+        self.pipeline_status['current_step'] = 'model_prediction'
+        logger.info("=" * 60)
+        logger.info("STEP 2: Running model prediction (in-process)")
+        logger.info("=" * 60)
+        
+        tester = self._get_document_tester()
+        if tester is None:
+            logger.error("Model prediction failed")
+            return None
+        
+        def predict():
+            test_df = tester.load_test_file(input_file, csv_format=self.pipeline_status['input_format'])
+            return tester.predict_file(test_df)
+        
+        success, predictions_df = self._execute_in_process(predict, "Model prediction")
+        if not success:
+            logger.error("Model prediction failed")
+            return None
+        
+        # Formato con el que se leyó realmente (sniffed o fallback)
+        if tester.last_csv_format:
+            self.pipeline_status['input_format'] = tester.last_csv_format
+        logger.info(f"✅ Predictions kept in memory: {len(predictions_df)} lines")
+        self.pipeline_status['steps_completed'].append('model_prediction')
+        return predictions_df
+    
+    def step3_process_in_process(self, predictions_df: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """
+        Paso 3 (in-process): estructurar las predicciones sin CSV intermedio
+        """
+        self.pipeline_status['current_step'] = 'process_predictions'
+        logger.info("=" * 60)
+        logger.info("STEP 3: Processing predictions (in-process)")
+        logger.info("=" * 60)
+        
+        from procesador_predicciones import procesar_predicciones_df
+        
+        success, processed_df = self._execute_in_process(
+            procesar_predicciones_df, "Predictions processing", predictions_df
+        )
+        if not success:
+            logger.error("Predictions processing failed")
+            return None
+        
+        logger.info(f"✅ Processed data kept in memory: {len(processed_df)} rows, "
+                    f"{len(processed_df.columns)} columns")
+        self.pipeline_status['steps_completed'].append('process_predictions')
+        return processed_df
+    
+    def step4_train_in_process(self, processed_df: pd.DataFrame, input_file: str,
+                               erp_hint: Optional[str] = None) -> Dict:
+        """
+        Paso 4 (in-process): AutomaticConfirmationTrainingSession sobre el DataFrame
+        procesado, reutilizando FieldMapper/FieldDetector
+        """
+        self.pipeline_status['current_step'] = 'automatic_trainer'
+        logger.info("=" * 60)
+        logger.info("STEP 4: Running automatic trainer (in-process)")
+        logger.info("=" * 60)
+        
+        if erp_hint is None and self.config['erp_detection'] != 'auto':
+            erp_hint = self.config['erp_detection']
+        if erp_hint:
+            logger.info(f"Using ERP hint: {erp_hint}")
+        
+        from automatic_confirmation_trainer import AutomaticConfirmationTrainingSession
+        
+        field_mapper, field_detector = self._get_field_components()
+        
+        def train():
+            session = AutomaticConfirmationTrainingSession(
+                input_file, erp_hint,
+                field_mapper=field_mapper, field_detector=field_detector,
+                dataframe=processed_df
+            )
+            if not session.initialize():
+                raise RuntimeError("Initialization failed")
+            return session.run_automatic_training()
+        
+        success, trainer_output = self._execute_in_process(train, "Automatic trainer")
+        trainer_output = trainer_output or {}
+        if success and not trainer_output.get('success'):
+            error_msg = f"❌ Automatic trainer failed: {trainer_output.get('error')}"
+            logger.error(error_msg)
+            self.pipeline_status['errors'].append(error_msg)
+        
+        # Las rutas salen directamente del resultado (sin parsear stdout)
+        result = {
+            'success': bool(trainer_output.get('success')),
+            'header_file': trainer_output.get('header_file'),
+            'detail_file': trainer_output.get('detail_file'),
+            'report_file': trainer_output.get('report_file')
+        }
+        
+        if result['success']:
+            logger.info(f"✅ Automatic trainer completed")
+            if result['header_file']:
+                logger.info(f"   Header: {result['header_file']}")
+            if result['detail_file']:
+                logger.info(f"   Detail: {result['detail_file']}")
+            if result['report_file']:
+                logger.info(f"   Report: {result['report_file']}")
+            
+            self.pipeline_status['steps_completed'].append('automatic_trainer')
+        else:
+            logger.error("Automatic trainer failed")
+        
+        return result
+    
     def step5_cleanup(self):
         """
         Paso 5: Limpiar archivos temporales (opcional)
@@ -328,6 +598,9 @@ class PipelineOrchestrator:
             f.write("=" * 70 + "\n\n")
             
             f.write(f"Timestamp: {self.timestamp}\n")
+            f.write(f"Execution Mode: {self.config.get('execution_mode')}\n")
+            if self.pipeline_status.get('prediction_backend'):
+                f.write(f"Prediction Server: {self.pipeline_status['prediction_backend']}\n")
             f.write(f"Start Time: {self.pipeline_status['start_time']}\n")
             f.write(f"End Time: {self.pipeline_status['end_time']}\n")
             
@@ -338,6 +611,20 @@ class PipelineOrchestrator:
             for step in self.pipeline_status['steps_completed']:
                 f.write(f"  ✅ {step}\n")
             
+            if self.pipeline_status['step_timings']:
+                f.write("\nSTEP TIMINGS:\n")
+                for step, seconds in self.pipeline_status['step_timings'].items():
+                    f.write(f"  ⏱️ {step}: {seconds:.3f} s\n")
+            
+            input_format = self.pipeline_status.get('input_format')
+            if input_format:
+                f.write("\nINPUT FORMAT:\n")
+                f.write(f"  - Encoding: {input_format['encoding']}\n")
+                f.write(f"  - Separator: {input_format['sep']!r}\n")
+                f.write(f"  - Columns: {input_format['columns']}\n")
+                if input_format.get('method'):
+                    f.write(f"  - Read: {input_format['method']}\n")
+            
             if self.pipeline_status['errors']:
                 f.write("\nERRORS:\n")
                 for error in self.pipeline_status['errors']:
@@ -370,7 +657,11 @@ class PipelineOrchestrator:
         """
         logger.info("🚀 Starting Pipeline Orchestrator")
         logger.info(f"Input file: {input_file}")
+        logger.info(f"Execution mode: {self.config.get('execution_mode')}")
         
+        # Estado limpio por ejecución: el orquestador puede procesar varios ficheros
+        self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.pipeline_status = self._new_pipeline_status()
         self.pipeline_status['start_time'] = datetime.now()
         results = {
             'success': False,
@@ -382,28 +673,43 @@ class PipelineOrchestrator:
         
         try:
             # Paso 1: Validar entrada
-            if not self.step1_validate_input(input_file):
+            with self._timed_step('validate_input'):
+                input_valid = self.step1_validate_input(input_file)
+            if not input_valid:
                 raise ValueError("Input validation failed")
             
             # Paso 2: Predicción del modelo
-            predictions_file = self.step2_run_model_prediction(input_file)
-            if not predictions_file:
+            with self._timed_step('model_prediction'):
+                if self.in_process:
+                    predictions = self.step2_predict_in_process(input_file)
+                else:
+                    predictions = self.step2_run_model_prediction(input_file)
+            if predictions is None:
                 raise RuntimeError("Model prediction failed")
             
             # Paso 3: Procesar predicciones
-            processed_file = self.step3_process_predictions(predictions_file)
-            if not processed_file:
+            with self._timed_step('process_predictions'):
+                if self.in_process:
+                    processed = self.step3_process_in_process(predictions)
+                else:
+                    processed = self.step3_process_predictions(predictions)
+            if processed is None:
                 raise RuntimeError("Predictions processing failed")
             
             # Paso 4: Automatic trainer
-            trainer_results = self.step4_run_automatic_trainer(processed_file, erp_hint)
+            with self._timed_step('automatic_trainer'):
+                if self.in_process:
+                    trainer_results = self.step4_train_in_process(processed, input_file, erp_hint)
+                else:
+                    trainer_results = self.step4_run_automatic_trainer(processed, erp_hint)
             results.update(trainer_results)
             
             if not trainer_results['success']:
                 raise RuntimeError("Automatic trainer failed")
             
             # Paso 5: Limpieza
-            self.step5_cleanup()
+            with self._timed_step('cleanup'):
+                self.step5_cleanup()
             
             results['success'] = True
             
@@ -446,6 +752,11 @@ class PipelineOrchestrator:
                 for error in self.pipeline_status['errors']:
                     print(f"   • {error}")
         
+        if self.pipeline_status['step_timings']:
+            print(f"\n⏱️ STEP TIMINGS ({self.config.get('execution_mode')}):")
+            for step, seconds in self.pipeline_status['step_timings'].items():
+                print(f"   • {step}: {seconds:.2f}s")
+        
         duration = (self.pipeline_status['end_time'] - self.pipeline_status['start_time']).total_seconds()
         print(f"\n⏱️ Total execution time: {duration:.2f} seconds")
         print("=" * 70)
@@ -462,12 +773,17 @@ Ejemplos de uso:
   python orquestador.py data_pre/ejemplo.csv --erp SAP
   python orquestador.py data_pre/ejemplo.csv --config custom_config.json
   python orquestador.py data_pre/ejemplo.csv --no-cleanup
+  python orquestador.py data_pre/a.csv data_pre/b.txt --in-process
+  python orquestador.py data_pre/a.csv --prediction-server http://127.0.0.1:8765
+  python orquestador.py data_pre/libro_sap_grande.txt --window-lines 50000
+  python orquestador.py --profile-startup
         """
     )
     
     parser.add_argument(
-        'input_file',
-        help='Archivo de entrada desde data-pre (CSV, TXT, XLSX)'
+        'input_files',
+        nargs='+',
+        help='Archivo(s) de entrada desde data-pre (CSV, TXT, XLSX)'
     )
     
     parser.add_argument(
@@ -489,12 +805,39 @@ Ejemplos de uso:
         help='No eliminar archivos temporales'
     )
     
+    parser.add_argument(
+        '--in-process',
+        action='store_true',
+        help='Ejecutar los pasos en el mismo proceso (modelo cargado una sola vez)'
+    )
+    
+    parser.add_argument(
+        '--prediction-server',
+        default=None,
+        help='Dirección de prediction_server.py (http://host:puerto o unix:///ruta.sock) para el paso 2'
+    )
+    
+    parser.add_argument(
+        '--window-lines',
+        type=int,
+        default=None,
+        help='Predicción por ventanas de N líneas en test_model.py (memoria constante, modo subprocess)'
+    )
+    
     parser.add_argument(
         '--verbose',
         action='store_true',
         help='Mostrar salida detallada'
     )
     
+    parser.add_argument(
+        '--profile-startup',
+        action='store_true',
+        help='Medir el tiempo de import en frío frente al presupuesto de arranque y salir'
+    )
+    
+    # Antes de parse_args: --profile-startup no requiere archivos de entrada
+    handle_profile_startup('orquestador')
     args = parser.parse_args()
     
     # Configurar nivel de logging
@@ -507,15 +850,24 @@ Ejemplos de uso:
     # Actualizar configuración si se especifica no-cleanup
     if args.no_cleanup:
         orchestrator.config['cleanup_temp_files'] = False
+    if args.in_process:
+        orchestrator.config['execution_mode'] = 'inprocess'
+    if args.prediction_server:
+        orchestrator.config['prediction_server'] = args.prediction_server
+    if args.window_lines:
+        orchestrator.config['prediction_window_lines'] = args.window_lines
     
-    # Ejecutar pipeline
-    results = orchestrator.run_pipeline(
-        input_file=args.input_file,
-        erp_hint=args.erp_hint
-    )
+    # Ejecutar pipeline (el mismo orquestador reutiliza modelo y mapper entre ficheros)
+    all_success = True
+    for input_file in args.input_files:
+        results = orchestrator.run_pipeline(
+            input_file=input_file,
+            erp_hint=args.erp_hint
+        )
+        all_success = all_success and results['success']
     
     # Retornar código de salida apropiado
-    sys.exit(0 if results['success'] else 1)
+    sys.exit(0 if all_success else 1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,573 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Servidor local de clasificación de líneas con el modelo residente
+Carga una sola vez model.pkl, el label encoder, feature_names y el DocumentFeatureExtractor
+y atiende ficheros o lotes de líneas por HTTP en localhost o en un socket Unix.
+
+Las features se calculan por petición (las contextuales dependen de las líneas vecinas y de
+la posición dentro del fichero); la inferencia se agrupa: las peticiones que llegan mientras
+el modelo está ocupado, o dentro de max_wait_ms, se unen en una sola llamada a predict_proba
+de hasta max_batch_lines líneas.
+
+Endpoints:
+    GET  /health         estado y modelo cargado
+    GET  /stats          latencias (p50/p90/p99), tamaños de lote y contadores
+    POST /predict        {"lines": [...], "file": "nombre"} → etiquetas y probabilidades
+    POST /predict_file   {"path": ..., "out": ...} → mismos CSV que test_model.py
+
+Solo se aceptan peticiones con Host local y sin cabecera Origin, y POST con Content-Type
+application/json (una página web no puede usar el servidor desde el navegador). /predict_file solo lee ficheros
+de los directorios de entrada (--input-dir, por defecto el directorio de trabajo) y solo escribe
+CSV dentro del directorio de resultados (--results-dir, por defecto predicciones).
+
+Uso:
+    python prediction_server.py --model-dir modelo --port 8765
+    python prediction_server.py --model-dir modelo --socket /tmp/smau_prediction.sock
+    python orquestador.py data_pre/ejemplo.csv --prediction-server http://127.0.0.1:8765
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import json
+import time
+import queue
+import socket
+import logging
+import argparse
+import threading
+import socketserver
+import http.client
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from startup_profiler import lazy_import, handle_profile_startup
+
+# numpy/pandas y el modelo se cargan al arrancar el servicio, no al importar (cliente ligero)
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Directorio donde /predict_file puede escribir (el mismo que usa el orquestador)
+DEFAULT_RESULTS_DIR = "predicciones"
+# Nombres de Host aceptados además del host de escucha (protección frente a DNS rebinding)
+LOCAL_HOSTNAMES = ("127.0.0.1", "localhost", "::1")
+# Lote máximo de inferencia y espera máxima para unir peticiones concurrentes
+DEFAULT_MAX_BATCH_LINES = 8192
+DEFAULT_MAX_WAIT_MS = 5.0
+# Muestras recientes usadas para los percentiles de /stats
+STATS_WINDOW = 10_000
+
+
+class PredictionServerError(RuntimeError):
+    """Error devuelto por el servidor (petición inválida o fallo de predicción)"""
+
+
+class _PendingBatch:
+    """Features de una petición esperando su parte del lote de inferencia"""
+    __slots__ = ('features', 'probas', 'error', 'done')
+
+    def __init__(self, features: pd.DataFrame):
+        self.features = features
+        self.probas = None
+        self.error: Optional[BaseException] = None
+        self.done = threading.Event()
+
+
+def _percentiles(values, points=(50, 90, 99)) -> Dict[str, Optional[float]]:
+    """Percentiles por rango más cercano, media y máximo de una ventana de muestras"""
+    ordered = sorted(values)
+    if not ordered:
+        return {**{f"p{point}": None for point in points}, 'mean': None, 'max': None}
+    summary = {f"p{point}": ordered[min(len(ordered) - 1, max(0, -(-point * len(ordered) // 100) - 1))]
+               for point in points}
+    summary['mean'] = sum(ordered) / len(ordered)
+    summary['max'] = ordered[-1]
+    return summary
+
+
+class PredictionService:
+    """
+    DocumentTester residente con un hilo de inferencia que agrupa peticiones.
+    Los métodos predict_* se pueden llamar desde varios hilos a la vez.
+    """
+
+    def __init__(self, model_dir: str = "modelo", max_batch_lines: int = DEFAULT_MAX_BATCH_LINES,
+                 max_wait_ms: float = DEFAULT_MAX_WAIT_MS, tester=None,
+                 input_dirs: Optional[List[str]] = None, results_dir: str = DEFAULT_RESULTS_DIR):
+        self.model_dir = model_dir
+        # predict_file solo lee bajo input_dirs y solo escribe bajo results_dir
+        self.input_dirs = [os.path.realpath(directory) for directory in (input_dirs or [os.getcwd()])]
+        self.results_dir = os.path.realpath(results_dir)
+        self.max_batch_lines = max(int(max_batch_lines), 1)
+        self.max_wait_ms = max(float(max_wait_ms), 0.0)
+        self.tester = tester
+        self._queue: queue.Queue = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._stats_lock = threading.Lock()
+        self._latencies_ms = deque(maxlen=STATS_WINDOW)
+        self._batch_lines = deque(maxlen=STATS_WINDOW)
+        self._batch_requests = deque(maxlen=STATS_WINDOW)
+        self._inference_ms = deque(maxlen=STATS_WINDOW)
+        # errors: fallos de predicción; rejected: peticiones inválidas (HTTP 400)
+        self.counters = {'requests': 0, 'file_requests': 0, 'lines': 0, 'errors': 0, 'rejected': 0,
+                         'batches': 0, 'coalesced_batches': 0}
+        self.started_at: Optional[float] = None
+        self.model_load_seconds: Optional[float] = None
+
+    # ---------------------------
+    # Ciclo de vida
+    # ---------------------------
+    def start(self) -> 'PredictionService':
+        """Carga el modelo (si no venía ya cargado) y arranca el hilo de inferencia"""
+        if self.tester is None:
+            from test_model import DocumentTester
+            start = time.perf_counter()
+            tester = DocumentTester(model_path=self.model_dir)
+            tester.load_model()
+            self.model_load_seconds = time.perf_counter() - start
+            self.tester = tester
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._batch_loop, name='prediction-batcher', daemon=True)
+            self._worker.start()
+        self.started_at = time.time()
+        return self
+
+    def stop(self):
+        if self._worker is not None:
+            self._queue.put(None)
+            self._worker.join(timeout=10)
+            self._worker = None
+
+    # ---------------------------
+    # Predicción
+    # ---------------------------
+    def predict_frame(self, test_df: pd.DataFrame) -> pd.DataFrame:
+        """Resultados de DocumentTester.predict_file para test_df, con la inferencia agrupada"""
+        start = time.perf_counter()
+        try:
+            features_df = self.tester.prepare_features(test_df)
+            pending = _PendingBatch(features_df)
+            self._queue.put(pending)
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            results_df = self.tester.results_from_probabilities(test_df, pending.probas)
+        except Exception:
+            with self._stats_lock:
+                self.counters['errors'] += 1
+            raise
+        with self._stats_lock:
+            self.counters['requests'] += 1
+            self.counters['lines'] += len(test_df)
+            self._latencies_ms.append((time.perf_counter() - start) * 1000)
+        return results_df
+
+    def predict_lines(self, lines: List[str], file_name: str = "request") -> pd.DataFrame:
+        """Clasifica un lote de líneas (mismo DataFrame que la lectura de un .txt)"""
+        texts = ["" if line is None else str(line) for line in lines]
+        return self.predict_frame(self.tester._lines_frame(file_name, texts))
+
+    def predict_file(self, path: str, out: Optional[str] = None, encoding: str = "utf-8") -> Dict[str, Any]:
+        """
+        Clasifica un fichero; con `out` escribe los CSV simple y detallado de test_model.py.
+        PermissionError si path no está en input_dirs o out (o su _detailed.csv) fuera de results_dir
+        """
+        start = time.perf_counter()
+        path = self._confined_path(path, self.input_dirs, 'path')
+        if out:
+            if not out.endswith('.csv'):
+                raise ValueError("'out' must be a .csv file")
+            out = self._confined_path(out, [self.results_dir], 'out')
+            self._confined_path(out.replace(".csv", "_detailed.csv"), [self.results_dir], 'out')
+        test_df = self.tester.load_test_file(path, encoding=encoding)
+        results_df = self.predict_frame(test_df)
+        with self._stats_lock:
+            self.counters['file_requests'] += 1
+        summary = {
+            'path': path,
+            'lines': len(results_df),
+            'label_counts': {str(label): int(count)
+                             for label, count in results_df['predicted_label'].value_counts().items()},
+            'results': results_df,
+        }
+        if out:
+            self.tester.save_results(results_df, output_file=out)
+            summary['out'] = out
+            summary['detailed_out'] = out.replace(".csv", "_detailed.csv")
+        summary['seconds'] = time.perf_counter() - start
+        return summary
+
+    @staticmethod
+    def _confined_path(path: str, roots: List[str], name: str) -> str:
+        """Ruta real (symlinks y .. resueltos) si está dentro de alguno de los directorios permitidos"""
+        resolved = os.path.realpath(path)
+        for root in roots:
+            if os.path.commonpath([resolved, root]) == root:
+                return resolved
+        raise PermissionError(f"'{name}' must be inside {', '.join(roots)}: {path}")
+
+    def _batch_loop(self):
+        """Une las peticiones en cola (hasta max_batch_lines o max_wait_ms) en un predict_proba"""
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            lines = len(first.features)
+            deadline = time.perf_counter() + self.max_wait_ms / 1000
+            while lines < self.max_batch_lines:
+                remaining = deadline - time.perf_counter()
+                try:
+                    pending = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if pending is None:
+                    stopping = True
+                    break
+                batch.append(pending)
+                lines += len(pending.features)
+            self._run_batch(batch, lines)
+
+    def _run_batch(self, batch: List[_PendingBatch], lines: int):
+        start = time.perf_counter()
+        try:
+            features = batch[0].features if len(batch) == 1 else pd.concat(
+                [pending.features for pending in batch], ignore_index=True)
+            probas = np.asarray(self.tester.predict_probabilities(features))
+            offset = 0
+            for pending in batch:
+                pending.probas = probas[offset:offset + len(pending.features)]
+                offset += len(pending.features)
+        except Exception as e:
+            for pending in batch:
+                pending.error = e
+        finally:
+            for pending in batch:
+                pending.done.set()
+        with self._stats_lock:
+            self.counters['batches'] += 1
+            self.counters['coalesced_batches'] += int(len(batch) > 1)
+            self._batch_lines.append(lines)
+            self._batch_requests.append(len(batch))
+            self._inference_ms.append((time.perf_counter() - start) * 1000)
+
+    # ---------------------------
+    # Estadísticas
+    # ---------------------------
+    def stats_report(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                'model_dir': self.model_dir,
+                'model_load_seconds': self.model_load_seconds,
+                'uptime_seconds': time.time() - self.started_at if self.started_at else 0.0,
+                'max_batch_lines': self.max_batch_lines,
+                'max_wait_ms': self.max_wait_ms,
+                'queue_depth': self._queue.qsize(),
+                **self.counters,
+                'latency_ms': _percentiles(self._latencies_ms),
+                'inference_ms': _percentiles(self._inference_ms),
+                'batch_lines': _percentiles(self._batch_lines),
+                'batch_requests': _percentiles(self._batch_requests),
+            }
+
+    def reset_stats(self):
+        with self._stats_lock:
+            for key in self.counters:
+                self.counters[key] = 0
+            for samples in (self._latencies_ms, self._batch_lines, self._batch_requests, self._inference_ms):
+                samples.clear()
+
+
+# ---------------------------
+# HTTP (localhost o socket Unix)
+# ---------------------------
+class _PredictionRequestHandler(BaseHTTPRequestHandler):
+    server_version = "SMAUPredictionServer/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        service = self.server.service
+        if not self._check_client():
+            return
+        if self.path == '/health':
+            self._send_json(200, {'status': 'ok', 'model_dir': service.model_dir,
+                                  'classes': [str(c) for c in service.tester.label_encoder.classes_]})
+        elif self.path == '/stats':
+            self._send_json(200, service.stats_report())
+        else:
+            self._send_json(404, {'error': f"Unknown endpoint: {self.path}"})
+
+    def do_POST(self):
+        service = self.server.service
+        if not self._check_client():
+            return
+        content_type = (self.headers.get('Content-Type') or '').split(';')[0].strip().lower()
+        if content_type != 'application/json':
+            self._reject(415, "Content-Type must be application/json")
+            return
+        try:
+            payload = self._read_json()
+            if self.path == '/predict':
+                lines = payload.get('lines')
+                if not isinstance(lines, list):
+                    raise ValueError("'lines' must be a list of strings")
+                results_df = service.predict_lines(lines, file_name=payload.get('file', 'request'))
+                self._send_json(200, _results_payload(results_df, service.tester.label_encoder.classes_))
+            elif self.path == '/predict_file':
+                path = payload.get('path')
+                if not path:
+                    raise ValueError("'path' is required")
+                summary = service.predict_file(path, out=payload.get('out'),
+                                               encoding=payload.get('encoding', 'utf-8'))
+                results_df = summary.pop('results')
+                if not summary.get('out'):
+                    summary.update(_results_payload(results_df, service.tester.label_encoder.classes_))
+                self._send_json(200, summary)
+            else:
+                self._send_json(404, {'error': f"Unknown endpoint: {self.path}"})
+        except PermissionError as e:
+            self._reject(403, f"{type(e).__name__}: {e}")
+        except (ValueError, FileNotFoundError) as e:
+            self._reject(400, f"{type(e).__name__}: {e}")
+        except Exception as e:
+            logger.exception("Prediction request failed")
+            self._send_json(500, {'error': f"{type(e).__name__}: {e}"})
+
+    def _check_client(self) -> bool:
+        """
+        Host local y sin Origin: el servidor no tiene interfaz web, así que una petición con
+        Origin viene de un navegador (p. ej. un POST cross-origin de otra página) y se rechaza.
+        Validar Host evita que se lea mediante DNS rebinding
+        """
+        host = self.headers.get('Host')
+        if host is None or urlsplit(f"//{host}").hostname not in self.server.allowed_hostnames:
+            self._reject(403, f"Host not allowed: {host}")
+            return False
+        origin = self.headers.get('Origin')
+        if origin is not None:
+            self._reject(403, f"Origin not allowed: {origin}")
+            return False
+        return True
+
+    def _reject(self, status: int, error: str):
+        """
+        Petición inválida o no permitida (contador 'rejected'). Cierra la conexión: el cuerpo
+        de un POST rechazado puede no haberse leído y se tomaría como la siguiente petición
+        """
+        service = self.server.service
+        with service._stats_lock:
+            service.counters['rejected'] += 1
+        self._send_json(status, {'error': error}, close=True)
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b'{}'
+        try:
+            payload = json.loads(body.decode('utf-8'))
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON body: {e}")
+        if not isinstance(payload, dict):
+            raise ValueError("JSON body must be an object")
+        return payload
+
+    def _send_json(self, status: int, payload: Dict[str, Any], close: bool = False):
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if close:
+            # send_header también marca close_connection
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self) -> str:
+        # En un socket Unix client_address es '' (sin host)
+        return self.client_address[0] if isinstance(self.client_address, tuple) else 'unix'
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def _results_payload(results_df: pd.DataFrame, classes) -> Dict[str, Any]:
+    prob_columns = [f"prob_{class_name}" for class_name in classes]
+    return {
+        'lines': len(results_df),
+        'classes': [str(class_name) for class_name in classes],
+        'line_no': results_df['line_no'].astype(int).tolist(),
+        'predicted_label': results_df['predicted_label'].astype(str).tolist(),
+        'confidence': results_df['confidence'].astype(float).tolist(),
+        'probabilities': results_df[prob_columns].to_numpy(dtype=float).tolist(),
+    }
+
+
+class PredictionHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service: PredictionService):
+        super().__init__(address, _PredictionRequestHandler)
+        self.service = service
+        self.allowed_hostnames = {*LOCAL_HOSTNAMES, address[0]}
+
+
+if hasattr(socketserver, 'UnixStreamServer'):
+    class PredictionUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+        def __init__(self, socket_path: str, service: PredictionService):
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)  # socket de una ejecución anterior
+            super().__init__(socket_path, _PredictionRequestHandler)
+            self.service = service
+            self.allowed_hostnames = set(LOCAL_HOSTNAMES)
+
+        def server_close(self):
+            super().server_close()
+            if os.path.exists(self.server_address):
+                os.unlink(self.server_address)
+
+
+def create_server(service: PredictionService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                  socket_path: Optional[str] = None):
+    """Servidor HTTP sobre el servicio ya arrancado (socket Unix si se indica socket_path)"""
+    if socket_path:
+        if not hasattr(socketserver, 'UnixStreamServer'):
+            raise ValueError("Unix sockets are not available on this platform")
+        return PredictionUnixServer(socket_path, service)
+    return PredictionHTTPServer((host, port), service)
+
+
+def server_address(server) -> str:
+    """Dirección para PredictionClient / --prediction-server"""
+    if isinstance(server.server_address, str):
+        return f"unix://{server.server_address}"
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
+
+
+# ---------------------------
+# Cliente (solo stdlib: el orquestador lo usa sin cargar pandas ni el modelo)
+# ---------------------------
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: float):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class PredictionClient:
+    """
+    Cliente de prediction_server.
+    address: 'http://127.0.0.1:8765' o 'unix:///tmp/smau_prediction.sock'
+    """
+
+    def __init__(self, address: str, timeout: float = 600.0):
+        self.address = address
+        self.timeout = timeout
+        parts = urlsplit(address if '://' in address else f"http://{address}")
+        self.scheme = parts.scheme
+        if self.scheme == 'unix':
+            self.socket_path = parts.path or parts.netloc
+        elif self.scheme == 'http':
+            self.host = parts.hostname or DEFAULT_HOST
+            self.port = parts.port or DEFAULT_PORT
+        else:
+            raise ValueError(f"Unsupported prediction server address: {address}")
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if self.scheme == 'unix':
+            return _UnixHTTPConnection(self.socket_path, self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def _request(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        connection = self._connection()
+        try:
+            body = json.dumps(payload).encode('utf-8') if payload is not None else None
+            headers = {'Content-Type': 'application/json'} if body is not None else {}
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            data = json.loads(response.read().decode('utf-8') or '{}')
+        finally:
+            connection.close()
+        if response.status != 200:
+            raise PredictionServerError(data.get('error', f"HTTP {response.status}"))
+        return data
+
+    def health(self) -> Dict[str, Any]:
+        return self._request('GET', '/health')
+
+    def stats(self) -> Dict[str, Any]:
+        return self._request('GET', '/stats')
+
+    def predict_lines(self, lines: List[str], file_name: str = "request") -> Dict[str, Any]:
+        return self._request('POST', '/predict', {'lines': list(lines), 'file': file_name})
+
+    def predict_file(self, path: str, out: Optional[str] = None, encoding: str = "utf-8") -> Dict[str, Any]:
+        """Rutas absolutas: el servidor puede tener otro directorio de trabajo"""
+        payload = {'path': os.path.abspath(path), 'encoding': encoding}
+        if out:
+            payload['out'] = os.path.abspath(out)
+        return self._request('POST', '/predict_file', payload)
+
+
+# ---------------------------
+# CLI
+# ---------------------------
+def build_argparser():
+    parser = argparse.ArgumentParser(
+        description="Servidor local de clasificación de líneas con el modelo cargado en memoria."
+    )
+    parser.add_argument("--model-dir", default="modelo", help="Directorio con el modelo entrenado.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Host HTTP (por defecto solo localhost).")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Puerto HTTP.")
+    parser.add_argument("--socket", dest="socket_path", default=None,
+                        help="Escuchar en un socket Unix en lugar de TCP.")
+    parser.add_argument("--input-dir", dest="input_dirs", action="append", default=None,
+                        help="Directorio desde el que /predict_file puede leer (repetible; "
+                             "por defecto el directorio de trabajo).")
+    parser.add_argument("--results-dir", default=DEFAULT_RESULTS_DIR,
+                        help="Directorio en el que /predict_file puede escribir.")
+    parser.add_argument("--max-batch-lines", type=int, default=DEFAULT_MAX_BATCH_LINES,
+                        help="Líneas máximas por llamada a predict_proba.")
+    parser.add_argument("--max-wait-ms", type=float, default=DEFAULT_MAX_WAIT_MS,
+                        help="Espera máxima para agrupar peticiones concurrentes.")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Medir el tiempo de import en frío frente al presupuesto de arranque y salir.")
+    return parser
+
+
+def main():
+    handle_profile_startup("prediction_server")
+    args = build_argparser().parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    service = PredictionService(args.model_dir, max_batch_lines=args.max_batch_lines,
+                                max_wait_ms=args.max_wait_ms, input_dirs=args.input_dirs,
+                                results_dir=args.results_dir).start()
+    server = create_server(service, args.host, args.port, args.socket_path)
+    print(f"🚀 Prediction server listening on {server_address(server)} "
+          f"(model loaded in {service.model_load_seconds:.2f}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping prediction server")
+    finally:
+        server.server_close()
+        service.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@
 
 import argparse
 import csv
+import io
 import os
 import sys
 import re
@@ -100,12 +101,8 @@ def _process_hd(df: pd.DataFrame, text_col: str, label_col: str) -> list[list[st
     return rows
 
 
-def procesar_csv_entrada(ruta_in: str, ruta_out: str):
-    if not os.path.exists(ruta_in):
-        raise FileNotFoundError(f"No se encontró el archivo de entrada: {ruta_in}")
-
-    # No activar recortes automáticos: mantener espacios/tabs en 'text'
-    df = pd.read_csv(ruta_in, dtype=str, keep_default_na=False)
+def construir_filas(df: pd.DataFrame) -> list[list[str]]:
+    """Construye las filas estructuradas (cabeceras + datos) a partir de las predicciones."""
     text_col = "text" if "text" in df.columns else None
     if text_col is None:
         raise ValueError("El CSV de entrada debe contener una columna 'text'.")
@@ -116,15 +113,39 @@ def procesar_csv_entrada(ruta_in: str, ruta_out: str):
     modo = _detect_mode(labels_upper)
 
     if modo == "HPC":
-        rows = _process_hpc(df, text_col, label_col)
-    else:
-        rows = _process_hd(df, text_col, label_col)
+        return _process_hpc(df, text_col, label_col)
+    return _process_hd(df, text_col, label_col)
+
+
+def escribir_filas(rows: list[list[str]], f):
+    writer = csv.writer(f, quoting=csv.QUOTE_ALL, lineterminator="\n")
+    for r in rows:
+        writer.writerow(r)
+
+
+def procesar_predicciones_df(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Versión en memoria de procesar_csv_entrada (modo in-process del orquestador).
+    Devuelve el mismo DataFrame que obtendría el automatic trainer al leer el CSV de
+    salida: las filas se serializan a un buffer y se parsean con pd.read_csv.
+    """
+    buffer = io.StringIO()
+    escribir_filas(construir_filas(df.fillna("")), buffer)
+    buffer.seek(0)
+    return pd.read_csv(buffer)
+
+
+def procesar_csv_entrada(ruta_in: str, ruta_out: str):
+    if not os.path.exists(ruta_in):
+        raise FileNotFoundError(f"No se encontró el archivo de entrada: {ruta_in}")
+
+    # No activar recortes automáticos: mantener espacios/tabs en 'text'
+    df = pd.read_csv(ruta_in, dtype=str, keep_default_na=False)
+    rows = construir_filas(df)
 
     os.makedirs(os.path.dirname(ruta_out) or ".", exist_ok=True)
     with open(ruta_out, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f, quoting=csv.QUOTE_ALL, lineterminator="\n")
-        for r in rows:
-            writer.writerow(r)
+        escribir_filas(rows, f)
 
 
 def main():
@@ -0,0 +1,337 @@
+# stage_metrics.py
+"""
+Tiempos y memoria por etapa del pipeline
+`with stage('balance_validation', rows=len(df)):` o `@timed('report')` acumulan por etapa
+el tiempo real, el tiempo de CPU, las filas procesadas y el pico de memoria. Las etapas
+anidadas se registran por ruta ('field_detection/column_mapping') para ver qué parte de
+cada fase domina. Desactivado (SMAU_STAGE_METRICS=0) stage() devuelve un contexto vacío
+compartido y el coste es una comprobación de un flag.
+
+Variables de entorno:
+    SMAU_STAGE_METRICS=0        no registrar nada
+    SMAU_STAGE_TRACEMALLOC=1    pico de memoria Python por etapa con tracemalloc (más lento)
+    SMAU_STAGE_PROFILE=<dir>    volcado cProfile (.prof) por etapa en <dir> ('1' → results/stage_profiles)
+    SMAU_STAGE_PROFILE_STAGES   etapas a perfilar separadas por comas (por defecto las de primer nivel)
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+STAGE_METRICS_ENV = 'SMAU_STAGE_METRICS'
+STAGE_TRACEMALLOC_ENV = 'SMAU_STAGE_TRACEMALLOC'
+STAGE_PROFILE_ENV = 'SMAU_STAGE_PROFILE'
+STAGE_PROFILE_STAGES_ENV = 'SMAU_STAGE_PROFILE_STAGES'
+DEFAULT_PROFILE_DIR = os.path.join('results', 'stage_profiles')
+
+_MB = 1024 * 1024
+
+# ruta de la etapa → {'name', 'depth', 'calls', 'errors', 'wall_seconds', 'cpu_seconds', 'rows',
+#                     'peak_memory_mb', 'rss_peak_mb', 'keys', 'profiles'}
+stage_metrics: Dict[str, Dict[str, Any]] = {}
+
+_lock = threading.Lock()
+_local = threading.local()
+_settings = {'enabled': True, 'trace_memory': False, 'profile_dir': None, 'profile_stages': None}
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None or not value.strip():
+        return default
+    return value.strip().lower() not in ('0', 'false', 'no', 'off')
+
+
+def configure_stage_metrics(enabled: Optional[bool] = None, trace_memory: Optional[bool] = None,
+                            profile_dir: Optional[str] = None, profile_stages: Optional[List[str]] = None):
+    """
+    Activa/desactiva el registro. Sin argumentos relee las variables de entorno;
+    profile_dir='' desactiva los volcados de cProfile
+    """
+    if enabled is None and trace_memory is None and profile_dir is None and profile_stages is None:
+        enabled = _env_flag(STAGE_METRICS_ENV, True)
+        trace_memory = _env_flag(STAGE_TRACEMALLOC_ENV, False)
+        profile_dir = os.environ.get(STAGE_PROFILE_ENV, '').strip()
+        if profile_dir.lower() in ('1', 'true', 'yes', 'on'):
+            profile_dir = DEFAULT_PROFILE_DIR
+        stages = os.environ.get(STAGE_PROFILE_STAGES_ENV, '')
+        profile_stages = [name.strip() for name in stages.split(',') if name.strip()]
+    if enabled is not None:
+        _settings['enabled'] = bool(enabled)
+    if trace_memory is not None:
+        _settings['trace_memory'] = bool(trace_memory)
+    if profile_dir is not None:
+        _settings['profile_dir'] = profile_dir or None
+    if profile_stages is not None:
+        _settings['profile_stages'] = set(profile_stages) or None
+
+
+def stage_metrics_enabled() -> bool:
+    return _settings['enabled']
+
+
+class _NullStage:
+    """Contexto sin efecto cuando el registro está desactivado"""
+    __slots__ = ()
+
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    """Una ejecución de una etapa; `rows` puede fijarse dentro del bloque"""
+    __slots__ = ('name', 'rows', 'key', 'path', 'depth', 'child_peak', 'profile',
+                 '_wall', '_cpu', '_traced')
+
+    def __init__(self, name: str, rows: Optional[int], key: Optional[str]):
+        self.name = name
+        self.rows = rows
+        self.key = key
+        self.child_peak = 0
+        self.profile = None
+
+    def __enter__(self):
+        stack = _stage_stack()
+        parent = stack[-1] if stack else None
+        self.path = f"{parent.path}/{self.name}" if parent else self.name
+        self.depth = len(stack)
+        stack.append(self)
+        # La entrada se crea al empezar: el informe sigue el orden de inicio (padre antes que hijos)
+        _stats_entry(self)
+
+        if _settings['trace_memory']:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            current, peak = tracemalloc.get_traced_memory()
+            if parent is not None:
+                # reset_peak es global: el pico que lleva la etapa padre no debe perderse
+                parent.child_peak = max(parent.child_peak, peak)
+            tracemalloc.reset_peak()
+            self._traced = current
+        else:
+            self._traced = None
+
+        if _settings['profile_dir'] and self._should_profile(stack):
+            import cProfile
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+
+        self._cpu = time.process_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall_seconds = time.perf_counter() - self._wall
+        cpu_seconds = time.process_time() - self._cpu
+        profile_path = None
+        if self.profile is not None:
+            self.profile.disable()
+            profile_path = self._dump_profile()
+
+        peak_memory_mb = None
+        if self._traced is not None:
+            import tracemalloc
+            if tracemalloc.is_tracing():
+                peak = max(tracemalloc.get_traced_memory()[1], self.child_peak)
+                peak_memory_mb = max(peak - self._traced, 0) / _MB
+
+        stack = _stage_stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+        if stack and self._traced is not None and peak_memory_mb is not None:
+            stack[-1].child_peak = max(stack[-1].child_peak, self._traced + int(peak_memory_mb * _MB))
+
+        _record(self, wall_seconds, cpu_seconds, peak_memory_mb, _rss_peak_mb(), profile_path,
+                exc_type is not None)
+        return False
+
+    def _should_profile(self, stack: List['_Stage']) -> bool:
+        # Un solo perfilador activo a la vez: las etapas anidadas quedan dentro del volcado del padre
+        if any(outer.profile is not None for outer in stack[:-1]):
+            return False
+        selected = _settings['profile_stages']
+        return self.name in selected if selected else self.depth == 0
+
+    def _dump_profile(self) -> Optional[str]:
+        try:
+            profile_dir = _settings['profile_dir']
+            os.makedirs(profile_dir, exist_ok=True)
+            label = self.path if self.key is None else f"{self.path}_{self.key}"
+            label = re.sub(r'[^A-Za-z0-9_.-]+', '_', label)[:120]
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+            path = os.path.join(profile_dir, f"{label}_{os.getpid()}_{timestamp}.prof")
+            self.profile.dump_stats(path)
+            return path
+        except Exception as e:
+            print(f"⚠️ Could not write cProfile dump for stage '{self.path}': {e}")
+            return None
+
+
+def _stage_stack() -> List[_Stage]:
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def _rss_peak_mb() -> Optional[float]:
+    """Pico de memoria residente del proceso hasta ahora (None si no está disponible)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux da KB; macOS, bytes
+    return peak / _MB if sys.platform == 'darwin' else peak / 1024
+
+
+def _stats_entry(run: _Stage) -> Dict[str, Any]:
+    with _lock:
+        return stage_metrics.setdefault(run.path, {
+            'name': run.name, 'depth': run.depth, 'calls': 0, 'errors': 0,
+            'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'rows': 0,
+            'peak_memory_mb': None, 'rss_peak_mb': None, 'keys': {}, 'profiles': [],
+        })
+
+
+def _record(run: _Stage, wall_seconds: float, cpu_seconds: float, peak_memory_mb: Optional[float],
+            rss_peak_mb: Optional[float], profile_path: Optional[str], failed: bool):
+    stats = _stats_entry(run)
+    with _lock:
+        stats['calls'] += 1
+        stats['errors'] += int(failed)
+        stats['wall_seconds'] += wall_seconds
+        stats['cpu_seconds'] += cpu_seconds
+        stats['rows'] += int(run.rows or 0)
+        if peak_memory_mb is not None:
+            stats['peak_memory_mb'] = max(stats['peak_memory_mb'] or 0.0, peak_memory_mb)
+        if rss_peak_mb is not None:
+            stats['rss_peak_mb'] = max(stats['rss_peak_mb'] or 0.0, rss_peak_mb)
+        if run.key is not None:
+            stats['keys'][str(run.key)] = stats['keys'].get(str(run.key), 0.0) + wall_seconds
+        if profile_path:
+            stats['profiles'].append(profile_path)
+
+
+def stage(name: str, rows: Optional[int] = None, key: Optional[Any] = None):
+    """
+    Contexto que registra una ejecución de la etapa `name`.
+
+    Args:
+        rows: Filas procesadas (también se puede asignar `.rows` dentro del bloque)
+        key: Desglose opcional dentro de la etapa (p.ej. la columna en column_mapping)
+    """
+    if not _settings['enabled']:
+        return _NULL_STAGE
+    return _Stage(name, rows, key)
+
+
+def timed(name: Optional[str] = None) -> Callable:
+    """Decorador: cada llamada a la función es una ejecución de la etapa (por defecto su nombre)"""
+    def decorator(function: Callable) -> Callable:
+        stage_name = name or function.__name__.lstrip('_')
+
+        def wrapper(*args, **kwargs):
+            if not _settings['enabled']:
+                return function(*args, **kwargs)
+            with _Stage(stage_name, None, None):
+                return function(*args, **kwargs)
+
+        wrapper.__name__ = function.__name__
+        wrapper.__qualname__ = function.__qualname__
+        wrapper.__doc__ = function.__doc__
+        wrapper.__wrapped__ = function
+        return wrapper
+    return decorator
+
+
+def stage_metrics_report() -> Dict[str, Dict[str, Any]]:
+    """Métricas por ruta de etapa terminada, en orden de inicio, con filas por segundo"""
+    with _lock:
+        report = {}
+        for path, stats in stage_metrics.items():
+            if not stats['calls']:
+                continue  # todavía en curso
+            entry = {key: (dict(value) if isinstance(value, dict) else
+                           list(value) if isinstance(value, list) else value)
+                     for key, value in stats.items()}
+            entry['rows_per_second'] = (stats['rows'] / stats['wall_seconds']
+                                        if stats['rows'] and stats['wall_seconds'] else None)
+            report[path] = entry
+        return report
+
+
+def format_stage_metrics(report: Optional[Dict[str, Dict[str, Any]]] = None, max_keys: int = 5) -> List[str]:
+    """Líneas de texto (una por etapa, sangradas por nivel) para consola y reportes"""
+    report = stage_metrics_report() if report is None else report
+    lines = []
+    for stats in report.values():
+        memory = ''
+        if stats.get('peak_memory_mb') is not None:
+            memory += f", peak {stats['peak_memory_mb']:.1f} MB"
+        if stats.get('rss_peak_mb') is not None:
+            memory += f", RSS {stats['rss_peak_mb']:.0f} MB"
+        rows = f", {stats['rows']:,} rows" if stats.get('rows') else ''
+        calls = f" x{stats['calls']}" if stats['calls'] > 1 else ''
+        indent = '  ' * stats['depth']
+        lines.append(f"{indent}{stats['name']}{calls}: {stats['wall_seconds']:.3f}s wall, "
+                     f"{stats['cpu_seconds']:.3f}s CPU{rows}{memory}")
+        slowest = sorted(stats.get('keys', {}).items(), key=lambda item: item[1], reverse=True)[:max_keys]
+        for key, seconds in slowest:
+            lines.append(f"{indent}  - {key}: {seconds:.3f}s")
+    return lines
+
+
+def print_stage_metrics_report():
+    """Imprime el tiempo y la memoria de cada etapa registrada"""
+    lines = format_stage_metrics()
+    if not lines:
+        return
+    print(f"\n⏱️ STAGE METRICS:")
+    for line in lines:
+        print(f"   {line}")
+
+
+def write_stage_metrics(path: str, extra: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """JSON con las métricas por etapa (sidecar del reporte); None si no hay nada registrado"""
+    report = stage_metrics_report()
+    if not report:
+        return None
+    payload = {
+        'generated': datetime.now().isoformat(),
+        'pid': os.getpid(),
+        'tracemalloc': _settings['trace_memory'],
+        **(extra or {}),
+        'stages': report,
+    }
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2, ensure_ascii=False, default=str)
+    return path
+
+
+def reset_stage_metrics():
+    with _lock:
+        stage_metrics.clear()
+
+
+configure_stage_metrics()
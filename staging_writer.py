@@ -0,0 +1,337 @@
+# staging_writer.py
+"""
+Ficheros de staging en formato columnar (Parquet / Feather)
+El cargador posterior pasa más tiempo volviendo a parsear los CSV de header/detail que
+el que se tarda en generarlos. En Parquet/Feather cada columna se guarda con su tipo de
+staging (importes float64, fechas date32, periodos int64) y las columnas de texto con
+pocos valores distintos (journal_entry_id, gl_account_number, debit_credit_indicator...)
+con diccionario, así que se leen sin parsear y ocupan una fracción del CSV.
+CSV sigue siendo el formato por defecto; pyarrow solo se importa al escribir otro formato
+"""
+
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from date_inference import date_format_inferencer
+
+# Formato → extensión del fichero
+OUTPUT_FORMATS = {'csv': '.csv', 'parquet': '.parquet', 'feather': '.feather'}
+DEFAULT_OUTPUT_FORMAT = 'csv'
+# Filas por row group (Parquet) o por record batch (Feather)
+DEFAULT_ROW_GROUP_SIZE = 100_000
+# Columnas con valores distintos / filas por debajo de este ratio se guardan con diccionario
+DICTIONARY_MAX_RATIO = 0.5
+# Compresión por defecto de cada formato
+DEFAULT_COMPRESSION = {'parquet': 'zstd', 'feather': 'lz4'}
+
+# Tipos explícitos de las columnas de staging; las demás son texto. Si una columna tiene
+# valores que no encajan en su tipo se guarda como texto (nunca se pierden valores)
+STAGING_DTYPES = {
+    'amount': 'float64',
+    'total_debit_amount': 'float64',
+    'total_credit_amount': 'float64',
+    'period_ending_balance': 'float64',
+    'period_beginning_balance': 'float64',
+    'period_activity_debit': 'float64',
+    'period_activity_credit': 'float64',
+    'line_number': 'int64',
+    'line_count': 'int64',
+    'fiscal_year': 'int64',
+    'period_number': 'int64',
+    'entry_date': 'date',
+    'posting_date': 'date',
+    'reversal_date': 'date',
+    'effective_date': 'date',
+    'approval_date': 'date',
+    'period_ending_date': 'date',
+}
+
+# Ensanchamiento de tipos entre bloques del modo streaming
+_WIDER_KIND = {
+    frozenset({'int64', 'float64'}): 'float64',
+    frozenset({'date', 'timestamp'}): 'timestamp',
+}
+
+
+def normalize_output_format(output_format: Optional[str]) -> str:
+    """'csv', 'parquet' o 'feather' (admite mayúsculas y punto inicial)"""
+    normalized = (output_format or DEFAULT_OUTPUT_FORMAT).lower().lstrip('.')
+    if normalized not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format: {output_format} "
+                         f"(use one of: {', '.join(OUTPUT_FORMATS)})")
+    return normalized
+
+
+def staging_path(base_path: str, output_format: str) -> str:
+    """Ruta con la extensión del formato (sustituye .csv/.parquet/.feather si ya la tiene)"""
+    root, extension = os.path.splitext(base_path)
+    if extension.lower() in OUTPUT_FORMATS.values():
+        base_path = root
+    return base_path + OUTPUT_FORMATS[normalize_output_format(output_format)]
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        import pyarrow.feather
+        return pyarrow
+    except ImportError:
+        raise ImportError("Parquet/Feather output requires pyarrow. Install with: pip install pyarrow")
+
+
+# ==============================
+# TIPOS DE STAGING POR COLUMNA
+# ==============================
+
+def _is_text(series: pd.Series) -> bool:
+    return not (pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_any_dtype(series)
+                or isinstance(series.dtype, pd.CategoricalDtype))
+
+
+def _present(series: pd.Series, strip: bool) -> np.ndarray:
+    """Valores no nulos ni vacíos (en CSV un nulo y '' se escriben igual)"""
+    present = series.notna().to_numpy(dtype=bool, copy=True)
+    if _is_text(series) and present.any():
+        text = series[present].astype(str)
+        present[present] = (text.str.strip() if strip else text).to_numpy(dtype=object) != ''
+    return present
+
+
+def _numeric_values(series: pd.Series, present: np.ndarray) -> pd.Series:
+    """Valores numéricos (NaN donde falta o no es un número)"""
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series.astype('float64').where(present)
+    text = series.astype(object).where(present)
+    return pd.to_numeric(text.astype(str).str.strip().where(present), errors='coerce')
+
+
+def _date_values(series: pd.Series, present: np.ndarray) -> pd.Series:
+    """Fechas con el formato inferido para la columna (NaT donde falta o no es una fecha)"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        parsed = series.dt.tz_localize(None) if getattr(series.dt, 'tz', None) is not None else series
+        return parsed.astype('datetime64[us]').where(present)
+    values = series.astype(object).where(present, None)
+    return date_format_inferencer.parse(values).where(present)
+
+
+def column_kind(series: pd.Series, name: str) -> str:
+    """Tipo de staging de una columna: float64, int64, date, timestamp o string"""
+    target = STAGING_DTYPES.get(name, 'string')
+    if target == 'string':
+        return 'string'
+    present = _present(series, strip=True)
+    if not present.any():
+        return target
+    if target in ('float64', 'int64'):
+        values = _numeric_values(series, present)
+        if values.isna().to_numpy()[present].any():
+            return 'string'
+        if target == 'int64':
+            present_values = values.to_numpy()[present]
+            if not (np.mod(present_values, 1) == 0).all() or np.abs(present_values).max() >= 2 ** 53:
+                return 'float64'
+        return target
+    parsed = _date_values(series, present)
+    present_dates = parsed[present]
+    if present_dates.isna().any():
+        return 'string'
+    if (present_dates != present_dates.dt.normalize()).any():
+        return 'timestamp'
+    return 'date'
+
+
+def merge_kinds(first: str, second: str) -> str:
+    """Tipo común de dos bloques (int64 + float64 → float64; cualquiera + string → string)"""
+    if first == second:
+        return first
+    return _WIDER_KIND.get(frozenset({first, second}), 'string')
+
+
+def _low_cardinality(series: pd.Series) -> bool:
+    if series.empty:
+        return False
+    return series.nunique(dropna=True) / len(series) <= DICTIONARY_MAX_RATIO
+
+
+def _to_arrow_array(pa, series: pd.Series, kind: str, dictionary: bool):
+    if kind in ('float64', 'int64'):
+        present = _present(series, strip=True)
+        values = _numeric_values(series, present).to_numpy(dtype='float64')
+        valid = ~np.isnan(values)
+        if kind == 'float64':
+            return pa.array(values, mask=~valid, type=pa.float64())
+        return pa.array(np.where(valid, values, 0).astype(np.int64), mask=~valid, type=pa.int64())
+    if kind in ('date', 'timestamp'):
+        present = _present(series, strip=True)
+        parsed = _date_values(series, present).to_numpy(dtype='datetime64[us]')
+        valid = ~np.isnat(parsed)
+        if kind == 'date':
+            return pa.array(parsed.astype('datetime64[D]'), mask=~valid, type=pa.date32())
+        return pa.array(parsed, mask=~valid, type=pa.timestamp('us'))
+    present = _present(series, strip=False)
+    text = np.full(len(series), None, dtype=object)
+    text[present] = series[present].astype(str).to_numpy(dtype=object)
+    array = pa.array(text, type=pa.string())
+    return array.dictionary_encode() if dictionary else array
+
+
+def plan_columns(df: pd.DataFrame) -> Dict[str, str]:
+    """Tipo de staging de cada columna del DataFrame"""
+    return {column: column_kind(df[column], column) for column in df.columns}
+
+
+def to_arrow_table(df: pd.DataFrame, kinds: Dict[str, str] = None, dictionary_columns: List[str] = None):
+    """
+    Tabla Arrow con los tipos de staging. Sin dictionary_columns se usa diccionario en las
+    columnas de texto con pocos valores distintos
+    """
+    pa = _require_pyarrow()
+    kinds = kinds or plan_columns(df)
+    if dictionary_columns is None:
+        dictionary_columns = [column for column in df.columns
+                              if kinds[column] == 'string' and _low_cardinality(df[column])]
+    arrays = [_to_arrow_array(pa, df[column], kinds[column], column in dictionary_columns)
+              for column in df.columns]
+    return pa.Table.from_arrays(arrays, names=[str(column) for column in df.columns])
+
+
+# ==============================
+# ESCRITURA
+# ==============================
+
+def write_staging_file(df: pd.DataFrame, path: str, output_format: str = DEFAULT_OUTPUT_FORMAT,
+                       row_group_size: int = DEFAULT_ROW_GROUP_SIZE, compression: Optional[str] = None,
+                       **csv_kwargs) -> Dict[str, Any]:
+    """
+    Escribe un DataFrame de staging en CSV, Parquet o Feather.
+
+    Args:
+        path: Ruta de salida (la extensión se ajusta al formato)
+        row_group_size: Filas por row group (Parquet) o record batch (Feather)
+        csv_kwargs: Argumentos de to_csv para el formato CSV
+
+    Returns:
+        Dict con la ruta escrita, tipos por columna, columnas con diccionario, bytes y segundos
+    """
+    start_time = time.perf_counter()
+    output_format = normalize_output_format(output_format)
+    path = staging_path(path, output_format)
+    kinds: Dict[str, str] = {}
+    dictionary_columns: List[str] = []
+
+    if output_format == 'csv':
+        df.to_csv(path, index=False, **{'encoding': 'utf-8', **csv_kwargs})
+    else:
+        pa = _require_pyarrow()
+        kinds = plan_columns(df)
+        # Páginas de diccionario en Parquet para las columnas de pocos valores distintos de
+        # cualquier tipo; tipo diccionario de Arrow solo en las de texto
+        low_cardinality = [str(column) for column in df.columns if _low_cardinality(df[column])]
+        table = to_arrow_table(df, kinds, [column for column in low_cardinality if kinds[column] == 'string'])
+        dictionary_columns = [field.name for field in table.schema if pa.types.is_dictionary(field.type)]
+        compression = compression or DEFAULT_COMPRESSION[output_format]
+        if output_format == 'parquet':
+            pa.parquet.write_table(table, path, row_group_size=max(int(row_group_size), 1),
+                                   use_dictionary=low_cardinality or False,
+                                   compression=compression)
+        else:
+            pa.feather.write_feather(table, path, chunksize=max(int(row_group_size), 1),
+                                     compression=compression)
+
+    return {
+        'path': path,
+        'format': output_format,
+        'rows': len(df),
+        'column_types': kinds,
+        'dictionary_columns': dictionary_columns,
+        'bytes': os.path.getsize(path),
+        'seconds': time.perf_counter() - start_time,
+    }
+
+
+def convert_csv_to_staging(csv_file: str, output_format: str, chunk_size: int = DEFAULT_ROW_GROUP_SIZE,
+                           row_group_size: Optional[int] = None, compression: Optional[str] = None,
+                           remove_csv: bool = True) -> Dict[str, Any]:
+    """
+    Convierte un CSV de staging ya escrito (modo streaming) a Parquet/Feather por bloques:
+    una primera pasada decide el tipo de cada columna para todo el fichero y la segunda
+    escribe un row group por bloque, sin cargar el fichero completo en memoria.
+    En Feather los diccionarios no pueden cambiar entre record batches, así que el texto
+    se guarda sin diccionario (la compresión lz4 absorbe la repetición)
+    """
+    start_time = time.perf_counter()
+    output_format = normalize_output_format(output_format)
+    if output_format == 'csv':
+        return {'path': csv_file, 'format': 'csv', 'bytes': os.path.getsize(csv_file),
+                'seconds': 0.0, 'column_types': {}, 'dictionary_columns': []}
+    pa = _require_pyarrow()
+    read_kwargs = {'dtype': str, 'keep_default_na': False, 'chunksize': chunk_size, 'encoding': 'utf-8'}
+
+    # 1ª pasada: tipo común a todos los bloques y diccionario según el primer bloque
+    kinds: Dict[str, str] = {}
+    dictionary_columns: Optional[List[str]] = None
+    rows = 0
+    for chunk in pd.read_csv(csv_file, **read_kwargs):
+        rows += len(chunk)
+        for column, kind in plan_columns(chunk).items():
+            kinds[column] = merge_kinds(kinds[column], kind) if column in kinds else kind
+        if dictionary_columns is None:
+            dictionary_columns = [column for column in chunk.columns if _low_cardinality(chunk[column])]
+    if not kinds:
+        kinds = {column: STAGING_DTYPES.get(column, 'string')
+                 for column in pd.read_csv(csv_file, nrows=0).columns}
+    dictionary_columns = dictionary_columns or []
+    arrow_dictionary = [column for column in dictionary_columns
+                        if kinds[column] == 'string' and output_format == 'parquet']
+
+    # 2ª pasada: un row group / record batch por bloque con el esquema fijado
+    path = staging_path(csv_file, output_format)
+    compression = compression or DEFAULT_COMPRESSION[output_format]
+    writer = None
+    try:
+        for chunk in pd.read_csv(csv_file, **read_kwargs):
+            table = to_arrow_table(chunk, kinds, arrow_dictionary)
+            if writer is None:
+                if output_format == 'parquet':
+                    writer = pa.parquet.ParquetWriter(path, table.schema, compression=compression,
+                                                      use_dictionary=dictionary_columns or False)
+                else:
+                    writer = pa.ipc.new_file(path, table.schema,
+                                             options=pa.ipc.IpcWriteOptions(compression=compression))
+            if output_format == 'parquet':
+                writer.write_table(table, row_group_size=row_group_size or chunk_size)
+            else:
+                writer.write_table(table, max_chunksize=row_group_size or chunk_size)
+        if writer is None:
+            empty = pd.read_csv(csv_file, dtype=str, keep_default_na=False, nrows=0)
+            write_staging_file(empty, path, output_format, compression=compression)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if remove_csv:
+        os.remove(csv_file)
+    return {
+        'path': path,
+        'format': output_format,
+        'rows': rows,
+        'column_types': kinds,
+        'dictionary_columns': arrow_dictionary,
+        'bytes': os.path.getsize(path),
+        'seconds': time.perf_counter() - start_time,
+    }
+
+
+def read_staging_file(path: str, columns: Optional[List[str]] = None, **kwargs) -> pd.DataFrame:
+    """Lee un fichero de staging según su extensión (.csv, .parquet o .feather)"""
+    extension = os.path.splitext(str(path))[1].lower()
+    if extension == '.parquet':
+        return pd.read_parquet(path, columns=columns, **kwargs)
+    if extension == '.feather':
+        return pd.read_feather(path, columns=columns, **kwargs)
+    return pd.read_csv(path, usecols=columns, **kwargs)
@@ -0,0 +1,130 @@
+# startup_profiler.py
+"""
+Imports diferidos y presupuesto de arranque de los puntos de entrada CLI
+Los scripts (automatic_confirmation_trainer.py, main.py, orquestador.py, prediction_server.py,
+test_model.py) cargan pandas, PyYAML, los módulos core y xgboost/sklearn solo al usarlos, de
+forma que --help o un error de argumentos no pagan ~0.5-2 s de imports. Con --profile-startup
+cada script mide su import en frío (estilo `python -X importtime`) y lo compara con
+su presupuesto documentado en README.md
+"""
+
+import os
+import re
+import sys
+import importlib.util
+from pathlib import Path
+from typing import Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+
+# Presupuesto de import en frío por punto de entrada (ms, sin contar el arranque del intérprete).
+# Margen amplio sobre lo medido; pandas solo ya cuesta 300-500 ms, así que un import
+# pesado que vuelva al nivel de módulo lo supera
+STARTUP_BUDGETS_MS = {
+    'automatic_confirmation_trainer': 150,
+    'main': 150,
+    'orquestador': 150,
+    'prediction_server': 150,
+    'test_model': 150,
+}
+
+# Dependencias que ningún punto de entrada debe cargar al importarse
+HEAVY_MODULES = ('pandas', 'numpy', 'yaml', 'sklearn', 'xgboost', 'matplotlib', 'seaborn', 'core')
+
+PROFILE_STARTUP_FLAG = '--profile-startup'
+
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$')
+
+
+def lazy_import(name: str):
+    """
+    Módulo que se carga en el primer acceso a un atributo (importlib.util.LazyLoader).
+    Si ya estaba importado se devuelve tal cual. Para anotaciones con el módulo
+    (p.ej. pd.DataFrame) el archivo que lo use necesita `from __future__ import annotations`
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named '{name}'")
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def measure_import_time(entry_point: str, runs: int = 3) -> Dict:
+    """
+    Importa el módulo en un intérprete nuevo con -X importtime (mejor de `runs`).
+    Devuelve el tiempo acumulado del import en ms y las líneas de cada módulo cargado.
+    Se ejecuta en un directorio temporal: algunos scripts crean su log al importarse
+    """
+    import subprocess
+    import tempfile
+
+    code = f"import sys; sys.path.insert(0, {str(PROJECT_ROOT)!r}); import {entry_point}"
+    best = None
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as work_dir:
+            completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                                       capture_output=True, text=True, cwd=work_dir,
+                                       env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'})
+        if completed.returncode != 0:
+            raise RuntimeError(f"import {entry_point} failed: {completed.stderr.strip()[-500:]}")
+
+        modules = []
+        for line in completed.stderr.splitlines():
+            match = _IMPORTTIME_LINE.match(line)
+            if match:
+                self_us, cumulative_us, indent, name = match.groups()
+                modules.append({'module': name, 'self_us': int(self_us), 'cumulative_us': int(cumulative_us),
+                                'depth': len(indent) // 2})
+        entry = next((m for m in reversed(modules) if m['module'] == entry_point and m['depth'] == 0), None)
+        if entry is None:
+            raise RuntimeError(f"import {entry_point} not found in -X importtime output")
+
+        result = {'entry_point': entry_point, 'import_ms': entry['cumulative_us'] / 1000, 'modules': modules}
+        if best is None or result['import_ms'] < best['import_ms']:
+            best = result
+    return best
+
+
+def loaded_heavy_modules(measurement: Dict) -> List[str]:
+    """Dependencias pesadas cargadas durante el import (paquetes raíz de HEAVY_MODULES)"""
+    loaded = {m['module'].split('.')[0] for m in measurement['modules']}
+    return [name for name in HEAVY_MODULES if name in loaded]
+
+
+def profile_startup(entry_point: str, top: int = 15) -> int:
+    """Imprime el coste de import del punto de entrada frente a su presupuesto (código de salida 1 si lo supera)"""
+    measurement = measure_import_time(entry_point)
+    budget = STARTUP_BUDGETS_MS.get(entry_point)
+
+    print(f"⏱️  STARTUP PROFILE: {entry_point}")
+    print("=" * 60)
+    print(f"   Import time: {measurement['import_ms']:.1f} ms"
+          + (f" (budget {budget} ms)" if budget else ""))
+    heavy = loaded_heavy_modules(measurement)
+    print(f"   Heavy modules at import: {', '.join(heavy) if heavy else 'none (lazy)'}")
+    print(f"\n   Top {top} imports by cumulative time:")
+    print(f"   {'self (ms)':>10} {'cumul (ms)':>11}  module")
+    ranked = sorted((m for m in measurement['modules'] if m['module'] != entry_point),
+                    key=lambda m: m['cumulative_us'], reverse=True)
+    for module in ranked[:top]:
+        print(f"   {module['self_us'] / 1000:10.1f} {module['cumulative_us'] / 1000:11.1f}  "
+              f"{'  ' * module['depth']}{module['module']}")
+
+    if budget and measurement['import_ms'] > budget:
+        print(f"\n❌ Startup budget exceeded: {measurement['import_ms']:.1f} ms > {budget} ms")
+        return 1
+    print("\n✅ Within startup budget")
+    return 0
+
+
+def handle_profile_startup(entry_point: str, argv: Optional[List[str]] = None):
+    """Si la línea de comandos lleva --profile-startup, perfila el arranque y termina"""
+    argv = sys.argv[1:] if argv is None else argv
+    if PROFILE_STARTUP_FLAG in argv:
+        sys.exit(profile_startup(entry_point))
@@ -0,0 +1,333 @@
+# synthetic_ledger.py
+"""
+Libros diarios sintéticos con la forma de cada ERP
+Genera de forma determinista (misma semilla → mismo fichero byte a byte) libros con
+las cabeceras de SAP, Navision, ContaPlus, A3, Dynamics 365 y Oracle que reconocen los
+sinónimos de config/dynamic_fields_config.yaml. Cada asiento tiene 2-6 líneas que
+cuadran salvo una fracción configurable de asientos descuadrados; los importes pueden
+ir con formato europeo y las fechas mezclar fecha sola y fecha+hora. Para 1M/10M filas
+write_synthetic_ledger escribe por bloques sin tener el libro entero en memoria.
+
+Uso:
+    python synthetic_ledger.py sap 1m ledger_sap_1m.csv [--seed 0] [--unbalanced-rate 0.02]
+"""
+
+import os
+import sys
+import argparse
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Tamaños de referencia de los benchmarks
+LEDGER_SIZES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000, '10m': 10_000_000}
+
+DEFAULT_UNBALANCED_RATE = 0.02
+DEFAULT_CHUNK_ROWS = 500_000
+MIN_LINES_PER_ENTRY = 2
+MAX_LINES_PER_ENTRY = 6
+
+# Columnas de cada ERP → campo estándar (lo que el mapper debería detectar).
+# amount_style: 'debit_credit' (dos columnas), 'amount_indicator' (importe + D/H) o 'signed'.
+# Con indicador el importe también lleva signo: AccountingDataProcessor no lo deriva del D/H
+ERP_LAYOUTS: Dict[str, Dict[str, Any]] = {
+    'sap': {
+        'columns': {
+            'BELNR': 'journal_entry_id', 'BUZEI': 'line_number', 'BUDAT': 'posting_date',
+            'CPUDT': 'entry_date', 'CPUTM': 'entry_time', 'HKONT': 'gl_account_number',
+            'DMBTR': 'amount', 'SHKZG': 'debit_credit_indicator', 'SGTXT': 'line_description',
+            'USNAM': 'prepared_by', 'GJAHR': 'fiscal_year', 'MONAT': 'period_number',
+        },
+        'amount_style': 'amount_indicator', 'indicator': ('S', 'H'),
+        'date_format': '%d.%m.%Y', 'number_format': 'european', 'account_style': 'sap',
+        'entry_id_start': 1_000_000_000,
+    },
+    'navision': {
+        'columns': {
+            'Document_No': 'journal_entry_id', 'Line_No': 'line_number', 'Posting_Date': 'posting_date',
+            'G_L_Account_No': 'gl_account_number', 'Description': 'line_description',
+            'Debit_Amount': 'debit_amount', 'Credit_Amount': 'credit_amount', 'User_ID': 'prepared_by',
+        },
+        'amount_style': 'debit_credit', 'date_format': '%Y-%m-%d', 'number_format': 'plain',
+        'account_style': 'plain', 'entry_id_prefix': 'DOC', 'line_step': 10000,
+    },
+    'contaplus': {
+        'columns': {
+            'NumAsiento': 'journal_entry_id', 'FechaAsiento': 'posting_date',
+            'CuentaContable': 'gl_account_number', 'Debe': 'debit_amount', 'Haber': 'credit_amount',
+            'ConceptoAsiento': 'description',
+        },
+        'amount_style': 'debit_credit', 'date_format': '%d/%m/%Y', 'number_format': 'european',
+        'account_style': 'plain',
+    },
+    'a3': {
+        'columns': {
+            'ASIENTO': 'journal_entry_id', 'FECHA': 'posting_date', 'CUENTA': 'gl_account_number',
+            'CONCEPTO': 'description', 'IMPORTE': 'amount', 'DEBE_HABER': 'debit_credit_indicator',
+            'USUARIO': 'prepared_by',
+        },
+        'amount_style': 'amount_indicator', 'indicator': ('D', 'H'),
+        'date_format': '%d/%m/%Y', 'number_format': 'european', 'account_style': 'dotted',
+        'entry_id_prefix': 'AST',
+    },
+    'd365': {
+        'columns': {
+            'Entry': 'journal_entry_id', 'Date': 'posting_date', 'Account_Code': 'gl_account_number',
+            'Details': 'line_description', 'Debit_Amount': 'debit_amount',
+            'Credit_Amount': 'credit_amount', 'Year': 'fiscal_year',
+        },
+        'amount_style': 'debit_credit', 'date_format': '%Y-%m-%d', 'number_format': 'plain',
+        'account_style': 'plain', 'entry_id_prefix': 'E',
+    },
+    'oracle': {
+        'columns': {
+            'JE_HEADER_ID': 'journal_entry_id', 'JE_LINE_NUM': 'line_number',
+            'ACCOUNTING_DATE': 'posting_date', 'CODE_COMBINATION_ID': 'gl_account_number',
+            'ENTERED_DR': 'debit_amount', 'ENTERED_CR': 'credit_amount', 'DESCRIPTION': 'line_description',
+            'CREATED_BY': 'prepared_by',
+        },
+        'amount_style': 'debit_credit', 'date_format': '%Y-%m-%d', 'number_format': 'plain',
+        'account_style': 'segments', 'entry_id_start': 100,
+    },
+}
+
+_ACCOUNTS = np.array(['1000001', '4000001', '4100001', '4300001', '4720001', '4770001', '5720001',
+                      '6000001', '6210001', '6400001', '7000001', '7050001'])
+_DESCRIPTIONS = np.array(['Factura proveedor', 'Venta mercaderías', 'Cobro cliente', 'Pago nómina',
+                          'IVA soportado 21%', 'Amortización inmovilizado', 'Regularización existencias',
+                          'Gastos bancarios', 'Supplier invoice', 'Customer receipt'])
+_USERS = np.array(['ADMIN', 'CONTABLE1', 'USR01', 'USR02', 'JGARCIA'])
+
+
+def resolve_size(size) -> int:
+    """'10k' / '1m' / '10m' o un número de filas"""
+    if isinstance(size, str) and size.lower() in LEDGER_SIZES:
+        return LEDGER_SIZES[size.lower()]
+    rows = int(size)
+    if rows < MIN_LINES_PER_ENTRY:
+        raise ValueError(f"A ledger needs at least {MIN_LINES_PER_ENTRY} rows, got {rows}")
+    return rows
+
+
+def expected_mapping(layout: str) -> Dict[str, str]:
+    """Columna → campo estándar que debería detectar el mapper para el layout"""
+    return dict(_layout(layout)['columns'])
+
+
+def generate_ledger(layout: str, rows, seed: int = 0, unbalanced_rate: float = DEFAULT_UNBALANCED_RATE,
+                    number_format: Optional[str] = None, datetime_mix: float = 0.0,
+                    first_entry: int = 0) -> pd.DataFrame:
+    """
+    Libro de `rows` filas con las columnas del layout (valores como texto, igual que en un CSV)
+
+    Args:
+        unbalanced_rate: Fracción de asientos con la última línea descuadrada
+        number_format: 'european' (1.234,56) o 'plain' (1234.56); por defecto el del ERP
+        datetime_mix: Fracción de asientos cuya fecha contable lleva también la hora
+        first_entry: Número del primer asiento (para generar por bloques sin repetir asientos)
+    """
+    spec = _layout(layout)
+    rows = resolve_size(rows)
+    rng = np.random.default_rng(seed)
+
+    # Líneas por asiento hasta completar `rows`
+    sizes = rng.integers(MIN_LINES_PER_ENTRY, MAX_LINES_PER_ENTRY + 1, rows // MIN_LINES_PER_ENTRY + 1)
+    ends = np.cumsum(sizes)
+    entries = int(np.searchsorted(ends, rows)) + 1
+    sizes = sizes[:entries]
+    sizes[-1] -= ends[entries - 1] - rows
+    if sizes[-1] < MIN_LINES_PER_ENTRY and entries > 1:
+        sizes[-2] += sizes[-1]
+        sizes = sizes[:-1]
+        entries -= 1
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    entry_of_row = np.repeat(np.arange(entries), sizes)
+    line_in_entry = np.arange(rows) - starts[entry_of_row]
+    last_line = line_in_entry == sizes[entry_of_row] - 1
+
+    # Importes en céntimos: cada línea salvo la última al azar, la última cuadra el asiento
+    cents = rng.integers(100, 5_000_000, rows) * np.where(rng.random(rows) < 0.5, 1, -1)
+    cents[last_line] = 0
+    cents[last_line] = -np.add.reduceat(cents, starts)
+    unbalanced = rng.random(entries) < unbalanced_rate
+    deltas = rng.integers(1, 100_000, entries)
+    cents[np.flatnonzero(last_line)[unbalanced]] += deltas[unbalanced]
+
+    # Fechas dentro de un mismo ejercicio; hora de creación por asiento
+    day_offsets = rng.integers(0, 365, entries)
+    posting = pd.Timestamp('2024-01-01') + pd.to_timedelta(day_offsets, unit='D')
+    seconds = rng.integers(6 * 3600, 22 * 3600, entries)
+    entry_numbers = np.arange(first_entry, first_entry + entries)
+
+    values = {
+        'journal_entry_id': _entry_ids(spec, entry_numbers)[entry_of_row],
+        'line_number': ((line_in_entry + 1) * spec.get('line_step', 1)).astype(str),
+        'posting_date': _dates(spec, posting, seconds, rng.random(entries) < datetime_mix)[entry_of_row],
+        'entry_date': np.asarray(posting.strftime(spec['date_format']), dtype=object)[entry_of_row],
+        'entry_time': np.array([f"{s // 3600:02d}:{s % 3600 // 60:02d}:{s % 60:02d}" for s in seconds],
+                               dtype=object)[entry_of_row],
+        'gl_account_number': _accounts(spec, rng.choice(_ACCOUNTS, rows)),
+        'description': rng.choice(_DESCRIPTIONS, entries)[entry_of_row],
+        'line_description': rng.choice(_DESCRIPTIONS, rows),
+        'prepared_by': rng.choice(_USERS, entries)[entry_of_row],
+        'fiscal_year': np.full(rows, '2024', dtype=object),
+        'period_number': (posting.month.to_numpy()[entry_of_row]).astype(str),
+    }
+    fmt = number_format or spec['number_format']
+    if spec['amount_style'] == 'debit_credit':
+        values['debit_amount'] = _format_amounts(np.where(cents > 0, cents, 0), fmt)
+        values['credit_amount'] = _format_amounts(np.where(cents < 0, -cents, 0), fmt)
+    elif spec['amount_style'] == 'amount_indicator':
+        debit_mark, credit_mark = spec['indicator']
+        values['amount'] = _format_amounts(cents, fmt)
+        values['debit_credit_indicator'] = np.where(cents >= 0, debit_mark, credit_mark).astype(object)
+    else:
+        values['amount'] = _format_amounts(cents, fmt)
+
+    return pd.DataFrame({column: values[field] for column, field in spec['columns'].items()})
+
+
+def unbalanced_entry_count(df: pd.DataFrame, layout: str) -> int:
+    """Asientos descuadrados de un libro generado (para comprobar el BalanceValidator)"""
+    spec = _layout(layout)
+    columns = {field: column for column, field in spec['columns'].items()}
+    fmt = 'european' if df[columns.get('debit_amount', columns.get('amount'))].str.contains(',').any() else 'plain'
+    if spec['amount_style'] == 'debit_credit':
+        cents = _parse_cents(df[columns['debit_amount']], fmt) - _parse_cents(df[columns['credit_amount']], fmt)
+    else:
+        cents = _parse_cents(df[columns['amount']], fmt)
+    sums = pd.Series(cents).groupby(df[columns['journal_entry_id']].to_numpy(), sort=False).sum()
+    return int((sums != 0).sum())
+
+
+def write_synthetic_ledger(path: str, layout: str, rows, seed: int = 0,
+                           unbalanced_rate: float = DEFAULT_UNBALANCED_RATE, number_format: Optional[str] = None,
+                           datetime_mix: float = 0.0, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Dict[str, Any]:
+    """
+    Escribe el libro en CSV por bloques de chunk_rows filas (cada bloque con su propia
+    semilla derivada y asientos completos), para 1M/10M filas sin tenerlo en memoria
+    """
+    rows = resolve_size(rows)
+    chunk_rows = max(int(chunk_rows), MAX_LINES_PER_ENTRY * 2)
+    written = 0
+    first_entry = 0
+    chunk = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        while written < rows:
+            chunk_size = min(chunk_rows, rows - written)
+            if rows - written - chunk_size < MIN_LINES_PER_ENTRY:
+                chunk_size = rows - written
+            df = generate_ledger(layout, chunk_size, seed=_chunk_seed(seed, chunk), unbalanced_rate=unbalanced_rate,
+                                 number_format=number_format, datetime_mix=datetime_mix, first_entry=first_entry)
+            df.to_csv(f, index=False, header=chunk == 0)
+            first_entry += _entry_count(df, layout)
+            written += len(df)
+            chunk += 1
+    return {'path': path, 'layout': layout, 'rows': written, 'entries': first_entry, 'chunks': chunk,
+            'seed': seed, 'bytes': os.path.getsize(path)}
+
+
+def ledger_text_lines(df: pd.DataFrame, layout: str) -> pd.Series:
+    """
+    Líneas de texto del libro impreso (cabecera de asiento, líneas en columnas de ancho
+    fijo y separadores) para medir DocumentFeatureExtractor con el mismo volumen
+    """
+    spec = _layout(layout)
+    columns = list(spec['columns'])
+    journal_column = next(column for column, field in spec['columns'].items() if field == 'journal_entry_id')
+    body = df[columns[0]].astype(str).str.ljust(14)
+    for column in columns[1:]:
+        body = body + '  ' + df[column].astype(str).str.slice(0, 24).str.ljust(14)
+    new_entry = df[journal_column].ne(df[journal_column].shift()).to_numpy()
+    header_lines = ('ASIENTO ' + df.loc[new_entry, journal_column].astype(str)).to_numpy()
+    positions = np.flatnonzero(new_entry)
+    lines = np.insert(body.to_numpy(dtype=object), positions, header_lines)
+    lines = np.insert(lines, positions + np.arange(1, len(positions) + 1), '-' * 60)
+    return pd.Series(lines, name='text')
+
+
+def _layout(layout: str) -> Dict[str, Any]:
+    try:
+        return ERP_LAYOUTS[layout.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown ERP layout '{layout}' (expected one of {', '.join(ERP_LAYOUTS)})")
+
+
+def _chunk_seed(seed: int, chunk: int) -> int:
+    return int(np.random.SeedSequence([seed, chunk]).generate_state(1)[0])
+
+
+def _entry_count(df: pd.DataFrame, layout: str) -> int:
+    journal_column = next(column for column, field in _layout(layout)['columns'].items()
+                          if field == 'journal_entry_id')
+    return int(df[journal_column].ne(df[journal_column].shift()).sum())
+
+
+def _entry_ids(spec: Dict[str, Any], numbers: np.ndarray) -> np.ndarray:
+    numbers = numbers + spec.get('entry_id_start', 1)
+    prefix = spec.get('entry_id_prefix')
+    if prefix:
+        return np.array([f"{prefix}{number:06d}" for number in numbers], dtype=object)
+    return numbers.astype(str).astype(object)
+
+
+def _dates(spec: Dict[str, Any], posting: pd.DatetimeIndex, seconds: np.ndarray, with_time: np.ndarray) -> np.ndarray:
+    dates = np.asarray(posting.strftime(spec['date_format']), dtype=object)
+    if with_time.any():
+        times = (posting[with_time] + pd.to_timedelta(seconds[with_time], unit='s')).strftime(' %H:%M:%S')
+        dates[with_time] = dates[with_time] + np.asarray(times, dtype=object)
+    return dates
+
+
+def _accounts(spec: Dict[str, Any], accounts: np.ndarray) -> np.ndarray:
+    style = spec['account_style']
+    if style == 'sap':
+        return np.char.zfill(accounts.astype(str), 10).astype(object)
+    if style == 'dotted':
+        return np.array([f"{a[:3]}.{a[3:]}" for a in accounts], dtype=object)
+    if style == 'segments':
+        return np.array([f"{a[:3]}.000.{a[-3:]}" for a in accounts], dtype=object)
+    return accounts.astype(object)
+
+
+def _format_amounts(cents: np.ndarray, number_format: str) -> np.ndarray:
+    """Céntimos → texto '1234.56' o, en formato europeo, '1.234,56'"""
+    if number_format not in ('european', 'plain'):
+        raise ValueError(f"Unknown number format '{number_format}' (expected 'european' or 'plain')")
+    sign = np.where(cents < 0, '-', '')
+    whole = (np.abs(cents) // 100).astype(np.int64)
+    fraction = np.char.zfill((np.abs(cents) % 100).astype(str), 2)
+    if number_format == 'plain':
+        return np.char.add(np.char.add(np.char.add(sign, whole.astype(str)), '.'), fraction).astype(object)
+    grouped = np.array([f"{value:,}".replace(',', '.') for value in whole])
+    return np.char.add(np.char.add(np.char.add(sign, grouped), ','), fraction).astype(object)
+
+
+def _parse_cents(values: pd.Series, number_format: str) -> np.ndarray:
+    text = values.astype(str)
+    if number_format == 'european':
+        text = text.str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+    return np.round(text.astype(float).to_numpy() * 100).astype(np.int64)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Genera un libro diario sintético con la forma de un ERP.")
+    parser.add_argument("layout", choices=list(ERP_LAYOUTS), help="Formato del ERP.")
+    parser.add_argument("size", help=f"Filas: {', '.join(LEDGER_SIZES)} o un número.")
+    parser.add_argument("output_file", help="CSV de salida.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--unbalanced-rate", type=float, default=DEFAULT_UNBALANCED_RATE)
+    parser.add_argument("--number-format", choices=['european', 'plain'], default=None)
+    parser.add_argument("--datetime-mix", type=float, default=0.0,
+                        help="Fracción de asientos con fecha y hora en la fecha contable.")
+    args = parser.parse_args(argv)
+    info = write_synthetic_ledger(args.output_file, args.layout, args.size, seed=args.seed,
+                                  unbalanced_rate=args.unbalanced_rate, number_format=args.number_format,
+                                  datetime_mix=args.datetime_mix)
+    print(f"✅ {info['rows']:,} rows / {info['entries']:,} entries written to {info['path']} "
+          f"({info['bytes'] / 1024 / 1024:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
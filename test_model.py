@@ -1,22 +1,115 @@
+from __future__ import annotations
+
 import os
 import re
 import json
 import pickle
 import argparse
-import numpy as np
-import pandas as pd
 import csv
+import io
+import time
+import codecs
+import contextlib
+
+from typing import Optional, List, Dict
+
+from startup_profiler import lazy_import, handle_profile_startup
+
+# numpy/pandas se cargan al usarse; features (sklearn) y xgboost al crear el tester y
+# cargar el modelo, de forma que --help no paga ~2 s de imports
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Sniffing de CSV: bytes leídos del principio del fichero, separadores candidatos y
+# proporción mínima de registros con el mismo número de campos
+SNIFF_BYTES = 64 * 1024
+SNIFF_DELIMITERS = [",", ";", "\t", "|"]
+SNIFF_MIN_CONSISTENCY = 0.9
+# Ficheros mayores se leen por chunks (solo se guarda la columna de texto de cada bloque)
+CHUNKED_READ_BYTES = 64 * 1024 * 1024
+READ_CHUNK_ROWS = 200_000
+# Clasificación por ventanas (--window-lines): líneas por ventana y bloque de lectura del conteo
+DEFAULT_WINDOW_LINES = 50_000
+COUNT_READ_CHARS = 1024 * 1024
+
+
+def _sniff_bom(head: bytes) -> str | None:
+    # Detecta por BOM: utf-16le / utf-16be / utf-8-sig
+    if head.startswith(b"\xff\xfe"):
+        return "utf-16le"
+    if head.startswith(b"\xfe\xff"):
+        return "utf-16be"
+    if head.startswith(b"\xef\xbb\xbf"):
+        return "utf-8-sig"
+    return None
+
+
+def _decode_sample(head: bytes, truncated: bool) -> tuple[str | None, str]:
+    """
+    Codificación por BOM o por prueba de decodificación de la muestra (mismo orden que la
+    lectura por fuerza bruta: utf-16 solo si hay bytes nulos, utf-8 y latin-1, que no falla).
+    Con la muestra cortada, un carácter multibyte partido al final no cuenta como error
+    """
+    bom = _sniff_bom(head)
+    candidates = [bom] if bom else (["utf-16"] if b"\x00" in head else []) + ["utf-8", "latin-1"]
+    for encoding in candidates:
+        try:
+            text = codecs.getincrementaldecoder(encoding)().decode(head, final=not truncated)
+        except UnicodeDecodeError:
+            continue
+        return encoding, text.lstrip("\ufeff")
+    return None, ""
+
+
+def _field_count_profile(sample: str, delimiter: str, truncated: bool) -> tuple[int, float, int]:
+    """(nº de campos más frecuente, proporción de registros con ese nº, registros) para un separador"""
+    records = list(csv.reader(io.StringIO(sample), delimiter=delimiter))
+    if truncated and len(records) > 1:
+        records = records[:-1]  # el último registro puede estar cortado
+    counts = [len(record) for record in records if record]
+    if not counts:
+        return 0, 0.0, 0
+    modal = max(set(counts), key=counts.count)
+    return modal, counts.count(modal) / len(counts), len(counts)
+
+
+def sniff_csv_format(file_path: str, sample_bytes: int = SNIFF_BYTES) -> Dict | None:
+    """
+    Detecta codificación y separador de un CSV leyendo solo los primeros sample_bytes.
+    El separador es el candidato con el nº de campos más consistente entre registros
+    (y más campos en empate); None si la muestra no permite decidir
+    """
+    start_time = time.perf_counter()
+    with open(file_path, "rb") as fb:
+        head = fb.read(sample_bytes + 1)
+    truncated = len(head) > sample_bytes
+    head = head[:sample_bytes]
+
+    encoding, sample = _decode_sample(head, truncated)
+    if encoding is None or not sample.strip():
+        return None
 
-from typing import Optional, List
-
-# Si el modelo se entrenó con XGBClassifier, no necesitas usar xgboost aquí,
-# pero lo importamos por si el pickle hace referencia interna.
-try:
-    import xgboost as xgb  # noqa: F401
-except Exception:
-    pass
-
-from features import DocumentFeatureExtractor
+    best = None
+    for delimiter in SNIFF_DELIMITERS:
+        columns, consistency, records = _field_count_profile(sample, delimiter, truncated)
+        if columns >= 2 and consistency >= SNIFF_MIN_CONSISTENCY:
+            if best is None or (consistency, columns) > (best["consistency"], best["columns"]):
+                best = {"sep": delimiter, "columns": columns, "consistency": consistency, "records": records}
+    if best is None:
+        # Una sola columna: cualquier separador ausente de la muestra la lee entera
+        absent = next((d for d in SNIFF_DELIMITERS if d not in sample), None)
+        if absent is None:
+            return None
+        best = {"sep": absent, "columns": 1, "consistency": 1.0,
+                "records": len(sample.splitlines()) - (1 if truncated else 0)}
+
+    return {
+        "encoding": encoding,
+        **best,
+        "bom": _sniff_bom(head) is not None,
+        "sample_bytes": len(head),
+        "sniff_seconds": time.perf_counter() - start_time,
+    }
 
 
 class DocumentTester:
@@ -26,6 +119,8 @@ class DocumentTester:
         self.label_encoder = None
         self.feature_names: Optional[List[str]] = None
         self.model_info = {}
+        self.last_csv_format: Optional[Dict] = None
+        from features import DocumentFeatureExtractor
         self.feature_extractor = DocumentFeatureExtractor()
 
     # ---------------------------
@@ -35,6 +130,13 @@ class DocumentTester:
         """Carga el modelo entrenado y sus componentes."""
         print("Cargando modelo entrenado...")
 
+        # Si el modelo se entrenó con XGBClassifier, no necesitas usar xgboost aquí,
+        # pero lo importamos por si el pickle hace referencia interna.
+        try:
+            import xgboost as xgb  # noqa: F401
+        except Exception:
+            pass
+
         # Modelo
         model_file = os.path.join(self.model_path, "model.pkl")
         if not os.path.exists(model_file):
@@ -96,19 +198,59 @@ class DocumentTester:
         return pd.DataFrame(test_data)
 
     def _sniff_encoding(self, file_path: str) -> str | None:
-        # Detecta por BOM: utf-16le / utf-16be / utf-8-sig
         with open(file_path, "rb") as fb:
-            head = fb.read(4)
-        if head.startswith(b"\xff\xfe"):
-            return "utf-16le"
-        if head.startswith(b"\xfe\xff"):
-            return "utf-16be"
-        if head.startswith(b"\xef\xbb\xbf"):
-            return "utf-8-sig"
-        return None
-
+            return _sniff_bom(fb.read(4))
+
+    @staticmethod
+    def _lines_frame(file_path: str, texts) -> pd.DataFrame:
+        """Esquema estándar del pipeline: una fila por línea del documento"""
+        texts = list(texts)
+        return pd.DataFrame(
+            {
+                "file": os.path.basename(file_path),
+                "line_no": np.arange(1, len(texts) + 1),
+                "text": texts,
+                "label": "UNKNOWN",
+            }
+        )
 
-    def _read_csv_or_excel(self, file_path: str) -> pd.DataFrame:
+    @staticmethod
+    def _row_texts(df: pd.DataFrame) -> pd.Series:
+        """Columna 'text' o todas las columnas unidas por espacios (sin recortar)"""
+        df = df.fillna("")
+        if "text" in df.columns:
+            return df["text"].astype(str)
+        columns = [df[column].astype(str) for column in df.columns]
+        if not columns:
+            return pd.Series([""] * len(df), index=df.index, dtype=object)
+        return columns[0].str.cat(columns[1:], sep=" ") if len(columns) > 1 else columns[0]
+
+    def _read_sniffed_csv(self, file_path: str, csv_format: Dict) -> pd.DataFrame | None:
+        """
+        Una sola lectura con el motor C y los parámetros detectados (por chunks si el fichero
+        es grande). None si el resultado no cuadra con la muestra y hay que usar el fallback
+        """
+        read_kwargs = dict(dtype=str, sep=csv_format["sep"], encoding=csv_format["encoding"], engine="c")
+        try:
+            if os.path.getsize(file_path) > CHUNKED_READ_BYTES:
+                texts = []
+                columns = None
+                for chunk in pd.read_csv(file_path, chunksize=READ_CHUNK_ROWS, **read_kwargs):
+                    columns = len(chunk.columns)
+                    texts.extend(self._row_texts(chunk).tolist())
+                if columns != csv_format["columns"]:
+                    return None
+                return self._lines_frame(file_path, texts)
+
+            df = pd.read_csv(file_path, **read_kwargs)
+        except (UnicodeDecodeError, ValueError, pd.errors.ParserError):
+            return None
+        if len(df.columns) != csv_format["columns"]:
+            return None
+        return self._lines_frame(file_path, self._row_texts(df))
+
+
+    def _read_csv_or_excel(self, file_path: str, csv_format: Optional[Dict] = None) -> pd.DataFrame:
         ext = os.path.splitext(file_path)[1].lower()
 
         if ext in [".xlsx", ".xls"]:
@@ -133,7 +275,20 @@ class DocumentTester:
                 }
             )
 
-        # CSV plano: probamos codificación + separador de forma robusta
+        # CSV plano: codificación y separador detectados sobre los primeros 64 KB y una
+        # sola lectura con el motor C; la prueba de combinaciones queda como fallback
+        start_time = time.perf_counter()
+        if csv_format is None:
+            csv_format = sniff_csv_format(file_path)
+        if csv_format is not None:
+            df = self._read_sniffed_csv(file_path, csv_format)
+            if df is not None:
+                self.last_csv_format = {**csv_format, "method": "sniffed",
+                                        "read_seconds": time.perf_counter() - start_time}
+                print(f"Formato detectado: encoding={csv_format['encoding']}, sep={csv_format['sep']!r}, "
+                      f"{csv_format['columns']} columnas (muestra de {csv_format['sample_bytes']:,} bytes)")
+                return df
+
         sniff = self._sniff_encoding(file_path)
         enc_candidates = ([sniff] if sniff else []) + ["utf-16", "utf-8", "latin-1", "cp1252"]
         sep_candidates = [None, ",", ";", "\t", "|"]
@@ -150,29 +305,23 @@ class DocumentTester:
                         engine="python",
                     )
                     # Éxito: normalizamos y salimos
-                    df = df.fillna("")
-                    if "text" in df.columns:
-                        texts = df["text"].astype(str).tolist()
-                    else:
-                        texts = df.astype(str).agg(" ".join, axis=1).tolist()
-
-                    base = os.path.basename(file_path)
-                    return pd.DataFrame(
-                        {
-                            "file": base,
-                            "line_no": np.arange(1, len(texts) + 1),
-                            "text": texts,
-                            "label": "UNKNOWN",
-                        }
-                    )
+                    self.last_csv_format = {"encoding": enc, "sep": sep, "columns": len(df.columns),
+                                            "method": "fallback",
+                                            "read_seconds": time.perf_counter() - start_time}
+                    return self._lines_frame(file_path, self._row_texts(df))
                 except Exception as e:
                     last_err = e
 
         # Si ninguna combinación funcionó, propagamos el último error
         raise last_err
 
-    def load_test_file(self, file_path: str, encoding: str = "utf-8") -> pd.DataFrame:
-        """Carga el archivo de test y lo prepara para predicción."""
+    def load_test_file(self, file_path: str, encoding: str = "utf-8",
+                       csv_format: Optional[Dict] = None) -> pd.DataFrame:
+        """
+        Carga el archivo de test y lo prepara para predicción.
+        csv_format: resultado de sniff_csv_format ya calculado (p.ej. por el orquestador);
+        el formato usado queda en self.last_csv_format
+        """
         print(f"Cargando archivo de test: {file_path}")
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"No se encontró el archivo: {file_path}")
@@ -181,7 +330,7 @@ class DocumentTester:
         if ext in [".txt", ".log"]:
             df = self._read_text_file(file_path, encoding=encoding)
         elif ext in [".csv", ".xlsx", ".xls"]:
-            df = self._read_csv_or_excel(file_path)
+            df = self._read_csv_or_excel(file_path, csv_format=csv_format)
         else:
             # Como fallback, lo tratamos como texto plano
             df = self._read_text_file(file_path, encoding=encoding)
@@ -193,7 +342,11 @@ class DocumentTester:
     # Predicción
     # ---------------------------
     def _align_features(self, features_df: pd.DataFrame) -> pd.DataFrame:
-        """Alinea y ordena las columnas de features como en entrenamiento."""
+        """
+        Alinea y ordena las columnas de features como en entrenamiento.
+        Devuelve un único bloque float32 contiguo (lo que usan internamente los árboles de
+        sklearn/XGBoost), así predict_proba no vuelve a convertir ni copiar la matriz.
+        """
         # Asegura todas las columnas esperadas
         missing = [c for c in self.feature_names if c not in features_df.columns]
         if missing:
@@ -216,14 +369,19 @@ class DocumentTester:
 
         # Evita NaN residuales
         features_df = features_df.fillna(0)
-        return features_df
-
-    def predict_file(self, test_df: pd.DataFrame) -> pd.DataFrame:
-        """Realiza predicciones en el archivo de test."""
-        print("Extrayendo features del archivo de test...")
-        features_df = self.feature_extractor.extract_all_features(test_df).copy()
+        values = np.ascontiguousarray(features_df.to_numpy(dtype=np.float32))
+        return pd.DataFrame(values, columns=self.feature_names, copy=False)
+
+    def prepare_features(self, test_df: pd.DataFrame, first_position: int = 0,
+                         total_lines: Optional[int] = None) -> pd.DataFrame:
+        """
+        Features de test_df alineadas con las del entrenamiento.
+        Las features contextuales (línea anterior/siguiente, posición) se calculan dentro de test_df;
+        si test_df es una ventana del fichero, first_position/total_lines la sitúan en él.
+        """
+        features_df = self.feature_extractor.extract_all_features(
+            test_df, first_position=first_position, total_lines=total_lines).copy()
         features_df = features_df.reset_index(drop=True)
-        test_df = test_df.reset_index(drop=True)
 
         # Verificar/forzar compatibilidad con las features del modelo
         if self.feature_names is None:
@@ -231,38 +389,205 @@ class DocumentTester:
 
         if list(features_df.columns) != self.feature_names:
             print("Advertencia: las features no coinciden exactamente. Realineando columnas...")
-        features_df = self._align_features(features_df)
-
-        print("Realizando predicciones...")
-        # XGBClassifier (scikit wrapper) soporta predict_proba
-        preds = self.model.predict(features_df)
-        # A veces los modelos devuelven floats -> convertimos a int para inverse_transform
-        if preds.dtype != np.int64 and preds.dtype != np.int32:
-            preds = preds.astype(int)
+        return self._align_features(features_df)
 
-        # Probabilidades (si existen)
+    def predict_probabilities(self, features_df: pd.DataFrame):
+        """Matriz de probabilidades (líneas x clases del label encoder)."""
         if hasattr(self.model, "predict_proba"):
-            probas = self.model.predict_proba(features_df)
+            return self.model.predict_proba(features_df)
+        # Sin predict_proba: probabilidad 1 para la clase predicha
+        preds = np.asarray(self.model.predict(features_df)).astype(int)
+        probas = np.zeros((len(preds), len(self.label_encoder.classes_)))
+        probas[np.arange(len(preds)), preds] = 1.0
+        return probas
+
+    def results_from_probabilities(self, test_df: pd.DataFrame, probas,
+                                   top_k: Optional[int] = None) -> pd.DataFrame:
+        """
+        Resultados con el formato de predict_file a partir de las probabilidades (argmax).
+        Etiquetas como texto (object) y probabilidades en float32; con top_k
+        solo se guardan las k clases más probables (topN_label/topN_prob) en lugar de una
+        columna prob_<clase> por clase.
+        """
+        probas = np.asarray(probas, dtype=np.float32)
+        classes = self.label_encoder.classes_
+        rows = np.arange(len(probas))
+        best = np.argmax(probas, axis=1)
+
+        results_df = test_df.reset_index(drop=True).copy()
+        results_df["predicted_label"] = classes[best]
+        results_df["confidence"] = probas[rows, best]
+        if top_k:
+            # Orden estable: en caso de empate top1 es la clase de argmax
+            order = np.argsort(-probas, axis=1, kind="stable")
+            for i in range(min(int(top_k), len(classes))):
+                results_df[f"top{i + 1}_label"] = classes[order[:, i]]
+                results_df[f"top{i + 1}_prob"] = probas[rows, order[:, i]]
         else:
-            # Fallback: si no hay predict_proba, construimos algo básico
-            # (no ideal, pero evita romper el flujo)
-            probas = np.zeros((len(preds), len(self.label_encoder.classes_)))
-            for i, p in enumerate(preds):
-                probas[i, p] = 1.0
+            for i, class_name in enumerate(classes):
+                results_df[f"prob_{class_name}"] = probas[:, i]
+        return results_df
 
-        # Decodificar etiquetas
-        predicted_labels = self.label_encoder.inverse_transform(preds)
+    def predict_file(self, test_df: pd.DataFrame, top_k: Optional[int] = None) -> pd.DataFrame:
+        """Realiza predicciones en el archivo de test (una sola pasada de predict_proba)."""
+        print("Extrayendo features del archivo de test...")
+        features_df = self.prepare_features(test_df)
 
-        # Construir resultados
-        results_df = test_df.copy()
-        results_df["predicted_label"] = predicted_labels
-        results_df["confidence"] = np.max(probas, axis=1)
+        print("Realizando predicciones...")
+        # La etiqueta es el argmax de predict_proba: no hace falta un segundo predict()
+        probas = self.predict_probabilities(features_df)
+        return self.results_from_probabilities(test_df, probas, top_k=top_k)
 
-        # Probabilidad por clase
-        for i, class_name in enumerate(self.label_encoder.classes_):
-            results_df[f"prob_{class_name}"] = probas[:, i]
+    # ---------------------------
+    # Predicción por ventanas (memoria acotada)
+    # ---------------------------
+    @staticmethod
+    def _count_text_lines(file_path: str, encoding: str = "utf-8") -> int:
+        """Líneas del fichero con el mismo corte que readlines() en modo texto, leyendo por bloques."""
+        lines = 0
+        last_char = "\n"
+        with open(file_path, "r", encoding=encoding, errors="replace") as f:
+            while True:
+                block = f.read(COUNT_READ_CHARS)
+                if not block:
+                    break
+                lines += block.count("\n")
+                last_char = block[-1]
+        # Última línea sin salto final
+        return lines + (last_char != "\n")
+
+    @staticmethod
+    def _line_windows(lines, window_lines: int):
+        """
+        Agrupa un iterable de líneas en ventanas de window_lines.
+        Devuelve (posición de la primera línea, líneas, línea anterior, línea siguiente),
+        con None como vecino en los extremos del fichero.
+        """
+        start = 0
+        prev_line = None
+        window = []
+        for line in lines:
+            if len(window) == window_lines:
+                yield start, window, prev_line, line
+                start += len(window)
+                prev_line = window[-1]
+                window = []
+            window.append(line)
+        if window:
+            yield start, window, prev_line, None
+
+    def predict_file_streaming(self, file_path: str, output_file: str = "resultados_prediccion.csv",
+                               window_lines: int = DEFAULT_WINDOW_LINES, encoding: str = "utf-8",
+                               csv_format: Optional[Dict] = None, low_conf: float = 0.7,
+                               top_k: Optional[int] = None) -> Dict:
+        """
+        Clasifica el fichero por ventanas de window_lines líneas y escribe los CSV simple y
+        detallado de save_results a medida que avanza, con memoria constante.
+
+        Los .txt se leen en streaming (un primer recorrido solo cuenta líneas); CSV/Excel se
+        leen como en load_test_file (solo la columna de texto) y se clasifican por ventanas.
+        Cada ventana lleva una línea de solape a cada lado y su posición en el fichero, de
+        modo que las features contextuales son las mismas que con el fichero completo.
+        """
+        print(f"Clasificando por ventanas de {window_lines:,} líneas: {file_path}")
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"No se encontró el archivo: {file_path}")
+        if self.feature_names is None:
+            raise RuntimeError("feature_names no cargados. Llama primero a load_model().")
+        window_lines = max(int(window_lines), 1)
 
-        return results_df
+        start_time = time.perf_counter()
+        base = os.path.basename(file_path)
+        ext = os.path.splitext(file_path)[1].lower()
+        detailed_file = output_file.replace(".csv", "_detailed.csv")
+        os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+        simple_cols = ["file", "line_no", "text", "predicted_label", "confidence"]
+        csv_kwargs = {"index": False, "lineterminator": "\n", "quoting": csv.QUOTE_ALL}
+
+        summary = {"file": file_path, "output_file": output_file, "detailed_file": detailed_file,
+                   "window_lines": window_lines, "windows": 0, "lines": 0, "label_counts": {},
+                   "confidence_sum": 0.0, "confidence_min": None, "confidence_max": None,
+                   "low_confidence": 0, "low_conf": low_conf}
+
+        with contextlib.ExitStack() as stack:
+            if ext in [".csv", ".xlsx", ".xls"]:
+                texts = self._read_csv_or_excel(file_path, csv_format=csv_format)["text"]
+                total_lines = len(texts)
+                lines = iter(texts.tolist())
+            else:
+                total_lines = self._count_text_lines(file_path, encoding=encoding)
+                handle = stack.enter_context(open(file_path, "r", encoding=encoding, errors="replace"))
+                lines = (line.rstrip("\r\n") for line in handle)
+            summary["total_lines"] = total_lines
+
+            simple = stack.enter_context(open(output_file, "w", encoding="utf-8", newline=""))
+            detailed = stack.enter_context(open(detailed_file, "w", encoding="utf-8", newline=""))
+
+            windows = self._line_windows(lines, window_lines)
+            first = True
+            for start, window, prev_line, next_line in windows:
+                has_prev = int(prev_line is not None)
+                context = ([prev_line] if has_prev else []) + window + ([next_line] if next_line is not None else [])
+                features_df = self.prepare_features(pd.DataFrame({"text": context}),
+                                                    first_position=start - has_prev, total_lines=total_lines)
+                features_df = features_df.iloc[has_prev:has_prev + len(window)].reset_index(drop=True)
+
+                window_df = self._lines_frame(base, window)
+                window_df["line_no"] += start
+                results_df = self.results_from_probabilities(window_df, self.predict_probabilities(features_df),
+                                                             top_k=top_k)
+
+                results_df[simple_cols].to_csv(simple, header=first, **csv_kwargs)
+                results_df.to_csv(detailed, header=first, **csv_kwargs)
+                first = False
+                self._accumulate_summary(summary, results_df)
+
+            if first:
+                # Fichero vacío: solo cabeceras, como save_results
+                empty = self.results_from_probabilities(self._lines_frame(base, []),
+                                                        np.zeros((0, len(self.label_encoder.classes_))),
+                                                        top_k=top_k)
+                empty[simple_cols].to_csv(simple, **csv_kwargs)
+                empty.to_csv(detailed, **csv_kwargs)
+
+        summary["confidence_mean"] = summary.pop("confidence_sum") / summary["lines"] if summary["lines"] else None
+        summary["seconds"] = time.perf_counter() - start_time
+        print(f"Resultados guardados en {output_file} y {detailed_file} "
+              f"({summary['lines']:,} líneas, {summary['windows']} ventanas, {summary['seconds']:.2f} s)")
+        return summary
+
+    @staticmethod
+    def _accumulate_summary(summary: Dict, results_df: pd.DataFrame):
+        """Distribución de etiquetas y estadísticos de confianza acumulados ventana a ventana."""
+        summary["windows"] += 1
+        summary["lines"] += len(results_df)
+        for label, count in results_df["predicted_label"].value_counts().items():
+            summary["label_counts"][label] = summary["label_counts"].get(label, 0) + int(count)
+        conf = results_df["confidence"]
+        summary["confidence_sum"] += float(conf.to_numpy(dtype=np.float64).sum())
+        minimum, maximum = float(conf.min()), float(conf.max())
+        summary["confidence_min"] = minimum if summary["confidence_min"] is None else min(summary["confidence_min"], minimum)
+        summary["confidence_max"] = maximum if summary["confidence_max"] is None else max(summary["confidence_max"], maximum)
+        summary["low_confidence"] += int((conf < _threshold(conf, summary["low_conf"])).sum())
+
+    def analyze_streaming_summary(self, summary: Dict):
+        """Versión acumulada de analyze_predictions para la clasificación por ventanas."""
+        print("\n" + "=" * 60)
+        print("ANÁLISIS DE PREDICCIONES")
+        print("=" * 60)
+
+        print("\nDistribución de etiquetas predichas:")
+        total = summary["lines"]
+        for label, count in sorted(summary["label_counts"].items(), key=lambda item: -item[1]):
+            percentage = (count / total) * 100 if total else 0.0
+            print(f"  {label}: {count} líneas ({percentage:.1f}%)")
+
+        if total:
+            print("\nEstadísticas de confianza:")
+            print(f"  Promedio: {summary['confidence_mean']:.3f}")
+            print(f"  Mínimo:   {summary['confidence_min']:.3f}")
+            print(f"  Máximo:   {summary['confidence_max']:.3f}")
+            print(f"\nLíneas con baja confianza (<{summary['low_conf']}): {summary['low_confidence']}")
 
     # ---------------------------
     # Análisis
@@ -289,7 +614,7 @@ class DocumentTester:
         print(f"  Máximo:   {conf.max():.3f}")
 
         # Baja confianza
-        low_conf_df = results_df[results_df["confidence"] < low_conf]
+        low_conf_df = results_df[results_df["confidence"] < _threshold(results_df["confidence"], low_conf)]
         if len(low_conf_df) > 0:
             print(f"\nLíneas con baja confianza (<{low_conf}): {len(low_conf_df)}")
             print("Ejemplos:")
@@ -344,6 +669,11 @@ class DocumentTester:
         print(f"Resultados detallados guardados en {detailed_file}")
 
 
+def _threshold(conf: pd.Series, value: float):
+    """Umbral en el dtype de la confianza: float32(0.7) < 0.7, y 0.7 exacto no es baja confianza."""
+    return np.asarray(value, dtype=conf.dtype) if conf.dtype.kind == "f" else value
+
+
 # ---------------------------
 # CLI
 # ---------------------------
@@ -357,17 +687,34 @@ def build_argparser():
     parser.add_argument("--encoding", default="utf-8", help="Codificación para archivos .txt (por defecto utf-8).")
     parser.add_argument("--low-conf", type=float, default=0.7, help="Umbral de baja confianza para el análisis.")
     parser.add_argument("--max-examples", type=int, default=5, help="Máx. ejemplos a mostrar en análisis.")
+    parser.add_argument("--window-lines", type=int, default=0,
+                        help=f"Clasificar por ventanas de N líneas escribiendo la salida de forma incremental "
+                             f"(memoria constante; p.ej. {DEFAULT_WINDOW_LINES}). 0 = fichero completo en memoria.")
+    parser.add_argument("--top-k", type=int, default=0,
+                        help="Guardar solo las K clases más probables (topN_label/topN_prob) en el CSV detallado "
+                             "en lugar de una columna prob_<clase> por clase. 0 = todas.")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Medir el tiempo de import en frío frente al presupuesto de arranque y salir.")
     return parser
 
 
 def main():
+    # Antes de parse_args: --profile-startup no requiere --file
+    handle_profile_startup("test_model")
     args = build_argparser().parse_args()
 
     tester = DocumentTester(model_path=args.model_dir)
     tester.load_model()
 
+    if args.window_lines > 0:
+        summary = tester.predict_file_streaming(args.file, output_file=args.out, window_lines=args.window_lines,
+                                                encoding=args.encoding, low_conf=args.low_conf,
+                                                top_k=args.top_k or None)
+        tester.analyze_streaming_summary(summary)
+        return
+
     test_df = tester.load_test_file(args.file, encoding=args.encoding)
-    results_df = tester.predict_file(test_df)
+    results_df = tester.predict_file(test_df, top_k=args.top_k or None)
 
     tester.analyze_predictions(results_df, low_conf=args.low_conf, max_examples=args.max_examples)
     tester.save_results(results_df, output_file=args.out)
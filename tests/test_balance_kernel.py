@@ -0,0 +1,121 @@
+"""
+Tests del kernel de balance por asiento de BalanceValidator (factorize + bincount)
+Verifica que el reporte coincide con la agregación groupby original, que los
+registros perezosos mantienen las claves/orden de to_dict('records') y reporta el
+tiempo frente a groupby en un libro de 1M de líneas
+"""
+
+import io
+import sys
+import time
+import unittest
+import contextlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Configurar path del proyecto
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from balance_validator import BalanceValidator, EntryBalanceRecords, get_unbalanced_entries
+
+
+def groupby_entry_balances(df: pd.DataFrame, tolerance: float = 0.01) -> pd.DataFrame:
+    """Agregación original con groupby (referencia)"""
+    grouped = df.groupby('journal_entry_id').agg({'amount': 'sum'}).reset_index()
+    grouped['balance_difference'] = grouped['amount']
+    grouped['is_balanced'] = abs(grouped['balance_difference']) < tolerance
+    return grouped
+
+
+def create_ledger(lines: int, string_ids: bool = False, seed: int = 0) -> pd.DataFrame:
+    """Libro con asientos cuadrados y descuadrados, ids nulos e importes NaN"""
+    rng = np.random.default_rng(seed)
+    entry_ids = rng.integers(0, max(lines // 4, 1), lines)
+    amounts = rng.integers(-100000, 100000, lines) / 100
+    df = pd.DataFrame({'journal_entry_id': entry_ids, 'amount': amounts})
+    # Contrapartida exacta para la mitad de los asientos
+    balanced_ids = entry_ids % 2 == 0
+    df.loc[balanced_ids, 'amount'] = 0.0
+    if string_ids:
+        df['journal_entry_id'] = [f"AS-{entry_id:07d}" for entry_id in entry_ids]
+    df.loc[df.index[:3], 'amount'] = np.nan
+    return df
+
+
+class TestBalanceKernel(unittest.TestCase):
+    """El kernel debe dar el mismo reporte que groupby con registros compactos"""
+
+    def validate(self, df: pd.DataFrame) -> dict:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return BalanceValidator().perform_comprehensive_balance_validation(df)
+
+    def test_01_matches_groupby(self):
+        """Mismos asientos, sumas, flags y orden que groupby (ids numéricos y texto)"""
+        for string_ids in [False, True]:
+            df = create_ledger(20000, string_ids=string_ids)
+            df.loc[5, 'journal_entry_id'] = None
+            expected = groupby_entry_balances(df)
+            report = self.validate(df)
+
+            self.assertEqual(report['entries_count'], len(expected))
+            self.assertEqual(report['balanced_entries_count'], int(expected['is_balanced'].sum()))
+            actual = report['entry_balance_check'].to_frame()
+            self.assertEqual(actual['journal_entry_id'].tolist(), expected['journal_entry_id'].tolist())
+            np.testing.assert_allclose(actual['amount'], expected['amount'], atol=1e-6)
+            self.assertEqual(actual['is_balanced'].tolist(), expected['is_balanced'].tolist())
+
+            unbalanced = expected[~expected['is_balanced']]
+            self.assertEqual([entry['journal_entry_id'] for entry in report['unbalanced_entries']],
+                             unbalanced['journal_entry_id'].tolist())
+            self.assertAlmostEqual(report['total_amount_sum'], df['amount'].sum(), places=6)
+
+    def test_02_lazy_records(self):
+        """Registros perezosos con las claves de to_dict('records') y cortes"""
+        df = pd.DataFrame({'journal_entry_id': ['B', 'A', 'B', 'C', 'A'],
+                           'amount': [10.0, 5.0, -10.0, 3.5, -4.0]})
+        report = self.validate(df)
+
+        records = report['entry_balance_check']
+        self.assertIsInstance(records, EntryBalanceRecords)
+        self.assertEqual(list(records), [
+            {'journal_entry_id': 'A', 'amount': 1.0, 'balance_difference': 1.0, 'is_balanced': False},
+            {'journal_entry_id': 'B', 'amount': 0.0, 'balance_difference': 0.0, 'is_balanced': True},
+            {'journal_entry_id': 'C', 'amount': 3.5, 'balance_difference': 3.5, 'is_balanced': False},
+        ])
+        unbalanced = report['unbalanced_entries']
+        self.assertEqual(len(unbalanced), 2)
+        self.assertEqual([entry['journal_entry_id'] for entry in unbalanced[:1]], ['A'])
+        self.assertEqual(get_unbalanced_entries(df)['journal_entry_id'].tolist(), ['A', 'C'])
+
+    def test_03_integer_cents_total(self):
+        """Las sumas en céntimos no acumulan deriva de coma flotante"""
+        df = pd.DataFrame({'journal_entry_id': [1, 1, 1], 'amount': [0.1, 0.2, -0.3]})
+        self.assertNotEqual(df['amount'].sum(), 0.0)
+        report = self.validate(df)
+        self.assertEqual(report['total_amount_sum'], 0.0)
+        self.assertEqual(report['entry_balance_check'][0]['amount'], 0.0)
+        self.assertTrue(report['is_balanced'])
+
+    def test_04_benchmark(self):
+        """Reporta el tiempo de groupby + to_dict frente al kernel en 1M de líneas"""
+        df = create_ledger(1_000_000)
+
+        start = time.perf_counter()
+        grouped = groupby_entry_balances(df)
+        grouped.to_dict('records')
+        grouped[~grouped['is_balanced']].to_dict('records')
+        groupby_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        self.validate(df)
+        kernel_seconds = time.perf_counter() - start
+
+        print(f"\n    ⚡ groupby + to_dict: {groupby_seconds:6.2f} s ({len(df):,} lines)")
+        print(f"    ⚡ bincount kernel:   {kernel_seconds:6.2f} s ({groupby_seconds / kernel_seconds:.1f}x)")
+
+
+if __name__ == '__main__':
+    unittest.main()
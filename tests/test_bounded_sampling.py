@@ -0,0 +1,191 @@
+"""
+Tests de la detección sobre una muestra acotada (csv_sampling.read_csv_sample)
+Verifica que max_rows_for_analysis y max_columns_per_file se leen de system_config.yaml
+a través de DynamicFieldLoader, que la muestra es el fichero completo si cabe y ventanas
+repartidas si no, que el trainer genera los mismos ficheros con detección por muestra y
+transformación por chunks, y reporta el tiempo hasta el mapeo frente a la lectura completa
+"""
+
+import io
+import os
+import re
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+import contextlib
+from pathlib import Path
+
+import pandas as pd
+
+# Configurar path del proyecto
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from csv_sampling import read_csv_sample
+from core.dynamic_field_loader import DynamicFieldLoader, DEFAULT_ANALYSIS_LIMITS
+from automatic_confirmation_trainer import AutomaticConfirmationTrainingSession
+from csv_transformer import CSVTransformer
+from synthetic_ledger import generate_ledger, expected_mapping
+from tests.test_csv_transformer_streaming import create_ledger
+
+LEDGER_FILE = project_root / 'data' / 'Libro_Diario_ZTE_MSSE.csv'
+
+
+def set_analysis_limits(config_dir: Path, max_rows: int, max_columns: int = 500):
+    """Cambia los límites de análisis en la copia de config/system_config.yaml"""
+    config_file = config_dir / 'system_config.yaml'
+    text = config_file.read_text(encoding='utf-8')
+    text = re.sub(r'max_rows_for_analysis: \d+', f'max_rows_for_analysis: {max_rows}', text)
+    text = re.sub(r'max_columns_per_file: \d+', f'max_columns_per_file: {max_columns}', text)
+    config_file.write_text(text, encoding='utf-8')
+
+
+def repeat_ledger(source: Path, target: Path, times: int):
+    """Mismo libro repetido: cabecera una vez y el cuerpo `times` veces"""
+    header, body = source.read_bytes().split(b'\n', 1)
+    with open(target, 'wb') as f:
+        f.write(header + b'\n')
+        for _ in range(times):
+            f.write(body)
+
+
+class TestBoundedSampling(unittest.TestCase):
+    """La detección lee como mucho max_rows_for_analysis filas; la transformación, el fichero completo"""
+
+    def setUp(self):
+        self.original_cwd = os.getcwd()
+        self.temp_dir = tempfile.mkdtemp()
+        os.chdir(self.temp_dir)
+        # Copia (no symlink) de config/: el test modifica system_config.yaml
+        shutil.copytree(project_root / 'config', 'config')
+
+    def tearDown(self):
+        os.chdir(self.original_cwd)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_01_loader_reads_limits(self):
+        """get_analysis_limits lee system_config.yaml y se actualiza al cambiar el archivo"""
+        with contextlib.redirect_stdout(io.StringIO()):
+            loader = DynamicFieldLoader('config/dynamic_fields_config.yaml', auto_reload=False)
+        try:
+            self.assertEqual(loader.get_analysis_limits(), DEFAULT_ANALYSIS_LIMITS)
+            self.assertTrue(loader.get_system_setting('enable_content_validation'))
+
+            set_analysis_limits(Path('config'), 2500, 40)
+            self.assertEqual(loader.get_analysis_limits(),
+                             {'max_rows_for_analysis': 2500, 'max_columns_per_file': 40})
+
+            os.remove('config/system_config.yaml')
+            self.assertEqual(loader.get_analysis_limits(), DEFAULT_ANALYSIS_LIMITS)
+            self.assertIsNone(loader.get_system_setting('max_backup_retention'))
+        finally:
+            loader.shutdown()
+
+    def test_02_sample_windows(self):
+        """Fichero completo si cabe; si no, ventanas de filas consecutivas repartidas por el fichero"""
+        for csv_path in sorted((project_root / 'data').glob('*.csv')):
+            with self.subTest(file=csv_path.name):
+                df, info = read_csv_sample(csv_path, max_rows=100_000)
+                pd.testing.assert_frame_equal(df, pd.read_csv(csv_path))
+                self.assertFalse(info['sampled'])
+
+        ledger = create_ledger(20_000)
+        ledger['Linea'] = range(len(ledger))
+        ledger.to_csv('ledger.csv', index=False)
+        full = pd.read_csv('ledger.csv')
+        df, info = read_csv_sample('ledger.csv', max_rows=1000, windows=4)
+        self.assertTrue(info['sampled'])
+        self.assertLessEqual(len(df), 1000)
+        self.assertAlmostEqual(info['estimated_total_rows'] / len(full), 1, delta=0.1)
+
+        # Filas completas del fichero, en orden y con ventanas en cada cuarto del fichero
+        positions = df['Linea'].to_numpy()
+        self.assertTrue((positions[1:] > positions[:-1]).all())
+        pd.testing.assert_frame_equal(df.reset_index(drop=True),
+                                      full.iloc[positions].reset_index(drop=True), check_dtype=False)
+        quarters = set(positions * 4 // len(full))
+        self.assertEqual(quarters, {0, 1, 2, 3})
+
+        wide = pd.DataFrame({f'col_{i}': range(5) for i in range(30)})
+        wide.to_csv('wide.csv', index=False)
+        df, info = read_csv_sample('wide.csv', max_rows=10, max_columns=12)
+        self.assertEqual(list(df.columns), [f'col_{i}' for i in range(12)])
+        self.assertEqual((info['columns_total'], info['columns_read']), (30, 12))
+
+    def run_training(self, csv_file: str, max_rows: int):
+        set_analysis_limits(Path('config'), max_rows)
+        with contextlib.redirect_stdout(io.StringIO()):
+            session = AutomaticConfirmationTrainingSession(csv_file, use_mapping_cache=False)
+            self.assertTrue(session.initialize())
+            result = session.run_automatic_training()
+        self.assertTrue(result['success'], result.get('error'))
+        return session, result
+
+    def test_03_trainer_streams_full_file(self):
+        """Detección sobre la muestra y mismos header/detail y balance que con el fichero en memoria"""
+        repeat_ledger(LEDGER_FILE, Path('ledger.csv'), 3)
+
+        full_session, full = self.run_training('ledger.csv', 100_000)
+        sampled_session, sampled = self.run_training('ledger.csv', 2000)
+        self.assertFalse(full_session.sample_info['sampled'])
+        self.assertTrue(sampled_session.sample_info['sampled'])
+        self.assertLessEqual(len(sampled_session.df), 2000)
+
+        self.assertEqual({column: decision['field_type'] for column, decision in sampled['user_decisions'].items()},
+                         {column: decision['field_type'] for column, decision in full['user_decisions'].items()})
+        self.assertEqual(sampled['transformation_stats']['rows_processed'], len(full_session.df))
+        self.assertEqual(Path(sampled['header_file']).read_bytes(), Path(full['header_file']).read_bytes())
+        self.assertEqual(Path(sampled['detail_file']).read_bytes(), Path(full['detail_file']).read_bytes())
+        for key in ('is_balanced', 'total_amount_sum'):
+            self.assertEqual(sampled['balance_report'].get(key), full['balance_report'].get(key))
+
+    def test_04_streamed_file_matches_in_memory_transform(self):
+        """Por encima del límite por defecto, con vacíos tardíos: header/detail idénticos al fichero en memoria"""
+        ledger = generate_ledger('sap', 25_000, seed=3)
+        # Vacíos en el último chunk: el resto del fichero se leería como enteros chunk a chunk
+        ledger.loc[len(ledger) - 50, ['BUZEI', 'HKONT', 'GJAHR', 'MONAT']] = None
+        ledger.to_csv('ledger.csv', index=False)
+        self.assertGreater(len(ledger), DEFAULT_ANALYSIS_LIMITS['max_rows_for_analysis'])
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            session = AutomaticConfirmationTrainingSession('ledger.csv', use_mapping_cache=False)
+            self.assertTrue(session.initialize())
+            session.csv_transformer.chunk_size = 5000
+            result = session.run_automatic_training()
+            self.assertTrue(result['success'], result.get('error'))
+            reference = CSVTransformer(output_prefix='reference').create_header_detail_csvs(
+                pd.read_csv('ledger.csv'), result['user_decisions'], [])
+        self.assertTrue(session.sample_info['sampled'])
+        self.assertEqual({column: decision['field_type'] for column, decision in result['user_decisions'].items()},
+                         expected_mapping('sap'))
+        self.assertEqual(Path(result['detail_file']).read_bytes(), Path(reference['detail_file']).read_bytes())
+        self.assertEqual(Path(result['header_file']).read_bytes(), Path(reference['header_file']).read_bytes())
+
+    def test_05_benchmark(self):
+        """Reporta el tiempo hasta el mapeo con lectura completa frente a la muestra acotada"""
+        repeat_ledger(LEDGER_FILE, Path('big_ledger.csv'), 150)
+        size_mb = Path('big_ledger.csv').stat().st_size / 1024 / 1024
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            session = AutomaticConfirmationTrainingSession('big_ledger.csv', use_mapping_cache=False)
+            start = time.perf_counter()
+            self.assertTrue(session.initialize())
+            self.assertTrue(session._perform_automatic_field_detection()['success'])
+            sampled_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            full = pd.read_csv('big_ledger.csv')
+            full_read_seconds = time.perf_counter() - start
+
+        self.assertEqual(len(session.df), DEFAULT_ANALYSIS_LIMITS['max_rows_for_analysis'])
+        self.assertAlmostEqual(session.sample_info['estimated_total_rows'] / len(full), 1, delta=0.1)
+        print(f"\n    ⚡ Full pd.read_csv only:        {full_read_seconds:6.2f} s for {size_mb:.0f} MB "
+              f"({len(full):,} rows)")
+        print(f"    ⚡ Sampled read + full mapping: {sampled_seconds:6.2f} s "
+              f"({session.sample_info['seconds']:.3f} s reading the sample)")
+
+
+if __name__ == '__main__':
+    unittest.main()
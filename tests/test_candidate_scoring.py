@@ -0,0 +1,202 @@
+"""
+Tests del scoring compartido de candidatos a journal_entry_id (FieldMapper + BalanceValidator)
+Verifica que puntuar todos los candidatos a la vez sobre un único vector de importes
+da los mismos scores que la evaluación con copia + rename por candidato y reporta el
+tiempo de ambas
+"""
+
+import io
+import sys
+import time
+import unittest
+import contextlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Configurar path del proyecto
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.field_mapper import FieldMapper
+from balance_validator import BalanceValidator
+
+
+def copy_rename_score(mapper: FieldMapper, column_name: str, df: pd.DataFrame, balance_validator) -> float:
+    """Implementación original de _calculate_balance_score_for_column (referencia)"""
+    try:
+        temp_df = df.copy()
+        column_mapping = {mapped_col: ftype for ftype, mapped_col in mapper._used_field_mappings.items()}
+        column_mapping[column_name] = 'journal_entry_id'
+        temp_df = temp_df.rename(columns=column_mapping)
+        for col in ('debit_amount', 'credit_amount', 'amount'):
+            if col in temp_df.columns:
+                temp_df[col] = pd.to_numeric(temp_df[col], errors='coerce')
+        result = balance_validator.evaluate_journal_entry_id_candidate(temp_df)
+        return float(result.get('quality_score', 0.0))
+    except Exception:
+        return 0.0
+
+
+def comprehensive_score(mapper: FieldMapper, journal_column: str, amount_columns: dict) -> float:
+    """Implementación original de _test_journal_entry_candidate (referencia)"""
+    balance_df = mapper._dataframe_for_balance
+    test_df = pd.DataFrame()
+    test_df['journal_entry_id'] = balance_df[journal_column]
+    for field_type, column_name in amount_columns.items():
+        test_df[field_type] = mapper._clean_numeric_column(balance_df[column_name])
+    return mapper._calculate_balance_score(
+        mapper._balance_validator.perform_comprehensive_balance_validation(test_df))
+
+
+def create_ledger(lines: int, seed: int = 0) -> pd.DataFrame:
+    """Libro con un id de asiento bueno, uno demasiado fino y uno demasiado grueso"""
+    rng = np.random.default_rng(seed)
+    entry = np.repeat(np.arange(lines // 2), 2)
+    amounts = rng.integers(1, 100000, lines // 2) / 100
+    return pd.DataFrame({
+        'Asiento': entry,
+        'Documento': [f"DOC{value:07d}" for value in np.arange(len(entry))],
+        'Periodo': entry // 500,
+        'Importe': np.column_stack([amounts, -amounts]).ravel().astype(str),
+    })
+
+
+class TestCandidateScoring(unittest.TestCase):
+    """El scoring compartido debe dar los mismos scores que la evaluación por candidato"""
+
+    @classmethod
+    def setUpClass(cls):
+        with contextlib.redirect_stdout(io.StringIO()):
+            cls.mapper = FieldMapper()
+        cls.balance_validator = BalanceValidator()
+
+    def setUp(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.mapper.reset_mappings()
+
+    def assert_same_scores(self, df: pd.DataFrame, candidates: list):
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected = {column: copy_rename_score(self.mapper, column, df, self.balance_validator)
+                        for column in candidates}
+            actual = self.mapper._calculate_balance_scores_for_columns(candidates, df, self.balance_validator)
+        self.assertEqual(actual, expected)
+        return actual
+
+    def test_01_parity_on_sample_ledgers(self):
+        """Mismos scores en todas las columnas de data/*.csv con cada columna como amount"""
+        for csv_file in sorted((project_root / 'data').glob('*.csv')):
+            try:
+                df = pd.read_csv(csv_file, nrows=2000)
+            except Exception:
+                continue
+            columns = list(df.columns)
+            for amount_column in columns[:6]:
+                self.mapper._used_field_mappings.clear()
+                self.mapper._used_field_mappings['amount'] = amount_column
+                # journal_entry_id ya mapeado: los demás candidatos colisionan al renombrar
+                self.mapper._used_field_mappings['journal_entry_id'] = columns[0]
+                with self.subTest(file=csv_file.name, amount=amount_column):
+                    self.assert_same_scores(df, columns)
+
+    def test_02_edge_cases(self):
+        """Sin amount, amount_numeric sin convertir, columnas literales y amounts de texto"""
+        df = pd.DataFrame({'A': [1, 1, 2, 2], 'B': ['x', 'x', 'y', None],
+                           'amount_numeric': [5.0, -5.0, 1.0, -1.0],
+                           'Importe': ['10', '-10', 'n/a', '3,5'],
+                           'amount': [1.0, -1.0, 2.0, -2.0]})
+        candidates = ['A', 'B', 'amount_numeric', 'Importe', 'amount', 'missing']
+        scores = self.assert_same_scores(df, candidates)
+        self.assertEqual(scores['A'], 1.0)
+
+        self.mapper._used_field_mappings['amount'] = 'Importe'
+        self.assert_same_scores(df, candidates)
+        self.assert_same_scores(df.drop(columns=['amount']), candidates)
+        self.assert_same_scores(df.drop(columns=['amount', 'Importe']), candidates)
+        self.mapper._used_field_mappings['debit_amount'] = 'B'
+        self.assert_same_scores(df.drop(columns=['amount']), candidates)
+
+        text_df = pd.DataFrame({'A': [1, 1], 'amount_numeric': ['x', 'y']})
+        self.mapper._used_field_mappings.clear()
+        self.assert_same_scores(text_df, ['A'])
+
+    def test_03_comprehensive_scores(self):
+        """_test_journal_entry_candidates coincide con el reporte completo por candidato"""
+        df = create_ledger(2000)
+        df.loc[3, 'Importe'] = '1.234,56'
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.mapper.set_dataframe_for_balance_validation(df)
+            for amount_columns in [{'amount': 'Importe'}, {'debit_amount': 'Importe'}]:
+                expected = {column: comprehensive_score(self.mapper, column, amount_columns)
+                            for column in df.columns}
+                actual = self.mapper._test_journal_entry_candidates(list(df.columns), amount_columns)
+                for column in df.columns:
+                    self.assertAlmostEqual(actual[column], expected[column], places=12)
+        # El amount limpio se cachea una sola vez para todos los candidatos
+        self.assertEqual(list(self.mapper._clean_amount_cache), ['Importe'])
+
+    def test_04_evaluator_cache_released(self):
+        """Los evaluators no sobreviven a reset_mappings ni a un cambio de DataFrame de muestra"""
+        df = pd.DataFrame({'A': [1, 1, 2, 2], 'amount': [1.0, -1.0, 2.0, -2.0]})
+        self.assertEqual(self.assert_same_scores(df, ['A'])['A'], 1.0)
+        self.assertIs(self.mapper._balance_evaluator_frame, df)
+
+        # Cambio en el mismo DataFrame: tras reset_mappings se vuelve a convertir el amount
+        df.loc[0, 'amount'] = 5.0
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.mapper.reset_mappings()
+        self.assertIsNone(self.mapper._balance_evaluator_frame)
+        self.assertEqual(self.mapper._balance_evaluator_cache, {})
+        self.assertLess(self.assert_same_scores(df, ['A'])['A'], 1.0)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.mapper.set_sample_dataframe(df.copy())
+        self.assertIsNone(self.mapper._balance_evaluator_frame)
+
+        # La resolución global de conflictos no retiene el DataFrame de la pasada
+        mappings = {'A': {'field_type': 'journal_entry_id', 'confidence': 0.9},
+                    'B': {'field_type': 'journal_entry_id', 'confidence': 0.8},
+                    'amount': {'field_type': 'amount', 'confidence': 0.95}}
+        self.mapper._used_field_mappings['amount'] = 'amount'
+        self.mapper._confidence_by_column['amount'] = 0.95
+        built = []
+        original = self.mapper._get_balance_candidate_evaluator
+        self.mapper._get_balance_candidate_evaluator = lambda *args: built.append(args[0]) or original(*args)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                final = self.mapper._resolve_global_field_conflicts(mappings, df.assign(B=[1, 2, 3, 4]),
+                                                                    self.balance_validator)
+        finally:
+            del self.mapper._get_balance_candidate_evaluator
+        self.assertIn({'field_type': 'journal_entry_id', 'confidence': 0.9,
+                       'resolution_type': 'balance_validation_winner'}, final.values())
+        self.assertTrue(built)
+        self.assertIsNone(self.mapper._balance_evaluator_frame)
+        self.assertEqual(self.mapper._balance_evaluator_cache, {})
+
+    def test_05_benchmark(self):
+        """Reporta el tiempo de copia + rename por candidato frente al scoring compartido"""
+        df = create_ledger(400_000)
+        self.mapper._used_field_mappings['amount'] = 'Importe'
+        candidates = ['Asiento', 'Documento', 'Periodo']
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            expected = {column: copy_rename_score(self.mapper, column, df, self.balance_validator)
+                        for column in candidates}
+            per_candidate_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            actual = self.mapper._calculate_balance_scores_for_columns(candidates, df, self.balance_validator)
+            shared_seconds = time.perf_counter() - start
+
+        self.assertEqual(actual, expected)
+        self.assertEqual(actual['Asiento'], 1.0)
+        print(f"\n    ⚡ Copy + rename per candidate: {per_candidate_seconds:6.2f} s ({len(df):,} lines)")
+        print(f"    ⚡ Shared amount vector:        {shared_seconds:6.2f} s "
+              f"({per_candidate_seconds / shared_seconds:.1f}x)")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Tests del perfilador de columnas en una sola pasada (core/column_profiler.py)
+Verifica la alternancia de fechas compilada, el vector de características y
+reporta el coste por columna de _enhanced_content_analysis en un extracto ancho
+"""
+
+import io
+import re
+import sys
+import time
+import unittest
+import contextlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Configurar path del proyecto
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.column_profiler import DATE_PATTERNS, DATE_FORMAT_REGEX, FEATURE_NAMES, profile_column
+from core.field_mapper import FieldMapper
+
+
+def create_wide_extract(rows: int = 100, columns: int = 150) -> pd.DataFrame:
+    """Extracto tipo SAP con columnas numéricas, fechas, códigos y textos"""
+    rng = np.random.default_rng(0)
+    generators = [
+        lambda: rng.uniform(-5000, 5000, rows).round(2),
+        lambda: [f"{d:02d}.{m:02d}.2024" for d, m in zip(rng.integers(1, 29, rows), rng.integers(1, 13, rows))],
+        lambda: [f"{x:08d}" for x in rng.integers(1, 10**8, rows)],
+        lambda: rng.choice(['Factura proveedor', 'Cobro cliente', 'Nómina mensual', 'Amortización'], rows),
+        lambda: rng.integers(1, 999, rows),
+    ]
+    return pd.DataFrame({f"FIELD_{i:03d}": generators[i % len(generators)]() for i in range(columns)})
+
+
+class TestColumnProfiler(unittest.TestCase):
+    """El perfil de una pasada debe alimentar los mismos scores que los analizadores"""
+
+    @classmethod
+    def setUpClass(cls):
+        with contextlib.redirect_stdout(io.StringIO()):
+            cls.mapper = FieldMapper()
+
+    def test_01_combined_date_regex(self):
+        """La alternancia compilada equivale a probar cada patrón por separado"""
+        values = ['2024-01-31', '31/01/2024', '31.01.2024', '20240131', '31-Jan-2024', '1 Ene 2024',
+                  '2024-01-31T10:00:00Z', '2024年1月31日', 'ndx', 'rd', '1234.56', 'ABC', '', '12 03 24',
+                  '2024-001', '1700000000', 'Jan 1, 2024', '31/01/2024 10:15', 'not a date']
+        for value in values:
+            expected = any(re.match(pattern, value) for pattern in DATE_PATTERNS)
+            self.assertEqual(expected, bool(DATE_FORMAT_REGEX.match(value)), value)
+
+    def test_02_feature_vector(self):
+        """Ratios numéricos, signos, unicidad y longitudes en el vector compacto"""
+        profile = profile_column(pd.Series(['10', '-5', '0', '0', 'abc']))
+        features = profile.as_dict()
+        self.assertEqual(len(profile.feature_vector()), len(FEATURE_NAMES))
+        self.assertEqual(features['numeric_ratio'], 0.8)
+        self.assertEqual(features['zero_ratio'], 0.5)
+        self.assertEqual((features['positive_count'], features['negative_count']), (1, 1))
+        self.assertEqual(features['unique_ratio'], 0.8)
+        self.assertEqual((features['min_length'], features['max_length']), (1, 3))
+        self.assertEqual(features['char_alpha_ratio'], 3 / 9)
+
+    def test_03_analyzers_accept_series(self):
+        """Los analizadores siguen aceptando una Series sin perfil precalculado"""
+        dates = pd.Series(['01/01/2024', '15/02/2024', '31/03/2024'])
+        self.assertEqual(self.mapper._analyze_date_content_improved(dates),
+                         {'posting_date': 0.9, 'entry_date': 0.85})
+        self.assertEqual(self.mapper._analyze_numeric_content(pd.Series([2024] * 5)),
+                         {'fiscal_year': 0.9})
+        self.assertEqual(self.mapper._analyze_vendor_id_content('Proveedor', pd.Series(['P1', 'P2'])),
+                         {'vendor_id': 0.7})
+
+    def test_04_wide_extract_cost(self):
+        """Reporta el coste por columna en un extracto de 150 columnas"""
+        df = create_wide_extract()
+        start = time.perf_counter()
+        for column in df.columns:
+            self.mapper._enhanced_content_analysis(column, df[column].head(100))
+        per_column = (time.perf_counter() - start) / len(df.columns)
+        print(f"\n    ⚡ Content analysis: {per_column * 1000:.2f} ms/column ({len(df.columns)} columns)")
+
+
+if __name__ == '__main__':
+    unittest.main()
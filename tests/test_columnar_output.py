@@ -0,0 +1,197 @@
+"""
+Tests de la salida columnar (Parquet/Feather) de staging_writer
+Verifica que header/detail en Parquet y Feather tienen los mismos valores que el CSV,
+con importes float64, fechas date32 y diccionario en las columnas repetitivas, que el
+modo streaming da el mismo resultado que el modo en memoria, la salida de
+balance_sumarias y reporta tiempos de escritura/lectura y tamaño frente al CSV
+"""
+
+import io
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+import contextlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pyarrow.feather as feather
+
+# Configurar path del proyecto
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from csv_transformer import IntegratedCSVTransformer
+from balance_sumarias import transformar_excel_a_csv
+from staging_writer import (column_kind, normalize_output_format, read_staging_file,
+                            write_staging_file, STAGING_DTYPES)
+from tests.test_csv_transformer_streaming import create_ledger, USER_DECISIONS
+
+
+def assert_same_values(test: unittest.TestCase, csv_file: str, columnar: pd.DataFrame):
+    """Cada columna tipada tiene el mismo valor que el texto del CSV"""
+    text = pd.read_csv(csv_file, dtype=str, keep_default_na=False)
+    test.assertEqual(list(columnar.columns), list(text.columns))
+    test.assertEqual(len(columnar), len(text))
+    for column in text.columns:
+        with test.subTest(column=column):
+            values = columnar[column].astype(object)
+            expected = text[column]
+            kind = STAGING_DTYPES.get(column, 'string')
+            if kind in ('float64', 'int64'):
+                numbers = pd.to_numeric(expected.replace('', np.nan)).to_numpy(dtype=float)
+                test.assertTrue(np.array_equal(values.to_numpy(dtype=float), numbers, equal_nan=True))
+            elif kind == 'date':
+                test.assertEqual([value.isoformat() if pd.notna(value) else '' for value in values],
+                                 expected.tolist())
+            else:
+                test.assertEqual(values.where(values.notna(), '').tolist(), expected.tolist())
+
+
+class TestColumnarOutput(unittest.TestCase):
+    """Parquet/Feather como alternativa al CSV de staging, con CSV por defecto"""
+
+    def setUp(self):
+        self.original_cwd = os.getcwd()
+        self.temp_dir = tempfile.mkdtemp()
+        os.chdir(self.temp_dir)
+
+    def tearDown(self):
+        os.chdir(self.original_cwd)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def transform(self, ledger: pd.DataFrame, output_format: str, streaming: bool = False):
+        transformer = IntegratedCSVTransformer(output_prefix=f"{output_format}_{int(streaming)}",
+                                               output_format=output_format)
+        with contextlib.redirect_stdout(io.StringIO()):
+            if streaming:
+                ledger.to_csv('ledger.csv', index=False)
+                result = transformer.create_header_detail_csvs_streaming('ledger.csv', USER_DECISIONS, [],
+                                                                         chunk_size=700)
+            else:
+                result = transformer.create_header_detail_csvs(ledger, USER_DECISIONS, [])
+        self.assertTrue(result['success'], result.get('error'))
+        return transformer, result
+
+    def test_01_same_values_as_csv(self):
+        """Parquet y Feather contienen los valores del CSV con tipos de staging"""
+        ledger = create_ledger(3000)
+        _, csv_result = self.transform(ledger, 'csv')
+        self.assertTrue(csv_result['detail_file'].endswith('.csv'))
+
+        for output_format in ('parquet', 'feather'):
+            with self.subTest(output_format=output_format):
+                transformer, result = self.transform(ledger, output_format)
+                stats = transformer.transformation_stats
+                self.assertEqual(stats['output_format'], output_format)
+                self.assertTrue(result['detail_file'].endswith(f'.{output_format}'))
+                self.assertEqual(stats['detail_file_bytes'], os.path.getsize(result['detail_file']))
+                self.assertIn('gl_account_number', stats['detail_dictionary_columns'])
+                self.assertNotIn('amount', stats['detail_dictionary_columns'])
+
+                for kind in ('header', 'detail'):
+                    assert_same_values(self, csv_result[f'{kind}_file'],
+                                       read_staging_file(result[f'{kind}_file']))
+
+                reader = pq.read_schema if output_format == 'parquet' else feather.read_table
+                schema = reader(result['detail_file'])
+                schema = getattr(schema, 'schema', schema)
+                self.assertEqual(str(schema.field('amount').type), 'double')
+                self.assertEqual(str(schema.field('line_number').type), 'int64')
+                self.assertTrue(str(schema.field('gl_account_number').type).startswith('dictionary'))
+                header_schema = reader(result['header_file'])
+                header_schema = getattr(header_schema, 'schema', header_schema)
+                self.assertEqual(str(header_schema.field('entry_date').type), 'date32[day]')
+
+    def test_02_streaming_matches_in_memory(self):
+        """El modo por chunks escribe los mismos datos y tipos que el modo en memoria"""
+        ledger = create_ledger(3000, seed=3)
+        for output_format in ('parquet', 'feather'):
+            with self.subTest(output_format=output_format):
+                _, in_memory = self.transform(ledger, output_format)
+                _, streamed = self.transform(ledger, output_format, streaming=True)
+                self.assertFalse(any(path.endswith('.csv') for path in os.listdir('results')
+                                     if path.startswith(f'{output_format}_1')))
+                for kind in ('header', 'detail'):
+                    expected = read_staging_file(in_memory[f'{kind}_file'])
+                    actual = read_staging_file(streamed[f'{kind}_file'])
+                    for frame in (expected, actual):
+                        for column in frame.columns:
+                            if isinstance(frame[column].dtype, pd.CategoricalDtype):
+                                frame[column] = frame[column].astype(object)
+                    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+                    self.assertEqual(actual.dtypes.map(lambda dtype: dtype.kind).to_dict(),
+                                     expected.dtypes.map(lambda dtype: dtype.kind).to_dict())
+
+    def test_03_type_fallbacks(self):
+        """Un valor que no encaja en el tipo de staging nunca se pierde: la columna pasa a texto/float"""
+        self.assertEqual(column_kind(pd.Series(['1.50', 'n/a']), 'amount'), 'string')
+        self.assertEqual(column_kind(pd.Series(['2024', '2024.5']), 'fiscal_year'), 'float64')
+        self.assertEqual(column_kind(pd.Series(['2024-01-01 10:30:00']), 'entry_date'), 'timestamp')
+        self.assertEqual(column_kind(pd.Series(['', None]), 'amount'), 'float64')
+        with self.assertRaises(ValueError):
+            normalize_output_format('xlsx')
+
+        frame = pd.DataFrame({'amount': ['1.50', 'n/a'], 'fiscal_year': ['2024', '2024.5']})
+        written = write_staging_file(frame, 'fallback', 'parquet')
+        self.assertEqual(written['column_types'], {'amount': 'string', 'fiscal_year': 'float64'})
+        self.assertEqual(read_staging_file(written['path'])['amount'].tolist(), ['1.50', 'n/a'])
+
+    def test_04_trial_balance(self):
+        """balance_sumarias escribe el mismo trial balance en Parquet con saldos float64"""
+        rows = 200
+        raw = pd.DataFrame({
+            'NIVEL CUENTA': ['4'] * rows,
+            'CUENTA MAYOR': ['430'] * rows,
+            'CUENTA': [f"43{i % 12:05d}" for i in range(rows)],
+            'CUENTA LOCAL': [f"43{i % 12:05d}.0" for i in range(rows)],
+            'SALDO 31/12/2023': [f"{(i % 7) * 1000},50" for i in range(rows)],
+            'SALDO FINAL': [f"({i % 5}.250,00)" if i % 2 else f"{i % 5}.250,00" for i in range(rows)],
+        })
+        with pd.ExcelWriter('sumas_saldos.xlsx') as writer:
+            pd.DataFrame([['Balance de sumas y saldos']]).to_excel(writer, header=False, index=False)
+            raw.to_excel(writer, startrow=2, index=False)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            csv_path = transformar_excel_a_csv('sumas_saldos.xlsx', 'trial_balance.csv')
+            parquet_path = transformar_excel_a_csv('sumas_saldos.xlsx', 'trial_balance.csv', 'parquet')
+        self.assertEqual(csv_path, 'trial_balance.csv')
+        self.assertEqual(parquet_path, 'trial_balance.parquet')
+
+        expected = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+        actual = read_staging_file(parquet_path)
+        self.assertEqual(actual['period_ending_balance'].dtype, np.float64)
+        self.assertEqual(actual['period_ending_balance'].map('{:.2f}'.format).tolist(),
+                         expected['period_ending_balance'].tolist())
+        self.assertEqual(actual['gl_account_number'].astype(object).tolist(),
+                         expected['gl_account_number'].tolist())
+
+    def test_05_benchmark(self):
+        """Reporta tiempo de escritura/lectura y tamaño del detail en CSV, Parquet y Feather"""
+        _, result = self.transform(create_ledger(300_000, seed=5), 'csv')
+        detail = pd.read_csv(result['detail_file'])
+
+        timings = {}
+        for output_format in ('csv', 'parquet', 'feather'):
+            start = time.perf_counter()
+            written = write_staging_file(detail, 'bench_detail', output_format)
+            write_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            loaded = read_staging_file(written['path'])
+            read_seconds = time.perf_counter() - start
+            self.assertEqual(len(loaded), len(detail))
+            timings[output_format] = (write_seconds, read_seconds, written['bytes'] / 1024 / 1024)
+
+        self.assertLess(timings['parquet'][2], timings['csv'][2])
+        print(f"\n    ⚡ Detail with {len(detail):,} rows (write / read / size):")
+        for output_format, (write_seconds, read_seconds, size_mb) in timings.items():
+            print(f"    ⚡ {output_format:<8} {write_seconds:6.2f} s / {read_seconds:6.2f} s / {size_mb:6.1f} MB")
+
+
+if __name__ == '__main__':
+    unittest.main()
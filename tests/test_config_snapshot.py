@@ -0,0 +1,147 @@
+"""
+Tests del snapshot binario de configuración de DynamicFieldLoader
+Verifica que el snapshot junto al YAML da las mismas definiciones que parsear el YAML,
+que se invalida al cambiar el contenido o la versión y reporta el tiempo hasta el
+primer mapeo con el loader YAML en Python, con el loader en C y con el snapshot
+"""
+
+import io
+import os
+import sys
+import time
+import pickle
+import shutil
+import tempfile
+import unittest
+import contextlib
+from pathlib import Path
+
+import yaml
+
+# Configurar path del proyecto
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from core import dynamic_field_loader
+from core.dynamic_field_loader import DynamicFieldLoader, CONFIG_SNAPSHOT_VERSION
+from core.field_mapper import FieldMapper
+
+CONFIG_FILE = Path('config') / 'dynamic_fields_config.yaml'
+SNAPSHOT_FILE = Path('config') / 'dynamic_fields_config.snapshot.pickle'
+
+
+def without_timestamps(data):
+    if isinstance(data, dict):
+        return {key: without_timestamps(value) for key, value in data.items()
+                if key not in ('timestamps', 'added_at')}
+    if isinstance(data, list):
+        return [without_timestamps(value) for value in data]
+    return data
+
+
+def comparable_definitions(loader: DynamicFieldLoader) -> dict:
+    """Definiciones sin marcas de tiempo de creación"""
+    return {code: without_timestamps(field_def.to_dict())
+            for code, field_def in loader.get_field_definitions().items()}
+
+
+class TestConfigSnapshot(unittest.TestCase):
+    """El snapshot debe ser equivalente al YAML y no usarse si está obsoleto"""
+
+    def setUp(self):
+        self.original_cwd = os.getcwd()
+        self.temp_dir = tempfile.mkdtemp()
+        os.chdir(self.temp_dir)
+        # Copia (no symlink) de config/: el test escribe el snapshot y modifica el YAML
+        shutil.copytree(project_root / 'config', 'config')
+        SNAPSHOT_FILE.unlink(missing_ok=True)
+        self.loaders = []
+
+    def tearDown(self):
+        for loader in self.loaders:
+            loader.shutdown()
+        os.chdir(self.original_cwd)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def create_loader(self, use_snapshot: bool = True) -> DynamicFieldLoader:
+        with contextlib.redirect_stdout(io.StringIO()):
+            loader = DynamicFieldLoader(auto_reload=False, use_snapshot=use_snapshot)
+        self.loaders.append(loader)
+        return loader
+
+    def test_01_snapshot_matches_yaml(self):
+        """Primera carga escribe el snapshot; las siguientes lo usan con el mismo resultado"""
+        first = self.create_loader()
+        self.assertEqual((first.stats['snapshot_hits'], first.stats['snapshot_misses']), (0, 1))
+        self.assertTrue(SNAPSHOT_FILE.exists())
+
+        second = self.create_loader()
+        self.assertEqual((second.stats['snapshot_hits'], second.stats['snapshot_misses']), (1, 0))
+        expected = comparable_definitions(self.create_loader(use_snapshot=False))
+        self.assertEqual(comparable_definitions(first), expected)
+        self.assertEqual(comparable_definitions(second), expected)
+
+        # El loader en C da el mismo árbol que safe_load
+        content = CONFIG_FILE.read_text(encoding='utf-8')
+        self.assertEqual(yaml.load(content, Loader=dynamic_field_loader.YAML_SAFE_LOADER), yaml.safe_load(content))
+
+    def test_02_stale_or_invalid_snapshot_falls_back(self):
+        """Un YAML editado, otra versión de formato o un archivo corrupto vuelven a parsear"""
+        self.create_loader()
+        content = CONFIG_FILE.read_text(encoding='utf-8')
+        CONFIG_FILE.write_text(content.replace('name: Importe\n', 'name: Importe Editado\n', 1), encoding='utf-8')
+
+        edited = self.create_loader()
+        self.assertEqual(edited.stats['snapshot_misses'], 1)
+        self.assertEqual(edited.get_field_definition('amount').name, 'Importe Editado')
+        self.assertEqual(self.create_loader().stats['snapshot_hits'], 1)
+
+        with open(SNAPSHOT_FILE, 'rb') as f:
+            snapshot = pickle.load(f)
+        with open(SNAPSHOT_FILE, 'wb') as f:
+            pickle.dump({**snapshot, 'version': CONFIG_SNAPSHOT_VERSION + 1}, f)
+        self.assertEqual(self.create_loader().stats['snapshot_misses'], 1)
+
+        SNAPSHOT_FILE.write_bytes(b'not a pickle')
+        loader = self.create_loader()
+        self.assertEqual(loader.stats['snapshot_misses'], 1)
+        self.assertEqual(loader.get_field_definition('amount').name, 'Importe Editado')
+        self.assertEqual(self.create_loader().stats['snapshot_hits'], 1)
+
+    def time_to_first_mapping(self, yaml_loader, keep_snapshot: bool) -> float:
+        """FieldMapper() + primer find_field_mapping, como al arrancar un entrenamiento"""
+        if not keep_snapshot:
+            SNAPSHOT_FILE.unlink(missing_ok=True)
+        original_loader = dynamic_field_loader.YAML_SAFE_LOADER
+        dynamic_field_loader.YAML_SAFE_LOADER = yaml_loader
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                mapper = FieldMapper()
+                mapping = mapper.find_field_mapping('Fecha Contable')
+                seconds = time.perf_counter() - start
+        finally:
+            dynamic_field_loader.YAML_SAFE_LOADER = original_loader
+        self.loaders.append(mapper.field_loader)
+        self.assertIsNotNone(mapping)
+        return seconds
+
+    def test_03_startup_benchmark(self):
+        """Reporta el tiempo hasta el primer mapeo con cada forma de cargar el YAML"""
+        runs = 3
+        python_seconds = min(self.time_to_first_mapping(yaml.SafeLoader, False) for _ in range(runs))
+        c_seconds = min(self.time_to_first_mapping(dynamic_field_loader.YAML_SAFE_LOADER, False)
+                        for _ in range(runs))
+        self.time_to_first_mapping(dynamic_field_loader.YAML_SAFE_LOADER, False)
+        snapshot_seconds = min(self.time_to_first_mapping(dynamic_field_loader.YAML_SAFE_LOADER, True)
+                               for _ in range(runs))
+
+        print(f"\n    ⚡ safe_load (Python): {python_seconds * 1e3:8.1f} ms to first mapping")
+        print(f"    ⚡ {dynamic_field_loader.YAML_SAFE_LOADER.__name__ + ':':19s} {c_seconds * 1e3:8.1f} ms "
+              f"({python_seconds / c_seconds:.1f}x)")
+        print(f"    ⚡ Snapshot:           {snapshot_seconds * 1e3:8.1f} ms "
+              f"({python_seconds / snapshot_seconds:.1f}x)")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+"""
+Tests del modo streaming de IntegratedCSVTransformer
+Verifica que create_header_detail_csvs_streaming produce los mismos ficheros header/detail
+que create_header_detail_csvs en memoria, con distintos tamaños de chunk
+"""
+
+import io
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import contextlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Configurar path del proyecto
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from csv_transformer import IntegratedCSVTransformer
+
+
+def create_ledger(rows: int, seed: int = 0, text_ids: bool = False) -> pd.DataFrame:
+    """Crea un libro diario desordenado con importes europeos y fecha+hora combinadas"""
+    rng = np.random.default_rng(seed)
+    entry_ids = rng.integers(1, rows // 3 + 2, rows)
+    amounts = rng.uniform(0, 50000, rows).round(2)
+    return pd.DataFrame({
+        'Asiento': [f"AS{i:05d}" for i in entry_ids] if text_ids else entry_ids,
+        'Linea': np.arange(1, rows + 1),
+        'Fecha': [f"{(i % 28) + 1:02d}.03.2024 {i % 24:02d}:15:00" for i in entry_ids],
+        'Cuenta': rng.choice(['4300001', '7000001', '5720001', '4720001'], rows),
+        'Concepto': rng.choice(['Venta, productos', 'Gastos "oficina"', 'Compra\nmaterial', ''], rows),
+        'Debe': [f"{x:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.') if i % 2 else '0,00'
+                 for i, x in enumerate(amounts)],
+        'Haber': [f"{x:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.') if not i % 2 else '0,00'
+                  for i, x in enumerate(amounts)],
+        'Usuario': rng.choice(['ADMIN', 'USR01', None], rows),
+    })
+
+
+USER_DECISIONS = {
+    'Asiento': {'field_type': 'journal_entry_id'},
+    'Linea': {'field_type': 'line_number'},
+    'Fecha': {'field_type': 'entry_date'},
+    'Cuenta': {'field_type': 'gl_account_number'},
+    'Concepto': {'field_type': 'description'},
+    'Debe': {'field_type': 'debit_amount'},
+    'Haber': {'field_type': 'credit_amount'},
+    'Usuario': {'field_type': 'prepared_by'},
+}
+
+
+class TestStreamingTransformer(unittest.TestCase):
+    """El modo por chunks debe generar exactamente los mismos ficheros que el modo en memoria"""
+
+    def setUp(self):
+        self.original_cwd = os.getcwd()
+        self.temp_dir = tempfile.mkdtemp()
+        os.chdir(self.temp_dir)
+
+    def tearDown(self):
+        os.chdir(self.original_cwd)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def run_both_modes(self, ledger: pd.DataFrame, chunk_size: int, sort_by_journal_id: bool = True,
+                       user_decisions: dict = USER_DECISIONS):
+        csv_file = os.path.join(self.temp_dir, 'ledger.csv')
+        ledger.to_csv(csv_file, index=False)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            in_memory = IntegratedCSVTransformer(output_prefix='memory', sort_by_journal_id=sort_by_journal_id)
+            expected = in_memory.create_header_detail_csvs(pd.read_csv(csv_file), user_decisions, [])
+            streaming = IntegratedCSVTransformer(output_prefix='streaming', sort_by_journal_id=sort_by_journal_id,
+                                                 chunk_size=chunk_size)
+            actual = streaming.create_header_detail_csvs_streaming(csv_file, user_decisions, [])
+
+        self.assertTrue(expected['success'], expected.get('error'))
+        self.assertTrue(actual['success'], actual.get('error'))
+        for output in ['header_file', 'detail_file']:
+            expected_bytes = Path(expected[output]).read_bytes()
+            actual_bytes = Path(actual[output]).read_bytes()
+            self.assertEqual(expected_bytes, actual_bytes, f"{output} differs (chunk_size={chunk_size})")
+        self.assertEqual(expected['transformation_stats']['duplicates_removed'],
+                         actual['transformation_stats']['duplicates_removed'])
+        self.assertEqual(expected['transformation_stats']['rows_processed'],
+                         actual['transformation_stats']['rows_processed'])
+        return actual
+
+    def test_01_same_output_sorted(self):
+        """Ordenado por journal_entry_id: merge externo sobre varios runs"""
+        ledger = create_ledger(1500)
+        for chunk_size in [97, 500, 5000]:
+            self.run_both_modes(ledger, chunk_size)
+
+    def test_02_same_output_unsorted(self):
+        """Sin ordenar: el detail se añade chunk a chunk"""
+        self.run_both_modes(create_ledger(800, seed=1), 128, sort_by_journal_id=False)
+
+    def test_03_text_journal_ids(self):
+        """journal_entry_id de texto se ordena lexicográficamente igual que en memoria"""
+        self.run_both_modes(create_ledger(900, seed=2, text_ids=True), 111)
+
+    def test_04_multilevel_merge(self):
+        """Más runs que MAX_OPEN_SORT_RUNS fuerzan el merge por niveles"""
+        import csv_transformer
+        original_limit = csv_transformer.MAX_OPEN_SORT_RUNS
+        csv_transformer.MAX_OPEN_SORT_RUNS = 4
+        try:
+            self.run_both_modes(create_ledger(600, seed=3), 37)
+        finally:
+            csv_transformer.MAX_OPEN_SORT_RUNS = original_limit
+
+    def test_05_runs_are_cleaned_up(self):
+        """Los runs temporales del merge se eliminan al terminar"""
+        self.run_both_modes(create_ledger(300, seed=4), 50)
+        leftovers = [name for name in os.listdir('results') if '_runs_' in name]
+        self.assertEqual(leftovers, [])
+
+    def test_06_mixed_type_ids_and_late_nan(self):
+        """El dtype de journal_entry_id es el del fichero completo, no el que se infiere en cada chunk"""
+        # Numéricos en el primer chunk, texto en el segundo: los ids repetidos entre chunks no se duplican
+        ledger = create_ledger(1000, seed=5)
+        ledger['Asiento'] = [str(i % 600) for i in range(999)] + ['X999']
+        actual = self.run_both_modes(ledger, 500)
+        self.assertEqual(len(pd.read_csv(actual['header_file'], dtype=str)), 601)
+
+        # Un vacío en el último chunk convierte todos los ids en float, como en memoria
+        ledger = create_ledger(1000, seed=6)
+        ledger['Asiento'] = ledger['Asiento'].astype(object)
+        ledger.loc[990, 'Asiento'] = None
+        actual = self.run_both_modes(ledger, 300)
+        detail_ids = pd.read_csv(actual['detail_file'], dtype=str)['journal_entry_id'].dropna()
+        self.assertTrue(detail_ids.str.endswith('.0').all())
+    def test_07_late_nan_in_other_columns_and_sparse_dates(self):
+        """Todas las columnas mapeadas (no solo journal_entry_id) y el formato de fecha son los del fichero"""
+        ledger = create_ledger(1000, seed=7)
+        ledger['CeCo'] = pd.Series(100 + np.arange(1000) % 7, dtype=object)
+        ledger.loc[990, 'CeCo'] = None
+        decisions = {**USER_DECISIONS, 'CeCo': {'field_type': 'cost_center'}}
+        actual = self.run_both_modes(ledger, 300, user_decisions=decisions)
+        cost_centers = pd.read_csv(actual['detail_file'], dtype=str)['cost_center'].dropna()
+        self.assertEqual(len(cost_centers), 999)
+        self.assertTrue(cost_centers.str.endswith('.0').all())
+
+        # Solo 3 fechas (puras) en el primer chunk: el formato se decide con las 10 primeras del fichero
+        ledger = create_ledger(1000, seed=8)
+        ledger['Fecha'] = ledger['Fecha'].astype(object)
+        ledger.loc[:299, 'Fecha'] = None
+        ledger.loc[[10, 20, 30], 'Fecha'] = '01.03.2024'
+        actual = self.run_both_modes(ledger, 300)
+        self.assertTrue(pd.read_csv(actual['header_file'], dtype=str)['entry_time'].notna().any())
+
+
+if __name__ == '__main__':
+    unittest.main()
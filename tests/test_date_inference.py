@@ -0,0 +1,168 @@
+"""
+Tests de la inferencia de formato de fecha compartida (date_inference.py)
+Verifica el formato y dayfirst inferidos, que el parseo vectorizado da lo mismo que
+la conversión valor a valor con el formato explícito y el fallback genérico, su uso en
+el procesador, el trainer y los validadores, y reporta el tiempo frente al bucle por valor
+"""
+
+import io
+import sys
+import time
+import random
+import unittest
+import contextlib
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Configurar path del proyecto
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from date_inference import DateFormatInferencer, date_format_inferencer, _generic_parse
+from accounting_data_processor import AccountingDataProcessor
+from manual_confirmation_trainer import ManualConfirmationTrainingSession
+from config.custom_field_validators import _validate_date_field, check_single_date_same_year_pattern
+
+
+def per_value_parse(value, date_format):
+    """Referencia: strptime con el formato inferido y pd.to_datetime genérico para el resto"""
+    text = str(value).strip()
+    try:
+        return datetime.strptime(text, date_format.format)
+    except (TypeError, ValueError):
+        return _generic_parse(text, date_format.dayfirst) if text else None
+
+
+def per_value_iso(values, date_format):
+    """Referencia de to_iso: nulos sin cambios, fechas YYYY-MM-DD y el resto como texto sin espacios"""
+    result = []
+    for value in values:
+        if value is None or (isinstance(value, float) and np.isnan(value)):
+            result.append(value)
+            continue
+        parsed = per_value_parse(value, date_format)
+        result.append(parsed.strftime('%Y-%m-%d') if parsed is not None else str(value).strip())
+    return result
+
+
+def ledger_dates(rows: int, seed: int = 7):
+    """Fechas DD.MM.YYYY de un libro diario con alguna celda sucia o vacía"""
+    rng = random.Random(seed)
+    days = pd.date_range('2023-01-01', '2024-12-31', freq='D').strftime('%d.%m.%Y').tolist()
+    values = [rng.choice(days) for _ in range(rows)]
+    for position in rng.sample(range(rows), max(rows // 100, 1)):
+        values[position] = rng.choice(['', None, ' 2024-02-30 ', 'pendiente', '3.4.2024 '])
+    return values
+
+
+class TestDateInference(unittest.TestCase):
+    """El formato se infiere una vez por columna y el resultado no cambia respecto a valor a valor"""
+
+    def test_01_infers_format_and_dayfirst(self):
+        """Formato explícito, orden día/mes por evidencia y hora más frecuente"""
+        inferencer = DateFormatInferencer()
+        cases = [
+            (['01.02.2024', '15.03.2024'], '%d.%m.%Y', True),
+            (['02/13/2024', '03/01/2024'], '%m/%d/%Y', False),
+            (['01/02/2024', '03/04/2024'], '%d/%m/%Y', True),
+            (['2024-01-02', '2024-03-15'], '%Y-%m-%d', False),
+            (['20240102', '20231231'], '%Y%m%d', False),
+            (['01.02.2024 10:30:00', '15.02.2024 08:00:00', '16.02.2024'], '%d.%m.%Y %H:%M:%S', True),
+            (['2024-01-02T10:30', '2024-01-03T11:00'], '%Y-%m-%dT%H:%M', False),
+            (['05-Jan-2024', '17-Feb-2024'], '%d-%b-%Y', True),
+        ]
+        for values, expected_format, expected_dayfirst in cases:
+            with self.subTest(values=values):
+                date_format = inferencer.infer(values)
+                self.assertEqual(date_format.format, expected_format)
+                self.assertEqual(date_format.dayfirst, expected_dayfirst)
+
+        self.assertIsNone(inferencer.infer(['foo', 'bar', '12']).format)
+        self.assertFalse(inferencer.infer(['01/02/2024'], dayfirst=False).dayfirst)
+
+    def test_02_vectorized_matches_per_value(self):
+        """to_iso/parse dan lo mismo que strptime + fallback genérico valor a valor"""
+        columns = {
+            'dotted': ledger_dates(2000),
+            'us': ['02/13/2024', '03/01/2024', '12/31/2023', None, 'n/a', '2024-01-05'],
+            'iso': ['2024-01-02', '2024-03-15 ', '2023-12-31', '', '02/01/2024'],
+            'compact': ['20240102', '20240315', 20231231, np.nan],
+        }
+        for name, values in columns.items():
+            with self.subTest(column=name):
+                date_format = date_format_inferencer.infer(values)
+                iso = date_format_inferencer.to_iso(values, date_format)
+                self.assertEqual(str(iso.tolist()), str(per_value_iso(values, date_format)))
+
+                parsed = date_format_inferencer.parse(values, date_format)
+                self.assertEqual(parsed.dtype, np.dtype('datetime64[ns]'))
+                expected = [None if pd.isna(v) else per_value_parse(v, date_format) for v in values]
+                self.assertEqual(parsed.notna().tolist(), [v is not None for v in expected])
+
+        mask = date_format_inferencer.parses(pd.Series(['01.02.2024', '01.02.1850', 'x']),
+                                             year_range=(1900, 2100))
+        self.assertEqual(mask.tolist(), [True, False, False])
+
+    def test_03_callers_use_column_format(self):
+        """Procesador y trainer aplican el mismo orden día/mes a toda la columna"""
+        processor = AccountingDataProcessor()
+        df = pd.DataFrame({'posting_date': ['01.02.2024 10:30:00', '15.02.2024 08:00:00', '', '01.03.2024'],
+                           'entry_date': ['2024-01-02', '2024-01-12', None, '2024-02-01']})
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = processor.separate_datetime_fields(df)
+        self.assertEqual(result['posting_date'].tolist(), ['2024-02-01', '2024-02-15', '', '2024-03-01'])
+        self.assertEqual(result['posting_time'].tolist(), ['10:30:00', '08:00:00', '', ''])
+        # Antes pd.to_datetime(dayfirst=True) leía 2024-01-02 como 1 de febrero
+        self.assertEqual(result['entry_date'].tolist()[:2], ['2024-01-02', '2024-01-12'])
+
+        session = ManualConfirmationTrainingSession.__new__(ManualConfirmationTrainingSession)
+        df = pd.DataFrame({'entry_date': ['01/02/2024 10:30', '15/02/2024 08:00', 'sin fecha']})
+        with contextlib.redirect_stdout(io.StringIO()):
+            session._handle_datetime_fields(df)
+        self.assertEqual(df['entry_date'].tolist(), ['01/02/2024', '15/02/2024', 'sin fecha'])
+        self.assertEqual(df['entry_time'].tolist(), ['10:30:00', '08:00:00', ''])
+
+    def test_04_validators(self):
+        """Validador de fechas y reclasificación entry_date → posting_date por año único"""
+        self.assertGreater(_validate_date_field(pd.Series(['01.02.2024', '15.03.2024', 'x']), 'posting_date'), 0.5)
+        self.assertEqual(_validate_date_field(pd.Series(['abc', 'def']), 'posting_date'), 0.0)
+
+        decisions = {'Fecha': {'field_type': 'entry_date', 'confidence': 0.85}}
+        df = pd.DataFrame({'Fecha': ['01/02/2024', '31/12/2024', '2 March 2024', None]})
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = check_single_date_same_year_pattern(decisions, df)
+        self.assertEqual(result['Fecha']['field_type'], 'posting_date')
+
+        decisions = {'Fecha': {'field_type': 'entry_date', 'confidence': 0.85}}
+        df = pd.DataFrame({'Fecha': ['01/02/2023', '31/12/2024']})
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = check_single_date_same_year_pattern(decisions, df)
+        self.assertEqual(result['Fecha']['field_type'], 'entry_date')
+
+    def test_05_benchmark(self):
+        """Reporta filas/s del parseo vectorizado frente a pd.to_datetime valor a valor"""
+        rows = 500_000
+        values = pd.Series(ledger_dates(rows), dtype=object)
+
+        sample = values.head(2000).tolist()
+        start = time.perf_counter()
+        for value in sample:
+            if value is not None and str(value).strip():
+                pd.to_datetime(str(value).strip(), dayfirst=True, errors='coerce')
+        per_value_seconds = (time.perf_counter() - start) * rows / len(sample)
+
+        start = time.perf_counter()
+        iso = date_format_inferencer.to_iso(values)
+        vectorized_seconds = time.perf_counter() - start
+        self.assertEqual(len(iso), rows)
+
+        print(f"\n    ⚡ Per-value to_datetime: {per_value_seconds:8.2f} s for {rows:,} rows (estimated)")
+        print(f"    ⚡ Inferred format:       {vectorized_seconds:8.2f} s "
+              f"({per_value_seconds / vectorized_seconds:.0f}x)")
+
+
+if __name__ == '__main__':
+    unittest.main()
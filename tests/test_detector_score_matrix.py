@@ -0,0 +1,125 @@
+"""
+Tests de la matriz de scores de validadores de EnhancedFieldDetector
+Verifica que la detección con scores memorizados por muestra da los mismos candidatos
+y correcciones que volver a ejecutar cada validador en cada fase, que cada par
+(muestra, validador) se evalúa una sola vez y reporta el tiempo de ambas
+"""
+
+import io
+import sys
+import time
+import unittest
+import contextlib
+from pathlib import Path
+
+import pandas as pd
+
+# Configurar path del proyecto
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from core import field_detector
+from core.field_detector import EnhancedFieldDetector
+from core.field_mapper import FieldMapper
+
+
+class RecomputingDetector(EnhancedFieldDetector):
+    """Detector original: validate_field en cada fase, sin matriz (referencia)"""
+
+    validator_calls = 0
+
+    def _get_validator_score(self, field_type, sample_data, sample_key=None):
+        self.validator_calls += 1
+        return field_detector.validator_registry.validate_field(field_type, sample_data)
+
+
+def sample_ledgers():
+    for csv_file in sorted((project_root / 'data').glob('*.csv')):
+        try:
+            yield csv_file.name, pd.read_csv(csv_file, nrows=500)
+        except Exception:
+            continue
+
+
+class TestDetectorScoreMatrix(unittest.TestCase):
+    """La matriz de scores no cambia la detección y evita validaciones repetidas"""
+
+    @classmethod
+    def setUpClass(cls):
+        with contextlib.redirect_stdout(io.StringIO()):
+            cls.field_mapper = FieldMapper()
+
+    def create_detector(self, detector_class=EnhancedFieldDetector):
+        with contextlib.redirect_stdout(io.StringIO()):
+            detector = detector_class()
+        detector.field_mapper = self.field_mapper
+        detector.field_loader = self.field_mapper.field_loader
+        return detector
+
+    def detect(self, detector, df):
+        with contextlib.redirect_stdout(io.StringIO()):
+            # El mapper compartido guarda los campos ya usados: cada detección parte de cero
+            self.field_mapper.reset_mappings()
+            result = detector.detect_fields(df, erp_hint='Generic_ES', learning_mode=False)
+        self.assertNotIn('error', result)
+        return result
+
+    def test_01_same_detection_as_recomputing(self):
+        """Mismos candidatos y correcciones en data/*.csv; cada validador una vez por muestra"""
+        validator_count = len(field_detector.validator_registry.validators)
+        for name, df in sample_ledgers():
+            with self.subTest(file=name):
+                detector = self.create_detector()
+                reference = self.create_detector(RecomputingDetector)
+                result = self.detect(detector, df)
+                expected = self.detect(reference, df)
+
+                self.assertEqual(result['candidates'], expected['candidates'])
+                self.assertEqual(result['auto_corrections'], expected['auto_corrections'])
+
+                stats = detector.get_detection_stats()
+                samples = {detector._sample_fingerprint(df[column].dropna().head(20)) for column in df.columns
+                           if df[column].notna().any()}
+                matrix = detector._content_validation_cache
+                self.assertEqual(set(matrix), samples)
+                # Una evaluación por celda (incluye tipos del YAML sin validador que valida la corrección)
+                self.assertTrue(all(len(row) >= validator_count for row in matrix.values()))
+                self.assertEqual(stats['validator_score_misses'], sum(len(row) for row in matrix.values()))
+                self.assertEqual(stats['validator_score_hits'] + stats['validator_score_misses'],
+                                 reference.validator_calls)
+
+    def test_02_hits_within_detection_only(self):
+        """La corrección reutiliza los scores del análisis; otra detección empieza de cero"""
+        df = pd.DataFrame({'Proveedor': ['01/02/2024', '15/03/2024', '28/12/2023'],
+                           'Otra': ['01/02/2024', '15/03/2024', '28/12/2023']})
+        detector = self.create_detector()
+        validator_count = len(field_detector.validator_registry.validators)
+
+        self.detect(detector, df)
+        stats = detector.get_detection_stats()
+        # Dos columnas con la misma muestra comparten la fila de la matriz
+        self.assertEqual(stats['validator_score_misses'], validator_count)
+        self.assertGreater(stats['validator_score_hits'], validator_count)
+        self.assertGreater(stats['validator_score_hit_rate'], 50.0)
+
+        self.detect(detector, df)
+        self.assertEqual(detector.get_detection_stats()['validator_score_misses'], 2 * validator_count)
+
+    def test_03_benchmark(self):
+        """Reporta el tiempo de detección recalculando validadores frente a la matriz"""
+        ledgers = [df for _, df in sample_ledgers()]
+        timings = {}
+        for label, detector_class in [('recompute', RecomputingDetector), ('matrix', EnhancedFieldDetector)]:
+            detector = self.create_detector(detector_class)
+            start = time.perf_counter()
+            for df in ledgers:
+                self.detect(detector, df)
+            timings[label] = time.perf_counter() - start
+
+        print(f"\n    ⚡ Validators per stage: {timings['recompute']:6.2f} s ({len(ledgers)} ledgers)")
+        print(f"    ⚡ Score matrix:        {timings['matrix']:6.2f} s "
+              f"({timings['recompute'] / timings['matrix']:.1f}x)")
+
+
+if __name__ == '__main__':
+    unittest.main()
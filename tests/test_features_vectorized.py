@@ -0,0 +1,114 @@
+"""
+Tests de la extracción vectorizada de features de línea (features.py)
+Verifica que extract_all_features produce exactamente la misma matriz que la
+extracción línea a línea (iterrows + extractores por texto) y reporta el tiempo de ambas
+"""
+
+import sys
+import time
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Configurar path del proyecto
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from features import DocumentFeatureExtractor
+
+
+def rowwise_features(extractor: DocumentFeatureExtractor, df: pd.DataFrame) -> pd.DataFrame:
+    """Implementación original línea a línea (referencia)"""
+    df = df.copy()
+    df["text"] = df["text"].fillna("").astype(str)
+
+    all_features = []
+    for _, row in df.iterrows():
+        text = row["text"]
+        f = {}
+        f.update(extractor.extract_structural_features(text))
+        content_f = extractor.extract_content_features(text)
+        f.update(content_f)
+        text_f = extractor.extract_text_features(text)
+        text_f["has_year"] = content_f.get("has_year", 0)
+        text_f["has_month_name"] = content_f.get("has_month_name", 0)
+        f.update(text_f)
+        all_features.append(f)
+
+    texts = df["text"].tolist()
+    n = len(texts)
+    contextual = []
+    for i in range(n):
+        prev_text = texts[i - 1] if i > 0 else ""
+        this_text = texts[i]
+        next_text = texts[i + 1] if i < n - 1 else ""
+        f = {
+            "relative_position": (i / (n - 1)) if n > 1 else 0.0,
+            "is_first_lines": 1 if i < 10 else 0,
+            "is_last_lines": 1 if i >= n - 8 else 0,
+            "prev_line_length": len(prev_text),
+            "prev_is_separator": extractor._is_separator(prev_text),
+            "prev_is_table_like": extractor._is_table_like(prev_text),
+            "length_diff_prev": len(this_text) - len(prev_text),
+            "surrounded_by_separators": 1 if (extractor._is_separator(prev_text) and
+                                              extractor._is_separator(next_text)) else 0,
+            "next_line_length": len(next_text),
+            "next_is_separator": extractor._is_separator(next_text),
+            "next_is_table_like": extractor._is_table_like(next_text),
+            "length_diff_next": len(next_text) - len(this_text),
+            "next_pipe_count": next_text.count("|"),
+        }
+        f["header_context_hint"] = 1 if (f["prev_is_separator"] or f["next_is_separator"]) else 0
+        f["meta_context_hint"] = 1 if (i < 10 and not f["prev_is_table_like"]) else 0
+        contextual.append(f)
+
+    return pd.concat([pd.DataFrame(all_features), pd.DataFrame(contextual)], axis=1)
+
+
+class TestVectorizedFeatures(unittest.TestCase):
+    """La matriz vectorizada debe ser idéntica (valores, orden de columnas y dtypes)"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.extractor = DocumentFeatureExtractor()
+        cls.training_df = pd.read_csv(project_root / 'training_data.csv', keep_default_na=False)
+
+    def test_01_parity_on_training_data(self):
+        """Misma matriz que la extracción línea a línea sobre training_data.csv"""
+        expected = rowwise_features(self.extractor, self.training_df)
+        actual = self.extractor.extract_all_features(self.training_df)
+        pd.testing.assert_frame_equal(actual, expected, check_exact=True)
+
+    def test_02_parity_on_edge_cases(self):
+        """Unicode (titlecase, sin caja, superíndices), vacíos, NaN y separadores"""
+        texts = ['', ' ', '\t\tABCD', 'ǅABC ǄABC', 'Abcd', 'ÉÑÓÁ x', 'éñóá', '中文中文', 'A中文中',
+                 'X² ½ ٣', '---------', ' ========= ', '12/12/2024 13/12/2024', 'EUR 1.234,56 -3,00',
+                 'ABC_DEF', 'ABCD1 WXYZ', 'Ⅻ Ⅷ ⅻ', None, np.nan, '  a  b  c  d', '\x1c\xa0x y　z',
+                 'NºDOC fecha hora', 'total página 1', '   000123 x', 'a|b|c|d', 'x │ y │ z │']
+        df = pd.DataFrame({'text': texts})
+        expected = rowwise_features(self.extractor, df)
+        pd.testing.assert_frame_equal(self.extractor.extract_all_features(df), expected, check_exact=True)
+
+        contextual = self.extractor.extract_contextual_features(df)
+        pd.testing.assert_frame_equal(contextual, expected[contextual.columns], check_exact=True)
+
+    def test_03_benchmark(self):
+        """Reporta el tiempo línea a línea frente al vectorizado (5x training_data.csv)"""
+        df = pd.concat([self.training_df] * 5, ignore_index=True)
+
+        start = time.perf_counter()
+        rowwise_features(self.extractor, df)
+        rowwise_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        self.extractor.extract_all_features(df)
+        vectorized_seconds = time.perf_counter() - start
+
+        print(f"\n    ⚡ Row-wise:   {rowwise_seconds:6.2f} s ({len(df):,} lines)")
+        print(f"    ⚡ Vectorized: {vectorized_seconds:6.2f} s ({rowwise_seconds / vectorized_seconds:.1f}x)")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,194 @@
+"""
+Tests de la detección de cambios por stat y la recarga incremental de DynamicFieldLoader
+Verifica que las comprobaciones periódicas no leen los archivos si el stat no cambia,
+que una recarga solo reconstruye las definiciones cuyo subárbol YAML ha cambiado (mismo
+resultado que una carga completa), que el mapper recibe el evento con los campos
+afectados y reporta el coste de la comprobación y de la recarga antes/después
+"""
+
+import io
+import os
+import sys
+import time
+import shutil
+import hashlib
+import tempfile
+import unittest
+import contextlib
+from pathlib import Path
+
+import yaml
+
+# Configurar path del proyecto
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.dynamic_field_loader import DynamicFieldLoader
+from core.field_mapper import FieldMapper
+
+CONFIG_FILE = Path('config') / 'dynamic_fields_config.yaml'
+
+
+def full_content_hash(loader: DynamicFieldLoader) -> str:
+    """Comprobación original: leer y concatenar todos los archivos y hacer MD5 (referencia)"""
+    hash_content = ""
+    if loader.config_source.exists():
+        hash_content += loader.config_source.read_text(encoding='utf-8')
+    if loader.validators_path.exists():
+        hash_content += loader.validators_path.read_text(encoding='utf-8')
+    for file_path in loader.config_source.parent.glob("*.yaml"):
+        if file_path != loader.config_source:
+            hash_content += file_path.read_text(encoding='utf-8')
+    return hashlib.md5(hash_content.encode()).hexdigest()
+
+
+def without_timestamps(data):
+    if isinstance(data, dict):
+        return {key: without_timestamps(value) for key, value in data.items()
+                if key not in ('timestamps', 'added_at')}
+    if isinstance(data, list):
+        return [without_timestamps(value) for value in data]
+    return data
+
+
+def comparable_definitions(loader: DynamicFieldLoader) -> dict:
+    """Definiciones sin marcas de tiempo de creación"""
+    return {code: without_timestamps(field_def.to_dict())
+            for code, field_def in loader.get_field_definitions().items()}
+
+
+class TestLoaderHotReload(unittest.TestCase):
+    """Recarga incremental con el mismo resultado que una carga completa"""
+
+    def setUp(self):
+        self.original_cwd = os.getcwd()
+        self.temp_dir = tempfile.mkdtemp()
+        os.chdir(self.temp_dir)
+        # Copia (no symlink) de config/: el test modifica el YAML
+        shutil.copytree(project_root / 'config', 'config')
+        self.loaders = []
+
+    def tearDown(self):
+        for loader in self.loaders:
+            loader.shutdown()
+        os.chdir(self.original_cwd)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def create_loader(self) -> DynamicFieldLoader:
+        with contextlib.redirect_stdout(io.StringIO()):
+            loader = DynamicFieldLoader()
+        self.loaders.append(loader)
+        return loader
+
+    def reload(self, loader: DynamicFieldLoader, force: bool = False) -> bool:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return loader.reload_configuration(force)
+
+    def edit_config(self, edit):
+        config = yaml.safe_load(CONFIG_FILE.read_text(encoding='utf-8'))
+        edit(config['field_definitions']['dynamic_fields'])
+        CONFIG_FILE.write_text(yaml.safe_dump(config, allow_unicode=True, sort_keys=False), encoding='utf-8')
+
+    def test_01_stat_check_skips_reading(self):
+        """Sin cambios de stat no se lee nada; un touch hashea una vez y no recarga"""
+        loader = self.create_loader()
+        hashes = loader.stats['config_content_hashes']
+        self.assertEqual(loader._get_config_hash(), full_content_hash(loader))
+
+        for _ in range(50):
+            self.assertFalse(loader._should_reload())
+        self.assertEqual(loader.stats['config_content_hashes'], hashes)
+
+        os.utime(CONFIG_FILE, ns=(time.time_ns(), time.time_ns() + 10**9))
+        self.assertFalse(loader._should_reload())
+        self.assertFalse(loader._should_reload())
+        self.assertEqual(loader.stats['config_content_hashes'], hashes + 1)
+
+    def test_02_incremental_reload_matches_full_load(self):
+        """Solo se reconstruye el campo editado; resultado idéntico a una carga nueva"""
+        loader = self.create_loader()
+        before = loader.get_field_definitions()
+        rebuilt = loader.stats['fields_rebuilt']
+
+        self.edit_config(lambda fields: fields['amount']['synonyms']['Generic_ES'].append(
+            {'name': 'Importe Total Linea', 'confidence_boost': 0.5}))
+        self.assertTrue(self.reload(loader))
+
+        after = loader.get_field_definitions()
+        self.assertEqual(loader.stats['fields_rebuilt'], rebuilt + 1)
+        self.assertEqual(loader.last_change_event.modified, ('amount',))
+        self.assertEqual(loader.last_change_event.changed_fields, ('amount',))
+        self.assertIsNot(after['amount'], before['amount'])
+        self.assertTrue(all(after[code] is before[code] for code in after if code != 'amount'))
+        self.assertEqual([entry.field_type for entry in loader.lookup_synonyms('importetotallinea')], ['amount'])
+        self.assertEqual(comparable_definitions(loader), comparable_definitions(self.create_loader()))
+
+        # Añadir y eliminar campos
+        def add_and_remove(fields):
+            fields['cost_center'] = {**fields['ledger'], 'code': 'cost_center', 'name': 'Centro de Coste'}
+            del fields['reversal_indicator']
+        self.edit_config(add_and_remove)
+        self.assertTrue(self.reload(loader))
+        event = loader.last_change_event
+        self.assertEqual((event.added, event.modified, event.removed), (('cost_center',), (), ('reversal_indicator',)))
+        self.assertEqual(comparable_definitions(loader), comparable_definitions(self.create_loader()))
+
+        # Definición modificada en memoria: la recarga forzada la reconstruye desde el YAML
+        loader.get_field_definition('ledger').add_synonym('Custom', 'Libro Mayor X')
+        self.assertTrue(self.reload(loader, force=True))
+        self.assertEqual(loader.last_change_event.changed_fields, ('ledger',))
+        self.assertEqual(loader.lookup_synonyms('libromayorx'), [])
+
+    def test_03_mapper_receives_change_event(self):
+        """El mapper solo invalida los sinónimos de los campos cambiados"""
+        with contextlib.redirect_stdout(io.StringIO()):
+            mapper = FieldMapper()
+        self.loaders.append(mapper.field_loader)
+        for field_type in ['amount', 'ledger', 'posting_date']:
+            mapper.get_all_field_synonyms(field_type)
+            mapper.get_all_field_synonyms(field_type, 'Generic_ES')
+
+        self.edit_config(lambda fields: fields['ledger']['synonyms'].setdefault('SAP', []).append(
+            {'name': 'RLDNR_X', 'confidence_boost': 0.4}))
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertTrue(mapper.reload_and_update())
+
+        self.assertEqual(sorted(mapper._erp_synonyms_cache), [('amount', 'Generic_ES'), ('amount', 'all'),
+                                                               ('posting_date', 'Generic_ES'), ('posting_date', 'all')])
+        self.assertIn('RLDNR_X', mapper.get_all_field_synonyms('ledger'))
+
+    def test_04_benchmark(self):
+        """Reporta el coste de la comprobación periódica y de la recarga antes/después"""
+        loader = self.create_loader()
+        checks = 200
+
+        start = time.perf_counter()
+        for _ in range(checks):
+            full_content_hash(loader) != loader._last_config_hash
+        content_check_seconds = (time.perf_counter() - start) / checks
+
+        start = time.perf_counter()
+        for _ in range(checks):
+            loader._should_reload()
+        stat_check_seconds = (time.perf_counter() - start) / checks
+
+        loader._field_signatures = {}
+        start = time.perf_counter()
+        self.reload(loader, force=True)
+        full_reload_seconds = time.perf_counter() - start
+
+        self.edit_config(lambda fields: fields['amount'].update(description='Importe de la línea'))
+        start = time.perf_counter()
+        self.assertTrue(self.reload(loader))
+        incremental_reload_seconds = time.perf_counter() - start
+        self.assertEqual(loader.last_change_event.changed_fields, ('amount',))
+
+        print(f"\n    ⚡ Content hash check: {content_check_seconds * 1e3:8.3f} ms")
+        print(f"    ⚡ Stat check:         {stat_check_seconds * 1e3:8.3f} ms "
+              f"({content_check_seconds / stat_check_seconds:.0f}x)")
+        print(f"    ⚡ Full reload:        {full_reload_seconds * 1e3:8.1f} ms")
+        print(f"    ⚡ One-field reload:   {incremental_reload_seconds * 1e3:8.1f} ms")
+
+
+if __name__ == '__main__':
+    unittest.main()
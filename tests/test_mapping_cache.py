@@ -0,0 +1,134 @@
+"""
+Tests de la cache persistente de mapeos (core/mapping_cache.py)
+Verifica que un fichero con las mismas columnas reutiliza los mapeos finales sin
+detección y genera el mismo detail CSV, que cambiar el YAML invalida las entradas y
+que el límite de tamaño descarta las menos usadas recientemente
+"""
+
+import io
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+import contextlib
+from pathlib import Path
+
+import pandas as pd
+
+# Configurar path del proyecto
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.mapping_cache import MappingResultCache, mapping_fingerprint, column_content_signature
+from automatic_confirmation_trainer import AutomaticConfirmationTrainingSession
+
+LEDGER_FILE = project_root / 'data' / 'Libro_Diario_ZTE_MSSE.csv'
+
+
+class TestMappingCache(unittest.TestCase):
+    """La cache devuelve los mismos mapeos finales y se invalida con la configuración"""
+
+    def setUp(self):
+        self.original_cwd = os.getcwd()
+        self.temp_dir = tempfile.mkdtemp()
+        os.chdir(self.temp_dir)
+        # Copia (no symlink) de config/: el test modifica el YAML
+        shutil.copytree(project_root / 'config', 'config')
+
+    def tearDown(self):
+        os.chdir(self.original_cwd)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def run_training(self, csv_file, field_mapper=None):
+        with contextlib.redirect_stdout(io.StringIO()):
+            session = AutomaticConfirmationTrainingSession(str(csv_file), field_mapper=field_mapper)
+            self.assertTrue(session.initialize())
+            result = session.run_automatic_training()
+        self.assertTrue(result['success'], result.get('error'))
+        return session, result
+
+    def detection_seconds(self, field_mapper, use_mapping_cache: bool) -> float:
+        """Tiempo de la fase de detección (mapeo + resolución de conflictos) de una sesión"""
+        with contextlib.redirect_stdout(io.StringIO()):
+            session = AutomaticConfirmationTrainingSession(str(LEDGER_FILE), field_mapper=field_mapper,
+                                                           use_mapping_cache=use_mapping_cache)
+            self.assertTrue(session.initialize())
+            start = time.perf_counter()
+            self.assertTrue(session._perform_automatic_field_detection()['success'])
+            return time.perf_counter() - start
+
+    def test_01_hit_skips_detection_with_same_output(self):
+        """Segunda ejecución: acierto de cache, mismas decisiones y mismo detail CSV"""
+        first_session, first = self.run_training(LEDGER_FILE)
+        self.assertFalse(first['training_stats']['mapping_cache_hit'])
+        first_detail = Path(first['detail_file']).read_bytes()
+
+        mapper = first_session.mapper
+        requested = mapper.mapping_stats['total_mappings_requested']
+        second_session, second = self.run_training(LEDGER_FILE, field_mapper=mapper)
+        self.assertTrue(second['training_stats']['mapping_cache_hit'])
+        # Sin análisis de columnas en la ejecución con acierto
+        self.assertEqual(mapper.mapping_stats['total_mappings_requested'], requested)
+        self.assertEqual(second['user_decisions'], first['user_decisions'])
+        self.assertEqual(Path(second['detail_file']).read_bytes(), first_detail)
+        self.assertEqual(mapper.get_mapping_statistics()['mapping_result_cache']['hits'], 1)
+
+        cold_seconds = self.detection_seconds(None, use_mapping_cache=False)
+        cached_seconds = self.detection_seconds(mapper, use_mapping_cache=True)
+        print(f"\n    ⚡ Full detection: {cold_seconds:6.2f} s")
+        print(f"    ⚡ Cache hit:      {cached_seconds:6.2f} s ({cold_seconds / cached_seconds:.1f}x)")
+
+    def test_02_renamed_case_and_config_change(self):
+        """Cabeceras con otra capitalización aciertan; un cambio en el YAML invalida"""
+        session, first = self.run_training(LEDGER_FILE)
+        mapper = session.mapper
+
+        upper_file = Path('ledger_upper.csv')
+        df = pd.read_csv(LEDGER_FILE)
+        df.columns = [column.upper() for column in df.columns]
+        df.to_csv(upper_file, index=False)
+        _, renamed = self.run_training(upper_file, field_mapper=mapper)
+        self.assertTrue(renamed['training_stats']['mapping_cache_hit'])
+        self.assertEqual(renamed['user_decisions'],
+                         {column.upper(): decision for column, decision in first['user_decisions'].items()})
+
+        with open('config/dynamic_fields_config.yaml', 'a', encoding='utf-8') as f:
+            f.write('\n# config change\n')
+        _, after_change = self.run_training(LEDGER_FILE, field_mapper=mapper)
+        self.assertFalse(after_change['training_stats']['mapping_cache_hit'])
+        # La entrada de la configuración anterior se descarta al guardar la nueva
+        cache_stats = mapper.mapping_result_cache.get_statistics()
+        self.assertEqual(cache_stats['entries'], 1)
+        self.assertEqual(cache_stats['invalidated'], 1)
+
+    def test_03_lru_eviction_and_content_signature(self):
+        """Límite de entradas con expulsión LRU y firma sensible al tipo de contenido"""
+        cache = MappingResultCache('cache/test.sqlite', max_entries=2)
+        mapping = {'A': {'field_type': 'amount', 'confidence': 0.9, 'resolution_type': 'no_conflict'}}
+        cache.put('first', ['A'], mapping, 'hash')
+        time.sleep(0.01)
+        cache.put('second', ['A'], mapping, 'hash')
+        time.sleep(0.01)
+        self.assertEqual(cache.get('first', ['B']), {'B': mapping['A']})
+        time.sleep(0.01)
+        cache.put('third', ['A'], mapping, 'hash')
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('second', ['A']))
+        self.assertIsNotNone(cache.get('first', ['A']))
+        self.assertEqual(cache.stats['evictions'], 1)
+
+        numbers = pd.DataFrame({'Importe': ['10.5', '-3', '7']})
+        dates = pd.DataFrame({'Importe': ['2024-01-01', '2024-01-02', '2024-01-03']})
+        self.assertNotEqual(column_content_signature(numbers['Importe']),
+                            column_content_signature(dates['Importe']))
+        self.assertNotEqual(mapping_fingerprint(numbers, None, 'hash', str.lower),
+                            mapping_fingerprint(dates, None, 'hash', str.lower))
+        self.assertNotEqual(mapping_fingerprint(numbers, 'SAP', 'hash', str.lower),
+                            mapping_fingerprint(numbers, None, 'hash', str.lower))
+
+
+if __name__ == '__main__':
+    unittest.main()
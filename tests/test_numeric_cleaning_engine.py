@@ -0,0 +1,137 @@
+"""
+Tests de paridad del motor vectorizado de limpieza numérica
+Compara clean_numeric_series con la versión por valor (_clean_numeric_value_with_zero_fill)
+sobre todas las columnas de data/*.csv y reporta el throughput en filas por segundo
+"""
+
+import sys
+import time
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Configurar path del proyecto
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from accounting_data_processor import AccountingDataProcessor, clean_numeric_series
+
+
+def read_data_file(csv_path: Path, as_text: bool) -> pd.DataFrame:
+    """Lee un CSV de data/ detectando separador y probando encodings habituales"""
+    for encoding in ['utf-8-sig', 'latin-1']:
+        try:
+            return pd.read_csv(csv_path, sep=None, engine='python', encoding=encoding,
+                               dtype=str if as_text else None)
+        except (UnicodeDecodeError, pd.errors.ParserError):
+            continue
+    raise ValueError(f"No se pudo leer {csv_path}")
+
+
+class TestNumericCleaningEngine(unittest.TestCase):
+    """Paridad bit a bit entre el motor vectorizado y la limpieza por valor"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.processor = AccountingDataProcessor()
+        cls.data_files = sorted((project_root / 'data').glob('*.csv'))
+
+    def assert_bitwise_equal(self, expected: pd.Series, actual: pd.Series, context: str = ""):
+        self.assertEqual(expected.dtype, actual.dtype, context)
+        self.assertTrue(expected.index.equals(actual.index), context)
+        self.assertEqual(expected.name, actual.name, context)
+        if expected.dtype == object:
+            self.assertEqual(expected.tolist(), actual.tolist(), context)
+            return
+        expected_values = expected.to_numpy(dtype='float64')
+        actual_values = actual.to_numpy(dtype='float64')
+        same_bits = expected_values.view(np.int64) == actual_values.view(np.int64)
+        both_nan = np.isnan(expected_values) & np.isnan(actual_values)
+        mismatches = ~(same_bits | both_nan)
+        self.assertFalse(mismatches.any(),
+                         f"{context}: {list(zip(expected[mismatches].head(5), actual[mismatches].head(5)))}")
+
+    def check_parity(self, series: pd.Series, context: str = ""):
+        expected = series.apply(self.processor._clean_numeric_value_with_zero_fill)
+        actual, _ = clean_numeric_series(series)
+        self.assert_bitwise_equal(expected, actual, context)
+
+    def test_01_known_formats(self):
+        """Formatos europeos, anglosajones, paréntesis y valores inválidos"""
+        values = ['1,5', '(2)', '1.234', '25.000.00', '1,234.56', '1.234,56', 'abc', None, '',
+                  '  ', '-', '.', ',', '12,', '1.2.3', '1,234', '1,2,3', '(1.234,56)', '(0)',
+                  'EUR 1.000,00', '1-2', '--5', '1.234,567.89', 3, 4.5, True, np.nan,
+                  'x(1)y', '-0', '(abc)', ' 41.926.94 ', '-41.926.94']
+        self.check_parity(pd.Series(values, dtype=object), "known formats")
+
+        expected = [1.5, -2.0, 1234.0, 25000.0, 1234.56, 1234.56]
+        actual, _ = clean_numeric_series(pd.Series(values[:6]))
+        self.assertEqual(actual.tolist(), expected)
+
+    def test_02_homogeneous_columns(self):
+        """Columnas con una única convención usan la ruta rápida y detectan la convención"""
+        amounts = np.random.default_rng(0).uniform(-1e6, 1e6, 5000)
+        columns = {
+            'plain': [f"{x:.2f}" for x in amounts],
+            'anglo': [f"{x:,.2f}" for x in amounts],
+            'european': [f"{x:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.') for x in amounts],
+            'european_dotted': [f"{x:,.2f}".replace(',', '.') for x in amounts],
+        }
+        for convention, values in columns.items():
+            series = pd.Series(values, name=convention)
+            self.check_parity(series, convention)
+            _, detected = clean_numeric_series(series)
+            self.assertEqual(detected, convention)
+
+        negatives = pd.Series([f"({abs(x):,.2f})" if x < 0 else f"{x:,.2f}" for x in amounts])
+        self.check_parity(negatives, "parentheses")
+        self.assertEqual(clean_numeric_series(negatives)[1], 'anglo+parentheses')
+
+    def test_03_all_invalid_text(self):
+        """Columna sin ningún número: mismo dtype object con None que .apply"""
+        self.check_parity(pd.Series(['abc', 'x']), "all invalid")
+        self.check_parity(pd.Series([], dtype=object), "empty object")
+        self.check_parity(pd.Series([], dtype=float), "empty float")
+
+    def test_04_parity_on_data_files(self):
+        """Paridad sobre todas las columnas de data/*.csv (texto e inferencia de tipos)"""
+        self.assertTrue(self.data_files, "No hay ficheros en data/")
+        checked_columns = 0
+        for csv_path in self.data_files:
+            for as_text in (True, False):
+                df = read_data_file(csv_path, as_text)
+                for column in df.columns:
+                    self.check_parity(df[column], f"{csv_path.name}:{column}:text={as_text}")
+                    checked_columns += 1
+        print(f"\n    ✅ Paridad verificada en {checked_columns} columnas de {len(self.data_files)} ficheros")
+
+    def test_05_throughput(self):
+        """Reporta filas por segundo de ambas implementaciones"""
+        amounts = np.random.default_rng(1).uniform(-1e6, 1e6, 100000)
+        series = pd.Series([f"{x:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.') for x in amounts])
+
+        start = time.perf_counter()
+        expected = series.apply(self.processor._clean_numeric_value_with_zero_fill)
+        per_value_rate = len(series) / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        actual, convention = clean_numeric_series(series)
+        vectorized_rate = len(series) / (time.perf_counter() - start)
+
+        self.assert_bitwise_equal(expected, actual, "throughput sample")
+        print(f"\n    ⚡ Per-value:  {per_value_rate:>12,.0f} rows/s")
+        print(f"    ⚡ Vectorized: {vectorized_rate:>12,.0f} rows/s ({convention})")
+
+    def test_06_processor_reports_throughput(self):
+        """process_numeric_fields_and_calculate_amounts registra filas y tiempo de limpieza"""
+        df = pd.DataFrame({'debit_amount': ['1.000,50', '0,00'], 'credit_amount': ['0,00', '1.000,50']})
+        processed, stats = AccountingDataProcessor().process_numeric_fields_and_calculate_amounts(df)
+        self.assertEqual(processed['amount'].tolist(), [1000.5, -1000.5])
+        self.assertEqual(stats['numeric_rows_cleaned'], 4)
+        self.assertGreater(stats['numeric_cleaning_seconds'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
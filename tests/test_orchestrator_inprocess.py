@@ -0,0 +1,118 @@
+"""
+Tests del modo in-process del orquestador (orquestador.py)
+Verifica que los DataFrames en memoria producen los mismos CSV finales que la cadena
+de subprocesos, que el modelo se carga una sola vez por orquestador y que el reporte
+del pipeline incluye los tiempos por paso
+"""
+
+import io
+import os
+import sys
+import pickle
+import shutil
+import logging
+import tempfile
+import unittest
+import contextlib
+from pathlib import Path
+
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder
+from sklearn.tree import DecisionTreeClassifier
+
+# Configurar path del proyecto
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from features import DocumentFeatureExtractor
+
+INPUT_FILE = project_root / 'data-pre' / 'raw' / 'ejemplo4.1.txt'
+
+
+def train_small_model(model_dir: str):
+    """Modelo pequeño y determinista entrenado con training_data.csv (mismo formato que entrenamiento.py)"""
+    df = pd.read_csv(project_root / 'training_data.csv', dtype=str, keep_default_na=False)
+    features_df = DocumentFeatureExtractor().extract_all_features(df)
+    label_encoder = LabelEncoder().fit(df['label'])
+    model = DecisionTreeClassifier(max_depth=8, random_state=0)
+    model.fit(features_df, label_encoder.transform(df['label']))
+
+    os.makedirs(model_dir, exist_ok=True)
+    with open(os.path.join(model_dir, 'model.pkl'), 'wb') as f:
+        pickle.dump(model, f)
+    with open(os.path.join(model_dir, 'label_encoder.pkl'), 'wb') as f:
+        pickle.dump(label_encoder, f)
+    with open(os.path.join(model_dir, 'feature_names.txt'), 'w', encoding='utf-8') as f:
+        f.write('\n'.join(features_df.columns))
+
+
+class TestOrchestratorInProcess(unittest.TestCase):
+    """El modo in-process debe ser equivalente a la cadena de subprocesos"""
+
+    def setUp(self):
+        self.original_cwd = os.getcwd()
+        self.temp_dir = tempfile.mkdtemp()
+        os.chdir(self.temp_dir)
+        os.symlink(project_root / 'config', 'config')
+        train_small_model('modelo')
+
+        # Importar aquí: el módulo crea pipeline_orchestrator.log en el directorio de trabajo
+        from orquestador import PipelineOrchestrator
+        self.orchestrator_class = PipelineOrchestrator
+        logging.getLogger('orquestador').setLevel(logging.WARNING)
+
+    def tearDown(self):
+        os.chdir(self.original_cwd)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def run_quiet(self, orchestrator, input_file):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return orchestrator.run_pipeline(str(input_file))
+
+    def test_01_same_output_as_subprocess(self):
+        """Mismo detail CSV en ambos modos y sin ficheros intermedios en modo in-process"""
+        subprocess_orchestrator = self.orchestrator_class()
+        subprocess_result = self.run_quiet(subprocess_orchestrator, INPUT_FILE)
+        self.assertTrue(subprocess_result['success'], subprocess_orchestrator.pipeline_status['errors'])
+        # Leer antes de relanzar: los nombres llevan timestamp al segundo y pueden coincidir
+        subprocess_detail = Path(subprocess_result['detail_file']).read_bytes()
+        subprocess_header = Path(subprocess_result['header_file']).read_bytes()
+        shutil.rmtree('predicciones')
+
+        inprocess_orchestrator = self.orchestrator_class()
+        inprocess_orchestrator.config['execution_mode'] = 'inprocess'
+        inprocess_result = self.run_quiet(inprocess_orchestrator, INPUT_FILE)
+        self.assertTrue(inprocess_result['success'], inprocess_orchestrator.pipeline_status['errors'])
+
+        self.assertEqual(Path(inprocess_result['detail_file']).read_bytes(), subprocess_detail)
+        self.assertEqual(Path(inprocess_result['header_file']).read_bytes(), subprocess_header)
+        self.assertEqual(os.listdir('predicciones'), [])
+        self.assertEqual(os.listdir('temp'), [])
+
+    def test_02_model_loaded_once_and_timings_reported(self):
+        """El modelo se reutiliza entre ficheros y el reporte incluye los tiempos por paso"""
+        orchestrator = self.orchestrator_class()
+        orchestrator.config['execution_mode'] = 'inprocess'
+
+        first = self.run_quiet(orchestrator, INPUT_FILE)
+        tester = orchestrator._document_tester
+        self.assertIn('model_load', orchestrator.pipeline_status['step_timings'])
+
+        second = self.run_quiet(orchestrator, INPUT_FILE)
+        self.assertTrue(first['success'] and second['success'])
+        self.assertIs(orchestrator._document_tester, tester)
+        timings = orchestrator.pipeline_status['step_timings']
+        self.assertNotIn('model_load', timings)
+        for step in ['validate_input', 'model_prediction', 'process_predictions', 'automatic_trainer']:
+            self.assertIn(step, timings)
+
+        report = Path(second['pipeline_report']).read_text(encoding='utf-8')
+        self.assertIn('Execution Mode: inprocess', report)
+        self.assertIn('STEP TIMINGS:', report)
+
+        print(f"\n    ⚡ In-process steps: " +
+              ", ".join(f"{step} {seconds:.2f}s" for step, seconds in timings.items()))
+
+
+if __name__ == '__main__':
+    unittest.main()
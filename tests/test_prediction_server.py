@@ -0,0 +1,279 @@
+"""
+Tests del servidor de clasificación con el modelo residente (prediction_server.py)
+Verifica que el servicio da las mismas etiquetas y probabilidades que test_model.py, que
+las peticiones concurrentes se agrupan en lotes de predict_proba sin mezclar el contexto
+de cada fichero, los endpoints HTTP y socket Unix, que el orquestador usa el servidor en
+lugar de lanzar test_model.py, y reporta la latencia frente a un test_model.py en frío
+"""
+
+import io
+import json
+import os
+import sys
+import time
+import shutil
+import logging
+import tempfile
+import threading
+import unittest
+import subprocess
+import http.client
+import contextlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Configurar path del proyecto
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from test_model import DocumentTester
+from prediction_server import (PredictionService, PredictionClient, PredictionServerError,
+                               create_server, server_address)
+from tests.test_orchestrator_inprocess import train_small_model, INPUT_FILE
+
+
+class TestPredictionServer(unittest.TestCase):
+    """Modelo caliente con inferencia agrupada y estadísticas de latencia"""
+
+    def setUp(self):
+        self.original_cwd = os.getcwd()
+        self.temp_dir = tempfile.mkdtemp()
+        os.chdir(self.temp_dir)
+        os.symlink(project_root / 'config', 'config')
+        train_small_model('modelo')
+        self.servers = []
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.tester = DocumentTester('modelo')
+            self.tester.load_model()
+            self.test_df = self.tester.load_test_file(str(INPUT_FILE))
+            self.expected = self.tester.predict_file(self.test_df)
+
+    def tearDown(self):
+        for server, service in self.servers:
+            server.shutdown()
+            server.server_close()
+            service.stop()
+        os.chdir(self.original_cwd)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def start_server(self, socket_path=None, **service_kwargs):
+        service = PredictionService('modelo', tester=self.tester, input_dirs=[str(INPUT_FILE.parent)],
+                                    results_dir=self.temp_dir, **service_kwargs).start()
+        server = create_server(service, port=0, socket_path=socket_path)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.servers.append((server, service))
+        return service, PredictionClient(server_address(server))
+
+    def assert_same_predictions(self, results, expected):
+        self.assertEqual(list(results['predicted_label']), list(expected['predicted_label']))
+        prob_columns = [column for column in expected.columns if column.startswith('prob_')]
+        np.testing.assert_allclose(np.asarray(results[prob_columns], dtype=float),
+                                   expected[prob_columns].to_numpy(dtype=float))
+
+    def test_01_same_results_as_test_model(self):
+        """predict_frame/predict_lines reproducen DocumentTester.predict_file"""
+        service = PredictionService('modelo', tester=self.tester).start()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                results = service.predict_frame(self.test_df)
+                from_lines = service.predict_lines(self.test_df['text'].tolist(), file_name=str(INPUT_FILE))
+        finally:
+            service.stop()
+        self.assertEqual(list(results.columns), list(self.expected.columns))
+        self.assert_same_predictions(results, self.expected)
+        self.assert_same_predictions(from_lines, self.expected)
+        self.assertEqual(from_lines['file'].iloc[0], INPUT_FILE.name)
+
+    def test_02_concurrent_requests_coalesced(self):
+        """Las peticiones simultáneas comparten predict_proba y cada una conserva su contexto"""
+        service = PredictionService('modelo', tester=self.tester, max_wait_ms=200).start()
+        texts = self.test_df['text'].tolist()
+        parts = [texts[i::8] for i in range(8)]
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected = [self.tester.predict_file(self.tester._lines_frame(f'part{i}', part))
+                        for i, part in enumerate(parts)]
+        results = [None] * len(parts)
+        barrier = threading.Barrier(len(parts))
+
+        def request(i):
+            barrier.wait()
+            results[i] = service.predict_lines(parts[i], file_name=f'part{i}')
+
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                threads = [threading.Thread(target=request, args=(i,)) for i in range(len(parts))]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+            stats = service.stats_report()
+        finally:
+            service.stop()
+
+        for result, reference in zip(results, expected):
+            self.assert_same_predictions(result, reference)
+        self.assertEqual((stats['requests'], stats['lines']), (8, len(texts)))
+        self.assertLess(stats['batches'], 8)
+        self.assertGreaterEqual(stats['coalesced_batches'], 1)
+        self.assertGreater(stats['batch_requests']['max'], 1)
+        self.assertIsNotNone(stats['latency_ms']['p99'])
+
+    def test_03_http_and_unix_endpoints(self):
+        """/predict, /predict_file, /stats y /health por TCP y por socket Unix"""
+        _, client = self.start_server()
+        self.assertEqual(client.health()['classes'], [str(c) for c in self.tester.label_encoder.classes_])
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            summary = client.predict_file(str(INPUT_FILE), out='server/predictions.csv')
+            self.tester.save_results(self.expected, output_file='cli/predictions.csv')
+        self.assertEqual(summary['lines'], len(self.expected))
+        for name in ('predictions.csv', 'predictions_detailed.csv'):
+            self.assertEqual(Path('server', name).read_bytes(), Path('cli', name).read_bytes())
+
+        head = self.test_df['text'].head(30).tolist()
+        inline = client.predict_lines(head)
+        with contextlib.redirect_stdout(io.StringIO()):
+            reference = self.tester.predict_file(self.tester._lines_frame('request', head))
+        self.assertEqual(inline['predicted_label'], reference['predicted_label'].tolist())
+        self.assertEqual(len(inline['probabilities']), len(head))
+        self.assertEqual(len(inline['probabilities'][0]), len(inline['classes']))
+        np.testing.assert_allclose(np.max(inline['probabilities'], axis=1), inline['confidence'])
+
+        with self.assertRaises(PredictionServerError), contextlib.redirect_stdout(io.StringIO()):
+            client.predict_file('missing.txt')
+        with self.assertRaises(PredictionServerError):
+            client._request('POST', '/predict', {'lines': 'not a list'})
+
+        stats = client.stats()
+        self.assertEqual((stats['requests'], stats['file_requests']), (2, 1))
+        self.assertEqual((stats['rejected'], stats['errors']), (2, 0))
+        self.assertGreater(stats['latency_ms']['p50'], 0)
+
+        socket_path = os.path.join(self.temp_dir, 'prediction.sock')
+        _, unix_client = self.start_server(socket_path=socket_path)
+        self.assertTrue(unix_client.address.startswith('unix://'))
+        from_socket = unix_client.predict_lines(head)
+        self.assertEqual(from_socket['predicted_label'], inline['predicted_label'])
+
+    def test_04_orchestrator_targets_server(self):
+        """El paso 2 del orquestador usa el servidor y da el mismo detail que el modo in-process"""
+        from orquestador import PipelineOrchestrator
+        logging.getLogger('orquestador').setLevel(logging.ERROR)
+        service, client = self.start_server()
+
+        orchestrator = PipelineOrchestrator()
+        orchestrator.config['prediction_server'] = client.address
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = orchestrator.run_pipeline(str(INPUT_FILE))
+        self.assertTrue(result['success'], orchestrator.pipeline_status['errors'])
+        self.assertEqual(orchestrator.pipeline_status['prediction_backend'], client.address)
+        self.assertEqual(service.stats_report()['file_requests'], 1)
+        self.assertIn(f"Prediction Server: {client.address}", Path(result['pipeline_report']).read_text())
+        server_detail = Path(result['detail_file']).read_bytes()
+
+        time.sleep(1)  # los nombres de salida llevan timestamp al segundo
+        inprocess = PipelineOrchestrator()
+        inprocess.config['execution_mode'] = 'inprocess'
+        with contextlib.redirect_stdout(io.StringIO()):
+            inprocess_result = inprocess.run_pipeline(str(INPUT_FILE))
+        self.assertEqual(Path(inprocess_result['detail_file']).read_bytes(), server_detail)
+
+    def test_05_benchmark(self):
+        """Reporta test_model.py en frío frente al servidor caliente y la latencia con peticiones concurrentes"""
+        _, client = self.start_server(max_wait_ms=2)
+        start = time.perf_counter()
+        subprocess.run([sys.executable, str(project_root / 'test_model.py'), '--model-dir', 'modelo',
+                        '--file', str(INPUT_FILE), '--out', 'cold/predictions.csv'],
+                       check=True, capture_output=True)
+        cold_seconds = time.perf_counter() - start
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            client.predict_file(str(INPUT_FILE), out='warm/predictions.csv')  # calentamiento
+            start = time.perf_counter()
+            client.predict_file(str(INPUT_FILE), out='warm/predictions.csv')
+            warm_seconds = time.perf_counter() - start
+
+        lines = self.test_df['text'].head(50).tolist()
+        client.stats()
+        self.servers[0][1].reset_stats()
+
+        def burst():
+            for _ in range(10):
+                client.predict_lines(lines)
+
+        threads = [threading.Thread(target=burst) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = client.stats()
+        self.assertEqual(stats['requests'], 80)
+        self.assertLess(warm_seconds, cold_seconds)
+
+        latency = stats['latency_ms']
+        print(f"\n    ⚡ {INPUT_FILE.name} ({len(self.test_df)} lines): test_model.py cold {cold_seconds:.2f} s, "
+              f"warm server {warm_seconds * 1000:.0f} ms")
+        print(f"    ⚡ 80 x 50-line requests, 8 clients: p50 {latency['p50']:.1f} ms, "
+              f"p99 {latency['p99']:.1f} ms, {stats['batches']} batches "
+              f"(mean {stats['batch_requests']['mean']:.1f} requests / {stats['batch_lines']['mean']:.0f} lines)")
+
+    def test_06_rejects_browser_requests_and_foreign_paths(self):
+        """Sin POST text/plain, Origin ni Host ajenos; /predict_file confinado a sus directorios"""
+        service, client = self.start_server()
+        victim = Path(self.temp_dir, 'victim.csv')
+        victim.write_text('keep me')
+
+        def post(headers, payload='{"lines": ["x"]}', path='/predict'):
+            connection = http.client.HTTPConnection(client.host, client.port, timeout=30)
+            try:
+                connection.request('POST', path, body=payload.encode('utf-8'),
+                                   headers={'Host': f'127.0.0.1:{client.port}', **headers})
+                response = connection.getresponse()
+                response.read()
+                return response.status
+            finally:
+                connection.close()
+
+        self.assertEqual(post({'Content-Type': 'text/plain'}), 415)
+        self.assertEqual(post({'Content-Type': 'application/json', 'Origin': 'https://evil.example'}), 403)
+        self.assertEqual(post({'Content-Type': 'application/json', 'Host': f'evil.example:{client.port}'}), 403)
+        self.assertEqual(post({'Content-Type': 'application/json; charset=utf-8'}), 200)
+
+        outside = Path(self.temp_dir).parent / 'outside_results.csv'
+        with self.assertRaises(PredictionServerError):
+            client.predict_file(str(INPUT_FILE), out=str(outside))
+        with self.assertRaises(PredictionServerError):
+            client.predict_file(str(INPUT_FILE), out=os.path.join(self.temp_dir, 'sub', '..', '..', 'x.csv'))
+        with self.assertRaises(PredictionServerError):
+            client.predict_file(str(victim), out='other.csv')
+        with self.assertRaises(PredictionServerError):
+            client.predict_file(str(INPUT_FILE), out='predictions.txt')
+        self.assertFalse(outside.exists())
+        self.assertEqual(victim.read_text(), 'keep me')
+        self.assertEqual(service.stats_report()['rejected'], 7)
+
+    def test_07_rejected_post_keeps_connection_usable(self):
+        """Un POST rechazado sin leer el cuerpo no contamina la siguiente petición de la conexión"""
+        service, client = self.start_server()
+        connection = http.client.HTTPConnection(client.host, client.port, timeout=30)
+        try:
+            connection.request('POST', '/predict', body=b'{"lines": ["x"]}',
+                               headers={'Host': f'127.0.0.1:{client.port}', 'Content-Type': 'text/plain'})
+            response = connection.getresponse()
+            response.read()
+            self.assertEqual(response.status, 415)
+
+            connection.request('GET', '/health', headers={'Host': f'127.0.0.1:{client.port}'})
+            response = connection.getresponse()
+            self.assertEqual(response.status, 200)
+            self.assertEqual(json.loads(response.read())['status'], 'ok')
+        finally:
+            connection.close()
+        self.assertEqual(service.stats_report()['rejected'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,217 @@
+"""
+Tests de la inferencia en una sola pasada (DocumentTester.predict_file)
+Verifica que predict_file llama una única vez a predict_proba y que las etiquetas por
+argmax son las de model.predict, que _align_features entrega un bloque float32 contiguo,
+la salida compacta (etiquetas categóricas, probabilidades float32, top-k), que
+analyze_predictions y el resumen por ventanas funcionan con ella, y reporta tiempo y
+tamaño del CSV detallado frente a la doble pasada anterior
+"""
+
+import io
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+import contextlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Configurar path del proyecto
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from test_model import DocumentTester
+from tests.test_orchestrator_inprocess import train_small_model, INPUT_FILE
+
+RAW_DIR = project_root / 'data-pre' / 'raw'
+
+
+class CountingModel:
+    """Envuelve el modelo y cuenta las pasadas de inferencia"""
+
+    def __init__(self, model):
+        self.model = model
+        self.calls = {'predict': 0, 'predict_proba': 0}
+
+    def predict(self, X):
+        self.calls['predict'] += 1
+        return self.model.predict(X)
+
+    def predict_proba(self, X):
+        self.calls['predict_proba'] += 1
+        return self.model.predict_proba(X)
+
+
+class TestSinglePassPrediction(unittest.TestCase):
+    """Una pasada de predict_proba, features float32 y salida compacta"""
+
+    def setUp(self):
+        self.original_cwd = os.getcwd()
+        self.temp_dir = tempfile.mkdtemp()
+        os.chdir(self.temp_dir)
+        os.symlink(project_root / 'config', 'config')
+        train_small_model('modelo')
+        self.tester = DocumentTester('modelo')
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.tester.load_model()
+            self.test_df = self.tester.load_test_file(str(RAW_DIR / 'ejemplo5.txt'))
+
+    def tearDown(self):
+        os.chdir(self.original_cwd)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def double_pass(self, test_df):
+        """predict_file anterior: predict + predict_proba sobre features float64"""
+        features_df = self.tester.feature_extractor.extract_all_features(test_df).reset_index(drop=True)
+        features_df = features_df[self.tester.feature_names].astype(float)
+        preds = self.tester.model.predict(features_df).astype(int)
+        probas = self.tester.model.predict_proba(features_df)
+        results_df = test_df.reset_index(drop=True).copy()
+        results_df['predicted_label'] = self.tester.label_encoder.inverse_transform(preds)
+        results_df['confidence'] = np.max(probas, axis=1)
+        for i, class_name in enumerate(self.tester.label_encoder.classes_):
+            results_df[f'prob_{class_name}'] = probas[:, i]
+        return results_df
+
+    def test_01_single_predict_proba_call(self):
+        """Un solo predict_proba y ningún predict; mismas etiquetas y probabilidades que la doble pasada"""
+        expected = self.double_pass(self.test_df)
+        counting = CountingModel(self.tester.model)
+        self.tester.model = counting
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = self.tester.predict_file(self.test_df)
+        self.assertEqual(counting.calls, {'predict': 0, 'predict_proba': 1})
+
+        self.assertEqual(list(results.columns), list(expected.columns))
+        self.assertEqual(results['predicted_label'].astype(str).tolist(), expected['predicted_label'].tolist())
+        prob_columns = [column for column in expected.columns if column.startswith('prob_')]
+        np.testing.assert_allclose(results[prob_columns].to_numpy(dtype=float),
+                                   expected[prob_columns].to_numpy(), rtol=1e-6)
+
+        # Modelo sin predict_proba: la probabilidad es 1 para la clase de predict
+        self.tester.model = type('PredictOnly', (), {'predict': lambda _, X: counting.model.predict(X)})()
+        with contextlib.redirect_stdout(io.StringIO()):
+            hard = self.tester.predict_file(self.test_df)
+        self.assertEqual(hard['predicted_label'].tolist(), results['predicted_label'].tolist())
+        self.assertTrue((hard['confidence'] == 1.0).all())
+
+    def test_02_align_features_float32_contiguous(self):
+        """Columnas del entrenamiento en orden, faltantes a 0, object a número y un bloque float32 C-contiguo"""
+        names = self.tester.feature_names
+        features = pd.DataFrame({name: np.arange(3) for name in reversed(names[1:])})
+        features[names[-1]] = pd.Series(['1', 'x', None], dtype=object)
+        features['not_a_feature'] = 5
+        aligned = self.tester._align_features(features)
+
+        self.assertEqual(list(aligned.columns), names)
+        self.assertEqual(set(aligned.dtypes), {np.dtype(np.float32)})
+        values = aligned.to_numpy()
+        self.assertTrue(values.flags['C_CONTIGUOUS'])
+        self.assertEqual(aligned[names[0]].tolist(), [0.0, 0.0, 0.0])
+        self.assertEqual(aligned[names[-1]].tolist(), [1.0, 0.0, 0.0])
+
+    def test_03_top_k_columns(self):
+        """top_k sustituye las prob_<clase> por las k clases más probables, también por ventanas"""
+        with contextlib.redirect_stdout(io.StringIO()):
+            full = self.tester.predict_file(self.test_df)
+            compact = self.tester.predict_file(self.test_df, top_k=2)
+            everything = self.tester.predict_file(self.test_df, top_k=100)
+
+        self.assertFalse(any(column.startswith('prob_') for column in compact.columns))
+        self.assertEqual(list(compact.columns[-4:]), ['top1_label', 'top1_prob', 'top2_label', 'top2_prob'])
+        self.assertEqual(compact['top1_label'].tolist(), compact['predicted_label'].tolist())
+        self.assertTrue((compact['top1_prob'] == compact['confidence']).all())
+        self.assertTrue((compact['top1_prob'] >= compact['top2_prob']).all())
+        self.assertEqual(compact['confidence'].dtype, np.float32)
+        self.assertEqual(compact['predicted_label'].dtype, object)
+        self.assertEqual(compact['top2_label'].dtype, object)
+
+        classes = self.tester.label_encoder.classes_
+        self.assertEqual(sum(column.endswith('_prob') for column in everything.columns), len(classes))
+        prob_columns = [f'prob_{class_name}' for class_name in classes]
+        np.testing.assert_allclose(np.sort(full[prob_columns].to_numpy(), axis=1)[:, ::-1][:, :2],
+                                   compact[['top1_prob', 'top2_prob']].to_numpy())
+
+        # Por ventanas con top_k: mismo CSV que predict_file + save_results
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.tester.save_results(compact, output_file='full/predictions.csv')
+            self.tester.predict_file_streaming(str(RAW_DIR / 'ejemplo5.txt'), 'windows/predictions.csv',
+                                               window_lines=7, top_k=2)
+        for name in ('predictions.csv', 'predictions_detailed.csv'):
+            self.assertEqual(Path('windows', name).read_bytes(), Path('full', name).read_bytes())
+
+    def test_04_analyze_compact_result(self):
+        """analyze_predictions y el resumen por ventanas ignoran clases sin líneas y usan el umbral en float32"""
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = self.tester.predict_file(self.tester.load_test_file(str(INPUT_FILE)), top_k=1)
+        predicted = set(results['predicted_label'].astype(str))
+        self.assertLess(len(predicted), len(self.tester.label_encoder.classes_))
+
+        # 0.7 guardado en float32 vale 0.69999999: no debe contar como baja confianza con low_conf=0.7
+        results['confidence'] = np.float32(0.7)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.tester.analyze_predictions(results, low_conf=0.7)
+        report = output.getvalue()
+        self.assertNotIn('baja confianza', report)
+        self.assertNotIn(': 0 líneas', report)
+        for label in predicted:
+            self.assertIn(f"\n{label}:", report)
+
+        summary = {'windows': 0, 'lines': 0, 'label_counts': {}, 'confidence_sum': 0.0,
+                   'confidence_min': None, 'confidence_max': None, 'low_confidence': 0, 'low_conf': 0.7}
+        DocumentTester._accumulate_summary(summary, results)
+        self.assertEqual(set(summary['label_counts']), predicted)
+        self.assertEqual(summary['low_confidence'], 0)
+        self.assertAlmostEqual(summary['confidence_sum'], float(np.float32(0.7)) * len(results))
+
+    def test_05_benchmark(self):
+        """Reporta doble pasada float64 frente a una pasada float32 (tiempo y tamaño del CSV detallado)"""
+        source = (RAW_DIR / 'ejemplo5.txt').read_bytes()
+        Path('big.txt').write_bytes(source * 20)
+        with contextlib.redirect_stdout(io.StringIO()):
+            test_df = self.tester.load_test_file('big.txt')
+
+        def best_of(function, repeat=3):
+            seconds = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    result = function()
+                seconds.append(time.perf_counter() - start)
+            return min(seconds), result
+
+        measurements = {
+            'double pass float64': best_of(lambda: self.double_pass(test_df)),
+            'single pass float32': best_of(lambda: self.tester.predict_file(test_df)),
+            'single pass top-2': best_of(lambda: self.tester.predict_file(test_df, top_k=2)),
+        }
+        print(f"\n    ⚡ {len(test_df):,} lines:")
+        for name, (seconds, results) in measurements.items():
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.tester.save_results(results, output_file=f'{name.replace(" ", "_")}/out.csv')
+            size = os.path.getsize(f'{name.replace(" ", "_")}/out_detailed.csv')
+            memory = results.memory_usage(deep=True).sum()
+            print(f"    ⚡ {name:<20} {seconds:6.3f} s, detailed CSV {size / 1024:8.1f} KB, "
+                  f"in memory {memory / 1024:8.1f} KB")
+
+        # Solo la inferencia, sobre las features ya extraídas
+        with contextlib.redirect_stdout(io.StringIO()):
+            features32 = self.tester.prepare_features(test_df)
+        features64 = features32.astype(float)
+        model = self.tester.model
+        double_seconds, _ = best_of(lambda: (model.predict(features64), model.predict_proba(features64)), repeat=5)
+        single_seconds, _ = best_of(lambda: self.tester.predict_probabilities(features32), repeat=5)
+        print(f"    ⚡ inference only: predict + predict_proba {double_seconds * 1000:.1f} ms, "
+              f"predict_proba float32 {single_seconds * 1000:.1f} ms")
+
+        (_, double), (_, single) = measurements['double pass float64'], measurements['single pass float32']
+        self.assertEqual(single['predicted_label'].tolist(), double['predicted_label'].tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,213 @@
+"""
+Tests del registro de tiempos y memoria por etapa (stage_metrics)
+Verifica el registro anidado por ruta con filas, desglose por clave y errores, el
+decorador, el pico de memoria con tracemalloc, los volcados de cProfile activados por
+variable de entorno, el JSON y la sección del reporte del trainer, y reporta el coste
+por etapa activado y desactivado
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import pstats
+import shutil
+import tempfile
+import unittest
+import unittest.mock
+import subprocess
+import contextlib
+from pathlib import Path
+
+# Configurar path del proyecto
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import stage_metrics
+from stage_metrics import (stage, timed, configure_stage_metrics, reset_stage_metrics,
+                           stage_metrics_report, format_stage_metrics, STAGE_PROFILE_ENV)
+from automatic_confirmation_trainer import AutomaticConfirmationTrainingSession
+
+LEDGER_FILE = project_root / 'data' / 'Libro_Diario_ZTE_MSSE.csv'
+
+
+class TestStageMetrics(unittest.TestCase):
+    """Etapas con tiempo real/CPU, filas y memoria, con coste casi nulo desactivado"""
+
+    def setUp(self):
+        self.original_cwd = os.getcwd()
+        self.temp_dir = tempfile.mkdtemp()
+        os.chdir(self.temp_dir)
+        configure_stage_metrics(enabled=True, trace_memory=False, profile_dir='', profile_stages=[])
+        reset_stage_metrics()
+
+    def tearDown(self):
+        os.chdir(self.original_cwd)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+        configure_stage_metrics()
+        reset_stage_metrics()
+
+    def test_01_nested_stages(self):
+        """Rutas padre/hijo en orden de inicio, filas acumuladas, claves y errores"""
+        @timed('report')
+        def write_report():
+            """Docstring conservada"""
+            time.sleep(0.01)
+            return 'ok'
+
+        with stage('transformation', rows=300) as outer:
+            for column in ('Debe', 'Haber', 'Debe'):
+                with stage('column_mapping', rows=100, key=column):
+                    pass
+            with self.assertRaises(ValueError):
+                with stage('csv_write'):
+                    raise ValueError('disk full')
+            outer.rows = 500
+        self.assertEqual(write_report(), 'ok')
+        self.assertEqual(write_report.__doc__, 'Docstring conservada')
+
+        report = stage_metrics_report()
+        self.assertEqual(list(report), ['transformation', 'transformation/column_mapping',
+                                        'transformation/csv_write', 'report'])
+        self.assertEqual(report['transformation']['rows'], 500)
+        mapping = report['transformation/column_mapping']
+        self.assertEqual((mapping['calls'], mapping['rows'], mapping['depth']), (3, 300, 1))
+        self.assertEqual(set(mapping['keys']), {'Debe', 'Haber'})
+        self.assertEqual(report['transformation/csv_write']['errors'], 1)
+        self.assertGreaterEqual(report['report']['wall_seconds'], 0.01)
+        self.assertLess(report['report']['cpu_seconds'], report['report']['wall_seconds'])
+        self.assertGreaterEqual(report['transformation']['wall_seconds'], mapping['wall_seconds'])
+        self.assertIsNone(report['transformation']['peak_memory_mb'])
+
+        lines = format_stage_metrics(report)
+        self.assertTrue(lines[0].startswith('transformation: '))
+        self.assertTrue(lines[1].startswith('  column_mapping x3: '))
+
+        json_path = stage_metrics.write_stage_metrics('metrics/run.json', {'csv_file': 'ledger.csv'})
+        payload = json.loads(Path(json_path).read_text(encoding='utf-8'))
+        self.assertEqual(payload['csv_file'], 'ledger.csv')
+        self.assertEqual(payload['stages']['transformation']['rows'], 500)
+
+    def test_02_disabled(self):
+        """Desactivado: contexto compartido sin efecto, el decorador llama directamente"""
+        configure_stage_metrics(enabled=False)
+        calls = []
+
+        @timed()
+        def _balance_validation():
+            calls.append(1)
+
+        with stage('load', rows=10) as load_stage:
+            load_stage.rows = 20
+        _balance_validation()
+        self.assertIs(stage('load'), stage('other'))
+        self.assertEqual(calls, [1])
+        self.assertEqual(stage_metrics_report(), {})
+        self.assertIsNone(stage_metrics.write_stage_metrics('empty.json'))
+
+        code = ("import sys; sys.path.insert(0, {!r}); import stage_metrics as m; "
+                "print(m.stage_metrics_enabled())").format(str(project_root))
+        completed = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                                   env={**os.environ, 'SMAU_STAGE_METRICS': '0'})
+        self.assertEqual(completed.stdout.strip(), 'False')
+
+    def test_03_tracemalloc_peak(self):
+        """Pico de memoria Python por etapa; el del padre incluye el de sus hijos"""
+        configure_stage_metrics(trace_memory=True)
+        import tracemalloc
+        was_tracing = tracemalloc.is_tracing()
+        try:
+            with stage('outer'):
+                with stage('allocate'):
+                    block = bytearray(20 * 1024 * 1024)
+                    del block
+                small = [0] * 1000
+            report = stage_metrics_report()
+        finally:
+            if not was_tracing:
+                tracemalloc.stop()
+        self.assertGreaterEqual(report['outer/allocate']['peak_memory_mb'], 19.5)
+        self.assertGreaterEqual(report['outer']['peak_memory_mb'], report['outer/allocate']['peak_memory_mb'])
+        self.assertGreater(report['outer']['rss_peak_mb'], 0)
+
+    def test_04_cprofile_dumps(self):
+        """Con SMAU_STAGE_PROFILE cada etapa de primer nivel (o las elegidas) deja un .prof"""
+        def busy():
+            return sum(i * i for i in range(20000))
+
+        with unittest.mock.patch.dict(os.environ, {STAGE_PROFILE_ENV: 'profiles'}):
+            configure_stage_metrics()
+        with stage('balance_validation'):
+            with stage('entry_balance'):
+                busy()
+        profiles = stage_metrics_report()['balance_validation']['profiles']
+        self.assertEqual(len(profiles), 1)
+        self.assertEqual(os.listdir('profiles'), [os.path.basename(profiles[0])])
+        functions = {function for _, _, function in pstats.Stats(profiles[0]).stats}
+        self.assertIn('busy', functions)
+
+        reset_stage_metrics()
+        configure_stage_metrics(profile_stages=['entry_balance'])
+        with stage('balance_validation'):
+            with stage('entry_balance', key='AS/001'):
+                busy()
+        report = stage_metrics_report()
+        self.assertEqual(report['balance_validation']['profiles'], [])
+        self.assertEqual(len(report['balance_validation/entry_balance']['profiles']), 1)
+        self.assertIn('AS_001', report['balance_validation/entry_balance']['profiles'][0])
+
+    def test_05_trainer_sidecar_and_report(self):
+        """El trainer registra cada fase y escribe <reporte>_stages.json y la sección STAGE METRICS"""
+        os.symlink(project_root / 'config', 'config')
+        with contextlib.redirect_stdout(io.StringIO()):
+            session = AutomaticConfirmationTrainingSession(str(LEDGER_FILE), use_mapping_cache=False)
+            self.assertTrue(session.initialize())
+            result = session.run_automatic_training()
+        self.assertTrue(result['success'], result.get('error'))
+
+        self.assertEqual(result['stage_metrics_file'],
+                         os.path.splitext(result['report_file'])[0] + '_stages.json')
+        payload = json.loads(Path(result['stage_metrics_file']).read_text(encoding='utf-8'))
+        stages = payload['stages']
+        for path in ('load', 'field_detection', 'field_detection/column_mapping',
+                     'field_detection/conflict_resolution', 'balance_validation',
+                     'csv_transformation/datetime_separation', 'csv_transformation/csv_write', 'report'):
+            self.assertIn(path, stages)
+        self.assertEqual(stages['load']['rows'], len(session.df))
+        self.assertEqual(set(stages['field_detection/column_mapping']['keys']), set(session.df.columns))
+        self.assertEqual(set(stages['csv_transformation/csv_write']['keys']), {'header', 'detail'})
+
+        report_text = Path(result['report_file']).read_text(encoding='utf-8')
+        self.assertIn('STAGE METRICS:', report_text)
+        self.assertIn('    column_mapping x', report_text)
+
+    def test_06_benchmark(self):
+        """Reporta el coste por etapa vacía activado y desactivado frente a un bucle sin registro"""
+        iterations = 50_000
+
+        def run(enabled):
+            configure_stage_metrics(enabled=enabled)
+            start = time.perf_counter()
+            for _ in range(iterations):
+                with stage('noop'):
+                    pass
+            return (time.perf_counter() - start) / iterations * 1e6
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            with contextlib.nullcontext():
+                pass
+        baseline_us = (time.perf_counter() - start) / iterations * 1e6
+        disabled_us = run(False)
+        enabled_us = run(True)
+
+        self.assertLess(disabled_us, 5)
+        self.assertEqual(stage_metrics_report()['noop']['calls'], iterations)
+        print(f"\n    ⚡ nullcontext baseline: {baseline_us:6.2f} µs per stage")
+        print(f"    ⚡ Disabled stage():     {disabled_us:6.2f} µs per stage")
+        print(f"    ⚡ Enabled stage():      {enabled_us:6.2f} µs per stage (wall + CPU + RSS)")
+
+
+if __name__ == '__main__':
+    unittest.main()
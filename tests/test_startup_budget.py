@@ -0,0 +1,65 @@
+"""
+Tests del presupuesto de arranque de los puntos de entrada CLI
+Importa cada script en un intérprete nuevo con -X importtime y falla si carga alguna
+dependencia pesada (pandas, PyYAML, core, sklearn, xgboost...) o si el import supera
+el presupuesto documentado en README.md; reporta el tiempo medido de cada uno
+"""
+
+import sys
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+# Configurar path del proyecto
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from startup_profiler import (
+    STARTUP_BUDGETS_MS, lazy_import, measure_import_time, loaded_heavy_modules
+)
+from config.custom_field_validators import PatternValidatorRegistry
+
+
+class TestStartupBudget(unittest.TestCase):
+    """Los puntos de entrada se importan sin dependencias pesadas y dentro del presupuesto"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.root_files_before = set(project_root.iterdir())
+        cls.measurements = {entry_point: measure_import_time(entry_point)
+                            for entry_point in STARTUP_BUDGETS_MS}
+        cls.root_files_after = set(project_root.iterdir())
+
+    def test_01_no_heavy_imports(self):
+        """Ningún script carga pandas, PyYAML, core, sklearn ni xgboost al importarse"""
+        for entry_point, measurement in self.measurements.items():
+            with self.subTest(entry_point=entry_point):
+                self.assertEqual(loaded_heavy_modules(measurement), [])
+        # Los imports medidos no dejan archivos (p.ej. pipeline_orchestrator.log) en el repositorio
+        self.assertEqual(self.root_files_after - self.root_files_before, set())
+
+    def test_02_within_budget(self):
+        """El import en frío (mejor de 3) no supera el presupuesto de cada script"""
+        print()
+        for entry_point, measurement in self.measurements.items():
+            budget = STARTUP_BUDGETS_MS[entry_point]
+            print(f"    ⚡ import {entry_point + ':':32s} {measurement['import_ms']:7.1f} ms (budget {budget} ms)")
+            with self.subTest(entry_point=entry_point):
+                self.assertLessEqual(measurement['import_ms'], budget)
+
+    def test_03_lazy_loading(self):
+        """lazy_import reutiliza módulos ya cargados; los patrones aprendidos se leen al usarlos"""
+        self.assertIs(lazy_import('json'), json)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            patterns_file = Path(temp_dir) / 'validator_patterns.json'
+            patterns_file.write_text(json.dumps({'amount': {'patterns': [], 'examples': []}}), encoding='utf-8')
+            registry = PatternValidatorRegistry()
+            registry.learned_patterns_file = str(patterns_file)
+            self.assertIsNone(registry._learned_patterns)
+            self.assertEqual(list(registry.learned_patterns), ['amount'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+"""
+Tests de la clasificación por ventanas con memoria acotada (DocumentTester.predict_file_streaming)
+Verifica que la salida incremental es byte a byte la de predict_file + save_results con
+cualquier tamaño de ventana (las features contextuales usan la línea de solape y la
+posición en el fichero), los casos límite de lectura (fichero vacío, sin salto final,
+CRLF y CR sueltos), el paso por el orquestador, y reporta el pico de memoria frente al
+tamaño del fichero
+"""
+
+import io
+import os
+import sys
+import time
+import shutil
+import logging
+import tempfile
+import unittest
+import tracemalloc
+import contextlib
+from pathlib import Path
+
+import pandas as pd
+
+# Configurar path del proyecto
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from test_model import DocumentTester
+from features import DocumentFeatureExtractor
+from tests.test_orchestrator_inprocess import train_small_model, INPUT_FILE
+
+RAW_DIR = project_root / 'data-pre' / 'raw'
+
+
+class TestStreamingPrediction(unittest.TestCase):
+    """Ventanas de N líneas con solape de una línea y salida incremental"""
+
+    def setUp(self):
+        self.original_cwd = os.getcwd()
+        self.temp_dir = tempfile.mkdtemp()
+        os.chdir(self.temp_dir)
+        os.symlink(project_root / 'config', 'config')
+        train_small_model('modelo')
+        self.tester = DocumentTester('modelo')
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.tester.load_model()
+
+    def tearDown(self):
+        os.chdir(self.original_cwd)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def assert_same_output(self, file_path, window_lines, expected_dir='full', **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            if not os.path.exists(os.path.join(expected_dir, 'predictions.csv')):
+                results = self.tester.predict_file(self.tester.load_test_file(str(file_path), **kwargs))
+                self.tester.save_results(results, output_file=os.path.join(expected_dir, 'predictions.csv'))
+            summary = self.tester.predict_file_streaming(str(file_path), 'windows/predictions.csv',
+                                                         window_lines=window_lines, **kwargs)
+        for name in ('predictions.csv', 'predictions_detailed.csv'):
+            self.assertEqual(Path('windows', name).read_bytes(), Path(expected_dir, name).read_bytes(),
+                             f"{file_path} window_lines={window_lines} ({name})")
+        return summary
+
+    def test_01_window_features_match_full_file(self):
+        """Las features de una ventana con solape y posición coinciden con las del fichero completo"""
+        texts = pd.read_csv(project_root / 'training_data.csv', dtype=str, keep_default_na=False)['text']
+        extractor = DocumentFeatureExtractor()
+        full = extractor.extract_all_features(pd.DataFrame({'text': texts}))
+        for start, stop in ((0, 40), (35, 120), (len(texts) - 30, len(texts))):
+            with self.subTest(start=start, stop=stop):
+                first = max(start - 1, 0)
+                window = extractor.extract_all_features(
+                    pd.DataFrame({'text': texts.iloc[first:stop + 1].tolist()}),
+                    first_position=first, total_lines=len(texts))
+                window = window.iloc[start - first:start - first + stop - start].reset_index(drop=True)
+                pd.testing.assert_frame_equal(window, full.iloc[start:stop].reset_index(drop=True))
+
+    def test_02_same_output_as_predict_file(self):
+        """TXT, CSV y Excel: misma salida con ventanas de una línea, pequeñas y mayores que el fichero"""
+        cases = {'ejemplo5.txt': (1, 7, 100_000), 'Ejemplo3.csv': (97, 100_000), 'Ejemplo6.xlsx': (97, 100_000)}
+        for name, window_sizes in cases.items():
+            expected_dir = f'full_{Path(name).stem}'
+            for window_lines in window_sizes:
+                with self.subTest(file=name, window_lines=window_lines):
+                    summary = self.assert_same_output(RAW_DIR / name, window_lines, expected_dir)
+                    self.assertEqual(summary['windows'], -(-summary['total_lines'] // window_lines))
+                    self.assertEqual(summary['lines'], summary['total_lines'])
+
+        # Resumen acumulado ventana a ventana = análisis del fichero completo
+        expected = pd.read_csv('full_Ejemplo6/predictions.csv', keep_default_na=False)
+        self.assertEqual(summary['label_counts'], expected['predicted_label'].value_counts().to_dict())
+        self.assertAlmostEqual(summary['confidence_mean'], expected['confidence'].mean())
+        self.assertEqual(summary['low_confidence'], int((expected['confidence'] < 0.7).sum()))
+
+    def test_03_line_endings_and_empty_file(self):
+        """Mismo corte de líneas que readlines(): sin salto final, CRLF, CR sueltos y fichero vacío"""
+        cases = {
+            'no_trailing_newline.txt': b'CUENTA  IMPORTE\n4300001  100,00\n4300002  200,00',
+            'crlf.txt': b'LIBRO DIARIO\r\n-----\r\n4300001  100,00\r\n\r\nTOTAL  100,00\r\n',
+            'lone_cr.txt': b'LIBRO DIARIO\r-----\r4300001  100,00\rTOTAL  100,00\r',
+            'latin1.txt': 'Asiento nº 1  Descripción  1.000,00\n'.encode('latin-1') * 5,
+        }
+        for name, content in cases.items():
+            Path(name).write_bytes(content)
+            with open(name, 'r', encoding='utf-8', errors='replace') as f:
+                self.assertEqual(DocumentTester._count_text_lines(name), len(f.readlines()))
+            for window_lines in (1, 2, 50):
+                with self.subTest(file=name, window_lines=window_lines):
+                    self.assert_same_output(name, window_lines, expected_dir=f'full_{Path(name).stem}')
+
+        Path('empty.txt').write_bytes(b'')
+        with contextlib.redirect_stdout(io.StringIO()):
+            summary = self.tester.predict_file_streaming('empty.txt', 'windows/empty.csv', window_lines=10)
+        self.assertEqual((summary['lines'], summary['windows']), (0, 0))
+        self.assertEqual(Path('windows/empty.csv').read_text(encoding='utf-8'),
+                         '"file","line_no","text","predicted_label","confidence"\n')
+
+    def test_04_orchestrator_window_lines(self):
+        """--window-lines llega a test_model.py y el pipeline da el mismo detail que en memoria"""
+        from orquestador import PipelineOrchestrator
+        logging.getLogger('orquestador').setLevel(logging.ERROR)
+
+        windowed = PipelineOrchestrator()
+        windowed.config['prediction_window_lines'] = 10
+        windowed.config['cleanup_temp_files'] = False
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = windowed.run_pipeline(str(INPUT_FILE))
+        self.assertTrue(result['success'], windowed.pipeline_status['errors'])
+        windowed_detail = Path(result['detail_file']).read_bytes()
+
+        time.sleep(1)  # los nombres de salida llevan timestamp al segundo
+        inprocess = PipelineOrchestrator()
+        inprocess.config['execution_mode'] = 'inprocess'
+        with contextlib.redirect_stdout(io.StringIO()):
+            inprocess_result = inprocess.run_pipeline(str(INPUT_FILE))
+        self.assertEqual(Path(inprocess_result['detail_file']).read_bytes(), windowed_detail)
+
+    def test_05_benchmark_constant_memory(self):
+        """Reporta el pico de memoria por ventanas frente al fichero completo al crecer el fichero"""
+        source = (RAW_DIR / 'ejemplo5.txt').read_bytes()
+        peaks = {}
+        for repeats in (10, 40):
+            Path('big.txt').write_bytes(source * repeats)
+            for mode, window_lines in (('full', 0), ('windows', 1000)):
+                if mode == 'full' and repeats > 10:
+                    continue
+                tracemalloc.start()
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    if window_lines:
+                        summary = self.tester.predict_file_streaming('big.txt', f'{mode}/big.csv',
+                                                                     window_lines=window_lines)
+                        lines = summary['lines']
+                    else:
+                        results = self.tester.predict_file(self.tester.load_test_file('big.txt'))
+                        self.tester.save_results(results, output_file=f'{mode}/big.csv')
+                        lines = len(results)
+                        del results
+                seconds = time.perf_counter() - start
+                peaks[(mode, lines)] = (tracemalloc.get_traced_memory()[1] / 1024 / 1024, seconds)
+                tracemalloc.stop()
+
+        (small_lines, small), (big_lines, big) = sorted((lines, peak) for (mode, lines), peak in peaks.items()
+                                                        if mode == 'windows')
+        full_peak = next(peak for (mode, _), peak in peaks.items() if mode == 'full')
+        self.assertLess(big[0], small[0] * 1.5)
+        self.assertLess(big[0], full_peak[0] * 2)
+
+        print()
+        for (mode, lines), (peak_mb, seconds) in sorted(peaks.items(), key=lambda item: (item[0][1], item[0][0])):
+            print(f"    ⚡ {mode:<8} {lines:>7,} lines: peak {peak_mb:7.1f} MB, {seconds:6.2f} s")
+
+
+if __name__ == '__main__':
+    unittest.main()
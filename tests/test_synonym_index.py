@@ -0,0 +1,143 @@
+"""
+Tests del índice de sinónimos normalizados de DynamicFieldLoader
+Verifica que _find_exact_matches da los mismos resultados que el recorrido lineal,
+que el índice se actualiza de forma incremental y reporta el micro-benchmark antes/después
+"""
+
+import io
+import sys
+import time
+import unittest
+import contextlib
+from pathlib import Path
+
+# Configurar path del proyecto
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.field_mapper import FieldMapper
+
+
+def linear_exact_matches(mapper: FieldMapper, field_name: str, erp_system: str = None):
+    """Recorrido lineal original sobre todas las definiciones, ERPs y sinónimos (referencia)"""
+    normalized_name = mapper._normalize_field_name(field_name)
+    exact_matches = []
+    for field_type, field_def in mapper.field_loader.get_field_definitions().items():
+        if erp_system and erp_system in field_def.synonyms_by_erp:
+            for synonym in field_def.synonyms_by_erp[erp_system]:
+                if normalized_name == mapper._normalize_field_name(synonym.name):
+                    if not mapper._is_problematic_partial_match(field_name, synonym.name):
+                        exact_matches.append((field_type, min(0.95 + (synonym.confidence_boost * 0.05), 1.0)))
+        for erp_synonyms in field_def.synonyms_by_erp.values():
+            for synonym in erp_synonyms:
+                if normalized_name == mapper._normalize_field_name(synonym.name):
+                    if not mapper._is_problematic_partial_match(field_name, synonym.name):
+                        exact_matches.append((field_type, min(0.85 + (synonym.confidence_boost * 0.1), 1.0)))
+        if normalized_name == mapper._normalize_field_name(field_def.code):
+            exact_matches.append((field_type, 0.90))
+
+    unique_matches = {}
+    for field_type, confidence in exact_matches:
+        if field_type not in unique_matches or confidence > unique_matches[field_type]:
+            unique_matches[field_type] = confidence
+    return list(unique_matches.items())
+
+
+class TestSynonymIndex(unittest.TestCase):
+    """El índice hash debe ser equivalente al recorrido lineal y mantenerse al día"""
+
+    @classmethod
+    def setUpClass(cls):
+        with contextlib.redirect_stdout(io.StringIO()):
+            cls.mapper = FieldMapper()
+        cls.column_names = ['Fecha Contable', 'Numero Asiento', 'foo', '']
+        for field_def in cls.mapper.field_loader.get_field_definitions().values():
+            cls.column_names.append(field_def.code)
+            for synonyms in field_def.synonyms_by_erp.values():
+                for synonym in synonyms:
+                    cls.column_names.extend([synonym.name, synonym.name.upper(), f"Fecha {synonym.name}"])
+
+    def test_01_same_matches_as_linear_scan(self):
+        """Mismos field_types, confianzas y orden para todos los sinónimos y ERPs"""
+        for erp_system in [None, 'SAP', 'Generic_ES', 'Navision']:
+            for column_name in self.column_names:
+                self.assertEqual(linear_exact_matches(self.mapper, column_name, erp_system),
+                                 self.mapper._find_exact_matches(column_name, erp_system),
+                                 f"{column_name} ({erp_system})")
+
+    def test_02_incremental_add_remove(self):
+        """add/remove_dynamic_synonym actualizan solo el campo afectado"""
+        loader = self.mapper.field_loader
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertTrue(self.mapper.add_dynamic_synonym('vendor_id', 'CodigoAcreedorXYZ', 'Custom', 0.5))
+            self.assertIn(('vendor_id', 0.9), self.mapper._find_exact_matches('Codigo Acreedor XYZ'))
+            reindexed = loader.stats['synonym_index_fields_reindexed']
+            self.assertTrue(self.mapper.remove_dynamic_synonym('vendor_id', 'CodigoAcreedorXYZ', 'Custom'))
+        self.assertEqual(loader.stats['synonym_index_fields_reindexed'], reindexed + 1)
+        self.assertEqual(self.mapper._find_exact_matches('Codigo Acreedor XYZ'), [])
+
+        # Cambios directos sobre la definición también se detectan (por versión)
+        field_def = loader.get_field_definition('vendor_id')
+        field_def.add_synonym('Custom', 'AcreedorDirecto')
+        self.assertEqual(self.mapper._find_exact_matches('AcreedorDirecto'), [('vendor_id', 0.85)])
+        field_def.remove_synonym('Custom', 'AcreedorDirecto')
+        self.assertEqual(self.mapper._find_exact_matches('AcreedorDirecto'), [])
+
+    def test_03_reload_only_reindexes_changed_fields(self):
+        """Una recarga sin cambios en los sinónimos no reindexa ningún campo"""
+        loader = self.mapper.field_loader
+        loader.lookup_synonyms('')
+        reindexed = loader.stats['synonym_index_fields_reindexed']
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertTrue(loader.reload_configuration(force=True))
+        self.assertEqual(loader.stats['synonym_index_fields_reindexed'], reindexed)
+        self.test_01_same_matches_as_linear_scan()
+
+    def test_04_lookup_does_not_resync_unchanged_definitions(self):
+        """Sin cambios en las definiciones, lookup_synonyms no recorre los campos"""
+        loader = self.mapper.field_loader
+        loader.lookup_synonyms('')
+        calls = []
+        original = loader.get_field_definitions
+        loader.get_field_definitions = lambda: calls.append(1) or original()
+        try:
+            for column_name in self.column_names[:50]:
+                loader.lookup_synonyms(self.mapper._normalize_field_name(column_name))
+            self.assertEqual(calls, [])
+
+            # Un cambio en una definición (versión) o en el loader vuelve a sincronizar una vez
+            field_def = loader.get_field_definition('vendor_id')
+            field_def.add_synonym('Custom', 'AcreedorStamp')
+            self.assertEqual(self.mapper._find_exact_matches('AcreedorStamp'), [('vendor_id', 0.85)])
+            self.assertEqual(len(calls), 1)
+            field_def.remove_synonym('Custom', 'AcreedorStamp')
+            self.assertEqual(self.mapper._find_exact_matches('AcreedorStamp'), [])
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.assertIn('vendor_id', dict(self.mapper._find_exact_matches('vendor_id')))
+                self.assertTrue(loader.remove_field_definition('vendor_id'))
+                self.assertNotIn('vendor_id', dict(self.mapper._find_exact_matches('vendor_id')))
+                self.assertTrue(loader.add_field_definition(field_def))
+        finally:
+            loader.get_field_definitions = original
+        self.test_01_same_matches_as_linear_scan()
+
+    def test_05_micro_benchmark(self):
+        """Reporta µs por columna del recorrido lineal frente al índice"""
+        column_names = self.column_names[:500]
+
+        start = time.perf_counter()
+        for column_name in column_names:
+            linear_exact_matches(self.mapper, column_name, 'SAP')
+        linear_us = (time.perf_counter() - start) / len(column_names) * 1e6
+
+        start = time.perf_counter()
+        for column_name in column_names:
+            self.mapper._find_exact_matches(column_name, 'SAP')
+        indexed_us = (time.perf_counter() - start) / len(column_names) * 1e6
+
+        print(f"\n    ⚡ Linear scan: {linear_us:8.1f} µs/column")
+        print(f"    ⚡ Hash index:  {indexed_us:8.1f} µs/column ({linear_us / indexed_us:.0f}x)")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+"""
+Tests del generador de libros sintéticos y del harness de benchmarks
+Verifica que el libro es reproducible por semilla (también escrito por bloques), que
+respeta la tasa de asientos descuadrados, los formatos numéricos y la mezcla de fechas,
+que el FieldMapper reconoce los layouts de SAP/A3, que el harness deja un JSON con
+medidas y comprobaciones, y que la comparación con la baseline marca regresiones sin
+reaccionar al ruido; reporta filas/s por motor
+"""
+
+import io
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+import contextlib
+from pathlib import Path
+
+import pandas as pd
+
+# Configurar path del proyecto
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from synthetic_ledger import (ERP_LAYOUTS, generate_ledger, write_synthetic_ledger, unbalanced_entry_count,
+                              resolve_size, ledger_text_lines)
+from benchmark_suite import (run_benchmarks, write_benchmark_results, compare_with_baseline, main,
+                             BENCHMARK_ENGINES)
+
+
+class TestSyntheticBenchmark(unittest.TestCase):
+    """Libros sintéticos deterministas por ERP y benchmarks con baseline"""
+
+    def setUp(self):
+        self.original_cwd = os.getcwd()
+        self.temp_dir = tempfile.mkdtemp()
+        os.chdir(self.temp_dir)
+        os.symlink(project_root / 'config', 'config')
+
+    def tearDown(self):
+        os.chdir(self.original_cwd)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_01_deterministic(self):
+        """Misma semilla → mismos bytes, también con otro tamaño de bloque; otra semilla → otro libro"""
+        first = write_synthetic_ledger('a.csv', 'sap', 5000, seed=7, chunk_rows=1200)
+        write_synthetic_ledger('b.csv', 'sap', 5000, seed=7, chunk_rows=1200)
+        write_synthetic_ledger('c.csv', 'sap', 5000, seed=8, chunk_rows=1200)
+        self.assertEqual(Path('a.csv').read_bytes(), Path('b.csv').read_bytes())
+        self.assertNotEqual(Path('a.csv').read_bytes(), Path('c.csv').read_bytes())
+        self.assertEqual((first['rows'], first['chunks']), (5000, 5))
+        self.assertEqual(first['bytes'], os.path.getsize('a.csv'))
+
+        ledger = pd.read_csv('a.csv', dtype=str)
+        self.assertEqual(list(ledger.columns), list(ERP_LAYOUTS['sap']['columns']))
+        # Los asientos no se parten entre bloques y los números siguen en orden
+        self.assertEqual(ledger['BELNR'].nunique(), first['entries'])
+        self.assertTrue(ledger['BELNR'].is_monotonic_increasing)
+        self.assertEqual(resolve_size('10M'), 10_000_000)
+        with self.assertRaises(ValueError):
+            generate_ledger('unknown', 10)
+
+    def test_02_unbalanced_rate_and_formats(self):
+        """Descuadres según la tasa, formato europeo/plano y horas en una parte de las fechas"""
+        balanced = generate_ledger('navision', 4000, seed=1, unbalanced_rate=0.0)
+        self.assertEqual(unbalanced_entry_count(balanced, 'navision'), 0)
+
+        ledger = generate_ledger('contaplus', 20000, seed=2, unbalanced_rate=0.1, datetime_mix=0.5)
+        entries = ledger['NumAsiento'].nunique()
+        self.assertAlmostEqual(unbalanced_entry_count(ledger, 'contaplus') / entries, 0.1, delta=0.03)
+        self.assertTrue(ledger['Debe'].str.match(r'^-?[\d.]+,\d{2}$').all())
+        with_time = ledger['FechaAsiento'].str.contains(':')
+        self.assertTrue(0.3 < with_time.mean() < 0.7)
+        self.assertTrue(ledger.loc[~with_time, 'FechaAsiento'].str.match(r'^\d{2}/\d{2}/\d{4}$').all())
+
+        plain = generate_ledger('a3', 2000, seed=3, number_format='plain')
+        self.assertTrue(plain['IMPORTE'].str.match(r'^-?\d+\.\d{2}$').all())
+        # Con indicador D/H el importe va con signo (el motor no deriva el signo del indicador)
+        negative = plain['IMPORTE'].str.startswith('-')
+        self.assertTrue((plain.loc[negative, 'DEBE_HABER'] == 'H').all())
+        self.assertTrue((plain.loc[~negative, 'DEBE_HABER'] == 'D').all())
+
+        lines = ledger_text_lines(plain.head(20), 'a3')
+        self.assertGreater(len(lines), 20)
+
+    def test_03_harness_json_and_checks(self):
+        """El harness mide cada motor, comprueba mapeo y descuadres y guarda el JSON"""
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = run_benchmarks(3000, layouts=['sap', 'a3'], seed=4)
+        self.assertEqual(set(results['results']),
+                         {f"{layout}/{engine}" for layout in ('sap', 'a3') for engine in BENCHMARK_ENGINES})
+        for layout in ('sap', 'a3'):
+            with self.subTest(layout=layout):
+                checks = {engine: results['results'][f"{layout}/{engine}"]['checks'] for engine in BENCHMARK_ENGINES}
+                self.assertEqual(checks['field_mapper']['mapping_accuracy'], 1.0, checks['field_mapper'])
+                self.assertTrue(checks['balance_validator']['unbalanced_match'], checks['balance_validator'])
+                self.assertTrue(checks['csv_transformer']['success'])
+                self.assertEqual(checks['accounting_processor']['amount_parsed'], 1.0)
+
+        mapper = results['results']['sap/field_mapper']
+        self.assertGreater(mapper['rows_per_second'], 0)
+        self.assertIn('conflict_resolution', mapper['stages'])
+        self.assertTrue(any(path.startswith('datetime_separation') or path.endswith('csv_write')
+                            for path in results['results']['sap/csv_transformer']['stages']))
+
+        path = write_benchmark_results(results)
+        self.assertTrue(path.startswith(os.path.join('results', 'benchmarks', 'benchmark_3000_')))
+        self.assertEqual(json.loads(Path(path).read_text(encoding='utf-8'))['parameters']['rows'], 3000)
+
+    def test_04_streaming_beyond_memory_rows(self):
+        """Por encima de max_memory_rows el transformador recorre el fichero completo por chunks"""
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = run_benchmarks(4000, layouts=['navision'], engines=['csv_transformer', 'balance_validator'],
+                                     max_memory_rows=1500)
+        transformer = results['results']['navision/csv_transformer']
+        self.assertTrue(transformer['checks']['streaming'])
+        self.assertEqual((transformer['rows'], transformer['checks']['rows_processed']), (4000, 4000))
+        self.assertEqual(results['results']['navision/balance_validator']['rows'], 1500)
+
+    def test_05_baseline_comparison(self):
+        """Más lento que la tolerancia y el mínimo absoluto → regresión; ruido en medidas cortas no"""
+        def results(**seconds):
+            return {'results': {name.replace('__', '/'): {'seconds': value, 'rows': 10_000}
+                                for name, value in seconds.items()}}
+
+        baseline = results(sap__field_mapper=1.0, sap__csv_transformer=0.010, sap__feature_extractor=2.0)
+        current = results(sap__field_mapper=1.5, sap__csv_transformer=0.030, sap__feature_extractor=1.0,
+                          a3__field_mapper=0.5)
+        comparison = compare_with_baseline(current, baseline, tolerance=0.25, min_delta_seconds=0.05)
+        self.assertEqual([entry['benchmark'] for entry in comparison['regressions']], ['sap/field_mapper'])
+        self.assertEqual([entry['benchmark'] for entry in comparison['improvements']], ['sap/feature_extractor'])
+        self.assertEqual([entry['benchmark'] for entry in comparison['unchanged']], ['sap/csv_transformer'])
+        self.assertEqual([entry['benchmark'] for entry in comparison['missing']], ['a3/field_mapper'])
+
+        # La CLI sale con 1 cuando hay regresiones frente a la baseline guardada
+        arguments = ['--size', '2000', '--layouts', 'sap', '--engines', 'balance_validator']
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(main(arguments + ['--save-baseline']), 0)
+            baseline_file = os.path.join('results', 'benchmarks', 'baseline_2000.json')
+            saved = json.loads(Path(baseline_file).read_text(encoding='utf-8'))
+            saved['results']['sap/balance_validator']['seconds'] = 0.0
+            Path(baseline_file).write_text(json.dumps(saved), encoding='utf-8')
+            self.assertEqual(main(arguments + ['--tolerance', '0', '--min-delta', '0']), 1)
+
+    def test_06_benchmark(self):
+        """Reporta filas/s por motor con un libro SAP de 10k filas"""
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = run_benchmarks('10k', layouts=['sap'])
+        print(f"\n    ⚡ Synthetic SAP ledger, {results['parameters']['rows']:,} rows:")
+        for name, measurement in results['results'].items():
+            print(f"    ⚡ {name.split('/')[1]:<22} {measurement['seconds']:7.3f} s "
+                  f"({measurement['rows_per_second']:>10,.0f} rows/s)")
+
+
+if __name__ == '__main__':
+    unittest.main()
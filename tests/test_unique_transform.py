@@ -0,0 +1,141 @@
+"""
+Tests de la capa de transformación por valor distinto (unique_transform.apply_unique)
+Compara apply_unique con series.apply en columnas con valores repetidos, mezclas de
+tipos y -0.0, su uso en la limpieza numérica del procesador y en balance_sumarias,
+y reporta el tiempo y la reducción filas/distintos frente a .apply
+"""
+
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+from decimal import Decimal
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Configurar path del proyecto
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from unique_transform import (
+    apply_unique, reduction_ratio, unique_transform_report, reset_unique_transform_stats
+)
+from accounting_data_processor import AccountingDataProcessor, clean_numeric_series
+from balance_sumarias import clean_number, clean_account_number, normalize_text, transformar_excel_a_csv
+from tests.test_numeric_cleaning_engine import read_data_file
+
+
+def same_result(expected: pd.Series, actual: pd.Series) -> bool:
+    """Mismo dtype, índice, nombre y valores (incluido el signo de los ceros)"""
+    return (expected.dtype == actual.dtype and expected.index.equals(actual.index)
+            and expected.name == actual.name and repr(expected.tolist()) == repr(actual.tolist()))
+
+
+class TestUniqueTransform(unittest.TestCase):
+    """apply_unique da el mismo resultado que .apply evaluando cada valor distinto una vez"""
+
+    def setUp(self):
+        reset_unique_transform_stats()
+
+    def test_01_matches_apply(self):
+        """Mismo resultado que .apply, incluidas mezclas de tipos que factorize agrupa"""
+        columns = {
+            'accounts': pd.Series(['4300001', '4300001.0', None, ' 572 ', '4300001'] * 3, name='cta'),
+            'object_text': pd.Series(['1.234,56', '(12)', None, 'x', '', '1.234,56'], dtype=object),
+            'floats': pd.Series([4300001.0, np.nan, 4300001.0, 5.5], index=[3, 1, 2, 9]),
+            'signed_zero': pd.Series([-0.0, 0.0, 1.0]),
+            'bool_and_int': pd.Series([True, 1, 1.0, 'x'], dtype=object),
+            'decimals': pd.Series([Decimal('1.0'), Decimal('1.00')], dtype=object),
+            'mixed_int_text': pd.Series([1, 'a', 1, None], dtype=object),
+            'all_null': pd.Series([None, None], dtype=object),
+            'empty': pd.Series([], dtype=object),
+        }
+        for name, series in columns.items():
+            for fn in (clean_number, clean_account_number, normalize_text, str):
+                with self.subTest(column=name, fn=fn.__name__):
+                    self.assertTrue(same_result(series.apply(fn), apply_unique(series, fn)))
+
+        apply_unique(columns['accounts'], clean_account_number, label='accounts')
+        self.assertEqual(reduction_ratio('accounts'), 15 / 4)
+        self.assertEqual(unique_transform_report()['accounts']['uniques'], 4)
+
+    def test_02_processor_numeric_cleaning(self):
+        """La limpieza del procesador por valores distintos es idéntica bit a bit a la de la columna completa"""
+        processor = AccountingDataProcessor()
+        for csv_path in sorted((project_root / 'data').glob('*.csv')):
+            df = read_data_file(csv_path, as_text=True)
+            for column in df.columns:
+                with self.subTest(file=csv_path.name, column=column):
+                    expected, _ = clean_numeric_series(df[column])
+                    actual = processor._clean_numeric_column_with_zero_fill(df[column])
+                    self.assertEqual(expected.dtype, actual.dtype)
+                    self.assertTrue(expected.index.equals(actual.index))
+                    np.testing.assert_array_equal(expected.to_numpy(), actual.to_numpy())
+
+        df = pd.DataFrame({'debit_amount': ['1.000,50', '0,00', '1.000,50', '0,00'],
+                           'credit_amount': ['0,00', '1.000,50', '0,00', '1.000,50']})
+        processed, stats = processor.process_numeric_fields_and_calculate_amounts(df)
+        self.assertEqual(processed['amount'].tolist(), [1000.5, -1000.5, 1000.5, -1000.5])
+        self.assertEqual(stats['numeric_rows_cleaned'], 8)
+        self.assertEqual(stats['numeric_unique_values'], 4)
+
+    def test_03_trial_balance(self):
+        """transformar_excel_a_csv da el mismo CSV que aplicar las funciones fila a fila"""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            rows = 300
+            accounts = [f"43{i % 12:05d}" for i in range(rows)]
+            raw = pd.DataFrame({
+                'NIVEL CUENTA': ['4'] * rows,
+                'CUENTA MAYOR': ['430'] * rows,
+                'CUENTA': [float(a) if i % 3 else a for i, a in enumerate(accounts)],
+                'CUENTA LOCAL': [a + '.0' for a in accounts],
+                'SALDO 31/12/2023': [f"{(i % 7) * 1000},50" for i in range(rows)],
+                'SALDO FINAL': [f"({i % 5}.250,00)" if i % 2 else f"{i % 5}.250,00" for i in range(rows)],
+            })
+            input_file = Path(temp_dir) / 'sumas_saldos.xlsx'
+            with pd.ExcelWriter(input_file) as writer:
+                pd.DataFrame([['Balance de sumas y saldos']]).to_excel(writer, header=False, index=False)
+                raw.to_excel(writer, startrow=2, index=False)
+
+            output_file = Path(temp_dir) / 'trial_balance.csv'
+            transformar_excel_a_csv(str(input_file), str(output_file))
+            result = pd.read_csv(output_file, dtype=str, keep_default_na=False)
+
+            source = pd.read_excel(input_file, header=2)
+            expected_accounts = source['CUENTA'].apply(clean_account_number).tolist()
+            expected_ending = source['SALDO FINAL'].apply(clean_number).map('{:.2f}'.format).tolist()
+            self.assertEqual(result['gl_account_number'].tolist(), expected_accounts)
+            self.assertEqual(result['period_ending_balance'].tolist(), expected_ending)
+            self.assertEqual(reduction_ratio('period_ending_balance'), rows / 10)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def test_04_benchmark(self):
+        """Reporta el tiempo de .apply frente a apply_unique en columnas de libro diario"""
+        rng = np.random.default_rng(3)
+        rows = 1_000_000
+        accounts = pd.Series(rng.choice([f"{4300000 + i}" for i in range(800)], rows), dtype=object)
+        amounts = pd.Series(rng.choice([f"{x:.2f}".replace('.', ',') for x in rng.uniform(0, 5e4, 20_000)], rows),
+                            dtype=object)
+        print()
+        for name, series, fn in (('gl_account_number', accounts, clean_account_number),
+                                 ('amount', amounts, clean_number)):
+            start = time.perf_counter()
+            expected = series.apply(fn)
+            apply_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            actual = apply_unique(series, fn, label=name)
+            unique_seconds = time.perf_counter() - start
+
+            self.assertTrue(same_result(expected, actual))
+            print(f"    ⚡ {name + ':':19s} .apply {apply_seconds:6.2f} s, apply_unique {unique_seconds:6.2f} s "
+                  f"({apply_seconds / unique_seconds:.0f}x, {reduction_ratio(name):,.0f} rows/unique)")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,294 @@
+"""
+Tests de los validadores precompilados (config/custom_field_validators.py)
+Verifica que los validadores con matchers compilados y puntuación por arrays dan
+exactamente los mismos scores que los bucles valor a valor con re.match por patrón,
+que los matchers solo se recompilan al aprender un patrón y reporta el coste por columna
+"""
+
+import re
+import sys
+import time
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+# Configurar path del proyecto
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from config import custom_field_validators as validators
+from config.custom_field_validators import (
+    PatternValidatorRegistry, CompiledPatternMatcher, AVAILABLE_VALIDATORS,
+    JOURNAL_ENTRY_ID_PATTERNS, DATE_FIELD_PATTERNS, AMOUNT_PATTERNS, GL_ACCOUNT_PATTERNS,
+    DATE_LIKE_PATTERNS, DEBIT_CREDIT_INDICATORS, _is_numeric, _try_parse_date
+)
+
+
+# ===== Implementación original valor a valor (referencia) =====
+
+def first_match(patterns, value: str) -> bool:
+    for pattern in patterns:
+        try:
+            if re.match(pattern, value):
+                return True
+        except re.error:
+            continue
+    return False
+
+
+def with_learned(patterns, learned_patterns, field_type):
+    patterns = list(patterns)
+    if learned_patterns and field_type in learned_patterns:
+        patterns += [info['regex'] for info in learned_patterns[field_type].get('patterns', []) if 'regex' in info]
+    return patterns
+
+
+def is_date_like(value) -> bool:
+    return any(re.match(pattern, str(value).strip()) for pattern in DATE_LIKE_PATTERNS)
+
+
+def loop_validator(step, clamp: bool = True):
+    """Bucle original: clean_series, valid_count += step(valor) y clamp final"""
+    def validate(series, learned_patterns=None, field_type=None):
+        if series.empty:
+            return 0.0
+        try:
+            clean_series = series.dropna().astype(str)
+            if len(clean_series) == 0:
+                return 0.0
+            valid_count = 0
+            context = step.prepare(learned_patterns, field_type)
+            for value in clean_series:
+                valid_count = step(str(value).strip(), valid_count, context)
+            ratio = valid_count / len(clean_series)
+            return max(0.0, min(ratio, 1.0)) if clamp else ratio
+        except Exception:
+            return 0.0
+    return validate
+
+
+def journal_step(value, valid_count, patterns):
+    if first_match(patterns, value.upper()):
+        return valid_count + 1
+    if len(value) >= 6 and value.isdigit():
+        valid_count += 0.8
+    elif len(value) >= 4 and re.match(r'^[A-Z0-9]+$', value.upper()):
+        valid_count += 0.6
+    if is_date_like(value):
+        valid_count -= 0.5
+    if len(value) < 3:
+        valid_count -= 0.3
+    return valid_count
+
+
+def date_step(value, valid_count, patterns):
+    if first_match(patterns, value):
+        return valid_count + 1
+    if _try_parse_date.__wrapped__(value):
+        valid_count += 0.8
+    elif len(value) > 8 and value.isdigit():
+        valid_count -= 0.3
+    return valid_count
+
+
+def amount_step(value, valid_count, patterns):
+    if first_match(patterns, value):
+        return valid_count + 1
+    if _is_numeric(value):
+        valid_count += 0.7
+    if len(value) > 2:
+        if sum(1 for c in value if c.isalpha()) > len(value) * 0.5:
+            valid_count -= 0.5
+    if is_date_like(value):
+        valid_count -= 0.4
+    return valid_count
+
+
+def debit_credit_step(value, valid_count, indicators):
+    value = value.upper()
+    if value in indicators:
+        valid_count += 1
+    elif len(value) == 1 and value in 'DCHXSNYN+-':
+        valid_count += 0.8
+    elif value in ['YES', 'NO', 'SI', 'TRUE', 'FALSE']:
+        valid_count += 0.6
+    if _is_numeric(value):
+        try:
+            num_val = abs(float(value.replace(',', '.')))
+            if num_val > 10:
+                valid_count -= 0.8
+            elif num_val <= 1:
+                valid_count += 0.3
+        except Exception:
+            pass
+    if len(value) > 10:
+        valid_count -= 0.5
+    return valid_count
+
+
+def gl_account_step(value, valid_count, patterns):
+    if first_match(patterns, value):
+        return valid_count + 1
+    if len(value) >= 3 and value.replace('.', '').replace('-', '').isdigit():
+        valid_count += 0.8
+    elif len(value) >= 3 and re.match(r'^[A-Z0-9\.\-]+$', value.upper()):
+        valid_count += 0.6
+    try:
+        if 1 <= int(value.replace('.', '').replace('-', '')) <= 12:
+            valid_count -= 0.4
+    except Exception:
+        pass
+    if len(value) < 3:
+        valid_count -= 0.3
+    return valid_count
+
+
+def description_step(value, valid_count, _):
+    if len(value) >= 3:
+        has_letters = any(c.isalpha() for c in value)
+        if has_letters and (' ' in value or len(value) > 10):
+            valid_count += 1
+        elif has_letters:
+            valid_count += 0.7
+        elif len(value) > 5:
+            valid_count += 0.4
+    if value.replace('.', '').replace(',', '').replace('-', '').replace(' ', '').isdigit():
+        valid_count -= 0.6 if len(value) < 8 else 0.2
+    if is_date_like(value):
+        valid_count -= 0.4
+    if len(value) < 2:
+        valid_count -= 0.5
+    return valid_count
+
+
+def learned_examples(learned_patterns, field_type):
+    indicators = set(DEBIT_CREDIT_INDICATORS)
+    if learned_patterns and 'debit_credit_indicator' in learned_patterns:
+        indicators |= {example.upper().strip()
+                       for example in learned_patterns['debit_credit_indicator'].get('examples', [])}
+    return indicators
+
+
+journal_step.prepare = lambda learned, _: with_learned(JOURNAL_ENTRY_ID_PATTERNS, learned, 'journal_entry_id')
+date_step.prepare = lambda learned, field_type: with_learned(DATE_FIELD_PATTERNS, learned, field_type)
+amount_step.prepare = lambda learned, field_type: with_learned(AMOUNT_PATTERNS, learned, field_type)
+debit_credit_step.prepare = learned_examples
+gl_account_step.prepare = lambda learned, _: with_learned(GL_ACCOUNT_PATTERNS, learned, 'gl_account_number')
+description_step.prepare = lambda learned, _: None
+
+# {validador: (referencia, field_type)}
+REFERENCE_VALIDATORS = {
+    'validate_journal_entry_id': (loop_validator(journal_step), 'journal_entry_id'),
+    'validate_posting_date': (loop_validator(date_step, clamp=False), 'posting_date'),
+    'validate_entry_date': (loop_validator(date_step, clamp=False), 'entry_date'),
+    'validate_amount': (loop_validator(amount_step), 'amount'),
+    'validate_debit_amount': (loop_validator(amount_step), 'debit_amount'),
+    'validate_amount_credit': (loop_validator(amount_step), 'amount_credit'),
+    'validate_debit_credit_indicator': (loop_validator(debit_credit_step), 'debit_credit_indicator'),
+    'validate_gl_account_number': (loop_validator(gl_account_step), 'gl_account_number'),
+    'validate_je_header_description': (loop_validator(description_step), 'description'),
+    'validate_je_line_description': (loop_validator(description_step), 'line_description'),
+}
+
+
+def sample_columns(sample_size: int):
+    for csv_file in sorted((project_root / 'data').glob('*.csv')):
+        try:
+            df = pd.read_csv(csv_file, nrows=2000)
+        except Exception:
+            continue
+        for column in df.columns:
+            yield f"{csv_file.name}:{column}", df[column].dropna().head(sample_size)
+
+
+class TestCompiledValidators(unittest.TestCase):
+    """Los validadores compilados deben dar exactamente los scores del bucle original"""
+
+    def assert_same_scores(self, series: pd.Series, learned_patterns=None, label: str = ''):
+        for name, (reference, field_type) in REFERENCE_VALIDATORS.items():
+            expected = reference(series, learned_patterns, field_type)
+            actual = AVAILABLE_VALIDATORS[name](series, learned_patterns)
+            with self.subTest(column=label, validator=name):
+                self.assertEqual(actual, expected)
+
+    def test_01_parity_on_sample_columns(self):
+        """Mismo score en todas las columnas de data/*.csv (muestras del detector y de 500 valores)"""
+        for sample_size in [20, 500]:
+            for label, series in sample_columns(sample_size):
+                self.assert_same_scores(series, label=label)
+
+    def test_02_parity_on_edge_cases(self):
+        """Valores límite, patrones aprendidos, regex inválidas y referencias a grupos"""
+        series = pd.Series(['JE123456789', '20240001234', 'AST12345678', '01/01/2024', '1.234,56', '-5,00',
+                            'D', 'h', ' 0 ', '-1', '12', '4300001', '43.000-01', 'ab', 'x', '', '  ',
+                            'Pago factura enero', 'EUR', '2024-13', '18-dic-23', 'FY2024', 'Q3', 'XX99',
+                            '20240101', '123456789012', 'TRUE', 'si', '1,5', 'abcabc', None, 3.5, 12, -7])
+        learned = {field_type: {'patterns': [{'regex': r'^XX\d{2}$'}, {'regex': '[unclosed'},
+                                             {'regex': r'^(abc)\1$'}, {'name': 'sin regex'}],
+                                'examples': ['xx99', ' Foo ']}
+                   for field_type in ['journal_entry_id', 'posting_date', 'amount', 'debit_credit_indicator',
+                                      'gl_account_number']}
+        for learned_patterns in [None, {}, learned]:
+            self.assert_same_scores(series, learned_patterns, label=str(bool(learned_patterns)))
+        self.assert_same_scores(pd.Series([], dtype=object))
+        self.assert_same_scores(pd.Series([None, None]))
+
+        matcher = CompiledPatternMatcher([r'^(abc)\1$', '[bad', r'^\d+$', r'(?i)^x$'])
+        self.assertEqual(matcher.patterns, (r'^(abc)\1$', r'^\d+$', r'(?i)^x$'))
+        self.assertEqual(matcher.match_all(['abcabc', '123', 'X', 'abc']).tolist(), [True, True, True, False])
+
+    def test_03_recompiles_only_on_learn_pattern(self):
+        """El matcher de un campo se compila una vez y solo se rehace al aprender un patrón"""
+        registry = PatternValidatorRegistry()
+        registry.learned_patterns = {}
+        # Sin escribir config/validator_patterns.json
+        registry.save_learned_patterns = lambda: None
+        registry.register_validator('journal_entry_id', validators.validate_journal_entry_id)
+
+        original_registry = validators.validator_registry
+        validators.validator_registry = registry
+        try:
+            series = pd.Series(['AB1234', 'CD5678', 'ZZ99'])
+            for _ in range(5):
+                initial_score = registry.validate_field('journal_entry_id', series)
+            self.assertEqual(registry.matcher_compilations, 1)
+
+            registry.learn_pattern('journal_entry_id', series, {'regex': r'^ZZ\d{2}$'})
+            score = registry.validate_field('journal_entry_id', series)
+            registry.validate_field('journal_entry_id', series)
+            self.assertEqual(registry.matcher_compilations, 2)
+            # ZZ99 pasa a coincidir con el patrón aprendido (1.0 en vez de 0.6)
+            self.assertAlmostEqual(score - initial_score, 0.4 / 3)
+
+            # Patrón repetido: no cambia el conjunto ni recompila
+            registry.learn_pattern('journal_entry_id', series, {'regex': r'^ZZ\d{2}$'})
+            registry.validate_field('journal_entry_id', series)
+            self.assertEqual(registry.matcher_compilations, 2)
+        finally:
+            validators.validator_registry = original_registry
+
+    def test_04_benchmark(self):
+        """Reporta el coste por columna del bucle original frente a los validadores compilados"""
+        for sample_size in [20, 1000]:
+            columns = [series for _, series in sample_columns(sample_size)]
+            timings = {}
+            for label, get_validator in [('loop', lambda name: REFERENCE_VALIDATORS[name]),
+                                         ('compiled', lambda name: (AVAILABLE_VALIDATORS[name], None))]:
+                start = time.perf_counter()
+                for name in REFERENCE_VALIDATORS:
+                    validator, field_type = get_validator(name)
+                    for series in columns:
+                        if field_type is None:
+                            validator(series, None)
+                        else:
+                            validator(series, None, field_type)
+                timings[label] = (time.perf_counter() - start) / (len(columns) * len(REFERENCE_VALIDATORS))
+
+            print(f"\n    ⚡ Loop validators:     {timings['loop'] * 1e6:8.0f} µs/column ({sample_size} values)")
+            print(f"    ⚡ Compiled validators: {timings['compiled'] * 1e6:8.0f} µs/column "
+                  f"({timings['loop'] / timings['compiled']:.1f}x)")
+
+
+if __name__ == '__main__':
+    unittest.main()
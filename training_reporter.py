@@ -6,6 +6,8 @@ from typing import Dict, List, Any, Optional
 from datetime import datetime
 import logging
 
+from stage_metrics import format_stage_metrics
+
 logger = logging.getLogger(__name__)
 
 class TrainingReporter:
@@ -140,6 +142,11 @@ class TrainingReporter:
             content_parts.append(self._create_patterns_section(data))
             self.report_sections.append("Learned Patterns")
         
+        # 14. Tiempos y memoria por etapa (stage_metrics)
+        if data.get('stage_metrics'):
+            content_parts.append(self._create_stage_metrics_section(data))
+            self.report_sections.append("Stage Metrics")
+        
         return "\n\n".join(content_parts)
     
     def _create_report_header(self, data: Dict[str, Any]) -> str:
@@ -535,6 +542,19 @@ Training Mode: {training_mode}"""
         
         return "\n".join(lines)
     
+    def _create_stage_metrics_section(self, data: Dict[str, Any]) -> str:
+        """Crea seccion de tiempos por etapa (wall/CPU, filas y pico de memoria)"""
+        lines = ["STAGE METRICS:"]
+        lines.append("=" * 30)
+        
+        stage_lines = format_stage_metrics(data.get('stage_metrics', {}))
+        if not stage_lines:
+            lines.append("  No stage metrics recorded")
+            return "\n".join(lines)
+        
+        lines.extend(f"  {line}" for line in stage_lines)
+        return "\n".join(lines)
+    
     def _detect_training_mode(self, data: Dict[str, Any]) -> str:
         """Detecta el modo de entrenamiento usado (EXISTENTE)"""
         # Buscar pistas en los datos
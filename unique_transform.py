@@ -0,0 +1,126 @@
+# unique_transform.py
+"""
+Transformaciones por valor distinto
+Las columnas de un libro diario repiten mucho (cuentas, fechas, usuarios, periodos e
+incluso importes). apply_unique factoriza la columna, aplica la función una sola vez
+por valor distinto y reconstruye la columna con los códigos, con el mismo resultado
+que series.apply(fn). Cada llamada acumula filas, valores distintos y tiempo por
+etiqueta para ver la reducción (filas / distintos) conseguida en cada columna
+"""
+
+import time
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# etiqueta → {'calls', 'rows', 'uniques', 'seconds'}
+unique_transform_stats: Dict[str, Dict[str, float]] = {}
+
+
+def apply_unique(series: pd.Series, fn: Callable, label: Optional[str] = None,
+                 vectorized: bool = False) -> pd.Series:
+    """
+    Equivalente a series.apply(fn) evaluando fn solo sobre los valores distintos
+    (cada tipo de nulo cuenta como un valor más y también pasa por fn)
+
+    Args:
+        series: Columna a transformar
+        fn: Función por valor, o con vectorized=True función que recibe la serie de
+            valores distintos y devuelve una serie/array del mismo tamaño
+        label: Etiqueta para acumular la reducción conseguida (por defecto el nombre de la serie)
+    """
+    start_time = time.perf_counter()
+    label = label if label is not None else str(series.name)
+    if not _factorize_is_exact(series):
+        result = series.apply(fn) if not vectorized else pd.Series(
+            fn(series.astype(object).reset_index(drop=True)), index=series.index, name=series.name)
+        _record(label, len(series), len(series), time.perf_counter() - start_time)
+        return result
+
+    codes, uniques = pd.factorize(series)
+    uniques = pd.Series(uniques, dtype=object)
+    nulls = codes < 0
+    if nulls.any():
+        # Un representante por tipo de nulo (None, NaN, NaT...): fn puede distinguirlos
+        null_values = series.to_numpy(dtype=object)[nulls]
+        null_kinds: Dict[type, object] = {}
+        for value in null_values:
+            null_kinds.setdefault(type(value), value)
+        kind_codes = {kind: len(uniques) + position for position, kind in enumerate(null_kinds)}
+        codes[nulls] = [kind_codes[type(value)] for value in null_values]
+        uniques = pd.concat([uniques, pd.Series(list(null_kinds.values()), dtype=object)], ignore_index=True)
+
+    if vectorized:
+        transformed = pd.Series(fn(uniques)).reset_index(drop=True)
+    else:
+        transformed = uniques.map(fn)
+
+    result = transformed.take(codes)
+    result.index = series.index
+    result.name = series.name
+    _record(label, len(series), len(uniques), time.perf_counter() - start_time)
+    return result
+
+
+def _factorize_is_exact(series: pd.Series) -> bool:
+    """
+    factorize agrupa valores iguales con distinto tipo (True == 1 == 1.0) y -0.0 con 0.0;
+    en esas columnas fn podría dar resultados distintos y se aplica fila a fila
+    """
+    if series.dtype.kind == 'f':
+        values = series.to_numpy()
+        return not np.signbit(values[values == 0]).any()
+    if series.dtype != object:
+        return True
+    inferred = pd.api.types.infer_dtype(series, skipna=True)
+    if inferred in ('string', 'empty', 'bytes', 'date', 'datetime', 'time', 'integer', 'boolean'):
+        return True
+    if inferred == 'decimal':
+        # Decimal('1.0') == Decimal('1.00') pero no se escriben igual
+        return False
+    if inferred == 'floating':
+        values = series.dropna().to_numpy(dtype=float)
+        return not np.signbit(values[values == 0]).any()
+    # Mezclas: exacto si entre los valores no nulos hay como mucho un tipo numérico
+    numeric_types = {value_type for value_type in map(type, series.dropna().to_numpy())
+                     if issubclass(value_type, (bool, int, float, complex, np.number, np.bool_))}
+    return len(numeric_types) <= 1
+
+
+def _record(label: str, rows: int, uniques: int, seconds: float):
+    stats = unique_transform_stats.setdefault(label, {'calls': 0, 'rows': 0, 'uniques': 0, 'seconds': 0.0})
+    stats['calls'] += 1
+    stats['rows'] += rows
+    stats['uniques'] += uniques
+    stats['seconds'] += seconds
+
+
+def reduction_ratio(label: str) -> float:
+    """Filas / valores distintos acumulados para una etiqueta (1.0 si no hay datos)"""
+    stats = unique_transform_stats.get(label)
+    if not stats or not stats['uniques']:
+        return 1.0
+    return stats['rows'] / stats['uniques']
+
+
+def unique_transform_report() -> Dict[str, Dict[str, float]]:
+    """Resumen por etiqueta con la reducción conseguida, de mayor a menor"""
+    report = {label: {**stats, 'reduction_ratio': reduction_ratio(label)}
+              for label, stats in unique_transform_stats.items()}
+    return dict(sorted(report.items(), key=lambda item: item[1]['reduction_ratio'], reverse=True))
+
+
+def print_unique_transform_report():
+    """Imprime la reducción filas/distintos de cada columna transformada"""
+    report = unique_transform_report()
+    if not report:
+        return
+    print(f"\n🔁 UNIQUE-VALUE TRANSFORMS:")
+    for label, stats in report.items():
+        print(f"   {label}: {stats['rows']:,} rows → {stats['uniques']:,} uniques "
+              f"({stats['reduction_ratio']:.1f}x), {stats['seconds']:.3f}s")
+
+
+def reset_unique_transform_stats():
+    unique_transform_stats.clear()